@@ -429,6 +429,8 @@ class CandidateEmail(db.Model):
 
     # labels_mapping = {1: 'Primary', 2: 'Home', 3: 'Work', 4: 'Other'}
     labels_mapping = {'Primary': 1, 'Home': 2, 'Work': 3, 'Other': 4}
+    # Maximum number of addresses in IN clause of bulk queries
+    BULK_QUERY_CHUNK_SIZE = 5000
 
     @classmethod
     def identify_label_id(cls, label):
@@ -488,6 +490,44 @@ class CandidateEmail(db.Model):
         bounced_email = cls.query.filter_by(address=email_address, is_bounced=True).first()
         return True if bounced_email else False
 
+    @classmethod
+    def get_bounced_addresses(cls, email_addresses):
+        """
+        Returns those of given email addresses which are marked bounced (in any domain), lower-cased as MySQL
+        compares addresses case-insensitively.
+        :param list | set email_addresses: email addresses
+        :rtype: set
+        """
+        bounced_addresses = set()
+        email_addresses = list(email_addresses)
+        for index in xrange(0, len(email_addresses), cls.BULK_QUERY_CHUNK_SIZE):
+            rows = cls.query.with_entities(cls.address).distinct(). \
+                filter(cls.address.in_(email_addresses[index:index + cls.BULK_QUERY_CHUNK_SIZE]),
+                       cls.is_bounced == True).all()
+            bounced_addresses.update(row.address.lower() for row in rows)
+        return bounced_addresses
+
+    @classmethod
+    def get_candidate_ids_of_addresses_in_domain(cls, domain_id, email_addresses):
+        """
+        Returns ids of candidates having given email addresses in given domain.
+        :param int | long domain_id: Domain Id
+        :param list | set email_addresses: email addresses
+        :return: Dictionary of lower-cased email address -> set of candidate ids
+        :rtype: dict
+        """
+        from user import User  # This is to avoid circular import error
+        candidate_ids_of_addresses = {}
+        email_addresses = list(email_addresses)
+        for index in xrange(0, len(email_addresses), cls.BULK_QUERY_CHUNK_SIZE):
+            rows = cls.query.with_entities(cls.address, cls.candidate_id).distinct(). \
+                join(Candidate, cls.candidate_id == Candidate.id).join(User, Candidate.user_id == User.id). \
+                filter(User.domain_id == domain_id,
+                       cls.address.in_(email_addresses[index:index + cls.BULK_QUERY_CHUNK_SIZE])).all()
+            for row in rows:
+                candidate_ids_of_addresses.setdefault(row.address.lower(), set()).add(row.candidate_id)
+        return candidate_ids_of_addresses
+
     @classmethod
     def mark_emails_bounced(cls, emails):
         """
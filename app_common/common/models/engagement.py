@@ -0,0 +1,97 @@
+"""
+Aggregated engagement scores of email-campaign sends.
+
+Score of a send is 0 if none of its URLs is hit, 33.3 if only its open tracking URL is hit and 100 if any of its
+text/html URLs is clicked. Scores are rolled up into per-campaign, per-candidate (of a campaign), per-pipeline,
+per-pipeline-candidate and per-candidate rows by utils/engagement_utils.py whenever sends are created or
+opened/clicked, so reading them is an index lookup.
+"""
+from datetime import datetime
+from db import db
+
+
+class EmailCampaignSendEngagement(db.Model):
+    __tablename__ = 'email_campaign_send_engagement'
+    email_campaign_send_id = db.Column(db.Integer, db.ForeignKey('email_campaign_send.Id', ondelete='CASCADE'),
+                                       primary_key=True, autoincrement=False)
+    email_campaign_id = db.Column(db.Integer, db.ForeignKey('email_campaign.Id', ondelete='CASCADE'),
+                                  nullable=False, index=True)
+    candidate_id = db.Column(db.BIGINT, db.ForeignKey('candidate.Id', ondelete='CASCADE'), nullable=False,
+                             index=True)
+    engagement_score = db.Column(db.Float, nullable=False, default=0)
+    updated_time = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return "<EmailCampaignSendEngagement (email_campaign_send_id = %r)>" % self.email_campaign_send_id
+
+
+class EmailCampaignEngagement(db.Model):
+    __tablename__ = 'email_campaign_engagement'
+    email_campaign_id = db.Column(db.Integer, db.ForeignKey('email_campaign.Id', ondelete='CASCADE'),
+                                  primary_key=True, autoincrement=False)
+    sends_count = db.Column(db.Integer, nullable=False, default=0)
+    engagement_score = db.Column(db.Float, nullable=False, default=0)
+    updated_time = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return "<EmailCampaignEngagement (email_campaign_id = %r)>" % self.email_campaign_id
+
+
+class CandidateCampaignEngagement(db.Model):
+    __tablename__ = 'candidate_campaign_engagement'
+    candidate_id = db.Column(db.BIGINT, db.ForeignKey('candidate.Id', ondelete='CASCADE'), primary_key=True,
+                             autoincrement=False)
+    email_campaign_id = db.Column(db.Integer, db.ForeignKey('email_campaign.Id', ondelete='CASCADE'),
+                                  primary_key=True, autoincrement=False, index=True)
+    engagement_score = db.Column(db.Float, nullable=False, default=0)
+    updated_time = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return "<CandidateCampaignEngagement (candidate_id = %r, email_campaign_id = %r)>" % (
+            self.candidate_id, self.email_campaign_id)
+
+
+class TalentPipelineEngagement(db.Model):
+    __tablename__ = 'talent_pipeline_engagement'
+    talent_pipeline_id = db.Column(db.Integer, db.ForeignKey('talent_pipeline.id', ondelete='CASCADE'),
+                                   primary_key=True, autoincrement=False)
+    engagement_score = db.Column(db.Float, nullable=False, default=0)
+    updated_time = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return "<TalentPipelineEngagement (talent_pipeline_id = %r)>" % self.talent_pipeline_id
+
+
+class TalentPipelineCandidateEngagement(db.Model):
+    __tablename__ = 'talent_pipeline_candidate_engagement'
+    talent_pipeline_id = db.Column(db.Integer, db.ForeignKey('talent_pipeline.id', ondelete='CASCADE'),
+                                   primary_key=True, autoincrement=False)
+    candidate_id = db.Column(db.BIGINT, db.ForeignKey('candidate.Id', ondelete='CASCADE'), primary_key=True,
+                             autoincrement=False)
+    engagement_score = db.Column(db.Float, nullable=False, default=0)
+    updated_time = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Top-N engaged candidates of a pipeline and top-N engaged pipelines of a candidate are read by these indexes
+    __table_args__ = (
+        db.Index('ix_talent_pipeline_candidate_engagement_pipeline_score', 'talent_pipeline_id', 'engagement_score'),
+        db.Index('ix_talent_pipeline_candidate_engagement_candidate_score', 'candidate_id', 'engagement_score'),
+    )
+
+    def __repr__(self):
+        return "<TalentPipelineCandidateEngagement (talent_pipeline_id = %r, candidate_id = %r)>" % (
+            self.talent_pipeline_id, self.candidate_id)
+
+
+class CandidateEngagement(db.Model):
+    """
+    Engagement score of a candidate, average of candidate's scores in pipelines of candidate's talent-pools.
+    Score is None if candidate is not sent any email-campaign through those pipelines.
+    """
+    __tablename__ = 'candidate_engagement'
+    candidate_id = db.Column(db.BIGINT, db.ForeignKey('candidate.Id', ondelete='CASCADE'), primary_key=True,
+                             autoincrement=False)
+    engagement_score = db.Column(db.Float)
+    updated_time = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return "<CandidateEngagement (candidate_id = %r)>" % self.candidate_id
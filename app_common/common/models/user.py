@@ -8,9 +8,9 @@ from contracts import contract
 from flask import request, current_app
 from dateutil.parser import parse
 from sqlalchemy.dialects.mysql import TINYINT
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, make_transient_to_detached
 from werkzeug.security import generate_password_hash
-from sqlalchemy import or_
+from sqlalchemy import or_, inspect
 
 from ..models.db import db
 from ..models.event import Event
@@ -24,11 +24,50 @@ from base_campaign import BaseCampaign
 from ..error_handling import *
 from ..redis_cache import redis_store
 from ..utils.validators import is_number
+from ..utils.token_cache import (get_verified_token, cache_verified_token, get_invalidation_count,
+                                 get_signing_secret, invalidate_secret_key, invalidate_access_token)
 from itsdangerous import (TimedJSONWebSignatureSerializer as Serializer, BadSignature, SignatureExpired)
 from ..utils.talent_s3 import sign_url_for_filepicker_bucket
 from ..error_codes import ErrorCodes
 
 
+def _get_column_values(instance):
+    """
+    Returns values of all columns of a model instance
+    :rtype: dict
+    """
+    return {attribute.key: getattr(instance, attribute.key)
+            for attribute in inspect(instance).mapper.column_attrs}
+
+
+def build_verified_token(secret_key_id=None, user=None, candidate=None):
+    """
+    Returns entry of a verified token to be cached by token_cache.cache_verified_token()
+    :param str | None secret_key_id: Id of signing secret of a JSON web token, None for OAuth2 tokens
+    :param User | None user: User of token
+    :param Candidate | None candidate: Candidate of token
+    :rtype: dict
+    """
+    identity = user or candidate
+    return {
+        'secret_key_id': secret_key_id,
+        'user_id': user.id if user else None,
+        'domain_id': user.domain_id if user else None,
+        'candidate_id': candidate.id if candidate else None,
+        'columns': _get_column_values(identity) if identity else None
+    }
+
+
+def _attach_from_column_values(model, column_values):
+    """
+    Builds an instance of model from column values returned by _get_column_values() and attaches it to session as
+    a persistent object, without loading it from database. Relationships are lazy loaded as usual.
+    """
+    instance = model(**column_values)
+    make_transient_to_detached(instance)
+    return db.session.merge(instance, load=False)
+
+
 class User(db.Model):
     __tablename__ = 'user'
     id = db.Column('Id', db.BIGINT, primary_key=True)
@@ -97,15 +136,28 @@ class User(db.Model):
 
     @staticmethod
     def verify_jw_token(secret_key_id, token, allow_null_user=False, allow_candidate=False):
+        """
+        Verifies a JSON web token and sets request.user and request.candidate. Tokens verified recently by this
+        process are authorized from cache (see utils/token_cache.py) without a round-trip to database or Redis.
+        :param str secret_key_id: Id of signing secret of token
+        :param str token: JSON web token without secret_key_id
+        :param bool allow_null_user: Authorize tokens without user_id
+        :param bool allow_candidate: Authorize tokens of candidates
+        """
+        cache_key = '%s.%s' % (token, secret_key_id)
+        verified_token = get_verified_token(cache_key)
+        if verified_token and User.authorize_verified_token(verified_token, allow_null_user, allow_candidate):
+            return
+        invalidation_count = get_invalidation_count()
 
         db.session.commit()
         '''Updating DB Session because when I generated a Bearer token using User.generate_jw_token()
         in Talentbot Service and I requested /parse[POST]. Method verify_jw_token() didn't find any user in database
         and raised UnauthorizedError .So I fixed it by manually updating DB Session.
         '''
-        s = Serializer(redis_store.get(secret_key_id) or '')
+        s = Serializer(get_signing_secret(secret_key_id) or '')
         try:
-            data = s.loads(token)
+            data, header = s.loads(token, return_header=True)
         except BadSignature:
             raise UnauthorizedError("Your Token is not found", error_code=11)
         except SignatureExpired:
@@ -118,24 +170,53 @@ class User(db.Model):
             if user:
                 if 'created_at' in data and user.password_reset_time > parse(data['created_at']):
                     redis_store.delete(secret_key_id)
+                    invalidate_secret_key(secret_key_id)
                     raise UnauthorizedError("Your token has expired due to password reset", error_code=12)
 
                 request.user = user
                 request.candidate = None
+                cache_verified_token(cache_key, build_verified_token(secret_key_id, user=user), invalidation_count,
+                                     header.get('exp'))
                 return
         elif allow_candidate and 'candidate_id' in data and data['candidate_id']:
             candidate = Candidate.query.get(data['candidate_id'])
             if candidate:
                 request.candidate = candidate
                 request.user = None
+                cache_verified_token(cache_key, build_verified_token(secret_key_id, candidate=candidate),
+                                     invalidation_count, header.get('exp'))
                 return
         elif allow_null_user:
             request.user = None
             request.candidate = None
+            cache_verified_token(cache_key, build_verified_token(secret_key_id), invalidation_count,
+                                 header.get('exp'))
             return
 
         raise UnauthorizedError("Your Token is invalid", error_code=13)
 
+    @staticmethod
+    def authorize_verified_token(verified_token, allow_null_user=False, allow_candidate=False):
+        """
+        Sets request.user and request.candidate from a cached verified token. User or candidate is rebuilt from
+        cached column values and attached to session without a query.
+        :param dict verified_token: Entry returned by build_verified_token()
+        :return: False if token is not authorized for this endpoint, so it is verified again
+        :rtype: bool
+        """
+        if verified_token['user_id']:
+            request.user = _attach_from_column_values(User, verified_token['columns'])
+            request.candidate = None
+        elif verified_token['candidate_id'] and allow_candidate:
+            request.candidate = _attach_from_column_values(Candidate, verified_token['columns'])
+            request.user = None
+        elif not verified_token['candidate_id'] and allow_null_user:
+            request.user = None
+            request.candidate = None
+        else:
+            return False
+        return True
+
     def to_dict(self):
         """
         This method withh convert sqlalchemy user object to a dictionary
@@ -468,6 +549,7 @@ class Token(db.Model):
     def delete(self):
         db.session.delete(self)
         db.session.commit()
+        invalidate_access_token(self.access_token)
 
     @property
     def scopes(self):
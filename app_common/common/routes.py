@@ -213,6 +213,8 @@ class ResumeApi(object):
     VERSION = 'v1'
     URL_PREFIX = '/' + VERSION + '/'
     PARSE = 'parse_resume'
+    BATCH_PARSE = 'parse_resumes'
+    PARSE_CACHE = 'parse_resume/cache'
 
 
 class ResumeApiUrl(object):
@@ -223,6 +225,8 @@ class ResumeApiUrl(object):
     HOST_NAME = _get_host_name(GTApis.RESUME_PARSING_SERVICE_NAME, GTApis.RESUME_PARSING_SERVICE_PORT)
     HEALTH_CHECK = _get_health_check_url(HOST_NAME)
     PARSE = HOST_NAME % ('/' + VERSION + '/parse_resume')
+    BATCH_PARSE = HOST_NAME % ('/' + VERSION + '/parse_resumes')
+    PARSE_CACHE = HOST_NAME % ('/' + VERSION + '/parse_resume/cache')
 
 
 class UserServiceApi(object):
@@ -381,14 +385,20 @@ class CandidateApi(object):
     CANDIDATE_EDIT = '/' + VERSION + '/candidates/<int:id>/edits'
 
     CANDIDATE_SEARCH = '/' + VERSION + '/candidates/search'
+    CANDIDATE_SEARCH_CACHE = '/' + VERSION + '/candidates/search/cache'
     CANDIDATES_DOCUMENTS = '/' + VERSION + '/candidates/documents'
+    CANDIDATES_DOCUMENTS_REINDEX = '/' + VERSION + '/candidates/documents/reindex'
+    CANDIDATES_DOCUMENTS_QUEUE = '/' + VERSION + '/candidates/documents/queue'
     OPENWEB = '/' + VERSION + '/candidates/openweb'
     CANDIDATE_CLIENT_CAMPAIGN = '/' + VERSION + '/candidates/client_email_campaign'
     CANDIDATE_VIEWS = '/' + VERSION + '/candidates/<int:id>/views'
+    CANDIDATE_CONTACT_HISTORY = '/' + VERSION + '/candidates/<int:id>/contact_history'
     CANDIDATE_PREFERENCES = '/' + VERSION + '/candidates/<int:id>/preferences'
+    CANDIDATES_PREFERENCES = '/' + VERSION + '/candidates/preferences'
 
     CANDIDATE_NOTES = '/' + VERSION + '/candidates/<int:candidate_id>/notes'
     CANDIDATE_NOTE = CANDIDATE_NOTES + '/<int:id>'
+    CANDIDATES_NOTES = '/' + VERSION + '/candidates/notes'
 
     LANGUAGES = '/' + VERSION + '/candidates/<int:candidate_id>/languages'
     LANGUAGE = '/' + VERSION + '/candidates/<int:candidate_id>/languages/<int:id>'
@@ -423,8 +433,11 @@ class CandidateApiUrl(object):
     CUSTOM_FIELD = CUSTOM_FIELDS + "/%s"
 
     CANDIDATE_SEARCH_URI = HOST_NAME % ('/' + VERSION + '/candidates/search')
+    CANDIDATE_SEARCH_CACHE_URI = HOST_NAME % ('/' + VERSION + '/candidates/search/cache')
 
     CANDIDATES_DOCUMENTS_URI = HOST_NAME % ('/' + VERSION + '/candidates/documents')
+    CANDIDATES_DOCUMENTS_REINDEX_URI = HOST_NAME % ('/' + VERSION + '/candidates/documents/reindex')
+    CANDIDATES_DOCUMENTS_QUEUE_URI = HOST_NAME % ('/' + VERSION + '/candidates/documents/queue')
 
     EDUCATIONS = HOST_NAME % ('/' + VERSION + '/candidates/%s/educations')
     EDUCATION = HOST_NAME % ('/' + VERSION + '/candidates/%s/educations/%s')
@@ -473,9 +486,12 @@ class CandidateApiUrl(object):
     WORK_PREFERENCE_ID = HOST_NAME % ('/' + VERSION + '/candidates/%s/work_preferences/%s')
     CANDIDATE_EDIT = HOST_NAME % ('/' + VERSION + '/candidates/%s/edits')
     CANDIDATE_VIEW = HOST_NAME % ('/' + VERSION + '/candidates/%s/views')
+    CONTACT_HISTORY = HOST_NAME % ('/' + VERSION + '/candidates/%s/contact_history')
     CANDIDATE_PREFERENCE = HOST_NAME % ('/' + VERSION + '/candidates/%s/preferences')
+    CANDIDATES_PREFERENCES = HOST_NAME % ('/' + VERSION + '/candidates/preferences')
 
     NOTES = HOST_NAME % ('/' + VERSION + '/candidates/%s/notes')
+    CANDIDATES_NOTES = HOST_NAME % ('/' + VERSION + '/candidates/notes')
     NOTE = NOTES + '/%s'
 
     CANDIDATE_CLIENT_CAMPAIGN = HOST_NAME % ('/' + VERSION + '/candidates/client_email_campaign')
@@ -0,0 +1,81 @@
+"""
+This module contains tests for TTLLRUCache in lru_cache.py module.
+"""
+import time
+
+from ..utils.lru_cache import TTLLRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    """
+    Test: Add more entries than max_size after reading first entry
+    Expect: Least recently used entry should be evicted, recently read entry should remain cached
+    """
+    cache = TTLLRUCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_expired_entry_is_not_returned():
+    """
+    Test: Read an entry after its ttl has passed
+    Expect: Default value should be returned and miss should be counted
+    """
+    cache = TTLLRUCache(max_size=10, ttl=60)
+    cache.set('a', 1, ttl=0.01)
+    cache.set('b', 2)
+    time.sleep(0.02)
+    assert cache.get('a', 'default') == 'default'
+    assert 'a' not in cache
+    assert cache.get('b') == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_delete_and_clear():
+    """
+    Test: Delete one entry and then clear cache
+    Expect: Deleted entry should be gone, clear() should remove all entries
+    """
+    cache = TTLLRUCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.delete('a')
+    assert 'a' not in cache and 'b' in cache
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_delete_matching():
+    """
+    Test: Delete entries whose value matches a predicate
+    Expect: Only non-matching entries should remain cached
+    """
+    cache = TTLLRUCache()
+    cache.set('a', {'user_id': 1})
+    cache.set('b', {'user_id': 2})
+    cache.set('c', {'user_id': 1})
+    cache.delete_matching(lambda key, value: value['user_id'] == 1)
+    assert 'a' not in cache and 'c' not in cache
+    assert cache.get('b') == {'user_id': 2}
+
+
+def test_replace_keeps_expiry():
+    """
+    Test: Replace value of a cached entry and of an expired entry
+    Expect: Cached entry should have new value but expire at its original time, expired entry should not be cached
+    """
+    cache = TTLLRUCache(max_size=10, ttl=60)
+    cache.set('a', 1, ttl=0.05)
+    cache.set('b', 2, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.replace('a', 10) is True
+    assert cache.replace('b', 20) is False
+    assert cache.get('a') == 10 and 'b' not in cache
+    time.sleep(0.04)
+    assert 'a' not in cache
@@ -0,0 +1,41 @@
+"""
+This module contains tests for invalidation of cached tokens in token_cache.py module.
+"""
+from ..utils.token_cache import (apply_invalidation, get_invalidation_count, signing_secret_cache,
+                                 verified_token_cache)
+
+
+def _cache_tokens():
+    verified_token_cache.clear()
+    signing_secret_cache.clear()
+    verified_token_cache.set('jwt-1.secret-1', {'secret_key_id': 'secret-1', 'user_id': 1})
+    verified_token_cache.set('jwt-2.secret-2', {'secret_key_id': 'secret-2', 'user_id': 2})
+    verified_token_cache.set('oauth-token', {'secret_key_id': None, 'user_id': 1})
+    signing_secret_cache.set('secret-1', 'secret-key-1')
+
+
+def test_user_invalidation_drops_all_tokens_of_user():
+    """
+    Test: Apply invalidation message of a user e.g. after password reset
+    Expect: JWT and OAuth2 tokens of that user should be dropped, tokens of other users should remain
+    """
+    _cache_tokens()
+    invalidation_count = get_invalidation_count()
+    apply_invalidation('user:1')
+    assert 'jwt-1.secret-1' not in verified_token_cache and 'oauth-token' not in verified_token_cache
+    assert 'jwt-2.secret-2' in verified_token_cache
+    assert get_invalidation_count() == invalidation_count + 1
+
+
+def test_secret_and_token_invalidation():
+    """
+    Test: Apply invalidation messages of a signing secret and of an OAuth2 access token e.g. after revocation
+    Expect: Secret and tokens verified by it should be dropped, revoked access token should be dropped
+    """
+    _cache_tokens()
+    apply_invalidation('secret:secret-1')
+    assert 'secret-1' not in signing_secret_cache
+    assert 'jwt-1.secret-1' not in verified_token_cache
+    apply_invalidation('token:oauth-token')
+    assert 'oauth-token' not in verified_token_cache
+    assert 'jwt-2.secret-2' in verified_token_cache
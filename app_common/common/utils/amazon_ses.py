@@ -60,8 +60,13 @@ def safe_send_email(source, subject, body, to_addresses, html_body=None, text_bo
 
 
 def send_email(source, subject, body, to_addresses, html_body=None, text_body=None,
-               reply_address=None, email_format='text'):
-    conn = get_boto_ses_connection()
+               reply_address=None, email_format='text', connection=None):
+    """
+    Sends email via Amazon SES.
+    :param connection: SES connection returned by get_boto_ses_connection(), a new connection is made if not given.
+                       Pass it when sending multiple emails, so connection is reused.
+    """
+    conn = connection or get_boto_ses_connection()
     email_result = conn.send_email(
         source=source,
         subject=subject,
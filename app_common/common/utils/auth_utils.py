@@ -5,6 +5,7 @@ __author__ = 'erikfarmer'
 # Standard Library
 import os
 import json
+import calendar
 from functools import wraps
 # Third Party
 import requests
@@ -13,7 +14,8 @@ from ..utils.handy_functions import random_letter_digit_string
 from ..models.user import *
 from ..error_handling import *
 from ..routes import AuthApiUrl
-from ..models.user import User, Role
+from ..models.user import User, Role, Token, build_verified_token
+from ..utils.token_cache import get_verified_token, cache_verified_token, get_invalidation_count
 from ..talent_config_manager import TalentConfigKeys, TalentEnvs
 
 
@@ -55,6 +57,12 @@ def require_oauth(allow_null_user=False, allow_candidate=False):
                 return func(*args, **kwargs)
 
             # Olf OAuth2.0 based Authentication
+            access_token = oauth_token.replace('Bearer', '').strip()
+            verified_token = get_verified_token(access_token)
+            if verified_token and User.authorize_verified_token(verified_token):
+                request.oauth_token = oauth_token
+                return func(*args, **kwargs)
+            invalidation_count = get_invalidation_count()
             try:
                 response = requests.get(AuthApiUrl.AUTHORIZE, headers={'Authorization': oauth_token})
             except Exception as e:
@@ -73,6 +81,11 @@ def require_oauth(allow_null_user=False, allow_candidate=False):
                 request.user = User.query.get(valid_user_id)
                 request.oauth_token = oauth_token
                 request.candidate = None
+                token = Token.query.filter_by(access_token=access_token).first() if request.user else None
+                if token:
+                    # Same as JSON web tokens, an OAuth2 token is not cached beyond its expiry
+                    cache_verified_token(access_token, build_verified_token(user=request.user), invalidation_count,
+                                         calendar.timegm(token.expires.utctimetuple()))
                 return func(*args, **kwargs)
 
         return authenticate
@@ -0,0 +1,218 @@
+"""
+This module maintains engagement scores of email-campaign sends and their aggregates (see models/engagement.py).
+
+Scores of an email-campaign are refreshed, for all of its candidates or given ones only, with a fixed number of
+set based statements:
+    1. Score of every send, from hit counts of its URL conversions
+    2. Score of every candidate of campaign, average of scores of their sends of campaign
+    3. Score of campaign, average of scores of its sends
+    4. Score of every pipeline campaign is sent to (through pipeline's smartlists), average of its campaigns' scores
+    5. Score of every candidate in those pipelines, average of candidate's scores in campaigns of pipeline
+    6. Score of every candidate of campaign, average of candidate's scores in pipelines of candidate's talent-pools
+
+Steps 4 & 5 only upsert scores of pipelines campaign is sent to now. When a smartlist of a campaign is moved out of
+a pipeline, refresh_pipelines_engagement() recomputes that pipeline's scores from scratch, so scores of campaigns
+no longer sent to it are dropped.
+
+Scores of candidates are also recomputed for a whole domain by refresh_domain_candidates_engagement(), as they
+change when candidates are added to or removed from talent-pools too.
+"""
+from sqlalchemy.sql import text
+from ..models.db import db
+from ..models.engagement import CandidateEngagement, TalentPipelineEngagement, TalentPipelineCandidateEngagement
+from ..models.email_campaign import EmailCampaignSmartlist
+from ..models.smartlist import Smartlist
+
+# Engagement score of a send, see models/engagement.py
+SEND_ENGAGEMENT_SCORE_SQL = """
+    CASE WHEN sum(url_conversion.HitCount) = 0 THEN 0.0
+         WHEN sum(email_campaign_send_url_conversion.type * url_conversion.HitCount) > 0 THEN 100
+         ELSE 33.3 END
+"""
+
+SEND_ENGAGEMENT_SQL = """
+    INSERT INTO email_campaign_send_engagement (email_campaign_send_id, email_campaign_id, candidate_id,
+                                                engagement_score, updated_time)
+    SELECT email_campaign_send.Id, email_campaign_send.EmailCampaignId, email_campaign_send.CandidateId,
+           %s, UTC_TIMESTAMP()
+    FROM email_campaign_send
+    INNER JOIN email_campaign_send_url_conversion
+            ON email_campaign_send_url_conversion.EmailCampaignSendId = email_campaign_send.Id
+    INNER JOIN url_conversion ON url_conversion.Id = email_campaign_send_url_conversion.UrlConversionId
+    WHERE email_campaign_send.EmailCampaignId = :campaign_id {candidates_filter}
+    GROUP BY email_campaign_send.Id
+    ON DUPLICATE KEY UPDATE engagement_score = VALUES(engagement_score), updated_time = VALUES(updated_time)
+""" % SEND_ENGAGEMENT_SCORE_SQL
+
+CANDIDATE_CAMPAIGN_ENGAGEMENT_SQL = """
+    INSERT INTO candidate_campaign_engagement (candidate_id, email_campaign_id, engagement_score, updated_time)
+    SELECT candidate_id, email_campaign_id, avg(engagement_score), UTC_TIMESTAMP()
+    FROM email_campaign_send_engagement
+    WHERE email_campaign_id = :campaign_id {candidates_filter}
+    GROUP BY candidate_id
+    ON DUPLICATE KEY UPDATE engagement_score = VALUES(engagement_score), updated_time = VALUES(updated_time)
+"""
+
+CAMPAIGN_ENGAGEMENT_SQL = """
+    INSERT INTO email_campaign_engagement (email_campaign_id, sends_count, engagement_score, updated_time)
+    SELECT email_campaign_id, count(*), avg(engagement_score), UTC_TIMESTAMP()
+    FROM email_campaign_send_engagement
+    WHERE email_campaign_id = :campaign_id
+    GROUP BY email_campaign_id
+    ON DUPLICATE KEY UPDATE sends_count = VALUES(sends_count), engagement_score = VALUES(engagement_score),
+                            updated_time = VALUES(updated_time)
+"""
+
+# A campaign may be sent to many smartlists of a pipeline, it is counted once for pipeline
+PIPELINE_CAMPAIGNS_SQL = """
+    SELECT DISTINCT smart_list.talentPipelineId AS talent_pipeline_id,
+                    email_campaign_smart_list.EmailCampaignId AS email_campaign_id
+    FROM smart_list
+    INNER JOIN email_campaign_smart_list ON email_campaign_smart_list.SmartListId = smart_list.Id
+    WHERE smart_list.talentPipelineId IN :talent_pipeline_ids
+"""
+
+PIPELINE_ENGAGEMENT_SQL = """
+    INSERT INTO talent_pipeline_engagement (talent_pipeline_id, engagement_score, updated_time)
+    SELECT pipeline_campaign.talent_pipeline_id, avg(email_campaign_engagement.engagement_score), UTC_TIMESTAMP()
+    FROM (%s) AS pipeline_campaign
+    INNER JOIN email_campaign_engagement
+            ON email_campaign_engagement.email_campaign_id = pipeline_campaign.email_campaign_id
+    GROUP BY pipeline_campaign.talent_pipeline_id
+    ON DUPLICATE KEY UPDATE engagement_score = VALUES(engagement_score), updated_time = VALUES(updated_time)
+""" % PIPELINE_CAMPAIGNS_SQL
+
+PIPELINE_CANDIDATE_ENGAGEMENT_SQL = """
+    INSERT INTO talent_pipeline_candidate_engagement (talent_pipeline_id, candidate_id, engagement_score,
+                                                      updated_time)
+    SELECT pipeline_campaign.talent_pipeline_id, candidate_campaign_engagement.candidate_id,
+           avg(candidate_campaign_engagement.engagement_score), UTC_TIMESTAMP()
+    FROM (%s) AS pipeline_campaign
+    INNER JOIN candidate_campaign_engagement
+            ON candidate_campaign_engagement.email_campaign_id = pipeline_campaign.email_campaign_id
+    WHERE TRUE {candidates_filter}
+    GROUP BY pipeline_campaign.talent_pipeline_id, candidate_campaign_engagement.candidate_id
+    ON DUPLICATE KEY UPDATE engagement_score = VALUES(engagement_score), updated_time = VALUES(updated_time)
+""" % PIPELINE_CAMPAIGNS_SQL
+
+# Candidates with no score in pipelines of their talent-pools get a NULL score
+CANDIDATE_ENGAGEMENT_SQL = """
+    INSERT INTO candidate_engagement (candidate_id, engagement_score, updated_time)
+    SELECT candidate.Id, candidate_score.engagement_score, UTC_TIMESTAMP()
+    FROM candidate
+    LEFT JOIN (SELECT talent_pipeline_candidate_engagement.candidate_id,
+                      avg(talent_pipeline_candidate_engagement.engagement_score) AS engagement_score
+               FROM candidate
+               INNER JOIN talent_pipeline_candidate_engagement
+                       ON talent_pipeline_candidate_engagement.candidate_id = candidate.Id
+               INNER JOIN talent_pipeline
+                       ON talent_pipeline.id = talent_pipeline_candidate_engagement.talent_pipeline_id
+               INNER JOIN talent_pool_candidate
+                       ON talent_pool_candidate.talent_pool_id = talent_pipeline.talent_pool_id
+                      AND talent_pool_candidate.candidate_id = candidate.Id
+               WHERE {candidates_filter}
+               GROUP BY talent_pipeline_candidate_engagement.candidate_id) AS candidate_score
+           ON candidate_score.candidate_id = candidate.Id
+    WHERE {candidates_filter}
+    ON DUPLICATE KEY UPDATE engagement_score = VALUES(engagement_score), updated_time = VALUES(updated_time)
+"""
+
+CANDIDATES_FILTER = 'candidate.Id IN :candidate_ids'
+CANDIDATES_OF_CAMPAIGN_FILTER = \
+    'candidate.Id IN (SELECT CandidateId FROM email_campaign_send WHERE EmailCampaignId = :campaign_id)'
+CANDIDATES_OF_DOMAIN_FILTER = 'candidate.OwnerUserId IN (SELECT Id FROM `user` WHERE domainId = :domain_id)'
+
+
+def get_talent_pipeline_ids_of_campaign(campaign_id):
+    """
+    Returns ids of talent-pipelines whose smartlists given email-campaign is sent to.
+    :param int | long campaign_id: Id of email-campaign
+    :rtype: list
+    """
+    talent_pipeline_ids = db.session.query(Smartlist.talent_pipeline_id).distinct().\
+        join(EmailCampaignSmartlist, EmailCampaignSmartlist.smartlist_id == Smartlist.id).\
+        filter(EmailCampaignSmartlist.campaign_id == campaign_id, Smartlist.talent_pipeline_id.isnot(None)).all()
+    return [talent_pipeline_id for talent_pipeline_id, in talent_pipeline_ids]
+
+
+def refresh_campaign_engagement(campaign_id, candidate_ids=None):
+    """
+    Refreshes engagement scores of sends of given email-campaign and rolls them up into campaign, candidate, pipeline
+    and pipeline-candidate scores. It should be called when sends of campaign are created and when a URL of a send
+    is hit for the first time (score of a send doesn't change on later hits).
+    :param int | long campaign_id: Id of email-campaign
+    :param list | None candidate_ids: Refresh scores of these candidates only. All candidates if None.
+    """
+    if candidate_ids is not None and not candidate_ids:
+        return
+    params = dict(campaign_id=campaign_id)
+    send_candidates_filter = candidates_filter = pipeline_candidates_filter = ''
+    if candidate_ids is not None:
+        params['candidate_ids'] = tuple(candidate_ids)
+        send_candidates_filter = 'AND email_campaign_send.CandidateId IN :candidate_ids'
+        candidates_filter = 'AND candidate_id IN :candidate_ids'
+        pipeline_candidates_filter = 'AND candidate_campaign_engagement.candidate_id IN :candidate_ids'
+
+    connection = db.session.connection()
+    connection.execute(text(SEND_ENGAGEMENT_SQL.format(candidates_filter=send_candidates_filter)), **params)
+    connection.execute(text(CANDIDATE_CAMPAIGN_ENGAGEMENT_SQL.format(candidates_filter=candidates_filter)), **params)
+    connection.execute(text(CAMPAIGN_ENGAGEMENT_SQL), campaign_id=campaign_id)
+
+    talent_pipeline_ids = tuple(get_talent_pipeline_ids_of_campaign(campaign_id))
+    if talent_pipeline_ids:
+        connection.execute(text(PIPELINE_ENGAGEMENT_SQL), talent_pipeline_ids=talent_pipeline_ids)
+        pipeline_candidate_engagement_sql = PIPELINE_CANDIDATE_ENGAGEMENT_SQL.format(
+            candidates_filter=pipeline_candidates_filter)
+        connection.execute(text(pipeline_candidate_engagement_sql), talent_pipeline_ids=talent_pipeline_ids, **params)
+
+        # Scores of candidates depend on their scores in pipelines only
+        if candidate_ids is not None:
+            connection.execute(text(CANDIDATE_ENGAGEMENT_SQL.format(candidates_filter=CANDIDATES_FILTER)),
+                               candidate_ids=params['candidate_ids'])
+        else:
+            connection.execute(text(CANDIDATE_ENGAGEMENT_SQL.format(candidates_filter=CANDIDATES_OF_CAMPAIGN_FILTER)),
+                               campaign_id=campaign_id)
+    db.session.commit()
+
+
+def refresh_pipelines_engagement(talent_pipeline_ids):
+    """
+    Deletes engagement scores of given talent-pipelines and of their candidates and recomputes them from campaigns
+    currently sent to pipelines' smartlists. It should be called when a smartlist is moved out of a pipeline, as
+    refresh_campaign_engagement() doesn't know pipelines campaign is no longer sent to.
+    :param list talent_pipeline_ids: Ids of talent-pipelines
+    """
+    talent_pipeline_ids = tuple(talent_pipeline_ids)
+    if not talent_pipeline_ids:
+        return
+    for model in (TalentPipelineCandidateEngagement, TalentPipelineEngagement):
+        model.query.filter(model.talent_pipeline_id.in_(talent_pipeline_ids)).delete(synchronize_session=False)
+    connection = db.session.connection()
+    connection.execute(text(PIPELINE_ENGAGEMENT_SQL), talent_pipeline_ids=talent_pipeline_ids)
+    connection.execute(text(PIPELINE_CANDIDATE_ENGAGEMENT_SQL.format(candidates_filter='')),
+                       talent_pipeline_ids=talent_pipeline_ids)
+    db.session.commit()
+
+
+def refresh_domain_candidates_engagement(domain_id):
+    """
+    Recomputes engagement scores of all candidates of a domain from their scores in pipelines, with a single
+    statement. Pipeline scores should be refreshed first (see refresh_campaign_engagement()).
+    :param int | long domain_id: Id of domain
+    """
+    db.session.connection().execute(text(CANDIDATE_ENGAGEMENT_SQL.format(
+        candidates_filter=CANDIDATES_OF_DOMAIN_FILTER)), domain_id=domain_id)
+    db.session.commit()
+
+
+def get_candidate_engagement(candidate_id):
+    """
+    Returns stored engagement score of a candidate and time it was computed at.
+    :param int | long candidate_id: Id of candidate
+    :return: (engagement_score, updated_time), (None, None) if score is not computed yet
+    :rtype: tuple
+    """
+    candidate_engagement = CandidateEngagement.query.get(candidate_id)
+    if not candidate_engagement:
+        return None, None
+    return candidate_engagement.engagement_score, candidate_engagement.updated_time
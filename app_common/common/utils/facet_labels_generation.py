@@ -0,0 +1,28 @@
+"""
+Generations of labels of id facets (owner, area of interest, source, status, tags & custom fields) of candidate
+search, kept in Redis.
+
+candidate-service caches these labels in every process. Services writing the underlying rows bump generation of
+the domain, which changes cache keys of that domain in all processes, so renamed or deleted rows are not served
+till their cached labels expire.
+"""
+from ..redis_cache import redis_store
+
+FACET_LABELS_GENERATION_KEY = 'facet_labels_generation_%s'
+
+
+def get_facet_labels_generation(domain_id):
+    """
+    :param int | long domain_id: Domain ID
+    :rtype: int
+    """
+    return int(redis_store.get(FACET_LABELS_GENERATION_KEY % domain_id) or 0)
+
+
+def bump_facet_labels_generation(domain_id):
+    """
+    Makes cached facet labels of given domain stale in all processes. It should be called after a source, area of
+    interest, custom field, tag or user of domain is added, renamed or deleted.
+    :param int | long domain_id: Domain ID
+    """
+    redis_store.incr(FACET_LABELS_GENERATION_KEY % domain_id)
@@ -0,0 +1,100 @@
+"""
+This module contains a thread safe, size & TTL bounded, in-process LRU cache.
+It is meant for small lookup data (e.g. labels of ids) which is read on every request but rarely changes, so
+a warm process can serve it without hitting database or Redis.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLLRUCache(object):
+    """
+    Least-recently-used cache with an expiry for every entry.
+    When cache is full, least recently used entry is evicted. Expired entries are dropped on access.
+        cache = TTLLRUCache(max_size=1000, ttl=300)
+        cache.set('key', 'value')
+        cache.get('key')  # 'value' for next 300 seconds
+    """
+
+    def __init__(self, max_size=1000, ttl=300):
+        """
+        :param int max_size: Maximum number of entries kept in cache
+        :param int | float ttl: Number of seconds an entry stays valid
+        """
+        assert max_size > 0 and ttl > 0, 'max_size and ttl must be positive'
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Returns cached value of given key or default if key is not cached or has expired
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= time.time():
+                self.misses += 1
+                return default
+            # Re-insert, so key becomes most recently used
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """
+        Caches value against given key, evicting least recently used entry if cache is full
+        :param ttl: Seconds this entry stays valid, defaults to ttl of cache
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + (ttl or self.ttl), value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def replace(self, key, value):
+        """
+        Replaces value of a cached key, keeping its expiry
+        :return: False if key is not cached or has expired, in which case nothing is cached
+        :rtype: bool
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                return False
+            self._entries[key] = (entry[0], value)
+            return True
+
+    def delete(self, key):
+        """
+        Removes given key from cache
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_matching(self, predicate):
+        """
+        Removes all entries for which predicate(key, value) is True
+        :param callable predicate: Function receiving key and value of an entry
+        """
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.iteritems() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Removes all entries from cache
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
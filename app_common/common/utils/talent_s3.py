@@ -1,4 +1,6 @@
 __author__ = 'ufarooqi'
+import os
+import tempfile
 import boto
 from urlparse import urlparse
 from cStringIO import StringIO
@@ -66,6 +68,23 @@ def download_file(bucket, key_name):
     return StringIO(key_obj.get_contents_as_string())
 
 
+def download_file_to_temporary_file(bucket, key_name):
+    """
+    Downloads S3 key in chunks to a temporary file on disk, so that large files are not held in memory.
+    File is deleted when it is closed.
+    :type bucket: Bucket
+    :type key_name: str
+    :rtype: tempfile.NamedTemporaryFile
+    """
+    key_obj = bucket.get_key(key_name=key_name)
+    if not key_obj:
+        raise InvalidUsage("No S3 key found in bucket %s, key_name=%s" % (bucket, key_name))
+    temporary_file = tempfile.NamedTemporaryFile(suffix=os.path.splitext(key_name)[1])
+    key_obj.get_contents_to_file(temporary_file)
+    temporary_file.seek(0)
+    return temporary_file
+
+
 def get_s3_conn(region=None):
     """
 
@@ -160,8 +179,8 @@ def upload_to_s3(file_content, folder_path, name, public=False):
     """
     Uploads given file object to S3.
 
-    :param file_content: Content of file to upload
-    :type file_content: str
+    :param file_content: Content of file to upload, or a file object which is uploaded from its beginning
+    :type file_content: str | file
 
     :param folder_path: The folder path (not bucket)
     :type folder_path: str
@@ -185,7 +204,10 @@ def upload_to_s3(file_content, folder_path, name, public=False):
     key_name = '%s/%s' % (folder_path, os.path.basename(name))
     k.key = key_name
     policy = 'public-read' if public else None
-    k.set_contents_from_string(file_content, policy=policy)
+    if hasattr(file_content, 'read'):
+        k.set_contents_from_file(file_content, policy=policy, rewind=True)
+    else:
+        k.set_contents_from_string(file_content, policy=policy)
 
     # Set Content-Type headers
     if name.endswith('pdf'):
@@ -290,6 +312,31 @@ def boto3_get_file(bucket, filename):
     return StringIO(s3_file['Body'].read())
 
 
+def boto3_list_keys(bucket, prefix, max_keys=1000):
+    """
+    Returns names of keys of bucket starting with given prefix, at most max_keys of them.
+    :param str bucket: Name of bucket
+    :param str prefix: Prefix of key names
+    :param int max_keys: Maximum number of keys to return
+    :rtype: list[str]
+    """
+    client = boto3.client(
+        's3',
+        aws_access_key_id=app.config[TalentConfigKeys.AWS_KEY],
+        aws_secret_access_key=app.config[TalentConfigKeys.AWS_SECRET]
+    )
+    paginator = client.get_paginator('list_objects')
+    key_names = []
+    try:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, PaginationConfig={'MaxItems': max_keys}):
+            key_names.extend(s3_object['Key'] for s3_object in page.get('Contents', []))
+    except ClientError as e:
+        app.logger.exception("boto3 ClientError. Error listing {} in {}. Exception: {}".format(prefix, bucket,
+                                                                                               e.message))
+        raise InvalidUsage(error_message="There has been an error listing the uploaded files. Please try again")
+    return key_names
+
+
 def boto3_put(file_contents, bucket, key, key_path):
     client = boto3.client(
         's3',
@@ -0,0 +1,181 @@
+"""
+In-process caches of verified access tokens and of signing secrets of JSON web tokens.
+
+Every authenticated request verifies its access token. A verified token is cached for a short time, so a warm
+process authorizes later requests of same token without a round-trip to database, Redis or auth-service.
+
+Entries are dropped from all processes when a token is revoked, or password, role or status of its user changes,
+through TOKEN_INVALIDATION_CHANNEL of Redis pub/sub. Caches are used only while a process is subscribed to that
+channel, so a lost subscription can't make a process serve a revoked token.
+"""
+import os
+import time
+import threading
+from .lru_cache import TTLLRUCache
+from ..redis_cache import redis_store
+
+TOKEN_INVALIDATION_CHANNEL = 'TokenInvalidation'
+VERIFIED_TOKEN_CACHE_TTL = 60
+VERIFIED_TOKEN_CACHE_SIZE = 10000
+
+verified_token_cache = TTLLRUCache(max_size=VERIFIED_TOKEN_CACHE_SIZE, ttl=VERIFIED_TOKEN_CACHE_TTL)
+signing_secret_cache = TTLLRUCache(max_size=VERIFIED_TOKEN_CACHE_SIZE, ttl=VERIFIED_TOKEN_CACHE_TTL)
+
+# Listener thread and id of process it was started in, forked processes start their own listener
+_listener = {'thread': None, 'pid': None}
+_listener_lock = threading.Lock()
+# Number of invalidations received, see cache_verified_token()
+_invalidations = {'count': 0}
+_invalidations_lock = threading.Lock()
+
+
+def is_listening():
+    """
+    Tells if this process is subscribed to token invalidation messages. Subscribes in a background thread if it
+    is not subscribed yet or its subscription is lost.
+    :rtype: bool
+    """
+    if _is_listener_alive():
+        return True
+    with _listener_lock:
+        if _is_listener_alive():
+            return True
+        # Entries cached before subscription was lost may have missed their invalidation
+        verified_token_cache.clear()
+        signing_secret_cache.clear()
+        try:
+            pubsub = redis_store.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(TOKEN_INVALIDATION_CHANNEL)
+        except Exception:
+            return False
+        thread = threading.Thread(target=_listen, args=(pubsub,), name='TokenInvalidationListener')
+        thread.daemon = True
+        thread.start()
+        _listener.update(thread=thread, pid=os.getpid())
+        return True
+
+
+def _is_listener_alive():
+    thread = _listener['thread']
+    return thread is not None and thread.is_alive() and _listener['pid'] == os.getpid()
+
+
+def _listen(pubsub):
+    """
+    Applies invalidation messages till subscription is lost
+    """
+    try:
+        for message in pubsub.listen():
+            if message['type'] == 'message':
+                apply_invalidation(message['data'])
+    except Exception:
+        pass
+    finally:
+        _listener['thread'] = None
+        verified_token_cache.clear()
+        signing_secret_cache.clear()
+
+
+def apply_invalidation(message):
+    """
+    Drops cached entries named by an invalidation message, i.e. 'user:<user_id>', 'secret:<secret_key_id>' or
+    'token:<access_token>'. Unknown messages drop all entries.
+    :param str message: Invalidation message
+    """
+    with _invalidations_lock:
+        _invalidations['count'] += 1
+    kind, _, value = message.partition(':')
+    if kind == 'user':
+        verified_token_cache.delete_matching(lambda key, entry: str(entry.get('user_id')) == value)
+    elif kind == 'secret':
+        signing_secret_cache.delete(value)
+        verified_token_cache.delete_matching(lambda key, entry: entry.get('secret_key_id') == value)
+    elif kind == 'token':
+        verified_token_cache.delete(value)
+    else:
+        verified_token_cache.clear()
+        signing_secret_cache.clear()
+
+
+def _publish_invalidation(message):
+    apply_invalidation(message)
+    redis_store.publish(TOKEN_INVALIDATION_CHANNEL, message)
+
+
+def invalidate_user_tokens(user_id):
+    """
+    Drops verified tokens of a user from all processes. It should be called after password, role or status of
+    user is changed and committed.
+    :param int | long user_id: Id of user
+    """
+    _publish_invalidation('user:%s' % user_id)
+
+
+def invalidate_secret_key(secret_key_id):
+    """
+    Drops signing secret of a JSON web token, and tokens verified by it, from all processes. It should be called
+    when secret is deleted from Redis i.e. token is revoked or refreshed.
+    :param str secret_key_id: Id of signing secret
+    """
+    _publish_invalidation('secret:%s' % secret_key_id)
+
+
+def invalidate_access_token(access_token):
+    """
+    Drops a verified OAuth2 access token from all processes. It should be called when token is revoked.
+    :param str access_token: Access token without 'Bearer' prefix
+    """
+    _publish_invalidation('token:%s' % access_token)
+
+
+def get_invalidation_count():
+    """
+    Returns number of invalidations this process has received. It should be read before a token is verified and
+    passed to cache_verified_token(), so a token invalidated during its verification is not cached.
+    :rtype: int
+    """
+    return _invalidations['count']
+
+
+def get_verified_token(key):
+    """
+    Returns cached entry of a verified token, or None if token is not cached or caches can't be trusted.
+    :param str key: Access token
+    :rtype: dict | None
+    """
+    if not is_listening():
+        return None
+    return verified_token_cache.get(key)
+
+
+def cache_verified_token(key, entry, invalidation_count, expires_at=None):
+    """
+    Caches a verified token, unless an invalidation is received since its verification started.
+    :param str key: Access token
+    :param dict entry: i.e. {'user_id': 1, 'domain_id': 1, 'secret_key_id': 'abc'}
+    :param int invalidation_count: Value of get_invalidation_count() before token was verified
+    :param int | None expires_at: Epoch time token expires at, token is not cached beyond it
+    """
+    if invalidation_count != get_invalidation_count() or not is_listening():
+        return
+    ttl = VERIFIED_TOKEN_CACHE_TTL
+    if expires_at:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl > 0:
+        verified_token_cache.set(key, entry, ttl=ttl)
+
+
+def get_signing_secret(secret_key_id):
+    """
+    Returns signing secret of a JSON web token from cache, or from Redis if it is not cached.
+    :param str secret_key_id: Id of signing secret
+    :rtype: str | None
+    """
+    listening = is_listening()
+    secret_key = signing_secret_cache.get(secret_key_id) if listening else None
+    if secret_key is None:
+        invalidation_count = get_invalidation_count()
+        secret_key = redis_store.get(secret_key_id)
+        if secret_key is not None and listening and invalidation_count == get_invalidation_count():
+            signing_secret_cache.set(secret_key_id, secret_key)
+    return secret_key
@@ -9,6 +9,8 @@ from flask_oauthlib.provider import OAuth2RequestValidator
 from werkzeug.security import check_password_hash
 from auth_service.common.models.user import User, Client, Token, db
 from auth_service.common.redis_cache import redis_store
+from auth_service.common.utils.token_cache import (invalidate_secret_key, invalidate_access_token,
+                                                  invalidate_user_tokens)
 from auth_service.oauth import logger, app
 from auth_service.common.error_handling import UnauthorizedError, InvalidUsage
 from ..custom_error_codes import AuthServiceCustomErrorCodes as custom_errors
@@ -57,6 +59,7 @@ def authenticate_user(username, password, *args, **kwargs):
                     redis_store.delete('invalid_login_attempt_counter_{}'.format(username))
                     user.is_disabled = 1
                     db.session.commit()
+                    invalidate_user_tokens(user.id)
                     logger.info("User %s has been disabled because %s invalid login attempts have been made in "
                                 "last one hour", user.id, MAXIMUM_NUMBER_OF_INVALID_LOGIN_ATTEMPTS)
                     raise UnauthorizedError("User %s has been disabled because %s invalid login attempts have made in "
@@ -130,6 +133,7 @@ def verify_jwt(token, secret_key_id, allow_null_user=False):
                 return user
             else:
                 redis_store.delete(secret_key_id)
+                invalidate_secret_key(secret_key_id)
                 raise UnauthorizedError("Your token has expired due to password reset", error_code=12)
     elif allow_null_user:
         return None
@@ -199,6 +203,8 @@ def save_token_v1(token, request, *args, **kwargs):
         db.session.delete(t)
 
     db.session.commit()
+    for t in tokens:
+        invalidate_access_token(t.access_token)
 
     token['user_id'] = request.user.id
     if latest_token:
@@ -211,6 +217,7 @@ def save_token_v1(token, request, *args, **kwargs):
             else:
                 db.session.delete(latest_token)
                 db.session.commit()
+                invalidate_access_token(latest_token.access_token)
         except Exception:
             db.session.rollback()
 
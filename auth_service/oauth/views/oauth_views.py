@@ -10,6 +10,7 @@ from auth_service.common.error_handling import *
 from auth_service.common.routes import AuthApi, AuthApiV2
 from auth_service.common.models.user import Permission, User, AuthClient
 from auth_service.common.utils.auth_utils import require_jwt_oauth
+from auth_service.common.utils.token_cache import invalidate_secret_key
 from auth_service.oauth.oauth_utilities import (authenticate_user, save_token_v2,
                                                 redis_store, authenticate_request, load_client, save_token_v1)
 
@@ -75,6 +76,7 @@ def refresh_token_v2():
 
     secret_key_id, authenticated_user = authenticate_request()
     redis_store.delete(secret_key_id)
+    invalidate_secret_key(secret_key_id)
 
     return jsonify(save_token_v2(authenticated_user))
 
@@ -84,6 +86,7 @@ def revoke_token_v2():
     """ Revoke an access_token """
     secret_key_id, authenticated_user = authenticate_request()
     redis_store.delete(secret_key_id)
+    invalidate_secret_key(secret_key_id)
 
     return '', 200
 
@@ -8,6 +8,7 @@ from candidate_pool_service.common.talent_api import TalentApi
 from candidate_pool_service.common.routes import CandidatePoolApi
 from candidate_pool_service.common.models.smartlist import Smartlist, SmartlistCandidate
 from candidate_pool_service.common.utils.validators import is_number
+from candidate_pool_service.common.utils.engagement_utils import refresh_pipelines_engagement
 from candidate_pool_service.common.models.user import Permission
 from candidate_pool_service.common.utils.auth_utils import require_oauth, require_all_permissions
 from candidate_pool_service.common.utils.api_utils import (DEFAULT_PAGE, DEFAULT_PAGE_SIZE,
@@ -178,7 +179,10 @@ class SmartlistResource(Resource):
         if data.get('name'):
             smart_list.name = data.get('name')
 
-        if data.get('talent_pipeline_id'):
+        # Pipelines whose engagement scores change as campaigns sent to this smartlist move between them
+        moved_talent_pipeline_ids = []
+        if data.get('talent_pipeline_id') and data.get('talent_pipeline_id') != smart_list.talent_pipeline_id:
+            moved_talent_pipeline_ids = filter(None, [smart_list.talent_pipeline_id, data.get('talent_pipeline_id')])
             smart_list.talent_pipeline_id = data.get('talent_pipeline_id')
 
         if data.get('search_params'):
@@ -192,6 +196,7 @@ class SmartlistResource(Resource):
                 db.session.add(row)
 
         db.session.commit()
+        refresh_pipelines_engagement(moved_talent_pipeline_ids)
 
         candidate_ids = data.get('remove_candidate_ids', []) + data.get('add_candidate_ids', [])
         update_candidates_on_cloudsearch(request.oauth_token, candidate_ids)
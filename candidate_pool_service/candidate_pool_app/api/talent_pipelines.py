@@ -18,7 +18,7 @@ from candidate_pool_service.common.utils.api_utils import ApiResponse, generate_
 from candidate_pool_service.candidate_pool_app.talent_pools_pipelines_utilities import (
     TALENT_PIPELINE_SEARCH_PARAMS, get_candidates_of_talent_pipeline, get_pipeline_engagement_score,
     get_stats_generic_function, top_most_engaged_candidates_of_pipeline, top_most_engaged_pipelines_of_candidate,
-    get_talent_pipeline_stat_for_given_day)
+    get_talent_pipeline_stat_for_given_day, get_pipeline_engagement_scores)
 from candidate_pool_service.common.utils.api_utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE
 from candidate_pool_service.common.inter_service_calls.candidate_service_calls import update_candidates_on_cloudsearch
 from candidate_pool_service.common.inter_service_calls.activity_service_calls import add_activity
@@ -140,8 +140,10 @@ class TalentPipelineApi(Resource):
                     talent_pipeline.to_dict(email_campaign_count=email_campaign_count)
                     for talent_pipeline in talent_pipelines]
 
+            engagement_scores = get_pipeline_engagement_scores([talent_pipeline_data['id'] for talent_pipeline_data
+                                                                in talent_pipelines_data])
             for talent_pipeline_data in talent_pipelines_data:
-                talent_pipeline_data['engagement_score'] = get_pipeline_engagement_score(talent_pipeline_data['id'])
+                talent_pipeline_data['engagement_score'] = engagement_scores.get(talent_pipeline_data['id'])
 
             if sort_by in ("engagement_score", "candidate_count"):
                 sort_by = 'total_candidates' if sort_by == "candidate_count" else "engagement_score"
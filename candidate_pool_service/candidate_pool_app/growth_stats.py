@@ -0,0 +1,158 @@
+"""
+Materialized growth statistics of talent-pools, talent-pipelines and smartlists.
+
+Growth of a container is stored in a single Redis hash per container, with a field for every day
+(i.e. '2016-08-23') holding 24 comma separated numbers; total number of candidates of container at end of each
+hour of that day. A range of days is read with a single HMGET.
+
+Candidates of talent-pools and dumb-lists (smartlists without search params) are counted for all containers
+of a domain by a single grouped query. Talent-pipelines and smartlists with search params are resolved by
+candidate search, so their days are computed by a faceted count search (see talent_pools_pipelines_utilities).
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_
+from candidate_pool_service.candidate_pool_app import db
+from candidate_pool_service.common.redis_cache import redis_store
+from candidate_pool_service.common.models.candidate import Candidate
+from candidate_pool_service.common.models.smartlist import Smartlist, SmartlistCandidate
+from candidate_pool_service.common.models.talent_pools_pipelines import TalentPool, TalentPoolCandidate, User
+
+GROWTH_STATS_KEY = 'GrowthStats:%s:%s'
+# Stats older than these days are neither served nor kept
+GROWTH_STATS_DAYS = 90
+HOURS_IN_DAY = 24
+
+
+def get_growth_stats_key(container_name, container_id):
+    """
+    Returns Redis key of growth stats of a container
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param int container_id: Id of container
+    :rtype: str
+    """
+    return GROWTH_STATS_KEY % (container_name, container_id)
+
+
+def read_growth_stats(container_name, container_id, dates):
+    """
+    Reads growth stats of given days of a container in one round-trip.
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param int container_id: Id of container
+    :param list[date] dates: Days to be read
+    :return: Hourly totals of candidates of each day, None for days which are not computed yet
+    :rtype: dict
+    """
+    if not dates:
+        return {}
+    values = redis_store.hmget(get_growth_stats_key(container_name, container_id),
+                               [day.isoformat() for day in dates])
+    return {day: map(int, value.split(',')) if value else None for day, value in zip(dates, values)}
+
+
+def write_growth_stats(container_name, stats_of_containers):
+    """
+    Writes growth stats of many containers in one round-trip.
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param dict stats_of_containers: {container_id: {date: [24 hourly totals]}}
+    """
+    pipeline = redis_store.pipeline(transaction=False)
+    for container_id, stats_of_days in stats_of_containers.iteritems():
+        if stats_of_days:
+            pipeline.hmset(get_growth_stats_key(container_name, container_id),
+                           {day.isoformat(): ','.join(map(str, hourly_totals))
+                            for day, hourly_totals in stats_of_days.iteritems()})
+    pipeline.execute()
+
+
+def build_growth_stats(initial_total, hourly_counts, from_date, to_date):
+    """
+    Builds hourly totals of candidates of every day in given range from number of candidates added in each hour.
+    :param int initial_total: Number of candidates before from_date
+    :param dict hourly_counts: Number of candidates added in an hour keyed by (date, hour)
+    :param date from_date: First day
+    :param date to_date: Last day
+    :return: {date: [24 hourly totals]}
+    :rtype: dict
+    """
+    stats_of_days = {}
+    total = initial_total
+    day = from_date
+    while day <= to_date:
+        hourly_totals = []
+        for hour in xrange(HOURS_IN_DAY):
+            total += hourly_counts.get((day, hour), 0)
+            hourly_totals.append(total)
+        stats_of_days[day] = hourly_totals
+        day += timedelta(days=1)
+    return stats_of_days
+
+
+def is_counted_by_query(container_name, container_object):
+    """
+    Tells if candidates of a container can be counted by grouped query, instead of candidate search.
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param container_object: TalentPool, TalentPipeline or Smartlist object
+    :rtype: bool
+    """
+    if container_name == 'TalentPool':
+        return True
+    elif container_name == 'SmartList':
+        return not container_object.search_params and not container_object.talent_pipeline_id
+    return False
+
+
+def _get_candidate_count_query(container_name, domain_id, *columns):
+    """
+    Returns query of active candidates of talent-pools or dumb-lists of a domain, grouped by their container.
+    """
+    if container_name == 'TalentPool':
+        container_id = TalentPoolCandidate.talent_pool_id
+        query = db.session.query(container_id, *columns).\
+            join(Candidate, Candidate.id == TalentPoolCandidate.candidate_id).\
+            join(TalentPool, TalentPool.id == TalentPoolCandidate.talent_pool_id).\
+            filter(TalentPool.domain_id == domain_id)
+    elif container_name == 'SmartList':
+        container_id = SmartlistCandidate.smartlist_id
+        query = db.session.query(container_id, *columns).\
+            join(Candidate, Candidate.id == SmartlistCandidate.candidate_id).\
+            join(Smartlist, Smartlist.id == SmartlistCandidate.smartlist_id).\
+            join(User, User.id == Smartlist.user_id).\
+            filter(User.domain_id == domain_id, Smartlist.talent_pipeline_id.is_(None),
+                   or_(Smartlist.search_params.is_(None), Smartlist.search_params == ''))
+    else:
+        raise Exception("Container %s is not supported for this method" % container_name)
+
+    # Candidate search counts active candidates only
+    return query.filter(Candidate.is_archived == 0), container_id
+
+
+def compute_domain_growth_stats(container_name, domain_id, from_date, to_date):
+    """
+    Computes growth stats of all talent-pools or dumb-lists of a domain with two grouped queries; one for number
+    of candidates before from_date and one for number of candidates added in each hour till end of to_date.
+    :param str container_name: TalentPool or SmartList
+    :param int domain_id: Id of domain
+    :param date from_date: First day
+    :param date to_date: Last day
+    :return: {container_id: {date: [24 hourly totals]}}
+    :rtype: dict
+    """
+    from_date_time = datetime.combine(from_date, datetime.min.time())
+    to_date_time = datetime.combine(to_date + timedelta(days=1), datetime.min.time())
+
+    query, container_id = _get_candidate_count_query(container_name, domain_id, func.count(Candidate.id))
+    initial_totals = dict(query.filter(Candidate.added_time < from_date_time).group_by(container_id).all())
+
+    added_date, added_hour = func.date(Candidate.added_time), func.hour(Candidate.added_time)
+    query, container_id = _get_candidate_count_query(container_name, domain_id, added_date, added_hour,
+                                                     func.count(Candidate.id))
+    query = query.filter(Candidate.added_time >= from_date_time, Candidate.added_time < to_date_time)
+
+    hourly_counts_of_containers = {}
+    for row_container_id, day, hour, count in query.group_by(container_id, added_date, added_hour):
+        hourly_counts_of_containers.setdefault(row_container_id, {})[(day, hour)] = count
+
+    return {row_container_id: build_growth_stats(initial_totals.get(row_container_id, 0),
+                                                 hourly_counts_of_containers.get(row_container_id, {}),
+                                                 from_date, to_date)
+            for row_container_id in set(initial_totals) | set(hourly_counts_of_containers)}
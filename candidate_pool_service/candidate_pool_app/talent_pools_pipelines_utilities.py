@@ -3,15 +3,24 @@ import math
 import json
 import decimal
 import requests
-from sqlalchemy.sql import text
 from dateutil.parser import parse
 from datetime import datetime, timedelta, date
 from candidate_pool_service.common.utils.validators import is_number
-from candidate_pool_service.common.utils.timeout import Timeout, TimeoutException
 from candidate_pool_service.candidate_pool_app import logger, app, celery_app, db
+from candidate_pool_service.candidate_pool_app.growth_stats import (GROWTH_STATS_DAYS, build_growth_stats,
+                                                                    compute_domain_growth_stats, get_growth_stats_key,
+                                                                    is_counted_by_query, read_growth_stats,
+                                                                    write_growth_stats)
 from candidate_pool_service.common.redis_cache import redis_dict, redis_store
 from candidate_pool_service.common.routes import CandidateApiUrl
 from candidate_pool_service.common.models.smartlist import Smartlist
+from candidate_pool_service.common.models.email_campaign import EmailCampaignSend, EmailCampaignSendUrlConversion
+from candidate_pool_service.common.models.misc import UrlConversion
+from candidate_pool_service.common.models.engagement import (TalentPipelineEngagement,
+                                                             TalentPipelineCandidateEngagement)
+from candidate_pool_service.common.utils.engagement_utils import (refresh_campaign_engagement,
+                                                                   refresh_domain_candidates_engagement,
+                                                                   refresh_pipelines_engagement)
 from candidate_pool_service.common.error_handling import InvalidUsage, NotFoundError, ForbiddenError
 from candidate_pool_service.common.models.talent_pools_pipelines import TalentPipeline, TalentPool, User, TalentPoolCandidate
 
@@ -51,6 +60,9 @@ TALENT_PIPELINE_SEARCH_PARAMS = [
 
 SCHEDULER_SERVICE_RESPONSE_CODE_TASK_ALREADY_SCHEDULED = 6057
 
+# Start time of last run of update_pipeline_engagement_score(), campaigns not changed since then are skipped
+ENGAGEMENT_SCORE_LAST_RUN_KEY = 'EngagementScoreLastRun'
+
 
 def generate_jwt_header(oauth_token=None, user_id=None):
     """
@@ -129,129 +141,202 @@ def get_pipeline_growth(talent_pipeline, interval):
     else:
         to_date = datetime.utcnow() - timedelta(days=1)
         from_date = to_date - timedelta(days=interval)
-        return get_talent_pipeline_stat_for_given_day(talent_pipeline, to_date) - \
-               get_talent_pipeline_stat_for_given_day(talent_pipeline, from_date)
+        to_date_stat, from_date_stat = get_growth_stats(talent_pipeline, 'TalentPipeline', [to_date, from_date])
+        return to_date_stat - from_date_stat
 
 
 def get_smartlist_stat_for_a_given_day(smartlist, date_object):
     """
-    This method will get and update smartlist stats for a given day
+    This method will get total number of candidates of a smartlist at a given time
     :param smartlist: SmartList Object
     :param date_object: DateTime Object
     :return:
     """
-    epoch_time_string = '1969-12-31'
-    current_date_time = datetime.utcnow()
-    date_string = date_object.strftime('%m/%d/%Y')
-    smartlists_growth_stats_dict = redis_dict(redis_store, 'smartlists_growth_stat_v2_%s' % smartlist.id)
-    if date_object < smartlist.added_time:
-        return 0
-
-    if date_string not in smartlists_growth_stats_dict:
-        smartlists_growth_stats_dict[date_string] = redis_dict(redis_store).key
-
-    if date_object.date() >= current_date_time.date():
-        response = get_smartlist_candidates(smartlist, request_params={
-            'date_from': epoch_time_string, 'date_to': date_object.strftime('%Y-%m-%dT%H:%M:%S'),
-            'fields': 'count_only'})
-        return response.get('total_found')
-
-    else:
-        redis_dictionary_for_hours = redis_dict(redis_store, smartlists_growth_stats_dict[date_string])
-        populate_stats_dictionary(redis_dictionary_for_hours, get_smartlist_candidates, smartlist, date_object)
-
-        return redis_dictionary_for_hours[date_object.hour]
+    return get_growth_stats(smartlist, 'SmartList', [date_object])[0]
 
 
 def get_talent_pipeline_stat_for_given_day(talent_pipeline, date_object):
     """
-    This method will get and update talent-pipeline stats for a given day
+    This method will get total number of candidates of a talent-pipeline at a given time
     :param talent_pipeline: TalentPipeline Object
     :param date_object: DateTime Object
-    :param is_update: Either we are in between daily stats update process
     :return:
     """
-    epoch_time_string = '1969-12-31'
-    current_date_time = datetime.utcnow()
-    date_string = date_object.strftime('%m/%d/%Y')
-    pipelines_growth_stats_dict = redis_dict(redis_store, 'pipelines_growth_stat_v2_%s' % talent_pipeline.id)
-    if date_object < talent_pipeline.added_time:
-        return 0
-
-    if date_string not in pipelines_growth_stats_dict:
-        pipelines_growth_stats_dict[date_string] = redis_dict(redis_store).key
-
-    if date_object.date() >= current_date_time.date():
-        response = get_candidates_of_talent_pipeline(talent_pipeline, request_params={
-            'date_from': epoch_time_string, 'date_to': date_object.strftime('%Y-%m-%dT%H:%M:%S'),
-            'fields': 'count_only'})
-        return response.get('total_found')
-
-    else:
-        redis_dictionary_for_hours = redis_dict(redis_store, pipelines_growth_stats_dict[date_string])
-        populate_stats_dictionary(redis_dictionary_for_hours, get_candidates_of_talent_pipeline,
-                                  talent_pipeline, date_object)
-
-        return redis_dictionary_for_hours[date_object.hour]
+    return get_growth_stats(talent_pipeline, 'TalentPipeline', [date_object])[0]
 
 
 def get_talent_pool_stat_for_a_given_day(talent_pool, date_object):
     """
-    This method will get and update talent-pool stats for a given day
+    This method will get total number of candidates of a talent-pool at a given time
     :param talent_pool: TalentPool Object
     :param date_object: DateTime Object
     :return:
     """
-    epoch_time_string = '1969-12-31'
-    current_date_time = datetime.utcnow()
-    date_string = date_object.strftime('%m/%d/%Y')
-    pools_growth_stats_dict = redis_dict(redis_store, 'pools_growth_stat_v2_%s' % talent_pool.id)
-    if date_object < talent_pool.added_time:
-        return 0
-
-    if date_string not in pools_growth_stats_dict:
-        pools_growth_stats_dict[date_string] = redis_dict(redis_store).key
+    return get_growth_stats(talent_pool, 'TalentPool', [date_object])[0]
 
-    if date_object.date() >= current_date_time.date():
-        response = get_candidates_of_talent_pool(talent_pool, request_params={
-            'date_from': epoch_time_string, 'date_to': date_object.strftime('%Y-%m-%dT%H:%M:%S'),
-            'fields': 'count_only'})
-        return response.get('total_found')
 
+def get_candidates_function_of_container(container_name):
+    """
+    This method will return function to get candidates of a container from candidate search
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :return:
+    """
+    if container_name == 'TalentPipeline':
+        return get_candidates_of_talent_pipeline
+    elif container_name == 'TalentPool':
+        return get_candidates_of_talent_pool
+    elif container_name == 'SmartList':
+        return get_smartlist_candidates
     else:
-        redis_dictionary_for_hours = redis_dict(redis_store, pools_growth_stats_dict[date_string])
-        populate_stats_dictionary(redis_dictionary_for_hours, get_candidates_of_talent_pool, talent_pool, date_object)
-
-        return redis_dictionary_for_hours[date_object.hour]
+        raise Exception("Container %s is not supported for this method" % container_name)
 
 
-def populate_stats_dictionary(stats_redis_object, get_candidates_function, container_object, date_object):
+def get_growth_stats(container_object, container_name, date_objects):
     """
-    This method will populate stats_redis_object using get_candidates_function
-    :param stats_redis_object: Redis Collection object
-    :param get_candidates_function: function to get candidates from cloud search
-    :param container_object: Container object like talent_pipeline or talent_pool
-    :param date_object: DateTime object
-    :return:
+    This method will return total number of candidates of a container at given times. Stats of past days are read
+    from materialized growth stats in one round-trip and days which are not materialized yet are computed from
+    candidate search. Stats of current day are always fetched from candidate search.
+    :param container_object: TalentPipeline, TalentPool or SmartList Object
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param list date_objects: DateTime Objects
+    :return: Total number of candidates at each of date_objects
+    :rtype: list
     """
-    if len(stats_redis_object.keys()) != 24:
-        response = get_candidates_function(container_object, request_params={
-            'date_from': '12/31/1969',
-            'date_to': (date_object - timedelta(days=1)).replace(hour=23, minute=59, second=59).strftime('%Y-%m-%dT%H:%M:%S'),
-            'fields': 'count_only'
-        })
-        total_number_of_candidates_on_last_day = response.get('total_found')
+    current_date = datetime.utcnow().date()
+    past_dates = sorted(set(date_object.date() for date_object in date_objects
+                            if container_object.added_time <= date_object and date_object.date() < current_date))
+
+    stats_of_days = read_growth_stats(container_name, container_object.id, past_dates)
+    missing_dates = [day for day in past_dates if stats_of_days[day] is None]
+    if missing_dates:
+        stats_of_days.update(compute_growth_stats_from_search(container_object, container_name, missing_dates))
+
+    get_candidates_function = get_candidates_function_of_container(container_name)
+    stats = []
+    for date_object in date_objects:
+        if date_object < container_object.added_time:
+            stats.append(0)
+        elif date_object.date() >= current_date:
+            response = get_candidates_function(container_object, request_params={
+                'date_from': '1969-12-31', 'date_to': date_object.strftime('%Y-%m-%dT%H:%M:%S'),
+                'fields': 'count_only'})
+            stats.append(response.get('total_found'))
+        else:
+            stats.append(stats_of_days[date_object.date()][date_object.hour])
+
+    return stats
+
+
+def compute_growth_stats_from_search(container_object, container_name, dates):
+    """
+    This method will compute and store growth stats of given days of a container from candidate search. Number of
+    candidates added in each hour of a day is fetched by one faceted count search. Number of candidates before a day
+    is taken from stats of previous day if it is available, otherwise it is fetched by another count search.
+    :param container_object: TalentPipeline, TalentPool or SmartList Object
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param list dates: Sorted days to be computed
+    :return: {date: [24 hourly totals]}
+    :rtype: dict
+    """
+    get_candidates_function = get_candidates_function_of_container(container_name)
+    previous_days = [day - timedelta(days=1) for day in dates]
+    previous_stats_of_days = read_growth_stats(container_name, container_object.id, previous_days)
+
+    stats_of_days = {}
+    for day, previous_day in zip(dates, previous_days):
+        previous_stats = stats_of_days.get(previous_day) or previous_stats_of_days[previous_day]
+        if previous_stats:
+            initial_total = previous_stats[-1]
+        else:
+            response = get_candidates_function(container_object, request_params={
+                'date_from': '1969-12-31',
+                'date_to': datetime.combine(previous_day, datetime.max.time()).strftime('%Y-%m-%dT%H:%M:%S'),
+                'fields': 'count_only'})
+            initial_total = response.get('total_found')
+
         response = get_candidates_function(container_object, request_params={
-            'date_from': date_object.replace(hour=0, minute=0, second=0, microsecond=0).strftime('%Y-%m-%dT%H:%M:%S'),
-            'date_to': date_object.replace(hour=23, minute=59, second=59).strftime('%Y-%m-%dT%H:%M:%S'),
-            'fields': 'count_only'
-        })
+            'date_from': datetime.combine(day, datetime.min.time()).strftime('%Y-%m-%dT%H:%M:%S'),
+            'date_to': datetime.combine(day, datetime.max.time()).strftime('%Y-%m-%dT%H:%M:%S'),
+            'fields': 'count_only'})
         added_time_hour_facet = response.get('facets').get('added_time_hour')
-        for index, count in enumerate(added_time_hour_facet):
-            if index - 1 >= 0:
-                stats_redis_object[index] = count + stats_redis_object[index - 1]
-            else:
-                stats_redis_object[index] = total_number_of_candidates_on_last_day
+        stats_of_days.update(build_growth_stats(initial_total, {(day, hour): count for hour, count
+                                                                in enumerate(added_time_hour_facet)}, day, day))
+
+    write_growth_stats(container_name, {container_object.id: stats_of_days})
+    return stats_of_days
+
+
+def get_containers_of_domain(container_name, domain_id):
+    """
+    This method will return all containers of a domain
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param int domain_id: Id of domain
+    :rtype: list
+    """
+    if container_name == 'TalentPool':
+        return TalentPool.query.filter_by(domain_id=domain_id).all()
+    elif container_name == 'TalentPipeline':
+        return TalentPipeline.query.join(TalentPool).filter(TalentPool.domain_id == domain_id).all()
+    elif container_name == 'SmartList':
+        return Smartlist.query.join(User).filter(User.domain_id == domain_id).all()
+    else:
+        raise Exception("Container %s is not supported for this method" % container_name)
+
+
+def update_growth_stats_of_domain(container_name, domain_id):
+    """
+    This method will materialize growth stats of last 90 days (till yesterday) of all containers of a domain.
+    Containers counted by grouped queries are recomputed for whole range in a few queries, other containers are
+    computed from candidate search for days which are not materialized yet.
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    :param int domain_id: Id of domain
+    """
+    to_date = datetime.utcnow().date() - timedelta(days=1)
+    from_date = to_date - timedelta(days=GROWTH_STATS_DAYS - 1)
+    containers = get_containers_of_domain(container_name, domain_id)
+
+    queried_containers = [container for container in containers if is_counted_by_query(container_name, container)]
+    if queried_containers:
+        stats_of_containers = compute_domain_growth_stats(container_name, domain_id, from_date, to_date)
+        write_growth_stats(container_name, {
+            container.id: stats_of_containers.get(container.id) or build_growth_stats(0, {}, from_date, to_date)
+            for container in queried_containers})
+
+    for container in containers:
+        if is_counted_by_query(container_name, container) or container.added_time.date() > to_date:
+            continue
+        try:
+            dates = [from_date + timedelta(days=index) for index in xrange(GROWTH_STATS_DAYS)]
+            dates = [day for day in dates if day >= container.added_time.date()]
+            stats_of_days = read_growth_stats(container_name, container.id, dates)
+            missing_dates = [day for day in dates if stats_of_days[day] is None]
+            if missing_dates:
+                compute_growth_stats_from_search(container, container_name, missing_dates)
+            logger.info("Statistics for %s %s have been updated successfully" % (container_name, container.id))
+        except Exception as e:
+            logger.exception("Update statistics for %s %s is not successful because: "
+                             "%s" % (container_name, container.id, e.message))
+
+
+def update_growth_stats_of_all_domains(container_name):
+    """
+    This method will materialize growth stats of all containers of all domains
+    :param str container_name: TalentPool, TalentPipeline or SmartList
+    """
+    if container_name == 'TalentPool':
+        domain_ids = db.session.query(TalentPool.domain_id).distinct().all()
+    elif container_name == 'TalentPipeline':
+        domain_ids = db.session.query(TalentPool.domain_id).join(TalentPipeline).distinct().all()
+    else:
+        domain_ids = db.session.query(User.domain_id).join(Smartlist).distinct().all()
+
+    for domain_id_tuple in domain_ids:
+        try:
+            update_growth_stats_of_domain(container_name, domain_id_tuple[0])
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Update statistics of %s for domain %s is not successful because: "
+                             "%s" % (container_name, domain_id_tuple[0], e.message))
 
 
 def get_candidates_of_talent_pool(talent_pool, oauth_token=None, request_params=None):
@@ -323,23 +408,27 @@ def campaign_json_encoder_helper(obj):
         return float(obj)
 
 
+STATS_CONTAINER_NAMES = {
+    'smartlist': 'SmartList',
+    'talent-pool': 'TalentPool',
+    'talent-pipeline': 'TalentPipeline'
+}
+
+# Keys of stats stored by previous versions (a Redis hash of hourly stats per day and container)
+LEGACY_STATS_KEYS = {
+    'smartlist': 'smartlists_growth_stat_v2_',
+    'talent-pool': 'pools_growth_stat_v2_',
+    'talent-pipeline': 'pipelines_growth_stat_v2_'
+}
+
+
 @celery_app.task(name="update_talent_pool_stats")
 def update_talent_pool_stats():
     with app.app_context():
         # Updating TalentPool Statistics
         logger.info("TalentPool statistics update process has been started at %s" % datetime.utcnow().date().isoformat())
-        talent_pools = TalentPool.query.with_entities(TalentPool.id).all()
-        for talent_pool_tuple in talent_pools:
-            try:
-                get_stats_generic_function(TalentPool.query.get(talent_pool_tuple[0]), 'TalentPool',
-                                           is_update=True, offset=0)
-                logger.info("Statistics for TalentPool %s have been updated successfully" % talent_pool_tuple[0])
-            except Exception as e:
-                db.session.rollback()
-                logger.exception("Update statistics for TalentPool %s is not successful because: "
-                                 "%s" % (talent_pool_tuple[0], e.message))
-
-        talent_pool_ids = map(lambda talent_pool: talent_pool[0], talent_pools)
+        update_growth_stats_of_all_domains('TalentPool')
+        talent_pool_ids = map(lambda talent_pool: talent_pool[0], TalentPool.query.with_entities(TalentPool.id))
         delete_dangling_stats(talent_pool_ids, container='talent-pool')
 
 
@@ -348,18 +437,9 @@ def update_talent_pipeline_stats():
     with app.app_context():
         # Updating TalentPipeline Statistics
         logger.info("TalentPipeline statistics update process has been started at %s" % datetime.utcnow().isoformat())
-        talent_pipelines = TalentPipeline.query.with_entities(TalentPipeline.id).all()
-        for talent_pipeline_tuple in talent_pipelines:
-            try:
-                get_stats_generic_function(TalentPipeline.query.get(talent_pipeline_tuple[0]),
-                                           'TalentPipeline', is_update=True, offset=0)
-                logger.info("Statistics for TalentPipeline %s have been updated successfully" % talent_pipeline_tuple[0])
-            except Exception as e:
-                db.session.rollback()
-                logger.exception("Update statistics for TalentPipeline %s is not successful because: "
-                                 "%s" % (talent_pipeline_tuple[0], e.message))
-
-        talent_pipeline_ids = map(lambda talent_pipeline: talent_pipeline[0], talent_pipelines)
+        update_growth_stats_of_all_domains('TalentPipeline')
+        talent_pipeline_ids = map(lambda talent_pipeline: talent_pipeline[0],
+                                  TalentPipeline.query.with_entities(TalentPipeline.id))
         delete_dangling_stats(talent_pipeline_ids, container='talent-pipeline')
 
 
@@ -368,18 +448,8 @@ def update_smartlist_stats():
     with app.app_context():
         # Updating SmartList Statistics
         logger.info("SmartList statistics update process has been started at %s" % datetime.utcnow().date().isoformat())
-        smartlists = Smartlist.query.with_entities(Smartlist.id).all()
-        for smartlist_tuple in smartlists:
-            try:
-                get_stats_generic_function(Smartlist.query.get(smartlist_tuple[0]), 'SmartList',
-                                           is_update=True, offset=0)
-                logger.info("Statistics for Smartlist %s have been updated successfully" % smartlist_tuple[0])
-            except Exception as e:
-                db.session.rollback()
-                logger.exception("Update statistics for SmartList %s is not successful because: "
-                                 "%s" % (smartlist_tuple[0], e.message))
-
-        smartlist_ids = map(lambda smartlist: smartlist[0], smartlists)
+        update_growth_stats_of_all_domains('SmartList')
+        smartlist_ids = map(lambda smartlist: smartlist[0], Smartlist.query.with_entities(Smartlist.id))
         delete_dangling_stats(smartlist_ids, container='smartlist')
 
 
@@ -389,18 +459,10 @@ def delete_all_stats(container, container_id):
     :param container: Container's name
     :return:
     """
-    if container == 'smartlist':
-        redis_key = 'smartlists_growth_stat_v2_'
-    elif container == 'talent-pool':
-        redis_key = 'pools_growth_stat_v2_'
-    elif container == 'talent-pipeline':
-        redis_key = 'pipelines_growth_stat_v2_'
-    else:
+    if container not in STATS_CONTAINER_NAMES:
         raise Exception("Container %s is not supported" % container)
 
-    key = redis_key + str(container_id)
-    redis_store.delete(redis_store.get(key))
-    redis_store.delete(key)
+    redis_store.delete(get_growth_stats_key(STATS_CONTAINER_NAMES[container], container_id))
 
 
 def delete_dangling_stats(id_list, container):
@@ -410,26 +472,26 @@ def delete_dangling_stats(id_list, container):
     :param container: Container's name
     :return:
     """
-    if container == 'smartlist':
-        redist_key = 'smartlists_growth_stat_v2_'
-    elif container == 'talent-pool':
-        redist_key = 'pools_growth_stat_v2_'
-    elif container == 'talent-pipeline':
-        redist_key = 'pipelines_growth_stat_v2_'
-    else:
+    if container not in STATS_CONTAINER_NAMES:
         raise Exception("Container %s is not supported" % container)
 
-    for key in redis_store.keys(redist_key + '*'):
-        hashed_key = redis_store.get(key)
-        if int(key.replace(redist_key, '')) not in id_list:
-            redis_store.delete(hashed_key)
+    id_list = set(id_list)
+    redis_key = get_growth_stats_key(STATS_CONTAINER_NAMES[container], '')
+    oldest_date = (datetime.utcnow() - timedelta(days=GROWTH_STATS_DAYS)).date().isoformat()
+    for key in redis_store.keys(redis_key + '*'):
+        if int(key.replace(redis_key, '')) not in id_list:
             redis_store.delete(key)
         else:
-            # Delete all stats which are older than 90 days
-            for date_time_key in redis_store.hkeys(hashed_key):
-                if datetime.strptime(date_time_key, '%m/%d/%Y') < datetime.utcnow() - timedelta(days=90):
-                    redis_store.delete(redis_store.hget(hashed_key, date_time_key))
-                    redis_store.hdel(hashed_key, date_time_key)
+            # Delete all stats which are older than 90 days, days are in ISO format so they sort as strings
+            old_days = [day for day in redis_store.hkeys(key) if day < oldest_date]
+            if old_days:
+                redis_store.hdel(key, *old_days)
+
+    for key in redis_store.keys(LEGACY_STATS_KEYS[container] + '*'):
+        legacy_stats_dict = redis_dict(redis_store, key)
+        for hours_key in legacy_stats_dict.values():
+            redis_store.delete(hours_key)
+        redis_store.delete(legacy_stats_dict.key, key)
 
     logger.info("Dangling Statistics have been deleted for %s" % container)
 
@@ -492,36 +554,32 @@ def get_stats_generic_function(container_object, container_name, user=None, from
     if interval < 1:
         raise InvalidUsage("Interval's value should be greater than or equal to 1 day")
 
-    if container_name == 'TalentPipeline':
-        get_stats_for_given_day = get_talent_pipeline_stat_for_given_day
-    elif container_name == 'TalentPool':
-        get_stats_for_given_day = get_talent_pool_stat_for_a_given_day
-    elif container_name == 'SmartList':
-        get_stats_for_given_day = get_smartlist_stat_for_a_given_day
-    else:
+    if container_name not in ('TalentPipeline', 'TalentPool', 'SmartList'):
         raise Exception("Container %s is not supported for this method" % container_name)
 
-    list_of_stats_dicts = []
-
     to_date = to_date.replace(hour=23, minute=59, second=59)
     from_date = from_date.replace(hour=23, minute=59, second=59)
 
     if is_update:
         to_date -= timedelta(days=interval)
 
+    stat_dates = []
     while to_date.date() >= from_date.date():
-        list_of_stats_dicts.append({
-            'total_number_of_candidates': get_stats_for_given_day(
-                    container_object, offset_date_time(to_date, offset)),
-            'added_datetime': to_date.date().isoformat(),
-        })
+        stat_dates.append(to_date)
         to_date -= timedelta(days=interval)
 
-    reference_stat = get_stats_for_given_day(container_object, offset_date_time(to_date, offset))
-    for index, stat_dict in enumerate(list_of_stats_dicts):
-        stat_dict['number_of_candidates_added'] = stat_dict['total_number_of_candidates'] - (
-            list_of_stats_dicts[index + 1]['total_number_of_candidates'] if index + 1 < len(
-                    list_of_stats_dicts) else reference_stat)
+    # Last one is reference stat to compute number of candidates added in oldest interval
+    stat_dates.append(to_date)
+    stats = get_growth_stats(container_object, container_name,
+                             [offset_date_time(stat_date, offset) for stat_date in stat_dates])
+
+    list_of_stats_dicts = []
+    for index, stat_date in enumerate(stat_dates[:-1]):
+        list_of_stats_dicts.append({
+            'total_number_of_candidates': stats[index],
+            'number_of_candidates_added': stats[index] - stats[index + 1],
+            'added_datetime': stat_date.date().isoformat(),
+        })
 
     return list_of_stats_dicts
 
@@ -544,80 +602,10 @@ def top_most_engaged_candidates_of_pipeline(talent_pipeline_id, limit):
     :return: List of candidate Ids of top (limit) most engaged candidates
     :rtype: list
     """
-
-    sql_query = """
-    SELECT candidates_engagement_score.CandidateId,
-       avg(candidates_engagement_score.campaign_engagement_score) AS engagement_score
-    FROM
-      (SELECT engagement_score_for_each_sent.CandidateId,
-              engagement_score_for_each_sent.EmailCampaignId,
-              avg(engagement_score_for_each_sent.engagement_score) AS campaign_engagement_score
-       FROM
-         (SELECT email_campaign_send.Id,
-                 email_campaign_send.EmailCampaignId,
-                 email_campaign_send.CandidateId,
-                 CASE WHEN sum(url_conversion.HitCount) = 0 THEN 0.0 WHEN sum(email_campaign_send_url_conversion.type * url_conversion.HitCount) > 0 THEN 100 ELSE 33.3 END AS engagement_score
-          FROM smart_list
-          INNER JOIN email_campaign_smart_list ON smart_list.Id = email_campaign_smart_list.SmartListId
-          INNER JOIN email_campaign_send ON email_campaign_send.EmailCampaignId = email_campaign_smart_list.EmailCampaignId
-          INNER JOIN email_campaign_send_url_conversion ON email_campaign_send_url_conversion.EmailCampaignSendId = email_campaign_send.Id
-          INNER JOIN url_conversion ON email_campaign_send_url_conversion.UrlConversionId = url_conversion.Id
-          WHERE smart_list.talentPipelineId = :talent_pipeline_id
-          GROUP BY email_campaign_send.Id,
-                   email_campaign_send.EmailCampaignId,
-                   email_campaign_send.CandidateId) AS engagement_score_for_each_sent
-       GROUP BY engagement_score_for_each_sent.EmailCampaignId) AS candidates_engagement_score
-    GROUP BY candidates_engagement_score.CandidateId
-    ORDER BY engagement_score DESC LIMIT :limit;
-    """
-
-    try:
-        engagement_scores = db.session.connection().execute(text(sql_query),
-                                                            talent_pipeline_id=talent_pipeline_id, limit=limit)
-        return [{'candidate_id': engagement_score['CandidateId'], 'engagement_score': float(str(
-                engagement_score['engagement_score']))} for engagement_score in engagement_scores]
-    except Exception as e:
-        logger.exception("Couldn't get top most engaged candidates of talent-pipeline(%s) "
-                         "because (%s)" % (talent_pipeline_id, e.message))
-        return []
-
-
-def engagement_score_of_pipeline(talent_pipeline_id):
-    """
-    This endpoint will calculate engagement_score of a talent_pipeline
-    :param talent_pipeline_id: Id of talent_pipeline
-    :return: engagement_score of talent_pipeline
-    :rtype: list
-    """
-
-    sql_query = """
-    SELECT avg(pipeline_engagement.campaign_engagement_score) AS pipeline_engagement_score
-      FROM
-        (SELECT avg(engagement_score_for_each_sent.engagement_score) AS campaign_engagement_score
-           FROM
-             (SELECT email_campaign_send.Id,
-                     email_campaign_send.EmailCampaignId,
-                     CASE WHEN sum(url_conversion.HitCount) = 0 THEN 0.0 WHEN sum(email_campaign_send_url_conversion.type * url_conversion.HitCount) > 0 THEN 100 ELSE 33.3 END AS engagement_score
-              FROM smart_list
-              INNER JOIN email_campaign_smart_list ON smart_list.Id = email_campaign_smart_list.SmartListId
-              INNER JOIN email_campaign_send ON email_campaign_send.EmailCampaignId = email_campaign_smart_list.EmailCampaignId
-              INNER JOIN email_campaign_send_url_conversion ON email_campaign_send_url_conversion.EmailCampaignSendId = email_campaign_send.Id
-              INNER JOIN url_conversion ON email_campaign_send_url_conversion.UrlConversionId = url_conversion.Id
-              WHERE smart_list.talentPipelineId = :talent_pipeline_id
-              GROUP BY email_campaign_send.Id, email_campaign_send.EmailCampaignId) AS engagement_score_for_each_sent
-              GROUP BY engagement_score_for_each_sent.EmailCampaignId) AS pipeline_engagement
-    """
-
-    try:
-        engagement_score = db.session.connection().execute(text(sql_query), talent_pipeline_id=talent_pipeline_id)
-        result = engagement_score.fetchone()
-        if not result or not result['pipeline_engagement_score']:
-            return None
-        else:
-            return float(str(result['pipeline_engagement_score']))
-    except Exception as e:
-        logger.exception("Couldn't compute engagement score for pipeline(%s) because (%s)" % (talent_pipeline_id, e.message))
-        return None
+    engagement_scores = TalentPipelineCandidateEngagement.query.filter_by(talent_pipeline_id=talent_pipeline_id).\
+        order_by(TalentPipelineCandidateEngagement.engagement_score.desc()).limit(limit).all()
+    return [{'candidate_id': engagement_score.candidate_id, 'engagement_score': engagement_score.engagement_score}
+            for engagement_score in engagement_scores]
 
 
 def top_most_engaged_pipelines_of_candidate(candidate_id, limit):
@@ -627,79 +615,105 @@ def top_most_engaged_pipelines_of_candidate(candidate_id, limit):
     :param limit: Number of results to be returned
     :return: List of dicts containing pipeline's id, name and engagement score
     """
-    talent_pool_ids_of_candidate = TalentPoolCandidate.query.with_entities(
-            TalentPoolCandidate.talent_pool_id).filter(TalentPoolCandidate.candidate_id == candidate_id).all()
-    talent_pool_ids_of_candidate = [talent_pool_id_of_candidate.talent_pool_id for
-                                    talent_pool_id_of_candidate in talent_pool_ids_of_candidate]
-
-    if not talent_pool_ids_of_candidate:
-        talent_pool_ids_of_candidate = ['NULL']
-
-    sql_query = """
-      SELECT talent_pipeline.id, talent_pipeline.name, avg(engagement_score_of_all_campaigns.engagement_score) as average_engagement_score_of_pipeline
-      FROM
-       (SELECT email_campaign_send.EmailCampaignId,
-               email_campaign_send_url_conversion.EmailCampaignSendId,
-               CASE WHEN sum(url_conversion.HitCount) = 0 THEN 0.0 WHEN sum(email_campaign_send_url_conversion.type * url_conversion.HitCount) > 0 THEN 100 ELSE 33.3 END AS engagement_score
-        FROM email_campaign_send
-        INNER JOIN email_campaign_send_url_conversion ON email_campaign_send.Id = email_campaign_send_url_conversion.EmailCampaignSendId
-        INNER JOIN url_conversion ON email_campaign_send_url_conversion.UrlConversionId = url_conversion.Id
-        WHERE email_campaign_send.candidateId = :candidate_id
-        GROUP BY email_campaign_send_url_conversion.EmailCampaignSendId) AS engagement_score_of_all_campaigns
-      NATURAL JOIN email_campaign_smart_list
-      INNER JOIN smart_list ON smart_list.Id = email_campaign_smart_list.SmartListId
-      INNER JOIN talent_pipeline ON talent_pipeline.id = smart_list.talentPipelineId
-      WHERE talent_pipeline.id IS NOT NULL AND talent_pipeline.talent_pool_id IN :talent_pool_ids GROUP BY talent_pipeline.id
-      ORDER BY average_engagement_score_of_pipeline DESC LIMIT :limit;
+    talent_pool_ids_of_candidate = TalentPoolCandidate.query.with_entities(TalentPoolCandidate.talent_pool_id).\
+        filter(TalentPoolCandidate.candidate_id == candidate_id)
+
+    engagement_scores = db.session.query(TalentPipeline.id, TalentPipeline.name,
+                                         TalentPipelineCandidateEngagement.engagement_score).\
+        join(TalentPipelineCandidateEngagement,
+             TalentPipelineCandidateEngagement.talent_pipeline_id == TalentPipeline.id).\
+        filter(TalentPipelineCandidateEngagement.candidate_id == candidate_id,
+               TalentPipeline.talent_pool_id.in_(talent_pool_ids_of_candidate)).\
+        order_by(TalentPipelineCandidateEngagement.engagement_score.desc()).limit(limit).all()
+    return [{'id': talent_pipeline_id, 'name': name, 'engagement_score': engagement_score}
+            for talent_pipeline_id, name, engagement_score in engagement_scores]
+
+
+def get_campaign_ids_changed_since(since):
+    """
+    Returns ids of email-campaigns which have sends created or updated or URLs of sends hit since given time, i.e.
+    campaigns whose engagement scores may have been missed by incremental updates.
+    :param datetime | None since: Time of last run, all sent campaigns are returned if it is None
+    :rtype: set
     """
+    if since is None:
+        return {campaign_id for campaign_id, in db.session.query(EmailCampaignSend.campaign_id).distinct()}
 
-    try:
-        engagement_scores = db.session.connection().execute(text(sql_query), candidate_id=candidate_id,
-                                                            limit=limit, talent_pool_ids=tuple(talent_pool_ids_of_candidate))
-        return [{
-                    'id': engagement_score['id'],
-                    'name': engagement_score['name'],
-                    'engagement_score': float(str(engagement_score['average_engagement_score_of_pipeline']))
-                } for engagement_score in engagement_scores]
-    except Exception as e:
-        logger.exception("Couldn't compute engagement score for all pipelines of a candidate(%s) "
-                         "because (%s)" % (candidate_id, e.message))
-        return []
+    sends_changed = db.session.query(EmailCampaignSend.campaign_id).\
+        filter((EmailCampaignSend.sent_datetime >= since) | (EmailCampaignSend.updated_datetime >= since))
+    urls_hit = db.session.query(EmailCampaignSend.campaign_id).\
+        join(EmailCampaignSendUrlConversion, EmailCampaignSendUrlConversion.email_campaign_send_id ==
+             EmailCampaignSend.id).\
+        join(UrlConversion, UrlConversion.id == EmailCampaignSendUrlConversion.url_conversion_id).\
+        filter(UrlConversion.last_hit_time >= since)
+    return {campaign_id for campaign_id, in sends_changed.union(urls_hit)}
 
 
 @celery_app.task(name="update_pipeline_engagement_score")
 def update_pipeline_engagement_score():
+    """
+    Engagement scores are updated when sends of email-campaigns are created or opened/clicked. This task recomputes
+    them for email-campaigns changed since its last run, so that scores missed by those updates are fixed. Then
+    scores of pipelines are recomputed from scratch per domain, as smartlists of campaigns may have been added to or
+    removed from pipelines, and so are scores of candidates, as they also change when candidates are added to or
+    removed from talent-pools.
+    """
     with app.app_context():
-        # Updating SmartList Statistics
-        logger.info("TalentPipeline Engagement Score update process has been started "
-                    "at %s" % datetime.utcnow().date().isoformat())
-        talent_pipelines = TalentPipeline.query.with_entities(TalentPipeline.id).all()
-        talent_pipeline_ids = map(lambda talent_pipeline: talent_pipeline[0], talent_pipelines)
-        talent_pipeline_cache = redis_dict(redis_store, 'pipelines_engagement_score')
-
-        for talent_pipeline_id in talent_pipeline_ids:
+        started_at = datetime.utcnow()
+        last_run = redis_store.get(ENGAGEMENT_SCORE_LAST_RUN_KEY)
+        since = parse(last_run) if last_run else None
+        logger.info("Engagement Score update process has been started at %s for campaigns changed since %s"
+                    % (started_at.isoformat(), since))
+        all_campaigns_updated = True
+
+        for campaign_id in get_campaign_ids_changed_since(since):
             try:
-                pipeline_cache_key = 'pipelines_engagement_score_%s' % talent_pipeline_id
+                refresh_campaign_engagement(campaign_id)
+                logger.info("Engagement Scores of EmailCampaign %s have been updated successfully" % campaign_id)
+            except Exception as e:
+                db.session.rollback()
+                all_campaigns_updated = False
+                logger.exception("Update Engagement Scores of EmailCampaign %s is not successful because: "
+                                 "%s" % (campaign_id, e.message))
 
-                with Timeout(seconds=120):
-                    talent_pipeline_cache[pipeline_cache_key] = engagement_score_of_pipeline(talent_pipeline_id)
+        # Failed campaigns are picked again by next run
+        if all_campaigns_updated:
+            redis_store.set(ENGAGEMENT_SCORE_LAST_RUN_KEY, started_at.isoformat())
 
-                logger.info("Engagement Score for TalentPipeline %s have been updated successfully" % talent_pipeline_id)
-            except TimeoutException:
-                logger.exception("Timelimit exceeded for updating Engagement Score for "
-                                 "TalentPipeline %s" % talent_pipeline_id)
+        domain_ids = db.session.query(TalentPool.domain_id).distinct().all()
+        for domain_id_tuple in domain_ids:
+            try:
+                talent_pipeline_ids = TalentPipeline.query.with_entities(TalentPipeline.id).\
+                    join(User, User.id == TalentPipeline.user_id).filter(User.domain_id == domain_id_tuple[0]).all()
+                refresh_pipelines_engagement([talent_pipeline_id for talent_pipeline_id, in talent_pipeline_ids])
+                refresh_domain_candidates_engagement(domain_id_tuple[0])
+                logger.info("Engagement Scores of pipelines and candidates of Domain %s have been updated "
+                            "successfully" % domain_id_tuple[0])
+            except Exception as e:
+                db.session.rollback()
+                logger.exception("Update Engagement Scores of pipelines and candidates of Domain %s is not successful "
+                                 "because: %s" % (domain_id_tuple[0], e.message))
 
 
 def get_pipeline_engagement_score(talent_pipeline_id):
     """
-    This method will return talent_pipeline engagement score from Redis Cache
+    This method will return talent_pipeline engagement score
     :param int talent_pipeline_id: Id of TalentPipeline
     :return:
     """
-    talent_pipeline_cache = redis_dict(redis_store, 'pipelines_engagement_score')
-    pipeline_cache_key = 'pipelines_engagement_score_%s' % talent_pipeline_id
-    if pipeline_cache_key not in talent_pipeline_cache:
-        logger.error("Engagement Score for TalentPipeline %s is not in cache" % talent_pipeline_id)
-        return None
+    return get_pipeline_engagement_scores([talent_pipeline_id]).get(talent_pipeline_id)
 
-    return talent_pipeline_cache[pipeline_cache_key]
+
+def get_pipeline_engagement_scores(talent_pipeline_ids):
+    """
+    This method will return engagement scores of given talent_pipelines, pipelines whose candidates are not sent
+    any email-campaign yet have no score.
+    :param list talent_pipeline_ids: Ids of TalentPipelines
+    :return: Dictionary of talent_pipeline_id -> engagement score
+    :rtype: dict
+    """
+    if not talent_pipeline_ids:
+        return {}
+    return dict(TalentPipelineEngagement.query.with_entities(TalentPipelineEngagement.talent_pipeline_id,
+                                                             TalentPipelineEngagement.engagement_score).
+                filter(TalentPipelineEngagement.talent_pipeline_id.in_(talent_pipeline_ids)).all())
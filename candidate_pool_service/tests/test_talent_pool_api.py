@@ -526,6 +526,75 @@ def test_get_all_talent_pipelines_of_talent_pools(access_token_first, user_first
     assert len(response.get('talent_pipelines')) == 1
 
 
+def test_talent_pool_growth_stats(talent_pool):
+    from datetime import date, timedelta
+    from candidate_pool_service.candidate_pool_app.growth_stats import (build_growth_stats, read_growth_stats,
+                                                                        write_growth_stats)
+    from candidate_pool_service.candidate_pool_app.talent_pools_pipelines_utilities import delete_all_stats
+
+    first_day = date.today() - timedelta(days=3)
+    second_day = first_day + timedelta(days=1)
+    stats_of_days = build_growth_stats(5, {(first_day, 0): 2, (first_day, 13): 1, (second_day, 23): 4},
+                                       first_day, second_day)
+
+    # Totals are cumulative across hours and days
+    assert stats_of_days[first_day][0] == 7
+    assert stats_of_days[first_day][12] == 7
+    assert stats_of_days[first_day][23] == 8
+    assert stats_of_days[second_day][22] == 8
+    assert stats_of_days[second_day][23] == 12
+
+    write_growth_stats('TalentPool', {talent_pool.id: stats_of_days})
+    third_day = second_day + timedelta(days=1)
+    assert read_growth_stats('TalentPool', talent_pool.id, [first_day, second_day, third_day]) == {
+        first_day: stats_of_days[first_day], second_day: stats_of_days[second_day], third_day: None}
+
+    delete_all_stats('talent-pool', talent_pool.id)
+    assert read_growth_stats('TalentPool', talent_pool.id, [first_day]) == {first_day: None}
+
+
+def test_talent_pool_growth_stats_of_domain(access_token_first, user_first, talent_pool):
+    from datetime import datetime, timedelta
+    from candidate_pool_service.candidate_pool_app.growth_stats import compute_domain_growth_stats
+    from candidate_pool_service.candidate_pool_app.talent_pools_pipelines_utilities import (
+        delete_all_stats, update_growth_stats_of_domain)
+
+    second_day = datetime.utcnow().date() - timedelta(days=1)
+    first_day = second_day - timedelta(days=1)
+    talent_pool.added_time = datetime.combine(first_day - timedelta(days=2), datetime.min.time())
+    db.session.commit()
+
+    # One candidate before first day, one at 05:30 of first day and two at 20:10 of second day
+    added_times = [datetime.combine(first_day, datetime.min.time()) - timedelta(hours=1),
+                   datetime.combine(first_day, datetime.min.time()) + timedelta(hours=5, minutes=30),
+                   datetime.combine(second_day, datetime.min.time()) + timedelta(hours=20, minutes=10),
+                   datetime.combine(second_day, datetime.min.time()) + timedelta(hours=20, minutes=10)]
+    for added_time in added_times:
+        candidate = Candidate(first_name=gen_salt(20), user_id=user_first.id, added_time=added_time)
+        db.session.add(candidate)
+        db.session.flush()
+        db.session.add(TalentPoolCandidate(talent_pool_id=talent_pool.id, candidate_id=candidate.id))
+    db.session.commit()
+
+    stats_of_days = compute_domain_growth_stats('TalentPool', user_first.domain_id, first_day,
+                                                second_day)[talent_pool.id]
+    assert stats_of_days[first_day][4] == 1
+    assert stats_of_days[first_day][5] == 2
+    assert stats_of_days[second_day][19] == 2
+    assert stats_of_days[second_day][20] == 4
+
+    # Stats endpoint should serve totals of past days from materialized stats
+    update_growth_stats_of_domain('TalentPool', user_first.domain_id)
+    response, status_code = talent_pool_get_stats(access_token_first, talent_pool.id, {
+        'from_date': first_day.isoformat(), 'to_date': second_day.isoformat()})
+    assert status_code == 200
+    assert response['talent_pool_data'] == [
+        {'total_number_of_candidates': 4, 'number_of_candidates_added': 2, 'added_datetime': second_day.isoformat()},
+        {'total_number_of_candidates': 2, 'number_of_candidates_added': 1, 'added_datetime': first_day.isoformat()}]
+
+    delete_all_stats('talent-pool', talent_pool.id)
+
+
 def test_health_check():
     import requests
     response = requests.get(CandidatePoolApiUrl.HEALTH_CHECK)
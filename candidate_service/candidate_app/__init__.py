@@ -16,17 +16,20 @@ try:
         CandidateWorkExperienceResource, CandidateWorkExperienceBulletResource, CandidateWorkPreferenceResource,
         CandidateEmailResource, CandidatePhoneResource, CandidateMilitaryServiceResource,
         CandidatePreferredLocationResource, CandidateSkillResource, CandidateSocialNetworkResource,
-        CandidatesResource, CandidateOpenWebResource, CandidateViewResource,
-        CandidatePreferenceResource, CandidateClientEmailCampaignResource,
+        CandidatesResource, CandidateOpenWebResource, CandidateViewResource, CandidateContactHistoryResource,
+        CandidatePreferenceResource, CandidatesPreferencesResource, CandidateClientEmailCampaignResource,
         CandidateDeviceResource, CandidatePhotosResource, CandidateLanguageResource, CandidateDocumentResource
     )
     from candidate_service.candidate_app.api.references import CandidateReferencesResource
-    from candidate_service.candidate_app.api.candidate_search_api import CandidateSearch, CandidateDocuments
+    from candidate_service.candidate_app.api.candidate_search_api import (
+        CandidateSearch, CandidateDocuments, CandidateDocumentsReindex, CandidateDocumentsQueue,
+        CandidateSearchCacheStats
+    )
     from candidate_service.candidate_app.api.v1_candidate_tags import CandidateTagResource
     from candidate_service.candidate_app.api.pipelines import CandidatePipelineResource
     from candidate_service.candidate_app.api.candidate_custom_fields import CandidateCustomFieldResource
     from candidate_service.candidate_app.api.statuses import CandidateStatusesResources
-    from candidate_service.candidate_app.api.notes import CandidateNotesResource
+    from candidate_service.candidate_app.api.notes import CandidateNotesResource, CandidatesNotesResource
     from candidate_service.candidate_app.api.edits import CandidateEditResource
 
     from candidate_service.common.talent_api import TalentApi
@@ -175,6 +178,10 @@ try:
     # ****** CandidateViewResource ******
     api.add_resource(CandidateViewResource, CandidateApi.CANDIDATE_VIEWS, endpoint='candidate_views')
 
+    # ****** CandidateContactHistoryResource ******
+    api.add_resource(CandidateContactHistoryResource, CandidateApi.CANDIDATE_CONTACT_HISTORY,
+                     endpoint='candidate_contact_history')
+
     # ****** CandidateDeviceResource ******
     api.add_resource(CandidateDeviceResource, CandidateApi.DEVICES, endpoint='candidate_devices')
 
@@ -184,9 +191,12 @@ try:
 
     # ****** Candidate Search *******
     api.add_resource(CandidateSearch, CandidateApi.CANDIDATE_SEARCH)
+    api.add_resource(CandidateSearchCacheStats, CandidateApi.CANDIDATE_SEARCH_CACHE)
 
     # ****** Candidate Documents *******
     api.add_resource(CandidateDocuments, CandidateApi.CANDIDATES_DOCUMENTS)
+    api.add_resource(CandidateDocumentsReindex, CandidateApi.CANDIDATES_DOCUMENTS_REINDEX)
+    api.add_resource(CandidateDocumentsQueue, CandidateApi.CANDIDATES_DOCUMENTS_QUEUE)
 
     # ****** OPENWEB Request *******
     api.add_resource(CandidateOpenWebResource, CandidateApi.OPENWEB, endpoint='openweb')
@@ -196,10 +206,13 @@ try:
 
     # ****** CandidatePreferenceResource *******
     api.add_resource(CandidatePreferenceResource, CandidateApi.CANDIDATE_PREFERENCES, endpoint='candidate_preference')
+    api.add_resource(CandidatesPreferencesResource, CandidateApi.CANDIDATES_PREFERENCES,
+                     endpoint='candidates_preferences')
 
     # ****** CandidatePreferenceResource *******
     api.add_resource(CandidateNotesResource, CandidateApi.CANDIDATE_NOTES, endpoint='candidate_notes')
     api.add_resource(CandidateNotesResource, CandidateApi.CANDIDATE_NOTE, endpoint='candidate_note')
+    api.add_resource(CandidatesNotesResource, CandidateApi.CANDIDATES_NOTES, endpoint='candidates_notes')
 
     # ****** CandidateLanguageResource *******
     api.add_resource(CandidateLanguageResource, CandidateApi.LANGUAGES, endpoint='candidate_languages')
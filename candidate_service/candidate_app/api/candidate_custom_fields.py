@@ -16,7 +16,7 @@ from candidate_service.common.models.user import Permission
 from candidate_service.common.utils.auth_utils import require_oauth, require_all_permissions
 from candidate_service.custom_error_codes import CandidateCustomErrors as custom_error
 from candidate_service.json_schema.candidate_custom_fields import ccf_schema
-from candidate_service.modules.talent_cloud_search import upload_candidate_documents
+from candidate_service.modules.cloudsearch_change_log import mark_candidates_dirty
 from candidate_service.modules.validators import (
     get_candidate_if_validated, does_candidate_cf_exist, is_custom_field_authorized, get_json_data_if_validated
 )
@@ -94,7 +94,7 @@ class CandidateCustomFieldResource(Resource):
                     created_candidate_custom_field_ids.append(candidate_custom_field.id)
 
         db.session.commit()
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return {
                    'candidate_custom_fields': [
                        {'id': custom_field_id} for custom_field_id in created_candidate_custom_field_ids]
@@ -212,5 +212,5 @@ class CandidateCustomFieldResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
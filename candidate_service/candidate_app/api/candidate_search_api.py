@@ -6,14 +6,15 @@ from flask import request
 from flask_restful import Resource
 
 # Utilities
-from candidate_service.common.utils.auth_utils import require_oauth, require_all_permissions
+from candidate_service.common.utils.auth_utils import require_oauth, require_all_permissions, require_role
+from candidate_service.common.utils.validators import is_number
 from candidate_service.common.utils.handy_functions import time_me
 
 # Validations
 from candidate_service.modules.validators import validate_and_format_data
 from jsonschema import validate, ValidationError
 from candidate_service.modules.json_schema import candidates_resource_schema_get
-from candidate_service.modules.validators import do_candidates_belong_to_users_domain, get_candidate_if_exists
+from candidate_service.modules.validators import do_candidates_belong_to_users_domain, get_candidates_if_exist
 
 # Error handling
 from candidate_service.common.error_handling import InvalidUsage, ForbiddenError
@@ -22,12 +23,15 @@ from candidate_service.custom_error_codes import CandidateCustomErrors as custom
 # Modules
 from candidate_service.candidate_app import logger
 from candidate_service.modules.talent_cloud_search import (
-    search_candidates, upload_candidate_documents, delete_candidate_documents
+    search_candidates, delete_candidate_documents
 )
-from candidate_service.modules.talent_candidates import fetch_candidate_info, get_search_params_of_smartlists
+from candidate_service.modules.cloudsearch_change_log import mark_candidates_dirty, get_change_log_status
+from candidate_service.modules.talent_candidates import fetch_candidates_info, get_search_params_of_smartlists
+from candidate_service.modules.cloudsearch_reindex import start_domain_reindex, get_domain_reindex_progress
+from candidate_service.modules.search_cache import get_search_cache_stats
 
 # Models
-from candidate_service.common.models.user import Permission
+from candidate_service.common.models.user import Permission, Role, Domain
 
 
 class CandidateSearch(Resource):
@@ -55,13 +59,9 @@ class CandidateSearch(Resource):
             if not do_candidates_belong_to_users_domain(authed_user, candidate_ids):
                 raise ForbiddenError('Not authorized', custom_error.CANDIDATE_FORBIDDEN)
 
-            retrieved_candidates = []
-            for candidate_id in candidate_ids:
-                # Check for candidate's existence and web-hidden status
-                candidate = get_candidate_if_exists(candidate_id)
-                retrieved_candidates.append(fetch_candidate_info(candidate=candidate))
-
-            return {'candidates': retrieved_candidates}
+            # Check for candidates' existence and web-hidden status
+            candidates = get_candidates_if_exist(candidate_ids)
+            return {'candidates': fetch_candidates_info(candidates)}
 
         else:
             request_vars = validate_and_format_data(request.args)
@@ -98,7 +98,7 @@ class CandidateDocuments(Resource):
         if not requested_data or 'candidate_ids' not in requested_data:
             raise InvalidUsage(error_message="Request body is empty or invalid")
 
-        upload_candidate_documents.delay(requested_data.get('candidate_ids'))
+        mark_candidates_dirty(requested_data.get('candidate_ids'))
 
         return '', 204
 
@@ -112,6 +112,69 @@ class CandidateDocuments(Resource):
         if not requested_data or 'candidate_ids' not in requested_data:
             raise InvalidUsage(error_message="Request body is empty or invalid")
 
-        delete_candidate_documents(candidate_ids=requested_data.get('candidate_ids'))
+        delete_candidate_documents(candidate_ids=requested_data.get('candidate_ids'),
+                                   domain_id=request.user.domain_id)
 
         return '', 204
+
+
+class CandidateDocumentsReindex(Resource):
+    decorators = [require_oauth()]
+
+    @staticmethod
+    def _get_domain_id(domain_id):
+        if not is_number(domain_id) or not Domain.get_by_id(int(domain_id)):
+            raise InvalidUsage(error_message="Valid domain_id is required")
+        return int(domain_id)
+
+    @require_role(Role.TALENT_ADMIN)
+    def post(self):
+        """
+        Re-index all candidate documents of a domain in Amazon Cloud Search.
+        A crashed re-index of the domain is resumed from its checkpoint.
+        :Example:
+            >>> data = {'domain_id': 1}
+            >>> requests.post(CandidateApiUrl.CANDIDATES_DOCUMENTS_REINDEX_URI, data=json.dumps(data), headers=headers)
+        :return: {'reindex': {'status': 'running', 'total': 2000, 'uploaded': 0, ...}}
+        """
+        requested_data = request.get_json(silent=True) or {}
+        domain_id = self._get_domain_id(requested_data.get('domain_id'))
+        return {'reindex': start_domain_reindex(domain_id)}, 202
+
+    @require_role(Role.TALENT_ADMIN)
+    def get(self):
+        """
+        Progress of domain's latest re-index along with its throughput (docs_per_sec) and eta_seconds
+        :Example:
+            >>> requests.get(CandidateApiUrl.CANDIDATES_DOCUMENTS_REINDEX_URI + '?domain_id=1', headers=headers)
+        """
+        domain_id = self._get_domain_id(request.args.get('domain_id'))
+        return {'reindex': get_domain_reindex_progress(domain_id)}
+
+
+class CandidateDocumentsQueue(Resource):
+    decorators = [require_oauth()]
+
+    @require_role(Role.TALENT_ADMIN)
+    def get(self):
+        """
+        Depth & indexing lag of the queue of candidates waiting for their documents to be uploaded to Cloud Search
+        :Example:
+            >>> requests.get(CandidateApiUrl.CANDIDATES_DOCUMENTS_QUEUE_URI, headers=headers)
+        :return: {'queue': {'queue_depth': 12, 'indexing_lag_seconds': 3.2, ...}}
+        """
+        return {'queue': get_change_log_status()}
+
+
+class CandidateSearchCacheStats(Resource):
+    decorators = [require_oauth()]
+
+    @require_role(Role.TALENT_ADMIN)
+    def get(self):
+        """
+        Hit/miss counts & hit rate of cached search results
+        :Example:
+            >>> requests.get(CandidateApiUrl.CANDIDATE_SEARCH_CACHE_URI, headers=headers)
+        :return: {'search_cache': {'hits': 120, 'misses': 30, 'hit_rate': 0.8, 'ttl_seconds': 300}}
+        """
+        return {'search_cache': get_search_cache_stats()}
@@ -3,15 +3,17 @@ import requests
 from flask import request
 from flask_restful import Resource
 
-from candidate_service.common.error_handling import ForbiddenError
+from candidate_service.common.error_handling import ForbiddenError, NotFoundError
 from candidate_service.common.models.user import Permission
 from candidate_service.common.utils.auth_utils import require_oauth, require_all_permissions
 from candidate_service.custom_error_codes import CandidateCustomErrors as custom_error
-from candidate_service.json_schema.notes import notes_schema
-from candidate_service.modules.notes import add_notes, get_notes, delete_note, delete_notes
-from candidate_service.modules.talent_cloud_search import upload_candidate_documents
+from candidate_service.json_schema.notes import notes_schema, candidates_notes_schema
+from candidate_service.modules.notes import add_notes, add_notes_of_candidates, get_notes, delete_note, delete_notes
+from candidate_service.modules.cloudsearch_change_log import mark_candidates_dirty
+from candidate_service.common.models.candidate import Candidate
 from candidate_service.modules.validators import (
-    does_candidate_belong_to_users_domain, get_candidate_if_exists, get_json_data_if_validated
+    does_candidate_belong_to_users_domain, do_candidates_belong_to_users_domain, get_candidate_if_exists,
+    get_json_data_if_validated
 )
 
 
@@ -40,7 +42,7 @@ class CandidateNotesResource(Resource):
         note_ids = add_notes(candidate_id=candidate_id, user_id=authed_user.id, data=body_dict['notes'])
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
 
         return {'candidate_notes': [{'id': note_id} for note_id in note_ids]}, requests.codes.CREATED
 
@@ -89,12 +91,43 @@ class CandidateNotesResource(Resource):
 
             # Delete note from DB & update cloud search
             delete_note(candidate_id, note_id)
-            upload_candidate_documents.delay([candidate_id])
+            mark_candidates_dirty([candidate_id])
 
             return {'candidate_note': {'id': note_id}}
         else:
             # Delete notes from DB & update cloud search
             deleted_notes = delete_notes(candidate)
-            upload_candidate_documents.delay([candidate_id])
+            mark_candidates_dirty([candidate_id])
 
             return {'candidate_notes': deleted_notes}
+
+
+class CandidatesNotesResource(Resource):
+    decorators = [require_oauth()]
+
+    @require_all_permissions(Permission.PermissionNames.CAN_ADD_CANDIDATE_NOTES)
+    def post(self, **kwargs):
+        """
+        Endpoint:  POST /v1/candidates/notes
+        Function will add notes of many candidates to database, e.g. while importing candidates in bulk
+        Input: {'notes': [{'candidate_id': 4, 'title': 'Note', 'comment': 'Comment'}, ...]}
+        :return: {'count': number of notes created}
+        """
+        # Validate and retrieve json data
+        body_dict = get_json_data_if_validated(request, candidates_notes_schema)
+
+        authed_user = request.user
+        candidate_ids = list(set(note['candidate_id'] for note in body_dict['notes']))
+
+        # All candidates must exist & belong to user's domain
+        if Candidate.query.filter(Candidate.id.in_(candidate_ids)).count() != len(candidate_ids):
+            raise NotFoundError('Candidate(s) not found', custom_error.CANDIDATE_NOT_FOUND)
+        if not do_candidates_belong_to_users_domain(authed_user, candidate_ids):
+            raise ForbiddenError('Not authorized', custom_error.CANDIDATE_FORBIDDEN)
+
+        count = add_notes_of_candidates(user_id=authed_user.id, data=body_dict['notes'])
+
+        # Update cloud search
+        mark_candidates_dirty(candidate_ids)
+
+        return {'count': count}, requests.codes.CREATED
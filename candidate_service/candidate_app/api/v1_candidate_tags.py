@@ -16,7 +16,7 @@ from candidate_service.modules.json_schema import tag_schema
 from candidate_service.modules.tags import (
     create_tags, get_tags, update_candidate_tag, update_candidate_tags, delete_tag, delete_tags
 )
-from candidate_service.modules.talent_cloud_search import upload_candidate_documents
+from candidate_service.modules.cloudsearch_change_log import mark_candidates_dirty
 from candidate_service.modules.validators import get_json_data_if_validated, get_candidate_if_validated
 
 
@@ -56,7 +56,7 @@ class CandidateTagResource(Resource):
         created_tag_ids = create_tags(candidate_id=candidate_id, tags=body_dict['tags'])
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
 
         return {'tags': [{'id': tag_id} for tag_id in created_tag_ids]}, 201
 
@@ -126,7 +126,7 @@ class CandidateTagResource(Resource):
         updated_tag_ids = update_candidate_tags(candidate_id=candidate_id, tags=tags)
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
 
         return {'updated_tags': [{'id': tag_id} for tag_id in updated_tag_ids]}
 
@@ -155,7 +155,7 @@ class CandidateTagResource(Resource):
             deleted_tag_id = delete_tag(candidate_id=candidate_id, tag_id=tag_id)
 
             # Update cloud search
-            upload_candidate_documents([candidate_id])
+            mark_candidates_dirty([candidate_id])
 
             return {'deleted_tag': deleted_tag_id}
 
@@ -163,7 +163,7 @@ class CandidateTagResource(Resource):
         deleted_tag_ids = delete_tags(candidate_id)
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
 
         # Delete all of candidate's tags
         return {'deleted_tags': deleted_tag_ids}
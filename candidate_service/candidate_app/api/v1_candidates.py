@@ -39,13 +39,12 @@ from candidate_service.common.models.candidate import (
     CandidateEducationDegreeBullet, CandidateExperience, CandidateExperienceBullet,
     CandidateWorkPreference, CandidateEmail, CandidatePhone, CandidateMilitaryService,
     CandidatePreferredLocation, CandidateSkill, CandidateSocialNetwork, CandidateDevice,
-    CandidateSubscriptionPreference, CandidatePhoto, CandidateSource,
-    CandidateStatus, CandidateDocument
+    CandidateSubscriptionPreference, CandidatePhoto, CandidateSource, CandidateDocument
 )
 from candidate_service.common.models.candidate_edit import CandidateEdit
 from candidate_service.common.models.db import db
 from candidate_service.common.models.language import CandidateLanguage
-from candidate_service.common.models.misc import AreaOfInterest, Frequency, CustomField, Product
+from candidate_service.common.models.misc import AreaOfInterest, Frequency, Product
 from candidate_service.common.models.talent_pools_pipelines import TalentPipeline, TalentPool
 from candidate_service.common.models.user import User, Permission
 from candidate_service.common.talent_config_manager import TalentConfigKeys
@@ -53,24 +52,28 @@ from candidate_service.common.talent_config_manager import TalentEnvs
 from candidate_service.common.utils.auth_utils import require_oauth, require_all_permissions
 from candidate_service.common.utils.datetime_utils import DatetimeUtils
 from candidate_service.common.utils.models_utils import to_json
-from candidate_service.common.utils.validators import is_valid_email, is_country_code_valid, is_number
+from candidate_service.common.utils.validators import is_valid_email, is_number
 from candidate_service.custom_error_codes import CandidateCustomErrors as custom_error
 from candidate_service.modules.api_calls import create_smartlist, create_campaign, create_campaign_send
-from candidate_service.modules.candidate_engagement import calculate_candidate_engagement_score
+from candidate_service.modules.bulk_candidates import validate_candidates, create_candidates, create_candidate
+from candidate_service.modules.candidate_engagement import get_candidate_engagement_score
 from candidate_service.modules.json_schema import (
     candidates_resource_schema_post, candidates_resource_schema_patch, resource_schema_preferences,
+    resource_schema_candidates_preferences,
     resource_schema_photos_post, resource_schema_photos_patch, language_schema,
 )
 from candidate_service.modules.talent_candidates import (
     fetch_candidate_info, get_candidate_id_from_email_if_exists_in_domain,
     create_or_update_candidate_from_params, fetch_candidate_views,
     add_candidate_view, fetch_candidate_subscription_preference,
-    add_or_update_candidate_subs_preference, add_photos, update_photo,
+    add_or_update_candidate_subs_preference, add_or_update_candidates_subs_preferences, add_photos, update_photo,
     fetch_aggregated_candidate_views, update_total_months_experience, fetch_candidate_languages,
-    add_languages, update_candidate_languages, CachedData, CandidateTitle, get_fullname_from_name_fields
+    add_languages, update_candidate_languages, CandidateTitle, get_fullname_from_name_fields,
+    candidate_contact_history, CONTACT_HISTORY_DEFAULT_LIMIT, CONTACT_HISTORY_MAX_LIMIT
 )
 from candidate_service.modules.track_changes import track_edits
-from candidate_service.modules.talent_cloud_search import upload_candidate_documents, delete_candidate_documents
+from candidate_service.modules.talent_cloud_search import delete_candidate_documents
+from candidate_service.modules.cloudsearch_change_log import mark_candidates_dirty
 from candidate_service.modules.talent_openweb import (
     match_candidate_from_openweb, convert_dice_candidate_dict_to_gt_candidate_dict,
     find_in_openweb_by_email
@@ -84,7 +87,7 @@ from candidate_service.modules.validators import (
 )
 from candidate_service.modules.contsants import ONE_SIGNAL_APP_ID, ONE_SIGNAL_REST_API_KEY
 from onesignalsdk.one_signal_sdk import OneSignalSdk
-from candidate_service.common.utils.handy_functions import normalize_value, time_me
+from candidate_service.common.utils.handy_functions import time_me
 
 from candidate_service.common.inter_service_calls.candidate_pool_service_calls import assert_smartlist_candidates
 from candidate_service.common.utils.talent_s3 import sign_url_for_filepicker_bucket
@@ -119,239 +122,37 @@ class CandidatesResource(Resource):
 
         candidates = body_dict.get('candidates')
 
-        # Check if request body contains data for multiple candidates or not; yield: boolean
-        multiple_candidates = len(candidates) > 1
+        # Validate all candidates at once; each candidate gets its own result (e.g. archived candidate it re-adds)
+        candidate_items = validate_candidates(candidates, authed_user)
 
-        # Accumulate response errors when bypassing exceptions in bulk candidate creation
-        response_errors = []
-
-        # We need track which dict contained the erroneous data so that it will be passed in the next loop
-        dict_position = set()
-
-        # Input validations
-        is_creating, is_updating, candidate_id = True, False, None
-        all_cf_ids, all_aoi_ids = [], []
-        all_email_addresses = []
-
-        for position, candidate_dict_ in enumerate(candidates, start=1):
-            try:
-                # Some candidate data may have tabs that we must omit before creating candidate's profile
-                candidate_dict_ = replace_tabs_with_spaces(candidate_dict_)
-                email_addresses = []
-                candidate_ids_from_candidate_email_obj = []
-                email_addresses.extend(email.get('address') for email in candidate_dict_.get('emails') or [])
-
-                # Strip, lower, and remove empty email addresses
-                email_addresses = filter(None, map(normalize_value, email_addresses))
-
-                # All email addresses must be valid emails
-                if not all(map(is_valid_email, email_addresses)):
-                    raise InvalidUsage('Invalid email address/format: {}'.format(email_addresses),
-                                       error_code=custom_error.INVALID_EMAIL)
-
-                all_email_addresses.extend(email.get('address') for email in candidate_dict_.get('emails') or [])
-
-                candidate_email_objects = CandidateEmail.get_emails_in_domain(domain_id, email_addresses)
-                for candidate_email_obj in candidate_email_objects:
-
-                    # Cache candidate's email
-                    CachedData.candidate_emails.append(candidate_email_obj)
-
-                    candidate_id = candidate_email_obj.candidate_id
-
-                    # We need to prevent duplicate creation in case candidate has multiple email addresses in db
-                    candidate_ids_from_candidate_email_obj.append(candidate_id)
-                    candidate = Candidate.get_by_id(candidate_id)
-
-                    # Raise error if candidate is active and its email matches another candidate's email
-                    if not candidate.is_archived and (candidate_email_obj not in CachedData.candidate_emails):
-                        # Clear cached data
-                        CachedData.candidate_emails = []
-
-                        raise InvalidUsage('Candidate with email: {}, already exists'.format(candidate_email_obj.address),
-                                           error_code=custom_error.CANDIDATE_ALREADY_EXISTS,
-                                           additional_error_info={'id': candidate_id})
-
-                    # Activate archived candidate if candidate is found
-                    if candidate.is_archived:
-                        candidate.is_archived = 0
-
-                        # If candidate's is_archived had been false, it will be treated as an update
-                        is_creating, is_updating = False, True
-
-                    elif candidate_id in candidate_ids_from_candidate_email_obj:
-                        continue
-
-                # Provided source ID must be recognized & belong to candidate's domain
-                source_id = candidate_dict_.get('source_id')
-                if source_id:
-                    candidate_source = CandidateSource.get(source_id)
-                    if not candidate_source:
-                        raise NotFoundError("Source ID ({}) not recognized", custom_error.SOURCE_NOT_FOUND)
-
-                    if candidate_source and candidate_source.domain_id != domain_id:
-                        raise ForbiddenError("Provided source ID ({source_id}) not "
-                                             "recognized for candidate's domain (id = {domain_id})"
-                                             .format(source_id=source_id, domain_id=domain_id),
-                                             error_code=custom_error.INVALID_SOURCE_ID)
-
-                source_product_id = candidate_dict_.get('source_product_id') or Product.WEB
-                if source_product_id and \
-                        (not is_number(source_product_id) or not Product.get_by_id(int(source_product_id))):
-                    raise InvalidUsage("Provided source product id ({source_product_id}) not recognized".format(
-                        source_product_id=source_product_id), error_code=custom_error.INVALID_SOURCE_PRODUCT_ID)
-
-                candidate_dict_['source_product_id'] = int(source_product_id)
-
-                for custom_field in candidate_dict_.get('custom_fields') or []:
-                    custom_field_id = custom_field.get('custom_field_id')
-                    if custom_field_id:
-                        if not CustomField.get_by_id(_id=custom_field_id):
-                            raise NotFoundError('Custom field not recognized: {}'.format(custom_field_id),
-                                                custom_error.CUSTOM_FIELD_NOT_FOUND)
-                    all_cf_ids.append(custom_field_id)
-
-                for aoi in candidate_dict_.get('areas_of_interest') or []:
-                    aoi_id = aoi.get('area_of_interest_id')
-                    if aoi_id:
-                        if not AreaOfInterest.get_by_id(_id=aoi_id):
-                            raise NotFoundError('Area of interest not recognized: {}'.format(aoi_id),
-                                                custom_error.AOI_NOT_FOUND)
-                    all_aoi_ids.append(aoi_id)
-
-                # to_date & from_date in military_service dict must be formatted properly
-                for military_service in candidate_dict_.get('military_services') or []:
-                    from_date, to_date = military_service.get('from_date'), military_service.get('to_date')
-                    if from_date:
-                        if not is_date_valid(date=from_date):
-                            raise InvalidUsage("Military service's date must be in a date format",
-                                               error_code=custom_error.MILITARY_INVALID_DATE)
-                    elif to_date:
-                        if not is_date_valid(date=to_date):
-                            raise InvalidUsage("Military service's date must be in a date format",
-                                               error_code=custom_error.MILITARY_INVALID_DATE)
-                    country_code = (military_service.get('country_code') or '').upper()
-                    if country_code:
-                        if not is_country_code_valid(country_code):
-                            raise InvalidUsage("Country code not recognized: {}".format(country_code))
-
-                    # Name is a required field (must not be empty)
-                    for tag in candidate_dict_.get('tags', []):
-                        tag['name'] = tag['name'].strip().lower()  # remove whitespaces while validating
-                        if not tag['name']:
-                            raise InvalidUsage('Tag name is a required field', custom_error.MISSING_INPUT)
-
-            except Exception as e:
-                # If it's a bulk import, we want to ignore the individual candidate errors
-                if multiple_candidates:
-                    error_message = "Failed to create candidate. Error message: {}".format(e.message)
-                    logger.info(error_message)
-                    response_errors.append(dict(candidate_data=candidate_dict_, error_message=error_message))
-                    dict_position.add(position)
-                    continue
-                else:
-                    raise e
-
-        # Custom fields must belong to user's domain
-        if all_cf_ids:
-            if not is_custom_field_authorized(domain_id, all_cf_ids):
-                raise ForbiddenError("Unauthorized custom field IDs", custom_error.CUSTOM_FIELD_FORBIDDEN)
-
-        # Areas of interest must belong to user's domain
-        if all_aoi_ids:
-            if not is_area_of_interest_authorized(domain_id, all_aoi_ids):
-                raise ForbiddenError("Unauthorized area of interest IDs", custom_error.AOI_FORBIDDEN)
-
-        created_candidate_ids = []
-        for i, candidate_dict in enumerate(candidates, start=1):
-
-            if i in dict_position:
-                continue
-
-            work_experiences = candidate_dict.get('work_experiences')
-
-            # Set candidate's title
-            title = (candidate_dict.get('title') or '').strip()
-            if not title and work_experiences:
-                title = CandidateTitle(experiences=work_experiences).title
-
-            user_id = authed_user.id
-            emails = [
-                {
-                    'label': (email.get('label') or '').strip(),
-                    'address': email['address'].strip(),
-                    'is_default': email.get('is_default')
-                } for email in candidate_dict.get('emails') or []
-            ] if all_email_addresses else None  # CandidateEmail object must only be created if email has an address
-
-            added_datetime = DatetimeUtils.isoformat_to_mysql_datetime(candidate_dict['added_datetime']) \
-                if candidate_dict.get('added_datetime') else None
-
-            candidate_data = dict(
-                user_id=user_id,
-                is_creating=is_creating,
-                is_updating=is_updating,
-                candidate_id=candidate_id,
-                first_name=candidate_dict.get('first_name'),
-                middle_name=candidate_dict.get('middle_name'),
-                last_name=candidate_dict.get('last_name'),
-                formatted_name=candidate_dict.get('full_name'),
-                status_id=candidate_dict.get('status_id') or CandidateStatus.DEFAULT_STATUS_ID,
-                emails=emails,
-                phones=candidate_dict.get('phones'),
-                addresses=candidate_dict.get('addresses'),
-                educations=candidate_dict.get('educations'),
-                military_services=candidate_dict.get('military_services'),
-                areas_of_interest=candidate_dict.get('areas_of_interest'),
-                custom_fields=candidate_dict.get('custom_fields'),
-                social_networks=candidate_dict.get('social_networks'),
-                work_experiences=work_experiences,
-                work_preference=candidate_dict.get('work_preference'),
-                preferred_locations=candidate_dict.get('preferred_locations'),
-                skills=candidate_dict.get('skills'),
-                dice_social_profile_id=candidate_dict.get('openweb_id'),
-                added_datetime=added_datetime,
-                source_id=candidate_dict.get('source_id'),
-                source_detail=(candidate_dict.get('source_detail') or '').strip(),
-                source_product_id=candidate_dict.get('source_product_id'),
-                objective=candidate_dict.get('objective'),
-                summary=candidate_dict.get('summary'),
-                talent_pool_ids=candidate_dict.get('talent_pool_ids', {'add': [], 'delete': []}),
-                resume_url=candidate_dict.get('resume_url'),
-                resume_text=candidate_dict.get('resume_text'),
-                tags=candidate_dict.get('tags', []),
-                title=title
-            )
-            if multiple_candidates:
-                try:
-                    resp_dict = create_or_update_candidate_from_params(**candidate_data)
-                    created_candidate_ids.append(resp_dict['candidate_id'])
-                except Exception as e:
-                    error_message = "Failed to create candidate. Error message: {}".format(e.message)
-                    logger.info(error_message)
-                    response_errors.append(dict(candidate_data=candidate_dict, error_message=error_message))
-                    continue
-            else:
-                resp_dict = create_or_update_candidate_from_params(**candidate_data)
-                created_candidate_ids.append(resp_dict['candidate_id'])
-                tam = TalentActivityManager(db, activity_model=Activity,logger=logger)
-                formatted_name = get_fullname_from_name_fields(
-                                            candidate_data.get('first_name'),
-                                            candidate_data.get('middle_name'),
-                                            candidate_data.get('last_name'))
-                tam.create_activity({
-                    'activity_params': {'username': authed_user.email,
-                                        'formatted_name': formatted_name if formatted_name != '' else 'Unknown'},
-                    'activity_type': 'CANDIDATE_CREATE_WEB',
-                    'activity_type_id': Activity.MessageIds.CANDIDATE_CREATE_WEB,
-                    'domain_id': domain_id,
-                    'source_id': resp_dict['candidate_id'],
-                    'source_table': 'candidate',
-                    'user_id': user_id,
-                })
-
-        # Add candidates to cloud search
-        upload_candidate_documents.delay(created_candidate_ids)
+        # In a bulk import, candidates with errors are skipped and their errors are returned
+        if len(candidate_items) > 1:
+            created_candidate_ids, response_errors = create_candidates(candidate_items, authed_user)
+        else:
+            candidate_item = candidate_items[0]
+            if candidate_item.error:
+                raise candidate_item.error
+
+            candidate_id = create_candidate(candidate_item, authed_user.id)
+            created_candidate_ids, response_errors = [candidate_id], []
+            candidate_dict = candidate_item.data
+            tam = TalentActivityManager(db, activity_model=Activity, logger=logger)
+            formatted_name = get_fullname_from_name_fields(candidate_dict.get('first_name'),
+                                                           candidate_dict.get('middle_name'),
+                                                           candidate_dict.get('last_name'))
+            tam.create_activity({
+                'activity_params': {'username': authed_user.email,
+                                    'formatted_name': formatted_name if formatted_name != '' else 'Unknown'},
+                'activity_type': 'CANDIDATE_CREATE_WEB',
+                'activity_type_id': Activity.MessageIds.CANDIDATE_CREATE_WEB,
+                'domain_id': domain_id,
+                'source_id': candidate_id,
+                'source_table': 'candidate',
+                'user_id': authed_user.id,
+            })
+
+            # Add candidate to cloud search, bulk import adds its candidates per chunk
+            mark_candidates_dirty(created_candidate_ids)
 
         # If candidate belongs to Kaiser, upload its document to us-west cloud search instance
         # this is temporary; once Kaiser migrates to the new app, we should remove below code
@@ -520,7 +321,7 @@ class CandidatesResource(Resource):
         if skip:
             db.session.commit()
             # Update candidate's document in CS
-            upload_candidate_documents.delay(archived_candidate_ids)
+            mark_candidates_dirty(archived_candidate_ids)
             return {'archived_candidates': archived_candidate_ids}, requests.codes.OK
 
         # Custom fields must belong to user's domain
@@ -614,7 +415,7 @@ class CandidatesResource(Resource):
             updated_candidate_ids.append(resp_dict['candidate_id'])
 
         # Update candidates in cloud search
-        upload_candidate_documents.delay(updated_candidate_ids)
+        mark_candidates_dirty(updated_candidate_ids)
         return {'candidates': [{'id': updated_candidate_id} for updated_candidate_id in updated_candidate_ids]}
 
     @require_all_permissions(Permission.PermissionNames.CAN_DELETE_CANDIDATES)
@@ -642,7 +443,7 @@ class CandidatesResource(Resource):
                 db.session.commit()
 
                 # Delete candidate from cloud search
-                delete_candidate_documents(candidate_ids)
+                delete_candidate_documents(candidate_ids, request.user.domain_id)
                 return '', requests.codes.NO_CONTENT
             except Exception as e:
                 raise InternalServerError(error_message="Oops. Something went wrong: {}".format(e.message))
@@ -681,7 +482,7 @@ class CandidateResource(Resource):
         # Check for candidate's existence and web-hidden status
         candidate = get_candidate_if_validated(authed_user, candidate_id)
         candidate_data_dict = fetch_candidate_info(candidate=candidate)
-        candidate_data_dict['engagement_score'] = calculate_candidate_engagement_score(candidate_id)
+        candidate_data_dict.update(get_candidate_engagement_score(candidate_id))
 
         return {'candidate': candidate_data_dict}
 
@@ -714,7 +515,7 @@ class CandidateResource(Resource):
         db.session.commit()
 
         # Delete candidate from cloud search
-        delete_candidate_documents([candidate_id])
+        delete_candidate_documents([candidate_id], authed_user.domain_id)
         return '', 204
 
 
@@ -756,7 +557,7 @@ class CandidateAddressResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -805,7 +606,7 @@ class CandidateAreaOfInterestResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -847,7 +648,7 @@ class CandidateEducationResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -897,7 +698,7 @@ class CandidateEducationDegreeResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -960,7 +761,7 @@ class CandidateEducationDegreeBulletResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1006,7 +807,7 @@ class CandidateWorkExperienceResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1063,7 +864,7 @@ class CandidateWorkExperienceBulletResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1105,7 +906,7 @@ class CandidateEmailResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1147,7 +948,7 @@ class CandidateMilitaryServiceResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1189,7 +990,7 @@ class CandidatePhoneResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1232,7 +1033,7 @@ class CandidatePreferredLocationResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1275,7 +1076,7 @@ class CandidateSkillResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1349,7 +1150,7 @@ class CandidateSocialNetworkResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1378,7 +1179,7 @@ class CandidateWorkPreferenceResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -1600,6 +1401,31 @@ class CandidateViewResource(Resource):
         return {'candidate_views': [candidate_view for candidate_view in candidate_views]}
 
 
+class CandidateContactHistoryResource(Resource):
+    decorators = [require_oauth()]
+
+    @require_all_permissions(Permission.PermissionNames.CAN_GET_CANDIDATES)
+    def get(self, **kwargs):
+        """
+        Endpoint:  GET /v1/candidates/:candidate_id/contact_history?limit=20&cursor=:next_cursor
+        Function will retrieve a page of candidate's contact history, newest events first
+        :return: {'timeline': [events], 'next_cursor': cursor of next page or None on last page}
+        """
+        authed_user, candidate_id = request.user, kwargs['id']
+        if Permission.PermissionNames.CAN_GET_CANDIDATE_CONTACT_HISTORY not in request.user_permissions:
+            raise ForbiddenError("You are not authorized to get contact history of this candidate")
+
+        # Check for candidate's existence and web-hidden status
+        get_candidate_if_validated(authed_user, candidate_id)
+
+        limit = request.args.get('limit', CONTACT_HISTORY_DEFAULT_LIMIT)
+        if not str(limit).isdigit() or not 0 < int(limit) <= CONTACT_HISTORY_MAX_LIMIT:
+            raise InvalidUsage('limit should be a number with maximum value %s. Given %s'
+                               % (CONTACT_HISTORY_MAX_LIMIT, limit), custom_error.INVALID_INPUT)
+
+        return candidate_contact_history(candidate_id, limit=int(limit), cursor=request.args.get('cursor'))
+
+
 class CandidatePreferenceResource(Resource):
     decorators = [require_oauth(allow_candidate=True)]
 
@@ -1643,7 +1469,7 @@ class CandidatePreferenceResource(Resource):
         add_or_update_candidate_subs_preference(candidate_id, frequency_id)
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
     def put(self, **kwargs):
@@ -1676,7 +1502,7 @@ class CandidatePreferenceResource(Resource):
         add_or_update_candidate_subs_preference(candidate_id, frequency_id, is_update=True)
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
     def delete(self, **kwargs):
@@ -1697,7 +1523,42 @@ class CandidatePreferenceResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
+        return '', 204
+
+
+class CandidatesPreferencesResource(Resource):
+    decorators = [require_oauth()]
+
+    @require_all_permissions(Permission.PermissionNames.CAN_EDIT_CANDIDATES)
+    def put(self, **kwargs):
+        """
+        Endpoint:  PUT /v1/candidates/preferences
+        Function will add or update subscription preference of many candidates, e.g. while importing candidates
+        in bulk
+        Input: {'candidate_ids': [1, 2, 3], 'frequency_id': 1}
+        """
+        # Validate and retrieve json data
+        body_dict = get_json_data_if_validated(request, resource_schema_candidates_preferences)
+        candidate_ids = list(set(body_dict['candidate_ids']))
+
+        # Frequency ID must be recognized
+        frequency_id = body_dict.get('frequency_id')
+        frequency_id = frequency_id if is_number(frequency_id) else None
+
+        if frequency_id and not Frequency.get_by_id(_id=frequency_id):
+            raise NotFoundError('Frequency ID not recognized: {}'.format(frequency_id))
+
+        # All candidates must exist & belong to user's domain
+        if Candidate.query.filter(Candidate.id.in_(candidate_ids)).count() != len(candidate_ids):
+            raise NotFoundError('Candidate(s) not found', custom_error.CANDIDATE_NOT_FOUND)
+        if not do_candidates_belong_to_users_domain(request.user, candidate_ids):
+            raise ForbiddenError('Not authorized', custom_error.CANDIDATE_FORBIDDEN)
+
+        add_or_update_candidates_subs_preferences(candidate_ids, frequency_id)
+
+        # Update cloud search
+        mark_candidates_dirty(candidate_ids)
         return '', 204
 
 
@@ -1870,7 +1731,7 @@ class CandidatePhotosResource(Resource):
         add_photos(candidate_id, body_dict['photos'])
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
     @require_all_permissions(Permission.PermissionNames.CAN_GET_CANDIDATES)
@@ -1945,7 +1806,7 @@ class CandidatePhotosResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
     @require_all_permissions(Permission.PermissionNames.CAN_EDIT_CANDIDATES)
@@ -1985,7 +1846,7 @@ class CandidatePhotosResource(Resource):
         db.session.commit()
 
         # Update cloud search
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -2013,7 +1874,7 @@ class CandidateLanguageResource(Resource):
         add_languages(candidate_id=candidate_id, data=body_dict['candidate_languages'])
         db.session.commit()
 
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
     @require_all_permissions(Permission.PermissionNames.CAN_GET_CANDIDATES)
@@ -2065,7 +1926,7 @@ class CandidateLanguageResource(Resource):
         update_candidate_languages(candidate_id, body_dict['candidate_languages'], authed_user.id)
         db.session.commit()
 
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
     @require_all_permissions(Permission.PermissionNames.CAN_EDIT_CANDIDATES)
@@ -2104,7 +1965,7 @@ class CandidateLanguageResource(Resource):
 
         db.session.commit()
 
-        upload_candidate_documents.delay([candidate_id])
+        mark_candidates_dirty([candidate_id])
         return '', 204
 
 
@@ -23,3 +23,32 @@ notes_schema = {
         }
     }
 }
+
+candidates_notes_schema = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["notes"],
+    "properties": {
+        "notes": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["candidate_id", "comment"],
+                "properties": {
+                    "candidate_id": {
+                        "type": "integer"
+                    },
+                    "title": {
+                        "type": ["string", "null"],
+                        "maxLength": 255
+                    },
+                    "comment": {
+                        "type": "string"
+                    }
+                }
+            }
+        }
+    }
+}
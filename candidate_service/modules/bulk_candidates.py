@@ -0,0 +1,683 @@
+"""
+Creation of candidates posted together to POST /v1/candidates.
+
+validate_candidates() validates all candidates of a request with one query per lookup (existing emails, phones and
+openweb profiles of domain, sources, products, custom fields, areas of interest and talent pools) and records an
+error against every invalid candidate. create_candidates() creates valid candidates in chunks. Candidates of a chunk
+and their emails, phones, work experiences, skills, areas of interest, custom fields and talent pools are written
+with multi-row INSERTs in a single transaction, if that fails they are created one at a time so only offending
+candidates get errors. Candidates having any other children (addresses, educations etc.) and archived candidates
+being re-added are created one at a time by create_or_update_candidate_from_params().
+Documents of a chunk's candidates are queued for CloudSearch upload at once.
+"""
+import datetime
+
+from candidate_service.candidate_app import logger
+from candidate_service.common.error_handling import InvalidUsage, NotFoundError, ForbiddenError
+from candidate_service.common.models.associations import CandidateAreaOfInterest
+from candidate_service.common.models.candidate import (
+    Candidate, CandidateEmail, CandidatePhone, CandidateExperience, CandidateExperienceBullet, CandidateSkill,
+    CandidateCustomField, CandidateSource, CandidateStatus, EmailLabel, PhoneLabel
+)
+from candidate_service.common.models.db import db
+from candidate_service.common.models.misc import AreaOfInterest, CustomField, Product
+from candidate_service.common.models.talent_pools_pipelines import TalentPool, TalentPoolCandidate, TalentPoolGroup
+from candidate_service.common.models.user import User
+from candidate_service.common.utils.candidate_utils import replace_tabs_with_spaces
+from candidate_service.common.utils.datetime_utils import DatetimeUtils
+from candidate_service.common.utils.handy_functions import normalize_value, purge_dict
+from candidate_service.common.utils.validators import is_valid_email, is_country_code_valid, is_number
+from candidate_service.custom_error_codes import CandidateCustomErrors as custom_error
+from candidate_service.modules.cloudsearch_change_log import mark_candidates_dirty
+from candidate_service.modules.talent_candidates import (
+    create_or_update_candidate_from_params, parse_candidate_names, format_phone_number, format_work_experience,
+    format_experience_bullet, format_skill, CandidateTitle
+)
+from candidate_service.modules.validators import is_date_valid, remove_duplicates
+
+# Number of candidates written in one transaction
+BULK_CREATE_CHUNK_SIZE = 100
+
+# Candidates having any of these fields are created one at a time by create_or_update_candidate_from_params()
+ONE_BY_ONE_FIELDS = ('addresses', 'educations', 'military_services', 'preferred_locations', 'work_preference',
+                     'social_networks', 'tags')
+
+# Settings of MySQL's auto-increment, see _has_consecutive_insert_ids()
+_auto_increment = {}
+
+
+class CandidateItem(object):
+    """
+    A candidate posted for creation along with its own validation results
+    """
+
+    def __init__(self, position, data):
+        """
+        :param int position: Position of candidate in request, starting from 1
+        :param dict data: Candidate dict as posted
+        """
+        self.position = position
+        self.data = data
+        self.email_addresses = []  # Normalized email addresses
+        self.phone_values = []  # Formatted phone numbers, if candidate has no addresses
+        self.archived_candidate_id = None  # Archived candidate having one of emails, it will be re-added
+        self.error = None
+
+    @property
+    def is_multi_row(self):
+        """
+        Tells if candidate can be written with multi-row INSERTs of create_candidates()
+        :rtype: bool
+        """
+        if self.archived_candidate_id or any(self.data.get(field) for field in ONE_BY_ONE_FIELDS):
+            return False
+        return not any(custom_field.get('id') or custom_field.get('custom_field_category_id') or
+                       custom_field.get('custom_field_subcategory_id')
+                       for custom_field in self.data.get('custom_fields') or [])
+
+
+def validate_candidates(candidate_dicts, user):
+    """
+    Validates candidates posted for creation. Every candidate is validated on its own, but existing records they
+    refer to are looked up for all candidates at once.
+    :param list[dict] candidate_dicts: Candidates as posted
+    :type user: User
+    :return: Candidates in order they were posted, invalid candidates have their error set
+    :rtype: list[CandidateItem]
+    """
+    items = [CandidateItem(position, replace_tabs_with_spaces(candidate_dict))
+             for position, candidate_dict in enumerate(candidate_dicts, start=1)]
+    for item in items:
+        try:
+            _validate_candidate_input(item)
+        except Exception as error:
+            item.error = error
+
+    valid_items = [item for item in items if not item.error]
+    lookups = _lookup_references(valid_items, user)
+
+    # Emails, phones and openweb profiles of candidates validated so far, a batch must not add them twice
+    seen = dict(emails=set(), phones=set(), openweb_ids=set())
+    for item in valid_items:
+        try:
+            _validate_candidate_references(item, lookups, seen, user.domain_id)
+        except Exception as error:
+            item.error = error
+            continue
+        seen['emails'].update(item.email_addresses)
+        seen['phones'].update(item.phone_values)
+        if item.data.get('openweb_id'):
+            seen['openweb_ids'].add(item.data['openweb_id'])
+    return items
+
+
+def _validate_candidate_input(item):
+    """
+    Validates fields of a candidate which don't need database
+    :type item: CandidateItem
+    """
+    candidate_dict = item.data
+
+    # Strip, lower, and remove empty email addresses. All email addresses must be valid emails
+    email_addresses = [email.get('address') for email in candidate_dict.get('emails') or []]
+    email_addresses = filter(None, map(normalize_value, filter(None, email_addresses)))
+    if not all(map(is_valid_email, email_addresses)):
+        raise InvalidUsage('Invalid email address/format: {}'.format(email_addresses),
+                           error_code=custom_error.INVALID_EMAIL)
+    item.email_addresses = email_addresses
+
+    source_product_id = candidate_dict.get('source_product_id') or Product.WEB
+    if not is_number(source_product_id):
+        raise InvalidUsage("Provided source product id ({source_product_id}) not recognized".format(
+            source_product_id=source_product_id), error_code=custom_error.INVALID_SOURCE_PRODUCT_ID)
+    candidate_dict['source_product_id'] = int(source_product_id)
+
+    # to_date & from_date in military_service dict must be formatted properly
+    for military_service in candidate_dict.get('military_services') or []:
+        from_date, to_date = military_service.get('from_date'), military_service.get('to_date')
+        if (from_date and not is_date_valid(date=from_date)) or (not from_date and to_date and
+                                                                  not is_date_valid(date=to_date)):
+            raise InvalidUsage("Military service's date must be in a date format",
+                               error_code=custom_error.MILITARY_INVALID_DATE)
+        country_code = (military_service.get('country_code') or '').upper()
+        if country_code and not is_country_code_valid(country_code):
+            raise InvalidUsage("Country code not recognized: {}".format(country_code))
+
+    # Name is a required field of tag (must not be empty)
+    for tag in candidate_dict.get('tags') or []:
+        tag['name'] = tag['name'].strip().lower()  # remove whitespaces while validating
+        if not tag['name']:
+            raise InvalidUsage('Tag name is a required field', custom_error.MISSING_INPUT)
+
+    # Phone numbers are formatted with country of candidate's address, those are checked on candidate's creation
+    if not candidate_dict.get('addresses'):
+        item.phone_values = [format_phone_number(phone.get('value'))[0]
+                             for phone in candidate_dict.get('phones') or []]
+
+
+def _lookup_references(items, user):
+    """
+    Looks up existing records referred by given candidates, with one query per table
+    :type items: list[CandidateItem]
+    :type user: User
+    :rtype: dict
+    """
+    def ids_of(field, id_key):
+        return set(value[id_key] for item in items for value in item.data.get(field) or [] if value.get(id_key))
+
+    domain_id = user.domain_id
+    source_ids = set(item.data['source_id'] for item in items if item.data.get('source_id'))
+    product_ids = set(item.data['source_product_id'] for item in items)
+    talent_pool_ids = set(int(talent_pool_id) for item in items
+                          for talent_pool_id in (item.data.get('talent_pool_ids') or {}).get('add') or [])
+    email_addresses = set(address for item in items for address in item.email_addresses)
+    phone_values = set(value for item in items for value in item.phone_values if value)
+    openweb_ids = set(item.data['openweb_id'] for item in items if item.data.get('openweb_id'))
+
+    lookups = dict(
+        sources=_domain_ids_of(CandidateSource, source_ids),
+        custom_fields=_domain_ids_of(CustomField, ids_of('custom_fields', 'custom_field_id')),
+        areas_of_interest=_domain_ids_of(AreaOfInterest, ids_of('areas_of_interest', 'area_of_interest_id')),
+        talent_pools=_domain_ids_of(TalentPool, talent_pool_ids),
+        products=set(product_id for product_id, in db.session.query(Product.id).filter(
+            Product.id.in_(product_ids))) if product_ids else set(),
+        group_talent_pools=set(talent_pool_id for talent_pool_id, in db.session.query(
+            TalentPoolGroup.talent_pool_id).filter(TalentPoolGroup.talent_pool_id.in_(talent_pool_ids),
+                                                   TalentPoolGroup.user_group_id == user.user_group_id))
+        if talent_pool_ids else set(),
+        emails={}, phones={}, openweb_ids={}
+    )
+
+    if email_addresses:
+        for address, candidate_id, is_archived in _candidates_of_domain(
+                domain_id, CandidateEmail.address, CandidateEmail.address.in_(email_addresses)):
+            lookups['emails'].setdefault(normalize_value(address), []).append((candidate_id, is_archived))
+    if phone_values:
+        for value, candidate_id, _ in _candidates_of_domain(
+                domain_id, CandidatePhone.value, CandidatePhone.value.in_(phone_values)):
+            lookups['phones'].setdefault(value, candidate_id)
+    if openweb_ids:
+        for openweb_id, candidate_id, _ in _candidates_of_domain(
+                domain_id, Candidate.dice_social_profile_id, Candidate.dice_social_profile_id.in_(openweb_ids)):
+            lookups['openweb_ids'].setdefault(openweb_id, candidate_id)
+    return lookups
+
+
+def _domain_ids_of(model, ids):
+    """
+    :return: {id: domain_id} of records of a model having given ids
+    :rtype: dict
+    """
+    if not ids:
+        return {}
+    return dict(db.session.query(model.id, model.domain_id).filter(model.id.in_(ids)))
+
+
+def _candidates_of_domain(domain_id, column, criterion):
+    """
+    :return: Rows of (column, candidate_id, is_archived) of domain's candidates matching given criterion
+    """
+    query = db.session.query(column, Candidate.id, Candidate.is_archived).select_from(Candidate).\
+        join(User, User.id == Candidate.user_id)
+    if column.class_ is not Candidate:
+        query = query.join(column.class_, column.class_.candidate_id == Candidate.id)
+    return query.filter(User.domain_id == domain_id, criterion)
+
+
+def _validate_candidate_references(item, lookups, seen, domain_id):
+    """
+    Validates records referred by a candidate and finds archived candidate it re-adds, if any
+    :type item: CandidateItem
+    :param dict lookups: Value of _lookup_references()
+    :param dict seen: Emails, phones and openweb ids of valid candidates before this one in request
+    :type domain_id: int | long
+    """
+    candidate_dict = item.data
+
+    # Provided source ID must be recognized & belong to candidate's domain
+    source_id = candidate_dict.get('source_id')
+    if source_id:
+        if source_id not in lookups['sources']:
+            raise NotFoundError("Source ID ({}) not recognized".format(source_id), custom_error.SOURCE_NOT_FOUND)
+        if lookups['sources'][source_id] != domain_id:
+            raise ForbiddenError("Provided source ID ({source_id}) not recognized for candidate's domain "
+                                 "(id = {domain_id})".format(source_id=source_id, domain_id=domain_id),
+                                 error_code=custom_error.INVALID_SOURCE_ID)
+
+    source_product_id = candidate_dict['source_product_id']
+    if source_product_id not in lookups['products']:
+        raise InvalidUsage("Provided source product id ({source_product_id}) not recognized".format(
+            source_product_id=source_product_id), error_code=custom_error.INVALID_SOURCE_PRODUCT_ID)
+
+    # Custom fields and areas of interest must be recognized and belong to user's domain
+    for custom_field in candidate_dict.get('custom_fields') or []:
+        custom_field_id = custom_field.get('custom_field_id')
+        if custom_field_id:
+            if custom_field_id not in lookups['custom_fields']:
+                raise NotFoundError('Custom field not recognized: {}'.format(custom_field_id),
+                                    custom_error.CUSTOM_FIELD_NOT_FOUND)
+            if lookups['custom_fields'][custom_field_id] != domain_id:
+                raise ForbiddenError("Unauthorized custom field IDs", custom_error.CUSTOM_FIELD_FORBIDDEN)
+
+    for aoi in candidate_dict.get('areas_of_interest') or []:
+        aoi_id = aoi.get('area_of_interest_id')
+        if aoi_id:
+            if aoi_id not in lookups['areas_of_interest']:
+                raise NotFoundError('Area of interest not recognized: {}'.format(aoi_id), custom_error.AOI_NOT_FOUND)
+            if lookups['areas_of_interest'][aoi_id] != domain_id:
+                raise ForbiddenError("Unauthorized area of interest IDs", custom_error.AOI_FORBIDDEN)
+
+    # Talent pools must belong to user's domain and user's group
+    for talent_pool_id in (candidate_dict.get('talent_pool_ids') or {}).get('add') or []:
+        talent_pool_id = int(talent_pool_id)
+        if talent_pool_id not in lookups['talent_pools']:
+            raise NotFoundError("TalentPool with id %s doesn't exist in database" % talent_pool_id)
+        if lookups['talent_pools'][talent_pool_id] != domain_id:
+            raise ForbiddenError("TalentPool and logged in user belong to different domains")
+        if talent_pool_id not in lookups['group_talent_pools']:
+            raise ForbiddenError("TalentPool %s doesn't belong to UserGroup of logged-in user" % talent_pool_id)
+
+    # An active candidate having any of emails already exists, an archived one will be re-added
+    archived_candidate_id = None
+    for address in item.email_addresses:
+        if address in seen['emails']:
+            raise InvalidUsage('Candidate with email: {}, is provided more than once'.format(address),
+                               error_code=custom_error.CANDIDATE_ALREADY_EXISTS)
+        for candidate_id, is_archived in lookups['emails'].get(address, []):
+            if not is_archived:
+                raise InvalidUsage('Candidate with email: {}, already exists'.format(address),
+                                   error_code=custom_error.CANDIDATE_ALREADY_EXISTS,
+                                   additional_error_info={'id': candidate_id})
+            archived_candidate_id = archived_candidate_id or candidate_id
+
+    # Phone numbers and openweb profile must not belong to any other candidate in the same domain
+    for value in item.phone_values:
+        candidate_id = lookups['phones'].get(value)
+        if value in seen['phones'] or (candidate_id and candidate_id != archived_candidate_id):
+            raise InvalidUsage(error_message='Candidate already exists, creation failed',
+                               error_code=custom_error.CANDIDATE_ALREADY_EXISTS,
+                               additional_error_info={'id': candidate_id} if candidate_id else None)
+
+    openweb_id = candidate_dict.get('openweb_id')
+    if openweb_id and not archived_candidate_id and (openweb_id in lookups['openweb_ids'] or
+                                                     openweb_id in seen['openweb_ids']):
+        raise InvalidUsage(error_message='Candidate already exists, creation failed',
+                           error_code=custom_error.CANDIDATE_ALREADY_EXISTS,
+                           additional_error_info={'id': lookups['openweb_ids'].get(openweb_id)})
+
+    item.archived_candidate_id = archived_candidate_id
+
+
+def candidate_create_params(item, user_id):
+    """
+    Returns keyword arguments of create_or_update_candidate_from_params() for a validated candidate
+    :type item: CandidateItem
+    :type user_id: int | long
+    :rtype: dict
+    """
+    candidate_dict = item.data
+    work_experiences = candidate_dict.get('work_experiences')
+
+    # Set candidate's title
+    title = (candidate_dict.get('title') or '').strip()
+    if not title and work_experiences:
+        title = CandidateTitle(experiences=work_experiences).title
+
+    # CandidateEmail object must only be created if email has an address
+    emails = [
+        {
+            'label': (email.get('label') or '').strip(),
+            'address': email['address'].strip(),
+            'is_default': email.get('is_default')
+        } for email in candidate_dict.get('emails') or [] if (email.get('address') or '').strip()
+    ]
+
+    added_datetime = DatetimeUtils.isoformat_to_mysql_datetime(candidate_dict['added_datetime']) \
+        if candidate_dict.get('added_datetime') else None
+
+    return dict(
+        user_id=user_id,
+        is_creating=not item.archived_candidate_id,
+        is_updating=bool(item.archived_candidate_id),
+        candidate_id=item.archived_candidate_id,
+        first_name=candidate_dict.get('first_name'),
+        middle_name=candidate_dict.get('middle_name'),
+        last_name=candidate_dict.get('last_name'),
+        formatted_name=candidate_dict.get('full_name'),
+        status_id=candidate_dict.get('status_id') or CandidateStatus.DEFAULT_STATUS_ID,
+        emails=emails or None,
+        phones=candidate_dict.get('phones'),
+        addresses=candidate_dict.get('addresses'),
+        educations=candidate_dict.get('educations'),
+        military_services=candidate_dict.get('military_services'),
+        areas_of_interest=candidate_dict.get('areas_of_interest'),
+        custom_fields=candidate_dict.get('custom_fields'),
+        social_networks=candidate_dict.get('social_networks'),
+        work_experiences=work_experiences,
+        work_preference=candidate_dict.get('work_preference'),
+        preferred_locations=candidate_dict.get('preferred_locations'),
+        skills=candidate_dict.get('skills'),
+        dice_social_profile_id=candidate_dict.get('openweb_id'),
+        added_datetime=added_datetime,
+        source_id=candidate_dict.get('source_id'),
+        source_detail=(candidate_dict.get('source_detail') or '').strip(),
+        source_product_id=candidate_dict.get('source_product_id'),
+        objective=candidate_dict.get('objective'),
+        summary=candidate_dict.get('summary'),
+        talent_pool_ids=candidate_dict.get('talent_pool_ids', {'add': [], 'delete': []}),
+        resume_url=candidate_dict.get('resume_url'),
+        resume_text=candidate_dict.get('resume_text'),
+        tags=candidate_dict.get('tags', []),
+        title=title
+    )
+
+
+def create_candidate(item, user_id):
+    """
+    Creates a validated candidate with create_or_update_candidate_from_params(), or re-adds the archived
+    candidate having one of its emails
+    :type item: CandidateItem
+    :type user_id: int | long
+    :return: Id of candidate
+    :rtype: int | long
+    """
+    if item.archived_candidate_id:
+        Candidate.get_by_id(item.archived_candidate_id).is_archived = 0
+    return create_or_update_candidate_from_params(**candidate_create_params(item, user_id))['candidate_id']
+
+
+def create_candidates(items, user, chunk_size=BULK_CREATE_CHUNK_SIZE):
+    """
+    Creates valid candidates in chunks, see module's docstring. A candidate which can't be created doesn't stop
+    creation of others, its error is returned instead.
+    :param list[CandidateItem] items: Value of validate_candidates()
+    :type user: User
+    :param int chunk_size: Number of candidates written in one transaction
+    :return: Ids of created candidates and errors of others, both in order candidates were posted
+    :rtype: tuple[list, list[dict]]
+    """
+    created_candidate_ids = {}
+    valid_items = [item for item in items if not item.error]
+    for index in xrange(0, len(valid_items), chunk_size):
+        chunk = valid_items[index:index + chunk_size]
+        chunk_candidate_ids = _insert_candidates([item for item in chunk if item.is_multi_row], user.id)
+        chunk_candidate_ids.update(_create_candidates_one_by_one([item for item in chunk if not item.is_multi_row],
+                                                                 user.id))
+        created_candidate_ids.update(chunk_candidate_ids)
+        mark_candidates_dirty(chunk_candidate_ids.values())
+
+    errors = []
+    for item in items:
+        if item.error:
+            error_message = "Failed to create candidate. Error message: {}".format(item.error.message)
+            logger.info(error_message)
+            errors.append(dict(candidate_data=item.data, position=item.position, error_message=error_message))
+    return [created_candidate_ids[position] for position in sorted(created_candidate_ids)], errors
+
+
+def _create_candidates_one_by_one(items, user_id):
+    """
+    Creates given candidates with create_candidate(), each in its own transaction. If a candidate can't be
+    created, its error is set and others are created.
+    :type items: list[CandidateItem]
+    :type user_id: int | long
+    :return: {position of candidate: id of candidate}
+    :rtype: dict
+    """
+    candidate_ids = {}
+    for item in items:
+        try:
+            candidate_ids[item.position] = create_candidate(item, user_id)
+        except Exception as error:
+            db.session.rollback()
+            item.error = error
+    return candidate_ids
+
+
+def _insert_candidates(items, user_id):
+    """
+    Writes given candidates and their children with multi-row INSERTs in a single transaction. If a candidate's
+    data can't be formatted, its error is set and others are written. If writing fails, i.e. a row violates a
+    constraint, transaction is rolled back and candidates are created one by one, so only errors of offending
+    candidates are set.
+    :type items: list[CandidateItem]
+    :type user_id: int | long
+    :return: {position of candidate: id of candidate}
+    :rtype: dict
+    """
+    label_ids = dict(email={}, phone={})
+    formatted = []
+    for item in items:
+        try:
+            formatted.append((item, _format_candidate_rows(item, user_id, label_ids)))
+        except Exception as error:
+            item.error = error
+    if not formatted:
+        return {}
+
+    try:
+        candidate_ids = _insert_returning_ids(Candidate, [rows['candidate'] for _, rows in formatted])
+        child_rows = dict(emails=[], phones=[], skills=[], areas_of_interest=[], custom_fields=[],
+                          talent_pools=[], experiences=[], bullets=[])
+        for candidate_id, (_, rows) in zip(candidate_ids, formatted):
+            for field in ('emails', 'phones', 'skills', 'areas_of_interest', 'custom_fields', 'talent_pools'):
+                for row in rows[field]:
+                    row['candidate_id'] = candidate_id
+                    child_rows[field].append(row)
+            # Same as create_or_update_candidate_from_params(), skills & experiences refer to candidate as resume
+            for skill in rows['skills']:
+                skill['resume_id'] = candidate_id
+            for experience, bullets in rows['experiences']:
+                experience.update(candidate_id=candidate_id, resume_id=candidate_id)
+                child_rows['experiences'].append((experience, bullets))
+
+        experience_ids = _insert_returning_ids(CandidateExperience, [experience for experience, _ in
+                                                                     child_rows['experiences']])
+        for experience_id, (_, bullets) in zip(experience_ids, child_rows['experiences']):
+            for bullet in bullets:
+                bullet['candidate_experience_id'] = experience_id
+                child_rows['bullets'].append(bullet)
+
+        for model, field in ((CandidateEmail, 'emails'), (CandidatePhone, 'phones'), (CandidateSkill, 'skills'),
+                             (CandidateAreaOfInterest, 'areas_of_interest'),
+                             (CandidateCustomField, 'custom_fields'), (TalentPoolCandidate, 'talent_pools'),
+                             (CandidateExperienceBullet, 'bullets')):
+            if child_rows[field]:
+                db.session.bulk_insert_mappings(model, child_rows[field])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to create %s candidates of user %s with multi-row INSERTs, creating them one by "
+                         "one", len(formatted), user_id)
+        return _create_candidates_one_by_one([item for item, _ in formatted], user_id)
+
+    return {item.position: candidate_id for candidate_id, (item, _) in zip(candidate_ids, formatted)}
+
+
+def _format_candidate_rows(item, user_id, label_ids):
+    """
+    Formats a candidate and its children into rows of their tables, as create_or_update_candidate_from_params()
+    would add them for a new candidate. Candidate ids are filled in by _insert_candidates().
+    :type item: CandidateItem
+    :type user_id: int | long
+    :param dict label_ids: Ids of email and phone labels by their description, filled as labels are looked up
+    :rtype: dict
+    """
+    params = candidate_create_params(item, user_id)
+    added_time = params['added_datetime'] or datetime.datetime.utcnow()
+    first_name, middle_name, last_name, formatted_name = parse_candidate_names(
+        params['first_name'], params['middle_name'], params['last_name'], params['formatted_name'])
+
+    experiences, total_months_experience = [], None
+    work_experiences = remove_duplicates(params['work_experiences'] or [])
+    if work_experiences:
+        total_months_experience = 0
+        current_year = datetime.datetime.utcnow().year
+        latest_start_date = max(experience.get('start_year') for experience in work_experiences)
+    for work_experience in work_experiences:
+        experience = format_work_experience(work_experience, latest_start_date, current_year)
+        experience.update(is_current=bool(experience['is_current']), added_time=added_time)
+        if experience['start_year'] and experience['end_year']:
+            total_months_experience += (experience['end_year'] - experience['start_year']) * 12 + \
+                                       (experience['end_month'] - experience['start_month'])
+        bullets = filter(None, map(format_experience_bullet, remove_duplicates(work_experience.get('bullets') or [])))
+        for bullet in bullets:
+            bullet['added_time'] = added_time
+        experiences.append((experience, bullets))
+
+    # Rows of a multi-row INSERT need same columns, so empty values are written as NULL instead of being dropped
+    candidate = dict(
+        first_name=first_name, middle_name=middle_name, last_name=last_name, formatted_name=formatted_name,
+        added_time=added_time, candidate_status_id=params['status_id'], user_id=user_id,
+        source_product_id=params['source_product_id'], dice_social_profile_id=params['dice_social_profile_id'],
+        source_id=params['source_id'], source_detail=params['source_detail'], objective=params['objective'],
+        summary=params['summary'], filename=params['resume_url'], resume_text=params['resume_text'],
+        title=params['title'], is_dirty=0, total_months_experience=total_months_experience
+    )
+    candidate = {key: value.strip() or None if isinstance(value, basestring) else value
+                 for key, value in candidate.iteritems()}
+
+    skills = []
+    for skill in remove_duplicates(params['skills'] or []):
+        skill_dict = format_skill(skill)
+        if skill_dict:
+            skill_dict['added_time'] = added_time
+            skills.append(skill_dict)
+
+    aoi_ids = []
+    for aoi in params['areas_of_interest'] or []:
+        if aoi['area_of_interest_id'] not in aoi_ids:
+            aoi_ids.append(aoi['area_of_interest_id'])
+
+    talent_pool_ids = sorted(set(int(talent_pool_id) for talent_pool_id in
+                                 (params['talent_pool_ids'] or {}).get('add') or []))
+
+    return dict(
+        candidate=candidate,
+        emails=_format_emails(params['emails'] or [], label_ids['email']),
+        phones=_format_phones(params['phones'] or [], label_ids['phone']),
+        experiences=experiences,
+        skills=skills,
+        areas_of_interest=[dict(area_of_interest_id=aoi_id) for aoi_id in aoi_ids],
+        custom_fields=_format_custom_fields(params['custom_fields'] or [], added_time),
+        talent_pools=[dict(talent_pool_id=talent_pool_id) for talent_pool_id in talent_pool_ids]
+    )
+
+
+def _format_emails(emails, label_ids):
+    """
+    :param list[dict] emails: Emails of a new candidate
+    :param dict label_ids: {label: email_label_id} of labels looked up so far
+    :rtype: list[dict]
+    """
+    # Raise an error if more than one email is set as "default"
+    if len(filter(None, [email.get('is_default') for email in emails])) > 1:
+        raise InvalidUsage('Only one email should be set as default email', custom_error.INVALID_USAGE)
+    emails_has_label = any(email.get('label') for email in emails)
+    emails_has_default = any(isinstance(email.get('is_default'), bool) for email in emails)
+
+    # If duplicate email addresses are provided, we will only use first of them
+    seen, email_rows = set(), []
+    for email in emails:
+        if email['address'] in seen:
+            continue
+        seen.add(email['address'])
+
+        # First email is default unless "is_default" is provided, and its label is 'Primary' unless labels are
+        index = len(email_rows)
+        email_label = EmailLabel.PRIMARY_DESCRIPTION if (not emails_has_label and index == 0) \
+            else (email.get('label') or '').strip().title()
+        if email_label not in label_ids:
+            label_ids[email_label] = EmailLabel.email_label_id_from_email_label(email_label)
+        email_rows.append(purge_dict(dict(
+            address=email['address'],
+            email_label_id=label_ids[email_label],
+            is_default=index == 0 if not emails_has_default else email.get('is_default')
+        )))
+    return email_rows
+
+
+def _format_phones(phones, label_ids):
+    """
+    :param list[dict] phones: Phones of a new candidate having no addresses
+    :param dict label_ids: {label: phone_label_id} of labels looked up so far
+    :rtype: list[dict]
+    """
+    # Raise an error if more than one phone is set as "default"
+    if len(filter(None, [phone.get('is_default') for phone in phones])) > 1:
+        raise InvalidUsage('Only one phone should be set as default', custom_error.INVALID_USAGE)
+    phones_has_label = any(phone.get('label') for phone in phones)
+    phones_has_default = any(isinstance(phone.get('is_default'), bool) for phone in phones)
+
+    # If duplicate phone numbers are provided, we will only use first of them
+    seen, phone_rows = set(), []
+    for index, phone in enumerate(remove_duplicates(phones)):
+        # First phone is default unless "is_default" is provided, and its label is 'Home' unless labels are
+        phone_label = PhoneLabel.DEFAULT_LABEL if (not phones_has_label and index == 0) \
+            else (phone.get('label') or '').strip().title()
+        value, extension = format_phone_number(phone.get('value'))
+        if not value or value in seen:
+            continue
+        seen.add(value)
+        if phone_label not in label_ids:
+            label_ids[phone_label] = PhoneLabel.phone_label_id_from_phone_label(phone_label)
+        phone_rows.append(purge_dict(dict(
+            value=value,
+            extension=extension,
+            phone_label_id=label_ids[phone_label],
+            is_default=index == 0 if not phones_has_default else phone.get('is_default')
+        )))
+    return phone_rows
+
+
+def _format_custom_fields(custom_fields, added_time):
+    """
+    :param list[dict] custom_fields: Custom fields of a new candidate, without categories
+    :rtype: list[dict]
+    """
+    custom_field_rows = []
+    for custom_field in remove_duplicates(custom_fields):
+        custom_field_id = custom_field.get('custom_field_id')
+        # Making sure no candidate_custom_field should be added without it's parent custom_field
+        if not custom_field_id:
+            raise InvalidUsage(error_message='No custom_field_id provided.',
+                               error_code=custom_error.NO_CUSTOM_FIELD_ID_PROVIDED)
+
+        # In case a list of custom field values are provided, we must remove all white spaces and empty values
+        values = filter(None, [value.strip() for value in (custom_field.get('values') or []) if value])
+        for value in values or [(custom_field.get('value') or '').strip()]:
+            row = dict(custom_field_id=custom_field_id, value=value, added_time=added_time)
+            if row not in custom_field_rows:
+                custom_field_rows.append(row)
+    return custom_field_rows
+
+
+def _insert_returning_ids(model, rows):
+    """
+    Inserts rows of a model and returns their ids in order of rows. MySQL gives consecutive auto-increment ids to
+    rows of a single INSERT when innodb_autoinc_lock_mode is 0 or 1, so rows are inserted with one multi-row INSERT
+    and ids are counted from id of first row. Otherwise rows are inserted one by one.
+    :param list[dict] rows: Rows keyed by attributes of model, all having same keys
+    :rtype: list[int | long]
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    column_keys = {key: getattr(model, key).property.columns[0].key for key in rows[0]}
+    table_rows = [{column_keys[key]: value for key, value in row.iteritems()} for row in rows]
+    if not _has_consecutive_insert_ids():
+        return [db.session.execute(table.insert().values(row)).lastrowid for row in table_rows]
+    first_id = db.session.execute(table.insert().values(table_rows)).lastrowid
+    return range(first_id, first_id + len(rows))
+
+
+def _has_consecutive_insert_ids():
+    """
+    Tells if MySQL gives consecutive ids to rows of a multi-row INSERT. Settings are read once per process.
+    :rtype: bool
+    """
+    if 'consecutive' not in _auto_increment:
+        lock_mode, increment = db.session.execute(
+            'SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment').fetchone()
+        _auto_increment['consecutive'] = lock_mode in (0, 1) and increment == 1
+    return _auto_increment['consecutive']
@@ -1,98 +1,40 @@
 
-# Database connection and logger
-from sqlalchemy.sql import text
-from candidate_service.common.models.db import db
-from candidate_service.common.models.talent_pools_pipelines import TalentPoolCandidate
-from candidate_service.candidate_app import logger
+from candidate_service.common.models.engagement import TalentPipelineCandidateEngagement
+from candidate_service.common.models.talent_pools_pipelines import TalentPipeline, TalentPoolCandidate
+from candidate_service.common.utils.datetime_utils import DatetimeUtils
+from candidate_service.common.utils.engagement_utils import get_candidate_engagement
 
 
-def calculate_candidate_engagement_score(candidate_id):
+def get_candidate_engagement_score(candidate_id):
     """
-    This method will calculate the average candidate engagement score of a candidate
+    This method will return stored engagement score of a candidate and the time it was computed at. Score is
+    updated asynchronously when email-campaigns are sent to candidate or opened/clicked by candidate, and is
+    recomputed for all candidates of a domain daily.
     :param candidate_id: Id of candidate
-    :return: Average Engagement score of a candidate
-    :rtype: Float|None
+    :return: Dictionary containing engagement score (None if candidate is not engaged through any pipeline yet)
+             and ISO formatted time score was updated at (None if score is not computed yet)
+    :rtype: dict
     """
-
-    talent_pool_ids_of_candidate = TalentPoolCandidate.query.with_entities(
-            TalentPoolCandidate.talent_pool_id).filter(TalentPoolCandidate.candidate_id == candidate_id).all()
-    talent_pool_ids_of_candidate = [talent_pool_id_of_candidate.talent_pool_id for
-                                    talent_pool_id_of_candidate in talent_pool_ids_of_candidate]
-
-    if not talent_pool_ids_of_candidate:
-        talent_pool_ids_of_candidate = ['NULL']
-
-    sql_query = """
-    SELECT avg(average_engagement_score.average_engagement_score_of_pipeline) AS engagement_score
-    FROM
-      (SELECT avg(engagement_score_of_all_campaigns.engagement_score) as average_engagement_score_of_pipeline
-      FROM
-       (SELECT email_campaign_send.EmailCampaignId,
-               email_campaign_send_url_conversion.EmailCampaignSendId,
-               CASE WHEN sum(url_conversion.HitCount) = 0 THEN 0.0 WHEN sum(email_campaign_send_url_conversion.type * url_conversion.HitCount) > 0 THEN 100 ELSE 33.3 END AS engagement_score
-        FROM email_campaign_send
-        INNER JOIN email_campaign_send_url_conversion ON email_campaign_send.Id = email_campaign_send_url_conversion.EmailCampaignSendId
-        INNER JOIN url_conversion ON email_campaign_send_url_conversion.UrlConversionId = url_conversion.Id
-        WHERE email_campaign_send.candidateId = :candidate_id
-        GROUP BY email_campaign_send_url_conversion.EmailCampaignSendId) AS engagement_score_of_all_campaigns
-      NATURAL JOIN email_campaign_smart_list
-      INNER JOIN smart_list ON smart_list.Id = email_campaign_smart_list.SmartListId
-      INNER JOIN talent_pipeline ON talent_pipeline.id = smart_list.talentPipelineId
-      WHERE talent_pipeline.id IS NOT NULL AND talent_pipeline.talent_pool_id IN :talent_pool_ids
-      GROUP BY talent_pipeline.id) as average_engagement_score;
-    """
-
-    try:
-        engagement_score = db.session.connection().execute(text(sql_query), candidate_id=candidate_id,
-                                                           talent_pool_ids=tuple(talent_pool_ids_of_candidate))
-        result = engagement_score.fetchone()
-        if not result or not result['engagement_score']:
-            return None
-        else:
-            return float(str(result['engagement_score']))
-    except Exception as e:
-        logger.exception("Couldn't compute engagement score for candidate(%s) because (%s)" % (candidate_id, e.message))
-        return None
+    engagement_score, updated_time = get_candidate_engagement(candidate_id)
+    return {
+        'engagement_score': engagement_score,
+        'engagement_score_updated_at': DatetimeUtils.utc_isoformat(updated_time) if updated_time else None
+    }
 
 
 def top_most_engaged_pipelines_of_candidate(candidate_id):
     """
     This endpoint will return top most engaged pipelines and their engagement score.
     :param candidate_id: Id of candidate
-    :return: List of dicts containing pipeline's id, name and engagement score
+    :return: Dictionary of pipeline's id -> engagement score
     """
-    talent_pool_ids_of_candidate = TalentPoolCandidate.query.with_entities(
-            TalentPoolCandidate.talent_pool_id).filter(TalentPoolCandidate.candidate_id == candidate_id).all()
-    talent_pool_ids_of_candidate = [talent_pool_id_of_candidate.talent_pool_id for
-                                    talent_pool_id_of_candidate in talent_pool_ids_of_candidate]
-
-    if not talent_pool_ids_of_candidate:
-        talent_pool_ids_of_candidate = ['NULL']
-
-    sql_query = """
-      SELECT talent_pipeline.id, avg(engagement_score_of_all_campaigns.engagement_score) as average_engagement_score_of_pipeline
-      FROM
-       (SELECT email_campaign_send.EmailCampaignId,
-               email_campaign_send_url_conversion.EmailCampaignSendId,
-               CASE WHEN sum(url_conversion.HitCount) = 0 THEN 0.0 WHEN sum(email_campaign_send_url_conversion.type * url_conversion.HitCount) > 0 THEN 100 ELSE 33.3 END AS engagement_score
-        FROM email_campaign_send
-        INNER JOIN email_campaign_send_url_conversion ON email_campaign_send.Id = email_campaign_send_url_conversion.EmailCampaignSendId
-        INNER JOIN url_conversion ON email_campaign_send_url_conversion.UrlConversionId = url_conversion.Id
-        WHERE email_campaign_send.candidateId = :candidate_id
-        GROUP BY email_campaign_send_url_conversion.EmailCampaignSendId) AS engagement_score_of_all_campaigns
-      NATURAL JOIN email_campaign_smart_list
-      INNER JOIN smart_list ON smart_list.Id = email_campaign_smart_list.SmartListId
-      INNER JOIN talent_pipeline ON talent_pipeline.id = smart_list.talentPipelineId
-      WHERE talent_pipeline.id IS NOT NULL AND talent_pipeline.talent_pool_id IN :talent_pool_ids GROUP BY talent_pipeline.id
-      ORDER BY average_engagement_score_of_pipeline DESC;
-    """
-
-    try:
-        engagement_scores = db.session.connection().execute(text(sql_query), candidate_id=candidate_id,
-                                                            talent_pool_ids=tuple(talent_pool_ids_of_candidate))
-        return {int(engagement_score['id']): float(str(engagement_score['average_engagement_score_of_pipeline']))
-                for engagement_score in engagement_scores}
-    except Exception as e:
-        logger.exception("Couldn't compute engagement score for all pipelines of a candidate(%s) "
-                         "because (%s)" % (candidate_id, e.message))
-        return {}
\ No newline at end of file
+    talent_pool_ids_of_candidate = TalentPoolCandidate.query.with_entities(TalentPoolCandidate.talent_pool_id).\
+        filter(TalentPoolCandidate.candidate_id == candidate_id)
+
+    engagement_scores = TalentPipelineCandidateEngagement.query.\
+        with_entities(TalentPipelineCandidateEngagement.talent_pipeline_id,
+                      TalentPipelineCandidateEngagement.engagement_score).\
+        join(TalentPipeline, TalentPipeline.id == TalentPipelineCandidateEngagement.talent_pipeline_id).\
+        filter(TalentPipelineCandidateEngagement.candidate_id == candidate_id,
+               TalentPipeline.talent_pool_id.in_(talent_pool_ids_of_candidate)).all()
+    return dict(engagement_scores)
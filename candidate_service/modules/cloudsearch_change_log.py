@@ -0,0 +1,152 @@
+"""
+Debounced change-log queue for candidate documents in CloudSearch.
+
+Instead of re-uploading a candidate's document on every edit, writers record IDs of edited (dirty) candidates in
+Redis via mark_candidates_dirty(). The first edit of a debounce window schedules flush_dirty_candidate_documents(),
+which runs when the window closes and uploads all dirty candidates in batches. Any number of edits to a candidate
+inside a window collapse into one document rebuild.
+
+Redis layout:
+    cloudsearch_dirty_candidates        set of candidate IDs waiting to be uploaded
+    cloudsearch_dirty_candidates_since  hash of candidate ID -> time it became dirty (used for indexing lag)
+    cloudsearch_flush_scheduled         set (with expiry) while a flush is scheduled for current window
+    cloudsearch_change_log_stats        hash with counters & details of last flush
+"""
+import time
+
+from candidate_service.candidate_app import celery_app, logger
+from candidate_service.common.redis_cache import redis_store
+from candidate_service.modules.talent_cloud_search import _build_candidate_documents_bulk, _send_batch_request
+
+DIRTY_CANDIDATES_KEY = 'cloudsearch_dirty_candidates'
+DIRTY_SINCE_KEY = 'cloudsearch_dirty_candidates_since'
+FLUSH_SCHEDULED_KEY = 'cloudsearch_flush_scheduled'
+CHANGE_LOG_STATS_KEY = 'cloudsearch_change_log_stats'
+
+DEBOUNCE_WINDOW_SECONDS = 5
+FLUSH_BATCH_SIZE = 200
+
+
+def mark_candidates_dirty(candidate_ids):
+    """
+    Records given candidates as dirty, so their documents will be uploaded to CloudSearch by the next flush
+    :param list[int] | int | long candidate_ids: IDs of created/updated candidates
+    """
+    if isinstance(candidate_ids, (int, long)):
+        candidate_ids = [candidate_ids]
+    if not candidate_ids:
+        return
+
+    now = time.time()
+    pipe = redis_store.pipeline()
+    pipe.sadd(DIRTY_CANDIDATES_KEY, *candidate_ids)
+    for candidate_id in candidate_ids:
+        # Only first edit of a window is recorded, so lag is measured from the oldest pending edit
+        pipe.hsetnx(DIRTY_SINCE_KEY, candidate_id, now)
+    pipe.hincrby(CHANGE_LOG_STATS_KEY, 'recorded', len(candidate_ids))
+    pipe.execute()
+    _schedule_flush()
+
+
+def _schedule_flush():
+    """
+    Schedules a flush at the end of current debounce window, unless one is already scheduled
+    """
+    if redis_store.set(FLUSH_SCHEDULED_KEY, time.time(), nx=True, ex=DEBOUNCE_WINDOW_SECONDS):
+        flush_dirty_candidate_documents.apply_async(countdown=DEBOUNCE_WINDOW_SECONDS)
+
+
+def _pop_dirty_candidates():
+    """
+    Atomically takes all dirty candidates off the queue
+    :return: Dirty candidate IDs and time each of them became dirty
+    :rtype: (list[int], dict)
+    """
+    pipe = redis_store.pipeline()  # MULTI/EXEC, so no edit gets lost between reading & clearing the queue
+    pipe.smembers(DIRTY_CANDIDATES_KEY)
+    pipe.hgetall(DIRTY_SINCE_KEY)
+    pipe.delete(DIRTY_CANDIDATES_KEY, DIRTY_SINCE_KEY)
+    candidate_ids, dirty_since, _ = pipe.execute()
+    return sorted(int(candidate_id) for candidate_id in candidate_ids), dirty_since
+
+
+def _requeue_dirty_candidates(candidate_ids, dirty_since, default_since):
+    """
+    Puts candidates of a failed batch back into the queue, keeping time they became dirty, and schedules a flush
+    """
+    pipe = redis_store.pipeline()
+    pipe.sadd(DIRTY_CANDIDATES_KEY, *candidate_ids)
+    for candidate_id in candidate_ids:
+        pipe.hsetnx(DIRTY_SINCE_KEY, candidate_id, dirty_since.get(str(candidate_id), default_since))
+    pipe.execute()
+    _schedule_flush()
+
+
+@celery_app.task()
+def flush_dirty_candidate_documents():
+    """
+    Uploads documents of all dirty candidates to CloudSearch in batches.
+    Candidates of a failed batch are put back into the queue, so they will be uploaded by next flush.
+    """
+    candidate_ids, dirty_since = _pop_dirty_candidates()
+    if not candidate_ids:
+        return
+
+    start_time = time.time()
+    uploaded = 0
+    for i in xrange(0, len(candidate_ids), FLUSH_BATCH_SIZE):
+        batch = candidate_ids[i:i + FLUSH_BATCH_SIZE]
+        try:
+            action_dicts = _build_candidate_documents_bulk(batch)
+            adds, deletes = _send_batch_request(action_dicts)
+        except Exception:
+            logger.exception("flush_dirty_candidate_documents: Couldn't upload candidates %s, re-queueing them",
+                             batch)
+            _requeue_dirty_candidates(batch, dirty_since, start_time)
+            continue
+
+        uploaded += adds
+        # _send_batch_request() logs CloudSearch errors instead of raising them, so a failed commit shows up as
+        # missing adds/deletes
+        if adds + deletes < len(action_dicts):
+            logger.error("flush_dirty_candidate_documents: CloudSearch accepted %s of %s documents of candidates %s, "
+                         "re-queueing them", adds + deletes, len(action_dicts), batch)
+            _requeue_dirty_candidates(batch, dirty_since, start_time)
+
+    finished_at = time.time()
+    oldest_edit = min(float(value) for value in dirty_since.values()) if dirty_since else start_time
+    pipe = redis_store.pipeline()
+    pipe.hincrby(CHANGE_LOG_STATS_KEY, 'flushed', len(candidate_ids))
+    pipe.hincrby(CHANGE_LOG_STATS_KEY, 'uploaded', uploaded)
+    pipe.hmset(CHANGE_LOG_STATS_KEY, dict(last_flush_at=finished_at, last_flush_candidates=len(candidate_ids),
+                                          last_flush_seconds=finished_at - start_time,
+                                          last_flush_max_lag_seconds=finished_at - oldest_edit))
+    pipe.execute()
+    logger.info("flush_dirty_candidate_documents: Uploaded %s of %s dirty candidate documents in %ss",
+                uploaded, len(candidate_ids), finished_at - start_time)
+
+
+def get_change_log_status():
+    """
+    Returns queue depth and indexing lag of the change-log queue.
+    indexing_lag_seconds is age of the oldest edit not uploaded yet. Since duplicate edits collapse, ratio of
+    recorded to flushed candidates shows how many document rebuilds have been saved.
+    :rtype: dict
+    """
+    pipe = redis_store.pipeline()
+    pipe.scard(DIRTY_CANDIDATES_KEY)
+    pipe.hvals(DIRTY_SINCE_KEY)
+    pipe.hgetall(CHANGE_LOG_STATS_KEY)
+    queue_depth, dirty_since, stats = pipe.execute()
+
+    now = time.time()
+    return dict(queue_depth=queue_depth,
+                indexing_lag_seconds=round(now - min(map(float, dirty_since)), 2) if dirty_since else 0,
+                debounce_window_seconds=DEBOUNCE_WINDOW_SECONDS,
+                recorded=int(stats.get('recorded') or 0),
+                flushed=int(stats.get('flushed') or 0),
+                uploaded=int(stats.get('uploaded') or 0),
+                last_flush_at=float(stats['last_flush_at']) if stats.get('last_flush_at') else None,
+                last_flush_candidates=int(stats.get('last_flush_candidates') or 0),
+                last_flush_seconds=round(float(stats.get('last_flush_seconds') or 0), 2),
+                last_flush_max_lag_seconds=round(float(stats.get('last_flush_max_lag_seconds') or 0), 2))
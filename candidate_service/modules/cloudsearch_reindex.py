@@ -0,0 +1,259 @@
+"""
+Streaming, parallel re-indexing of all candidate documents of a domain.
+
+Candidate IDs are read with keyset pagination (WHERE id > last_id ORDER BY id LIMIT n) so whole domain is never loaded
+into memory. Every page is uploaded by an independent Celery task, sized so that its documents fit in one CloudSearch
+batch request (5MB). Progress is check-pointed in Redis, so a crashed re-index resumes from where it stopped and its
+throughput & ETA can be retrieved via CandidateDocumentsReindex API.
+
+Redis layout (per domain):
+    cloudsearch_reindex_<domain_id>          hash with status, counters & last dispatched candidate ID
+    cloudsearch_reindex_<domain_id>_pending  set of "first_id:last_id" ranges dispatched but not uploaded yet
+    cloudsearch_reindex_<domain_id>_failed   set of "first_id:last_id" ranges which failed after all their retries
+
+A failed batch is retried BATCH_MAX_RETRIES times, then it is moved to failed set so the dispatcher carries on with
+next batches. Failed batches are re-dispatched when re-index is started again.
+"""
+import time
+
+import simplejson
+from sqlalchemy import func
+
+from candidate_service.candidate_app import celery_app, logger
+from candidate_service.common.models.db import db
+from candidate_service.common.models.candidate import Candidate
+from candidate_service.common.models.user import User
+from candidate_service.common.redis_cache import redis_store
+from candidate_service.common.error_handling import InvalidUsage
+from candidate_service.modules.talent_cloud_search import (_build_candidate_documents_bulk, _send_batch_request,
+                                                           BATCH_REQUEST_LIMIT_BYTES)
+
+REINDEX_REDIS_KEY = 'cloudsearch_reindex_%s'
+REINDEX_PENDING_REDIS_KEY = 'cloudsearch_reindex_%s_pending'
+REINDEX_FAILED_REDIS_KEY = 'cloudsearch_reindex_%s_failed'
+REINDEX_KEY_EXPIRY = 7 * 24 * 3600  # Keep progress of a re-index for a week
+
+# Average document size used until real document sizes of the domain are measured
+ESTIMATED_DOCUMENT_SIZE_BYTES = 10 * 1024
+MIN_BATCH_SIZE = 50
+MAX_BATCH_SIZE = 2000
+
+# Maximum number of batches waiting in Celery queue at a time, dispatcher re-schedules itself when limit is reached
+MAX_PENDING_BATCHES = 50
+DISPATCH_RETRY_COUNTDOWN = 5
+
+# A failed batch is retried this many times, with countdown doubling on every retry, before it is given up
+BATCH_MAX_RETRIES = 3
+BATCH_RETRY_COUNTDOWN = 30
+
+# A running re-index without any progress for this long is considered crashed and can be resumed
+REINDEX_STALE_SECONDS = 15 * 60
+
+
+class ReindexStatus(object):
+    RUNNING = 'running'
+    DISPATCHED = 'dispatched'  # All batches have been dispatched, some of them may still be running
+    COMPLETED = 'completed'
+
+
+def _reindex_key(domain_id):
+    return REINDEX_REDIS_KEY % domain_id
+
+
+def _pending_key(domain_id):
+    return REINDEX_PENDING_REDIS_KEY % domain_id
+
+
+def _failed_key(domain_id):
+    return REINDEX_FAILED_REDIS_KEY % domain_id
+
+
+def _domain_candidate_ids_query(domain_id):
+    return Candidate.query.with_entities(Candidate.id).join(User, Candidate.user_id == User.id)\
+        .filter(User.domain_id == domain_id)
+
+
+def get_batch_size(domain_id):
+    """
+    Number of candidates per batch task, so that their documents fit in one CloudSearch batch request.
+    Average document size is measured by the batches already uploaded in this re-index.
+    :param int domain_id: Domain ID
+    :rtype: int
+    """
+    checkpoint = redis_store.hgetall(_reindex_key(domain_id))
+    uploaded = int(checkpoint.get('uploaded') or 0)
+    document_bytes = int(checkpoint.get('document_bytes') or 0)
+    average_size = document_bytes / uploaded if uploaded and document_bytes else ESTIMATED_DOCUMENT_SIZE_BYTES
+    # Leave some room for request overhead
+    batch_size = int(BATCH_REQUEST_LIMIT_BYTES * 0.8) / max(average_size, 1)
+    return max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, batch_size))
+
+
+def start_domain_reindex(domain_id):
+    """
+    Starts re-indexing all candidate documents of given domain. If a previous re-index of this domain has crashed
+    (i.e. made no progress for REINDEX_STALE_SECONDS) it is resumed from its checkpoint.
+    :param int domain_id: Domain ID
+    :return: Progress of re-index, see get_domain_reindex_progress()
+    :rtype: dict
+    """
+    key = _reindex_key(domain_id)
+    checkpoint = redis_store.hgetall(key)
+    now = time.time()
+
+    if checkpoint and checkpoint.get('status') != ReindexStatus.COMPLETED:
+        if now - float(checkpoint.get('heartbeat') or 0) < REINDEX_STALE_SECONDS:
+            raise InvalidUsage("Re-index of domain %s is already in progress" % domain_id)
+
+        # Re-dispatch batches which were dispatched but never uploaded, then continue from last dispatched ID
+        for failed_range in redis_store.smembers(_failed_key(domain_id)):
+            redis_store.smove(_failed_key(domain_id), _pending_key(domain_id), failed_range)
+        pending_ranges = redis_store.smembers(_pending_key(domain_id))
+        logger.info("Resuming re-index of domain %s from candidate %s, re-dispatching %s batches",
+                    domain_id, checkpoint.get('last_candidate_id'), len(pending_ranges))
+        redis_store.hmset(key, dict(status=ReindexStatus.RUNNING, heartbeat=now))
+        for pending_range in pending_ranges:
+            first_id, last_id = map(int, pending_range.split(':'))
+            upload_candidate_documents_batch.delay(domain_id, first_id, last_id)
+    else:
+        total = _domain_candidate_ids_query(domain_id).with_entities(func.count(Candidate.id)).scalar()
+        db.session.commit()
+        logger.info("Starting re-index of %s candidates of domain %s", total, domain_id)
+        redis_store.delete(key, _pending_key(domain_id), _failed_key(domain_id))
+        redis_store.hmset(key, dict(status=ReindexStatus.RUNNING, total=total, last_candidate_id=0, dispatched=0,
+                                    uploaded=0, document_bytes=0, started_at=now, heartbeat=now))
+
+    redis_store.expire(key, REINDEX_KEY_EXPIRY)
+    dispatch_domain_reindex.delay(domain_id)
+    return get_domain_reindex_progress(domain_id)
+
+
+@celery_app.task()
+def dispatch_domain_reindex(domain_id):
+    """
+    Streams candidate IDs of domain after the last dispatched ID and fans them out as independent batch tasks.
+    Only MAX_PENDING_BATCHES batches are queued at a time, after that this task re-schedules itself.
+    :param int domain_id: Domain ID
+    """
+    key = _reindex_key(domain_id)
+    pending_key = _pending_key(domain_id)
+    last_candidate_id = int(redis_store.hget(key, 'last_candidate_id') or 0)
+
+    while redis_store.scard(pending_key) < MAX_PENDING_BATCHES:
+        candidate_ids = [row.id for row in _domain_candidate_ids_query(domain_id)
+                         .filter(Candidate.id > last_candidate_id).order_by(Candidate.id)
+                         .limit(get_batch_size(domain_id))]
+        db.session.commit()
+        if not candidate_ids:
+            logger.info("All re-index batches of domain %s have been dispatched", domain_id)
+            redis_store.hset(key, 'status', ReindexStatus.DISPATCHED)
+            _complete_reindex_if_done(domain_id)
+            return
+
+        first_id, last_candidate_id = candidate_ids[0], candidate_ids[-1]
+        redis_store.sadd(pending_key, '%s:%s' % (first_id, last_candidate_id))
+        redis_store.hmset(key, dict(last_candidate_id=last_candidate_id, heartbeat=time.time()))
+        redis_store.hincrby(key, 'dispatched', len(candidate_ids))
+        upload_candidate_documents_batch.delay(domain_id, first_id, last_candidate_id)
+
+    if time.time() - float(redis_store.hget(key, 'heartbeat') or 0) > REINDEX_STALE_SECONDS:
+        # Pending batches are neither uploaded nor given up, i.e. workers are down. Stop here, re-index can be
+        # resumed via start_domain_reindex()
+        logger.error("Re-index of domain %s made no progress for %ss, stopping dispatcher", domain_id,
+                     REINDEX_STALE_SECONDS)
+        return
+    dispatch_domain_reindex.apply_async(args=[domain_id], countdown=DISPATCH_RETRY_COUNTDOWN)
+
+
+@celery_app.task()
+def upload_candidate_documents_batch(domain_id, first_id, last_id, retries=0):
+    """
+    Uploads documents of domain's candidates with IDs in [first_id, last_id] and records progress in checkpoint.
+    A failed batch is re-scheduled BATCH_MAX_RETRIES times, then it is moved from pending set to failed set so
+    it no longer holds the dispatcher. Failed batches are retried when re-index is started again.
+    :param int domain_id: Domain ID
+    :param int first_id: First candidate ID of batch
+    :param int last_id: Last candidate ID of batch
+    :param int retries: Number of times this batch has already failed
+    """
+    key = _reindex_key(domain_id)
+    batch_range = '%s:%s' % (first_id, last_id)
+    try:
+        candidate_ids = [row.id for row in _domain_candidate_ids_query(domain_id)
+                         .filter(Candidate.id.between(first_id, last_id))]
+        db.session.commit()
+        action_dicts = _build_candidate_documents_bulk(candidate_ids, domain_id)
+        document_bytes = len(simplejson.dumps(action_dicts, encoding='ISO-8859-1'))
+        adds, deletes = _send_batch_request(action_dicts)
+    except Exception:
+        db.session.rollback()
+        logger.exception("upload_candidate_documents_batch: Couldn't upload candidates %s-%s of domain %s "
+                         "(retries: %s)", first_id, last_id, domain_id, retries)
+        _retry_or_give_up_batch(domain_id, first_id, last_id, retries)
+        return
+
+    # _send_batch_request() logs CloudSearch errors instead of raising them, so a failed commit shows up as
+    # missing adds/deletes
+    if adds + deletes < len(action_dicts):
+        logger.error("upload_candidate_documents_batch: CloudSearch accepted %s of %s documents of candidates %s-%s "
+                     "of domain %s (retries: %s)", adds + deletes, len(action_dicts), first_id, last_id, domain_id,
+                     retries)
+        _retry_or_give_up_batch(domain_id, first_id, last_id, retries)
+        return
+
+    redis_store.hincrby(key, 'uploaded', adds)
+    redis_store.hincrby(key, 'document_bytes', document_bytes)
+    redis_store.hset(key, 'heartbeat', time.time())
+    redis_store.srem(_pending_key(domain_id), batch_range)
+    logger.info("Re-index of domain %s: uploaded %s documents of candidates %s-%s", domain_id, adds, first_id, last_id)
+    _complete_reindex_if_done(domain_id)
+
+
+def _retry_or_give_up_batch(domain_id, first_id, last_id, retries):
+    """
+    Re-schedules a failed batch with doubling countdown, or moves it to failed set once it has been retried
+    BATCH_MAX_RETRIES times
+    """
+    if retries < BATCH_MAX_RETRIES:
+        upload_candidate_documents_batch.apply_async(args=[domain_id, first_id, last_id, retries + 1],
+                                                     countdown=BATCH_RETRY_COUNTDOWN * 2 ** retries)
+        return
+    redis_store.smove(_pending_key(domain_id), _failed_key(domain_id), '%s:%s' % (first_id, last_id))
+    redis_store.hset(_reindex_key(domain_id), 'heartbeat', time.time())
+    _complete_reindex_if_done(domain_id)
+
+
+def _complete_reindex_if_done(domain_id):
+    key = _reindex_key(domain_id)
+    if redis_store.hget(key, 'status') == ReindexStatus.DISPATCHED and not redis_store.scard(_pending_key(domain_id)):
+        redis_store.hmset(key, dict(status=ReindexStatus.COMPLETED, completed_at=time.time()))
+        logger.info("Re-index of domain %s has been completed, %s batches failed", domain_id,
+                    redis_store.scard(_failed_key(domain_id)))
+
+
+def get_domain_reindex_progress(domain_id):
+    """
+    Returns progress of latest re-index of given domain with its throughput (documents/sec) and ETA (seconds)
+    :param int domain_id: Domain ID
+    :rtype: dict
+    """
+    checkpoint = redis_store.hgetall(_reindex_key(domain_id))
+    if not checkpoint:
+        return dict(domain_id=domain_id, status=None)
+
+    total, uploaded = int(checkpoint.get('total') or 0), int(checkpoint.get('uploaded') or 0)
+    started_at = float(checkpoint['started_at'])
+    elapsed = float(checkpoint.get('completed_at') or time.time()) - started_at
+    docs_per_sec = uploaded / elapsed if elapsed > 0 else 0
+    eta = (max(total - uploaded, 0) / docs_per_sec) if docs_per_sec else None
+    return dict(domain_id=domain_id,
+                status=checkpoint.get('status'),
+                total=total,
+                dispatched=int(checkpoint.get('dispatched') or 0),
+                uploaded=uploaded,
+                failed_batches=redis_store.scard(_failed_key(domain_id)),
+                pending_batches=redis_store.scard(_pending_key(domain_id)),
+                last_candidate_id=int(checkpoint.get('last_candidate_id') or 0),
+                elapsed_seconds=round(elapsed, 2),
+                docs_per_sec=round(docs_per_sec, 2),
+                eta_seconds=int(eta) if eta is not None and checkpoint.get('status') != ReindexStatus.COMPLETED else 0)
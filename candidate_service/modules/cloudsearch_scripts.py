@@ -2,12 +2,19 @@
 To run, do:
 python modules/cloudsearch_scripts.py --upload-all-candidate-documents gettalent-prod us-east-1
 From inside the container.
+
+To compare candidate document builders (documents are only built, nothing is uploaded), do:
+python modules/cloudsearch_scripts.py --benchmark-document-builders 1 --sample-size 1000
 """
 import argparse
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 from candidate_service.common.talent_flask import TalentFlask
 from candidate_service.common.talent_config_manager import load_gettalent_config, TalentConfigKeys
-from talent_cloud_search import define_index_fields, upload_candidate_documents
+from talent_cloud_search import define_index_fields, upload_candidate_documents, DOCUMENT_BUILDERS
 from candidate_service.common.models.user import User, Domain
 from candidate_service.common.models.candidate import Candidate
 
@@ -18,6 +25,12 @@ parser.add_argument('--upload-all-candidate-documents', nargs=2,
                     help='Uploads all Candidate documents to the given CloudSearch domain name and region')
 parser.add_argument('--domain-id', nargs=1,
                     help='Optional: Domain ID for uploading candidate documents')
+parser.add_argument('--benchmark-document-builders', nargs=1,
+                    help='Compares rows scanned & wall time of candidate document builders for given domain ID')
+parser.add_argument('--sample-size', nargs=1, type=int, default=[1000],
+                    help='Optional: Number of candidates used in --benchmark-document-builders')
+parser.add_argument('--batch-size', nargs=1, type=int, default=[10],
+                    help='Optional: Number of candidates per builder call in --benchmark-document-builders')
 args = parser.parse_args()
 
 app = TalentFlask(__name__)
@@ -64,4 +77,48 @@ if args.upload_all_candidate_documents:
             print "Uploading all candidates of domain %s" % domain.id
             upload_candidate_documents_in_domain(domain.id)
 
-    upload_all_candidate_documents()
\ No newline at end of file
+    upload_all_candidate_documents()
+
+if args.benchmark_document_builders:
+    domain_id = int(args.benchmark_document_builders[0])
+    sample_size = args.sample_size[0]
+    batch_size = args.batch_size[0]
+    rows_scanned = dict(count=0)
+
+    def _handler_reads(dbapi_connection):
+        """
+        Returns sum of MySQL's Handler_read_* counters of given connection, i.e. number of rows read by storage engine
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%%'")
+        reads = sum(int(value) for _, value in cursor.fetchall())
+        cursor.close()
+        return reads
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info['handler_reads'] = _handler_reads(conn.connection)
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # SHOW STATUS itself increments Handler_read_rnd_next, that's negligible for our comparison
+        rows_scanned['count'] += _handler_reads(conn.connection) - conn.info.pop('handler_reads', 0)
+
+    candidates = Candidate.query.with_entities(Candidate.id).join(User).filter(User.domain_id == domain_id) \
+        .order_by(Candidate.id).limit(sample_size).all()
+    candidate_ids = [candidate.id for candidate in candidates]
+    print "Benchmarking document builders with %s candidates of domain %s (%s candidates per batch)" % (
+        len(candidate_ids), domain_id, batch_size)
+
+    for builder_name, build_candidate_documents in sorted(DOCUMENT_BUILDERS.items()):
+        rows_scanned['count'] = 0
+        documents_count = 0
+        start_time = time.time()
+        for i in xrange(0, len(candidate_ids), batch_size):
+            documents_count += len(build_candidate_documents(candidate_ids[i:i + batch_size], domain_id))
+        wall_time = time.time() - start_time
+        per_thousand = 1000.0 / len(candidate_ids) if candidate_ids else 0
+        print "%s builder: %s documents, rows scanned: %s (%.0f per 1,000 candidates), wall time: %.2fs " \
+              "(%.2fs per 1,000 candidates)" % (builder_name, documents_count, rows_scanned['count'],
+                                                rows_scanned['count'] * per_thousand, wall_time,
+                                                wall_time * per_thousand)
@@ -0,0 +1,99 @@
+"""
+In-process cache of labels displayed for id facets (owner, area of interest, source, status & tags) of candidate search.
+
+CloudSearch returns ids in buckets of these facets, which are replaced by their names for UI. These lookup tables
+rarely change, so labels are kept per domain in a TTL bounded LRU cache. On a miss, labels of all missing ids of a
+facet are loaded with one bulk query, so a warm process decorates facets without any SQL.
+Ids without a row are cached too (as None), so a deleted row isn't looked up on every search.
+Cache keys include facet labels generation of domain, which is bumped in Redis by services writing these rows, so
+changed labels are dropped from all processes.
+"""
+from candidate_service.common.models.db import db
+from candidate_service.common.models.candidate import CandidateSource, CandidateStatus
+from candidate_service.common.models.user import User
+from candidate_service.common.models.tag import Tag
+from candidate_service.common.models.misc import AreaOfInterest
+from candidate_service.common.utils.lru_cache import TTLLRUCache
+from candidate_service.common.utils.facet_labels_generation import (get_facet_labels_generation,
+                                                                   bump_facet_labels_generation)
+
+FACET_LABELS_CACHE_SIZE = 1000  # Number of (domain, facet, generation) entries
+FACET_LABELS_TTL = 600
+
+# facet name -> (columns to select, function returning label of a selected row)
+FACET_LABEL_QUERIES = {
+    'username': ((User.id, User.first_name, User.last_name),
+                 lambda row: (row.first_name or "") + " " + (row.last_name or "")),
+    'area_of_interest': ((AreaOfInterest.id, AreaOfInterest.name), lambda row: row.name),
+    'source': ((CandidateSource.id, CandidateSource.description), lambda row: row.description),
+    'status': ((CandidateStatus.id, CandidateStatus.description), lambda row: row.description),
+    'tags': ((Tag.id, Tag.name), lambda row: row.name),
+}
+
+facet_labels_cache = TTLLRUCache(max_size=FACET_LABELS_CACHE_SIZE, ttl=FACET_LABELS_TTL)
+
+
+def get_facet_labels(domain_id, facet_name, ids):
+    """
+    Returns labels of given ids of a facet. Ids not cached yet are loaded with a single query.
+    :param int domain_id: Domain ID of user searching candidates
+    :param str facet_name: One of FACET_LABEL_QUERIES keys
+    :param list ids: Ids of facet (as int or str)
+    :return: Dictionary of id -> label (None if there is no row with that id)
+    :rtype: dict
+    """
+    columns, get_label = FACET_LABEL_QUERIES[facet_name]
+    key = get_facet_labels_cache_key(domain_id, facet_name)
+    labels = facet_labels_cache.get(key)
+    if labels is None:
+        labels = {}
+        facet_labels_cache.set(key, labels)
+
+    ids = set(int(id_) for id_ in ids)
+    missing_ids = ids.difference(labels)
+    if missing_ids:
+        rows = db.session.query(*columns).filter(columns[0].in_(missing_ids)).all()
+        # Cached dict is never modified, a new one is swapped in so concurrent readers see complete labels
+        labels = dict(labels)
+        labels.update(dict.fromkeys(missing_ids))
+        labels.update((row.id, get_label(row)) for row in rows)
+        # Entry keeps its original expiry, so a label is never served older than FACET_LABELS_TTL
+        facet_labels_cache.replace(key, labels)
+    return {id_: labels[id_] for id_ in ids}
+
+
+def get_facet_labels_cache_key(domain_id, facet_name):
+    """
+    :param int domain_id: Domain ID
+    :param str facet_name: One of FACET_LABEL_QUERIES keys
+    :rtype: tuple
+    """
+    return domain_id, facet_name, get_facet_labels_generation(domain_id)
+
+
+def get_facet_info_with_labels(domain_id, facet_name, facet):
+    """
+    Replaces ids in facet buckets with their labels for displaying on UI. Ids are returned too, so they can serve as
+    values of checkboxes for filter queries.
+    :param int domain_id: Domain ID of user searching candidates
+    :param str facet_name: One of FACET_LABEL_QUERIES keys
+    :param list facet: Buckets of facet as received from cloudsearch (bucket value contains id)
+    :return: List of dictionaries with id, label (value) & count of candidates
+    :rtype: list[dict]
+    """
+    labels = get_facet_labels(domain_id, facet_name, [bucket['value'] for bucket in facet])
+    return [dict(id=bucket['value'], value=labels[int(bucket['value'])], count=bucket['count'])
+            for bucket in facet if labels[int(bucket['value'])] is not None]
+
+
+def invalidate_facet_labels(domain_id=None):
+    """
+    Drops cached labels of given domain from all processes, or of all domains from this process if domain_id is
+    not given
+    :param int | None domain_id: Domain ID
+    """
+    if domain_id is None:
+        facet_labels_cache.clear()
+        return
+    bump_facet_labels_generation(domain_id)
+    facet_labels_cache.delete_matching(lambda key, labels: key[0] == domain_id)
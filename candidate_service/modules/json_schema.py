@@ -1254,6 +1254,25 @@ resource_schema_preferences = {
     }
 }
 
+resource_schema_candidates_preferences = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["candidate_ids", "frequency_id"],
+    "properties": {
+        "candidate_ids": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "integer"
+            }
+        },
+        "frequency_id": {
+            "type": ["integer", "string"]
+        }
+    }
+}
+
 resource_schema_photos_post = {
     "$schema": "http://json-schema.org/draft-04/schema#",
     "type": "object",
@@ -49,6 +49,36 @@ def add_notes(candidate_id, user_id, data):
     return created_note_ids
 
 
+def add_notes_of_candidates(user_id, data):
+    """
+    Function will insert notes of many candidates into the db with a single INSERT statement.
+    Notes must have a comment.
+    :type user_id:  int|long
+    :param data:  Notes, each containing candidate_id of its candidate
+    :type data:  list[dict]
+    :return: Number of notes created
+    :rtype:  int
+    """
+    notes = []
+    added_time = datetime.utcnow()
+    for note in data:
+        comments = normalize_value(note.get('comment'))
+
+        # Notes must have a comment
+        if not comments:
+            raise InvalidUsage('Note must have a comment', custom_error.INVALID_USAGE)
+
+        notes.append(dict(candidate_id=note['candidate_id'],
+                          owner_user_id=user_id,
+                          title=normalize_value(note.get('title')) if note.get('title') else None,
+                          comment=comments,
+                          added_time=added_time))
+
+    db.session.bulk_insert_mappings(CandidateTextComment, notes)
+    db.session.commit()
+    return len(notes)
+
+
 def get_notes(candidate, note_id=None):
     """
     Function will return all of candidate's notes if note_id is not provided, otherwise it
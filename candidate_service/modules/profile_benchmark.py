@@ -0,0 +1,77 @@
+"""
+Measures SQL statements and latency of assembling candidate profiles by fetch_candidates_info().
+
+Profiles of --count most recent candidates of a domain are assembled one candidate at a time (as GET of a single
+candidate does) and in a single batch (as search API with candidate_ids does). Number of statements and
+milliseconds per profile are reported for both. Only given fields are assembled if --fields is given.
+    python modules/profile_benchmark.py --domain-id 1 --count 50
+    python modules/profile_benchmark.py --domain-id 1 --count 50 --fields emails,work_experiences,educations
+"""
+import time
+import argparse
+
+from sqlalchemy import event
+
+from candidate_service.candidate_app import app
+from candidate_service.common.models.db import db
+from candidate_service.common.models.candidate import Candidate
+from candidate_service.common.models.user import User
+from candidate_service.modules.talent_candidates import fetch_candidates_info
+
+
+class StatementCounter(object):
+    """
+    Counts SQL statements executed by engine while in context
+        with StatementCounter() as counter:
+            Candidate.query.get(1)
+        counter.statements  # 1
+    """
+
+    def __init__(self):
+        self.statements = 0
+
+    def _count(self, *args, **kwargs):
+        self.statements += 1
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(db.engine, 'before_cursor_execute', self._count)
+
+
+def measure(candidate_ids, fields, batch_size):
+    """
+    Assembles profiles of given candidates in batches of given size, with an empty session so nothing is served
+    from identity map, and returns statements & milliseconds per profile
+    :rtype: dict
+    """
+    db.session.expunge_all()
+    with StatementCounter() as counter:
+        start_time = time.time()
+        for index in xrange(0, len(candidate_ids), batch_size):
+            candidates = Candidate.query.filter(Candidate.id.in_(candidate_ids[index:index + batch_size])).all()
+            fetch_candidates_info(candidates, fields)
+        elapsed = time.time() - start_time
+    return dict(statements=float(counter.statements) / len(candidate_ids),
+                milliseconds=elapsed * 1000 / len(candidate_ids))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures SQL statements and latency of candidate profiles.')
+    parser.add_argument('--domain-id', type=int, required=True, help='Id of domain whose candidates are used')
+    parser.add_argument('--count', type=int, default=50, help='Number of candidates')
+    parser.add_argument('--fields', default=None, help='Optional: Comma separated fields of profile to assemble')
+    args = parser.parse_args()
+
+    with app.app_context():
+        benchmark_candidate_ids = [candidate_id for candidate_id, in db.session.query(Candidate.id).join(User).
+                                   filter(User.domain_id == args.domain_id, Candidate.is_archived == 0).
+                                   order_by(Candidate.added_time.desc()).limit(args.count)]
+        if not benchmark_candidate_ids:
+            raise SystemExit('No candidates found in domain %s' % args.domain_id)
+        for mode, size in (('single', 1), ('batch', len(benchmark_candidate_ids))):
+            result = measure(benchmark_candidate_ids, args.fields, size)
+            print '%s: %s profiles, %.1f statements and %.1f ms per profile' \
+                  % (mode, len(benchmark_candidate_ids), result['statements'], result['milliseconds'])
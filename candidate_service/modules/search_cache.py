@@ -0,0 +1,117 @@
+"""
+Redis cache of CloudSearch results (hits, facets, max score & facet labels) returned by search_candidates().
+
+Cache keys are built from domain ID and the normalized CloudSearch request (filter query, search query, sort,
+page/cursor, size, facets and returned fields), so repeated landing-page & smartlist-count searches are served without
+any CloudSearch request.
+Invalidation is done with generation counters: a domain's generation is bumped whenever documents of that domain
+are uploaded or deleted, which changes all cache keys of the domain. Old entries simply expire.
+CloudSearch indexes uploaded documents a little later, so a search made in between reads old index and caches it
+under new generation. Generation is therefore bumped again SEARCH_CACHE_INDEXING_DELAY seconds after upload.
+A global generation is bumped when documents are deleted without knowing their domain.
+"""
+import hashlib
+
+import simplejson
+
+from candidate_service.candidate_app import celery_app, logger
+from candidate_service.common.redis_cache import redis_store
+
+SEARCH_CACHE_KEY = 'search_cache_%s_%s_%s_%s'
+SEARCH_CACHE_DOMAIN_GENERATION_KEY = 'search_cache_generation_%s'
+SEARCH_CACHE_GLOBAL_GENERATION_KEY = 'search_cache_generation'
+SEARCH_CACHE_STATS_KEY = 'search_cache_stats'
+
+# Documents become searchable a little after upload, so entries are short lived even without any upload
+SEARCH_CACHE_TTL = 300
+# Seconds CloudSearch takes to make uploaded documents searchable
+SEARCH_CACHE_INDEXING_DELAY = 60
+
+
+def get_search_cache_key(domain_id, params, count_only=False):
+    """
+    Returns cache key of given CloudSearch request
+    :param int domain_id: Domain ID
+    :param dict params: CloudSearch search params
+    :param bool count_only: True if only count of candidates is requested
+    :return: Cache key, or None if generations couldn't be read, in which case search is not cached
+    :rtype: str | None
+    """
+    try:
+        pipe = redis_store.pipeline(transaction=False)
+        pipe.get(SEARCH_CACHE_GLOBAL_GENERATION_KEY)
+        pipe.get(SEARCH_CACHE_DOMAIN_GENERATION_KEY % domain_id)
+        global_generation, domain_generation = pipe.execute()
+    except Exception:
+        logger.exception("get_search_cache_key: Couldn't read search cache generations")
+        return None
+    request_hash = hashlib.sha1(simplejson.dumps([params, count_only], sort_keys=True)).hexdigest()
+    return SEARCH_CACHE_KEY % (domain_id, global_generation or 0, domain_generation or 0, request_hash)
+
+
+def get_cached_search_results(cache_key):
+    """
+    Returns cached search results for given key or None in case of a miss. Hits & misses are counted.
+    :param str | None cache_key: Key returned by get_search_cache_key()
+    :rtype: dict | None
+    """
+    if not cache_key:
+        return None
+    try:
+        cached_value = redis_store.get(cache_key)
+        redis_store.hincrby(SEARCH_CACHE_STATS_KEY, 'hits' if cached_value else 'misses', 1)
+    except Exception:
+        logger.exception("get_cached_search_results: Couldn't read search cache")
+        return None
+    return simplejson.loads(cached_value) if cached_value else None
+
+
+def cache_search_results(cache_key, search_results):
+    """
+    :param str | None cache_key: Key returned by get_search_cache_key()
+    :param dict search_results: Results returned by search_candidates()
+    """
+    if not cache_key:
+        return
+    try:
+        redis_store.setex(cache_key, simplejson.dumps(search_results), SEARCH_CACHE_TTL)
+    except Exception:
+        logger.exception("cache_search_results: Couldn't cache search results")
+
+
+def invalidate_search_cache(domain_ids=None):
+    """
+    Invalidates cached search results of given domains, or of all domains if domain_ids is not given, now and
+    again once CloudSearch has indexed the changed documents
+    :param list | set | None domain_ids: IDs of domains whose documents have been uploaded or deleted
+    """
+    if domain_ids is not None:
+        domain_ids = list(set(domain_ids))
+    bump_search_cache_generation(domain_ids)
+    bump_search_cache_generation.apply_async(args=[domain_ids], countdown=SEARCH_CACHE_INDEXING_DELAY)
+
+
+@celery_app.task()
+def bump_search_cache_generation(domain_ids=None):
+    """
+    Bumps search cache generation of given domains, or global generation if domain_ids is not given
+    :param list | None domain_ids: Domain IDs
+    """
+    if domain_ids is None:
+        redis_store.incr(SEARCH_CACHE_GLOBAL_GENERATION_KEY)
+        return
+    pipe = redis_store.pipeline(transaction=False)
+    for domain_id in domain_ids:
+        pipe.incr(SEARCH_CACHE_DOMAIN_GENERATION_KEY % domain_id)
+    pipe.execute()
+
+
+def get_search_cache_stats():
+    """
+    Returns hit/miss counts & hit rate of search cache
+    :rtype: dict
+    """
+    stats = redis_store.hgetall(SEARCH_CACHE_STATS_KEY)
+    hits, misses = int(stats.get('hits') or 0), int(stats.get('misses') or 0)
+    return dict(hits=hits, misses=misses, hit_rate=round(float(hits) / (hits + misses), 4) if hits + misses else 0,
+                ttl_seconds=SEARCH_CACHE_TTL)
@@ -2,6 +2,7 @@
 Helper functions for candidate CRUD operations and tracking edits made to the Candidate
 """
 # Standard libraries
+import base64
 import datetime
 import hashlib
 import re
@@ -13,6 +14,8 @@ import phonenumbers
 import pycountry
 import simplejson as json
 from flask import request, has_request_context
+from sqlalchemy import and_, case, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import joinedload, subqueryload
 from nameparser import HumanName
 from candidate_service.candidate_app import logger
 from candidate_service.common.error_handling import InvalidUsage, NotFoundError, ForbiddenError
@@ -30,7 +33,7 @@ from candidate_service.modules.tags import create_tags, update_candidate_tags
 from candidate_service.common.models.candidate_edit import CandidateView
 from candidate_service.common.models.db import db
 from candidate_service.common.models.email_campaign import EmailCampaign, EmailCampaignSend, \
-    EmailCampaignSendUrlConversion
+    EmailCampaignSendUrlConversion, TRACKING_URL_TYPE
 from candidate_service.common.models.language import CandidateLanguage
 from candidate_service.common.models.misc import AreaOfInterest, UrlConversion, Product, \
     CustomFieldCategory, CustomField
@@ -64,99 +67,69 @@ def fetch_candidate_info(candidate, fields=None):
     :rtype:     dict[str, T]
     """
     assert isinstance(candidate, Candidate)
-    candidate_id = candidate.id
-
-    get_all_fields = fields is None  # if fields is None, then get ALL the fields
-
-    full_name = None
-    if get_all_fields or 'full_name' in fields:
-        full_name = format_candidate_full_name(candidate)
-
-    created_at_datetime = None
-    if get_all_fields or 'created_at_datetime' in fields:
-        created_at_datetime = DatetimeUtils.utc_isoformat(candidate.added_time)
+    return fetch_candidates_info([candidate], fields)[0]
 
-    emails = None
-    if get_all_fields or 'emails' in fields:
-        emails = candidate_emails(candidate=candidate)
 
-    phones = None
-    if get_all_fields or 'phones' in fields:
-        phones = candidate_phones(candidate=candidate)
-
-    addresses = None
-    if get_all_fields or 'addresses' in fields:
-        addresses = candidate_addresses(candidate_id=candidate_id)
-
-    work_experiences = None
-    if get_all_fields or 'work_experiences' in fields:
-        work_experiences = candidate_experiences(candidate_id=candidate_id)
-
-    work_preference = None
-    if get_all_fields or 'work_preferences' in fields:
-        work_preference = candidate_work_preference(candidate=candidate)
-
-    preferred_locations = None
-    if get_all_fields or 'preferred_locations' in fields:
-        preferred_locations = candidate_preferred_locations(candidate=candidate)
-
-    educations = None
-    if get_all_fields or 'educations' in fields:
-        educations = candidate_educations(candidate=candidate)
+def fetch_candidates_info(candidates, fields=None):
+    """
+    Fetch profiles of many candidates. Every requested child table (emails, experiences etc.) is loaded for all
+    candidates with one query and nested children (i.e. bullets of experiences) are eager loaded with one query per
+    table, so number of statements doesn't grow with number of candidates or their children.
+    :type       candidates: list[Candidate]
+    :type       fields: None | str
+    :return:    Candidate dicts in order of given candidates
+    :rtype:     list[dict[str, T]]
+    """
+    get_all_fields = fields is None  # if fields is None, then get ALL the fields
+    requested_fields = [field for field in CANDIDATE_PROFILE_FIELDS if get_all_fields or field in fields]
 
-    skills = None
-    if get_all_fields or 'skills' in fields:
-        skills = candidate_skills(candidate_id=candidate_id)
+    if 'social_networks' in requested_fields and has_request_context() and \
+            Permission.PermissionNames.CAN_GET_CANDIDATE_SOCIAL_PROFILE not in request.user_permissions:
+        raise ForbiddenError("You are not authorized to get social networks of this candidate")
+    if 'contact_history' in requested_fields and has_request_context() and \
+            Permission.PermissionNames.CAN_GET_CANDIDATE_CONTACT_HISTORY not in request.user_permissions:
+        raise ForbiddenError("You are not authorized to get contact history of this candidate")
 
-    areas_of_interest = None
-    if get_all_fields or 'areas_of_interest' in fields:
-        areas_of_interest = candidate_areas_of_interest(candidate_id=candidate_id)
+    candidate_ids = [candidate.id for candidate in candidates]
+    children = {field: CANDIDATE_PROFILE_LOADERS[field](candidate_ids) if candidate_ids else {}
+                for field in requested_fields if field in CANDIDATE_PROFILE_LOADERS}
 
-    military_services = None
-    if get_all_fields or 'military_services' in fields:
-        military_services = candidate_military_services(candidate_id=candidate_id)
+    # Get candidates' source product information
+    source_product_ids = set(candidate.source_product_id for candidate in candidates if candidate.source_product_id)
+    source_products = {product.id: product.to_json()
+                       for product in Product.query.filter(Product.id.in_(source_product_ids))} \
+        if source_product_ids else {}
 
-    custom_fields = None
-    if get_all_fields or 'custom_fields' in fields:
-        custom_fields = candidate_custom_fields(candidate=candidate)
+    return [_candidate_profile(candidate, requested_fields, children, source_products) for candidate in candidates]
 
-    social_networks = None
-    if get_all_fields or 'social_networks' in fields:
-        if (not has_request_context()) or Permission.PermissionNames.CAN_GET_CANDIDATE_SOCIAL_PROFILE in request.user_permissions:
-            social_networks = candidate_social_networks(candidate=candidate)
-        else:
-            raise ForbiddenError("You are not authorized to get social networks of this candidate")
 
-    history = None
-    if get_all_fields or 'contact_history' in fields:
-        if (not has_request_context()) or Permission.PermissionNames.CAN_GET_CANDIDATE_CONTACT_HISTORY in request.user_permissions:
-            history = candidate_contact_history(candidate=candidate)
-        else:
-            raise ForbiddenError("You are not authorized to get contact history of this candidate")
+def _candidate_profile(candidate, requested_fields, children, source_products):
+    """
+    Builds profile of a candidate from children loaded by fetch_candidates_info()
+    :type candidate: Candidate
+    :type requested_fields: list[str]
+    :param dict children: {field: {candidate_id: formatted value of field}}
+    :param dict source_products: {product_id: product dict}
+    :rtype: dict[str, T]
+    """
+    candidate_id = candidate.id
 
-    openweb_id = None
-    if get_all_fields or 'openweb_id' in fields:
-        openweb_id = candidate.dice_social_profile_id
+    def child(field, default):
+        return children[field].get(candidate_id, default) if field in children else None
 
-    dice_profile_id = None
-    if get_all_fields or 'dice_profile_id' in fields:
-        dice_profile_id = candidate.dice_profile_id
+    full_name = None
+    if 'full_name' in requested_fields:
+        full_name = format_candidate_full_name(candidate)
 
-    talent_pool_ids = None
-    if get_all_fields or 'talent_pool_ids' in fields:
-        talent_pool_ids = [talent_pool_candidate.talent_pool_id for talent_pool_candidate in
-                           TalentPoolCandidate.query.filter_by(candidate_id=candidate.id).all()]
+    created_at_datetime = None
+    if 'created_at_datetime' in requested_fields:
+        created_at_datetime = DatetimeUtils.utc_isoformat(candidate.added_time)
 
     resume_url = None
-    if (get_all_fields or 'resume_url' in fields) and candidate.filename:
+    if 'resume_url' in requested_fields and candidate.filename:
         resume_url = get_s3_url(folder_path="OriginalFiles", name=candidate.filename)
 
-    # Get candidate's source product information
-    source_product_info = None
     source_product_id = candidate.source_product_id
-    if source_product_id:
-        source_product = Product.get(source_product_id)
-        source_product_info = source_product.to_json()
     return {
         'id': candidate_id,
         'owner_id': candidate.user_id,
@@ -167,33 +140,47 @@ def fetch_candidate_info(candidate, fields=None):
         'full_name': full_name,
         'created_at_datetime': created_at_datetime,
         'updated_at_datetime': DatetimeUtils.utc_isoformat(candidate.updated_datetime),
-        'emails': emails,
-        'phones': phones,
-        'addresses': addresses,
-        'work_experiences': work_experiences,
-        'work_preference': work_preference,
-        'preferred_locations': preferred_locations,
-        'educations': educations,
-        'skills': skills,
-        'areas_of_interest': areas_of_interest,
-        'military_services': military_services,
-        'custom_fields': custom_fields,
-        'social_networks': social_networks,
-        'contact_history': history,
-        'openweb_id': openweb_id,
-        'dice_profile_id': dice_profile_id,
-        'talent_pool_ids': talent_pool_ids,
+        'emails': child('emails', []),
+        'phones': child('phones', []),
+        'addresses': child('addresses', []),
+        'work_experiences': child('work_experiences', []),
+        'work_preference': child('work_preferences', {}),
+        'preferred_locations': child('preferred_locations', []),
+        'educations': child('educations', []),
+        'skills': child('skills', []),
+        'areas_of_interest': child('areas_of_interest', []),
+        'military_services': child('military_services', []),
+        'custom_fields': child('custom_fields', []),
+        'social_networks': child('social_networks', []),
+        'contact_history': child('contact_history', {'timeline': []}),
+        'openweb_id': candidate.dice_social_profile_id if 'openweb_id' in requested_fields else None,
+        'dice_profile_id': candidate.dice_profile_id if 'dice_profile_id' in requested_fields else None,
+        'talent_pool_ids': child('talent_pool_ids', []),
         'resume_url': resume_url,
         'source_id': candidate.source_id,
         'source_detail': candidate.source_detail,
         'source_product_id': source_product_id,
-        'source_product_info': source_product_info,
+        'source_product_info': source_products.get(source_product_id) if source_product_id else None,
         'summary': candidate.summary,
         'objective': candidate.objective,
         'title': candidate.title
     }
 
 
+def _group_by_candidate(rows, formatter):
+    """
+    Groups rows of a child table by their candidate and formats each group
+    :param rows: Rows having candidate_id, in order they should be returned in
+    :param formatter: Function returning formatted value of a candidate's list of rows
+    :return: {candidate_id: formatted value}
+    :rtype: dict
+    """
+    rows_of_candidates = {}
+    for row in rows:
+        rows_of_candidates.setdefault(row.candidate_id, []).append(row)
+    return {candidate_id: formatter(candidate_rows) for candidate_id, candidate_rows in rows_of_candidates.iteritems()}
+
+
 def format_candidate_full_name(candidate):
     """
     :type candidate:  Candidate
@@ -204,87 +191,92 @@ def format_candidate_full_name(candidate):
     return get_fullname_from_name_fields(first_name or '', middle_name or '', last_name or '')
 
 
-def candidate_emails(candidate):
+def candidate_emails(candidate_ids):
     """
-    :type candidate:    Candidate
-    :rtype              [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
-    assert isinstance(candidate, Candidate)
-    emails = candidate.emails
-    return [{'id': email.id,
-             'label': email.email_label.description,
-             'address': email.address,
-             'is_default': email.is_default
-             } for email in emails]
+    emails = CandidateEmail.query.options(joinedload('email_label')).\
+        filter(CandidateEmail.candidate_id.in_(candidate_ids)).order_by(CandidateEmail.id)
+    return _group_by_candidate(emails, lambda candidate_emails_: [{
+        'id': email.id,
+        'label': email.email_label.description,
+        'address': email.address,
+        'is_default': email.is_default
+    } for email in candidate_emails_])
 
 
-def candidate_phones(candidate):
+def candidate_phones(candidate_ids):
     """
-    :type candidate:    Candidate
-    :rtype              [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
-    assert isinstance(candidate, Candidate)
-    phones = candidate.phones
-    return [{'id': phone.id,
-             'label': phone.phone_label.description,
-             'value': phone.value,
-             'extension': phone.extension,
-             'is_default': phone.is_default
-             } for phone in phones]
+    phones = CandidatePhone.query.options(joinedload('phone_label')).\
+        filter(CandidatePhone.candidate_id.in_(candidate_ids)).order_by(CandidatePhone.id)
+    return _group_by_candidate(phones, lambda candidate_phones_: [{
+        'id': phone.id,
+        'label': phone.phone_label.description,
+        'value': phone.value,
+        'extension': phone.extension,
+        'is_default': phone.is_default
+    } for phone in candidate_phones_])
 
 
-def candidate_addresses(candidate_id):
+def candidate_addresses(candidate_ids):
     """
-    :type candidate_id:     int|long
-    :rtype                  [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
-    assert isinstance(candidate_id, (int, long))
     # Default CandidateAddress must be returned first
-    addresses = CandidateAddress.query.filter_by(candidate_id=candidate_id).order_by(CandidateAddress.is_default.desc())
-    return [{'id': address.id,
-             'address_line_1': address.address_line_1,
-             'address_line_2': address.address_line_2,
-             'city': address.city,
-             'state': address.state,
-             'subdivision': get_subdivision_name(address.iso3166_subdivision) if address.iso3166_subdivision else None,
-             'zip_code': address.zip_code,
-             'po_box': address.po_box,
-             'country': get_country_name(address.iso3166_country),
-             'latitude': address.coordinates and address.coordinates.split(',')[0],
-             'longitude': address.coordinates and address.coordinates.split(',')[1],
-             'is_default': address.is_default
-             } for address in addresses]
-
-
-def candidate_experiences(candidate_id):
-    """
-    :type candidate_id:     int|long
-    :rtype                  [dict]
+    addresses = CandidateAddress.query.filter(CandidateAddress.candidate_id.in_(candidate_ids)).\
+        order_by(CandidateAddress.is_default.desc(), CandidateAddress.id)
+    return _group_by_candidate(addresses, lambda candidate_addresses_: [{
+        'id': address.id,
+        'address_line_1': address.address_line_1,
+        'address_line_2': address.address_line_2,
+        'city': address.city,
+        'state': address.state,
+        'subdivision': get_subdivision_name(address.iso3166_subdivision) if address.iso3166_subdivision else None,
+        'zip_code': address.zip_code,
+        'po_box': address.po_box,
+        'country': get_country_name(address.iso3166_country),
+        'latitude': address.coordinates and address.coordinates.split(',')[0],
+        'longitude': address.coordinates and address.coordinates.split(',')[1],
+        'is_default': address.is_default
+    } for address in candidate_addresses_])
+
+
+def candidate_experiences(candidate_ids):
+    """
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
-    assert isinstance(candidate_id, (int, long))
     # Query CandidateExperience from db in descending order based on start_date & is_current
-    experiences = db.session.query(CandidateExperience).filter_by(candidate_id=candidate_id). \
+    experiences = CandidateExperience.query.options(subqueryload('bullets')).\
+        filter(CandidateExperience.candidate_id.in_(candidate_ids)).\
         order_by(CandidateExperience.is_current.desc(),
                  CandidateExperience.end_year.desc(),
                  CandidateExperience.start_year.desc(),
                  CandidateExperience.end_month.desc(),
                  CandidateExperience.start_month.desc())
-    return [{'id': experience.id,
-             'organization': experience.organization,
-             'position': experience.position,
-             'start_date': date_of_employment(year=experience.start_year, month=experience.start_month or 1),
-             'end_date': date_of_employment(year=experience.end_year, month=experience.end_month or 1),
-             'start_year': experience.start_year,
-             'start_month': experience.start_month,
-             'end_year': experience.end_year,
-             'end_month': experience.end_month,
-             'city': experience.city,
-             'state': experience.state,
-             'subdivision': get_subdivision_name(experience.iso3166_subdivision) if experience.iso3166_subdivision else None,
-             'country': get_country_name(experience.iso3166_country),
-             'is_current': experience.is_current,
-             'bullets': _candidate_experience_bullets(experience=experience),
-             } for experience in experiences]
+    return _group_by_candidate(experiences, lambda candidate_experiences_: [{
+        'id': experience.id,
+        'organization': experience.organization,
+        'position': experience.position,
+        'start_date': date_of_employment(year=experience.start_year, month=experience.start_month or 1),
+        'end_date': date_of_employment(year=experience.end_year, month=experience.end_month or 1),
+        'start_year': experience.start_year,
+        'start_month': experience.start_month,
+        'end_year': experience.end_year,
+        'end_month': experience.end_month,
+        'city': experience.city,
+        'state': experience.state,
+        'subdivision': get_subdivision_name(experience.iso3166_subdivision)
+        if experience.iso3166_subdivision else None,
+        'country': get_country_name(experience.iso3166_country),
+        'is_current': experience.is_current,
+        'bullets': _candidate_experience_bullets(experience=experience),
+    } for experience in candidate_experiences_])
 
 
 def _candidate_experience_bullets(experience):
@@ -300,60 +292,65 @@ def _candidate_experience_bullets(experience):
              } for experience_bullet in experience_bullets]
 
 
-def candidate_work_preference(candidate):
-    """
-    :type candidate:    Candidate
-    :rtype              dict
-    """
-    assert isinstance(candidate, Candidate)
-    work_preference = candidate.work_preferences
-    return {'id': work_preference[0].id,
-            'authorization': work_preference[0].authorization,
-            'employment_type': work_preference[0].tax_terms,
-            'security_clearance': work_preference[0].bool_security_clearance,
-            'relocate': work_preference[0].bool_relocate,
-            'telecommute': work_preference[0].bool_telecommute,
-            'hourly_rate': work_preference[0].hourly_rate,
-            'salary': work_preference[0].salary,
-            'travel_percentage': work_preference[0].travel_percentage,
-            'third_party': work_preference[0].bool_third_party
-            } if work_preference else {}
-
-
-def candidate_preferred_locations(candidate):
-    """
-    :type candidate:    Candidate
-    :rtype              [dict]
-    """
-    assert isinstance(candidate, Candidate)
-    return [{'id': preferred_location.id,
-             'address': preferred_location.address,
-             'city': preferred_location.city,
-             'state': preferred_location.region,
-             'subdivision': get_subdivision_name(preferred_location.iso3166_subdivision)
-             if preferred_location.iso3166_subdivision else None,
-             'country': get_country_name(preferred_location.iso3166_country)
-             } for preferred_location in candidate.preferred_locations]
-
-
-def candidate_educations(candidate):
-    """
-    :type candidate:    Candidate
-    :rtype              [dict]
-    """
-    assert isinstance(candidate, Candidate)
-    educations = candidate.educations
-    return [{'id': education.id,
-             'school_name': education.school_name,
-             'school_type': education.school_type,
-             'is_current': education.is_current,
-             'degrees': _candidate_degrees(education=education),
-             'city': education.city,
-             'state': education.state,
-             'subdivision': get_subdivision_name(education.iso3166_subdivision) if education.iso3166_subdivision else None,
-             'country': get_country_name(education.iso3166_country),
-             'added_time': str(education.added_time)
-             } for education in educations]
+def candidate_work_preference(candidate_ids):
+    """
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, dict]
+    """
+    work_preferences = CandidateWorkPreference.query.\
+        filter(CandidateWorkPreference.candidate_id.in_(candidate_ids)).order_by(CandidateWorkPreference.id)
+    return _group_by_candidate(work_preferences, lambda candidate_work_preferences: {
+        'id': candidate_work_preferences[0].id,
+        'authorization': candidate_work_preferences[0].authorization,
+        'employment_type': candidate_work_preferences[0].tax_terms,
+        'security_clearance': candidate_work_preferences[0].bool_security_clearance,
+        'relocate': candidate_work_preferences[0].bool_relocate,
+        'telecommute': candidate_work_preferences[0].bool_telecommute,
+        'hourly_rate': candidate_work_preferences[0].hourly_rate,
+        'salary': candidate_work_preferences[0].salary,
+        'travel_percentage': candidate_work_preferences[0].travel_percentage,
+        'third_party': candidate_work_preferences[0].bool_third_party
+    })
+
+
+def candidate_preferred_locations(candidate_ids):
+    """
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
+    """
+    preferred_locations = CandidatePreferredLocation.query.\
+        filter(CandidatePreferredLocation.candidate_id.in_(candidate_ids)).order_by(CandidatePreferredLocation.id)
+    return _group_by_candidate(preferred_locations, lambda candidate_preferred_locations_: [{
+        'id': preferred_location.id,
+        'address': preferred_location.address,
+        'city': preferred_location.city,
+        'state': preferred_location.region,
+        'subdivision': get_subdivision_name(preferred_location.iso3166_subdivision)
+        if preferred_location.iso3166_subdivision else None,
+        'country': get_country_name(preferred_location.iso3166_country)
+    } for preferred_location in candidate_preferred_locations_])
+
+
+def candidate_educations(candidate_ids):
+    """
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
+    """
+    educations = CandidateEducation.query.options(subqueryload('degrees').subqueryload('bullets')).\
+        filter(CandidateEducation.candidate_id.in_(candidate_ids)).order_by(CandidateEducation.id)
+    return _group_by_candidate(educations, lambda candidate_educations_: [{
+        'id': education.id,
+        'school_name': education.school_name,
+        'school_type': education.school_type,
+        'is_current': education.is_current,
+        'degrees': _candidate_degrees(education=education),
+        'city': education.city,
+        'state': education.state,
+        'subdivision': get_subdivision_name(education.iso3166_subdivision)
+        if education.iso3166_subdivision else None,
+        'country': get_country_name(education.iso3166_country),
+        'added_time': str(education.added_time)
+    } for education in candidate_educations_])
 
 
 def _candidate_degrees(education):
@@ -391,204 +388,293 @@ def _candidate_degree_bullets(degree):
              } for degree_bullet in degree_bullets]
 
 
-def candidate_skills(candidate_id):
+def candidate_skills(candidate_ids):
     """
-    :type candidate_id: int
-    :rtype              [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
-    assert isinstance(candidate_id, (int, long))
     # Query CandidateSkill in descending order based on last_used
-    skills = db.session.query(CandidateSkill).filter_by(candidate_id=candidate_id).\
-        order_by(CandidateSkill.last_used.desc())
-    return [{'id': skill.id,
-             'name': skill.description,
-             'months_used': skill.total_months,
-             'last_used_date': skill.last_used.isoformat() if skill.last_used else None,
-             'added_time': str(skill.added_time)
-             } for skill in skills]
+    skills = CandidateSkill.query.filter(CandidateSkill.candidate_id.in_(candidate_ids)).\
+        order_by(CandidateSkill.last_used.desc(), CandidateSkill.id)
+    return _group_by_candidate(skills, lambda candidate_skills_: [{
+        'id': skill.id,
+        'name': skill.description,
+        'months_used': skill.total_months,
+        'last_used_date': skill.last_used.isoformat() if skill.last_used else None,
+        'added_time': str(skill.added_time)
+    } for skill in candidate_skills_])
 
 
-def candidate_areas_of_interest(candidate_id):
+def candidate_areas_of_interest(candidate_ids):
     """
-    :type candidate_id: int
-    :rtype              [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
-    assert isinstance(candidate_id, (int, long))
-    areas_of_interest = db.session.query(CandidateAreaOfInterest).filter_by(candidate_id=candidate_id)
-    return [{'id': db.session.query(AreaOfInterest).get(interest.area_of_interest_id).id,
-             'name': db.session.query(AreaOfInterest).get(interest.area_of_interest_id).name
-             } for interest in areas_of_interest]
+    areas_of_interest = db.session.query(CandidateAreaOfInterest.candidate_id, AreaOfInterest.id,
+                                         AreaOfInterest.name).\
+        join(AreaOfInterest, AreaOfInterest.id == CandidateAreaOfInterest.area_of_interest_id).\
+        filter(CandidateAreaOfInterest.candidate_id.in_(candidate_ids))
+    return _group_by_candidate(areas_of_interest, lambda candidate_areas_of_interest_: [{
+        'id': interest.id,
+        'name': interest.name
+    } for interest in candidate_areas_of_interest_])
 
 
-def candidate_military_services(candidate_id):
+def candidate_military_services(candidate_ids):
     """
-    :type candidate_id:  int
-    :rtype              [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
-    assert isinstance(candidate_id, (int, long))
     military_services = CandidateMilitaryService.query.\
-        filter_by(candidate_id=candidate_id).\
-        order_by(CandidateMilitaryService.to_date.desc())
-
-    services = []
-    for service in military_services:
-        # format inputs
-        from_date, to_date = None, None
-        service_from_date = service.from_date
-        service_to_date = service.to_date
-        service_start_year = service.start_year
-        service_start_month = service.start_month
-        service_end_year = service.end_year
-        service_end_month = service.end_month
-
-        from_date_start_year, from_date_start_month = None, None
-        if service_from_date:
-            from_date = str(service_from_date.date())
-            from_date_start_year = service_from_date.year
-            from_date_start_month = service_from_date.month
-
-        to_date_end_year, to_date_end_month = None, None
-        if service_to_date:
-            to_date = str(service_to_date.date())
-            to_date_end_year = service_to_date.year
-            to_date_end_month = service_to_date.month
-
-        start_year = service_start_year or from_date_start_year
-        start_month = service_start_month or from_date_start_month
-        end_year = service_end_year or to_date_end_year
-        end_month = service_end_month or to_date_end_month
-
-        services.append(dict(
-            id=service.id,
-            branch=service.branch,
-            status=service.service_status,
-            highest_grade=service.highest_grade,
-            highest_rank=service.highest_rank,
-            from_date=from_date,
-            to_date=to_date,
-            start_year=start_year,
-            start_month=start_month,
-            end_year=end_year,
-            end_month=end_month,
-            country=get_country_name(service.iso3166_country),
-            comments=service.comments
-        ))
-
-    return services
+        filter(CandidateMilitaryService.candidate_id.in_(candidate_ids)).\
+        order_by(CandidateMilitaryService.to_date.desc(), CandidateMilitaryService.id)
+    return _group_by_candidate(military_services, lambda candidate_military_services_: map(
+        _candidate_military_service, candidate_military_services_))
+
+
+def _candidate_military_service(service):
+    """
+    :type service:  CandidateMilitaryService
+    :rtype          dict
+    """
+    # format inputs
+    from_date, to_date = None, None
+    service_from_date = service.from_date
+    service_to_date = service.to_date
+    service_start_year = service.start_year
+    service_start_month = service.start_month
+    service_end_year = service.end_year
+    service_end_month = service.end_month
+
+    from_date_start_year, from_date_start_month = None, None
+    if service_from_date:
+        from_date = str(service_from_date.date())
+        from_date_start_year = service_from_date.year
+        from_date_start_month = service_from_date.month
+
+    to_date_end_year, to_date_end_month = None, None
+    if service_to_date:
+        to_date = str(service_to_date.date())
+        to_date_end_year = service_to_date.year
+        to_date_end_month = service_to_date.month
+
+    start_year = service_start_year or from_date_start_year
+    start_month = service_start_month or from_date_start_month
+    end_year = service_end_year or to_date_end_year
+    end_month = service_end_month or to_date_end_month
+
+    return dict(
+        id=service.id,
+        branch=service.branch,
+        status=service.service_status,
+        highest_grade=service.highest_grade,
+        highest_rank=service.highest_rank,
+        from_date=from_date,
+        to_date=to_date,
+        start_year=start_year,
+        start_month=start_month,
+        end_year=end_year,
+        end_month=end_month,
+        country=get_country_name(service.iso3166_country),
+        comments=service.comments
+    )
 
 
-def candidate_custom_fields(candidate):
+def candidate_custom_fields(candidate_ids):
     """
-    Function will return custom field information linked to the candidate, which include:
+    Function will return custom field information linked to the candidates, which include:
       - candidate's domain custom field ID
       - candidate's custom field value
       - candidate's domain custom field subcategory
-    :type candidate:    Candidate
-    :rtype              [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
     """
+    # TODO: Product has decided to punt cf-subcategories for later -Amir
+    custom_fields = CandidateCustomField.query.filter(CandidateCustomField.candidate_id.in_(candidate_ids)).\
+        order_by(CandidateCustomField.id)
+    return _group_by_candidate(custom_fields, lambda candidate_custom_fields_: [{
+        'id': candidate_custom_field.id,
+        'custom_field_id': candidate_custom_field.custom_field_id,
+        'value': candidate_custom_field.value,
+        'created_at_datetime': candidate_custom_field.added_time.isoformat(),
+        'custom_field_category_id': candidate_custom_field.custom_field_category_id
+    } for candidate_custom_field in candidate_custom_fields_])
 
-    candidate_custom_fields_data = []
-
-    for candidate_custom_field in CandidateCustomField.query.filter_by(candidate_id=candidate.id):
-        # TODO: Product has decided to punt cf-subcategories for later -Amir
-        # subcategory_id = candidate_custom_field.custom_field_subcategory_id
-        # if subcategory_id:
-        #     sub_cat = CustomFieldSubCategory.get(subcategory_id)  # type: CustomFieldSubCategory
-        #     sub_cat_data = {'id': sub_cat.id, 'name': sub_cat.name}
-        # else:
-        #     sub_cat_data = None
-
-        candidate_custom_fields_data.append(
-            {
-                'id': candidate_custom_field.id,
-                'custom_field_id': candidate_custom_field.custom_field_id,
-                'value': candidate_custom_field.value,
-                'created_at_datetime': candidate_custom_field.added_time.isoformat(),
-                'custom_field_category_id': candidate_custom_field.custom_field_category_id
-                # 'custom_field_subcategory': sub_cat_data
-            }
-        )
 
-    return candidate_custom_fields_data
+def candidate_social_networks(candidate_ids):
+    """
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[dict]]
+    """
+    social_networks = CandidateSocialNetwork.query.options(joinedload('social_network')).\
+        filter(CandidateSocialNetwork.candidate_id.in_(candidate_ids)).order_by(CandidateSocialNetwork.id)
+    return _group_by_candidate(social_networks, lambda candidate_social_networks_: [{
+        'id': soc_net.id,
+        'name': soc_net.social_network.name,
+        'profile_url': soc_net.social_profile_url
+    } for soc_net in candidate_social_networks_])
 
 
-def candidate_social_networks(candidate):
+def candidate_talent_pool_ids(candidate_ids):
     """
-    :type candidate:    Candidate
-    :rtype              [dict]
+    :type candidate_ids:    list[int|long]
+    :rtype                  dict[int|long, list[int|long]]
     """
-    assert isinstance(candidate, Candidate)
-    social_networks = candidate.social_networks
-    return [{'id': soc_net.id,
-             'name': soc_net.social_network.name,
-             'profile_url': soc_net.social_profile_url
-             } for soc_net in social_networks]
+    talent_pool_candidates = db.session.query(TalentPoolCandidate.candidate_id, TalentPoolCandidate.talent_pool_id).\
+        filter(TalentPoolCandidate.candidate_id.in_(candidate_ids)).order_by(TalentPoolCandidate.id)
+    return _group_by_candidate(talent_pool_candidates, lambda candidate_talent_pools: [
+        talent_pool_candidate.talent_pool_id for talent_pool_candidate in candidate_talent_pools])
 
 
 class ContactHistoryEvent(object):
     CREATED_AT = 'created_at'
     EMAIL_SEND = 'email_send'
-    EMAIL_OPEN = 'email_open'  # Todo: Implement opens and clicks into timeline
+    EMAIL_OPEN = 'email_open'
     EMAIL_CLICK = 'email_click'
 
 
-def candidate_contact_history(candidate):
+# Events without datetime are sorted after all others
+NULL_EVENT_DATETIME = datetime.datetime(1000, 1, 1)
+CONTACT_HISTORY_DEFAULT_LIMIT = 20
+CONTACT_HISTORY_MAX_LIMIT = 100
+
+
+def _contact_history_events(candidate_ids):
     """
-    :type candidate:    Candidate
-    :rtype              dict
+    Returns a union of sends of email campaigns to given candidates and of opens & clicks of those sends. Each event
+    is joined to campaign of its own send. Opens (tracking pixel) and clicks (links of text or HTML body) of a send
+    are each reported once, at time of their latest hit.
+    :param list[int | long] candidate_ids: Ids of candidates
+    :rtype: sqlalchemy.sql.expression.Alias
     """
-    # Campaign sends & campaigns
-    timeline = []
-    for email_campaign_send in candidate.email_campaign_sends:
+    sends_with_campaigns = EmailCampaignSend.__table__.join(EmailCampaign.__table__,
+                                                            EmailCampaign.id == EmailCampaignSend.campaign_id)
+    sends = select([EmailCampaignSend.candidate_id.label('candidate_id'),
+                    EmailCampaignSend.id.label('email_campaign_send_id'),
+                    literal(ContactHistoryEvent.EMAIL_SEND).label('event_type'),
+                    EmailCampaignSend.sent_datetime.label('event_datetime'),
+                    EmailCampaign.id.label('email_campaign_id'),
+                    EmailCampaign.name.label('campaign_name')]).\
+        select_from(sends_with_campaigns).where(EmailCampaignSend.candidate_id.in_(candidate_ids))
 
-        if not email_campaign_send.campaign_id:
-            logger.error("contact_history: email_campaign_send has no campaign_id: %s", email_campaign_send.id)
-            continue
+    hit_type = case([(EmailCampaignSendUrlConversion.type == TRACKING_URL_TYPE, ContactHistoryEvent.EMAIL_OPEN)],
+                    else_=ContactHistoryEvent.EMAIL_CLICK)
+    sends_with_hits = sends_with_campaigns.\
+        join(EmailCampaignSendUrlConversion.__table__,
+             EmailCampaignSendUrlConversion.email_campaign_send_id == EmailCampaignSend.id).\
+        join(UrlConversion.__table__, UrlConversion.id == EmailCampaignSendUrlConversion.url_conversion_id)
+    hits = select([EmailCampaignSend.candidate_id, EmailCampaignSend.id, hit_type,
+                   func.max(UrlConversion.last_hit_time), EmailCampaign.id, EmailCampaign.name]).\
+        select_from(sends_with_hits).\
+        where(and_(EmailCampaignSend.candidate_id.in_(candidate_ids), UrlConversion.hit_count > 0)).\
+        group_by(EmailCampaignSend.candidate_id, EmailCampaignSend.id, hit_type, EmailCampaign.id, EmailCampaign.name)
+
+    return union_all(sends, hits).alias('contact_history')
 
-        email_campaign = EmailCampaign.get(email_campaign_send.campaign_id)
-        event_datetime = email_campaign_send.sent_datetime
-        event_type = ContactHistoryEvent.EMAIL_SEND
 
-        timeline.insert(0, dict(id=hashlib.md5('{}{}{}'.format(str(event_datetime), event_type, str(email_campaign.id)))
-                                .hexdigest(),
-                                email_campaign_id=email_campaign.id,
-                                event_datetime=email_campaign_send.sent_datetime,
-                                event_type=ContactHistoryEvent.EMAIL_SEND,
-                                campaign_name=email_campaign.name))
+def _format_contact_history_event(row):
+    event_datetime = row.event_datetime
+    return dict(id=hashlib.md5('{}{}{}'.format(str(event_datetime), row.event_type, str(row.email_campaign_id)))
+                .hexdigest(),
+                email_campaign_id=row.email_campaign_id,
+                campaign_name=row.campaign_name,
+                event_type=row.event_type,
+                event_datetime=event_datetime.isoformat() if event_datetime else None)
 
-    # Get email campaign sends if its url was clicked by the candidate
-    open_email_campaign_sends = EmailCampaignSend.get_candidate_open_email_campaign_send(int(candidate.id))
 
-    for open_email_campaign_send_ in open_email_campaign_sends:
-        # Get email campaign send's url conversion
-        url_conversion_id = EmailCampaignSendUrlConversion.query.filter(
-            EmailCampaignSendUrlConversion.email_campaign_send_id == open_email_campaign_send_.id
-        ).first().url_conversion_id
-        url_conversion = UrlConversion.get(url_conversion_id)
+def _contact_history_sort_key(row):
+    return row.event_datetime or NULL_EVENT_DATETIME, row.email_campaign_send_id, row.event_type
 
-        event_datetime = url_conversion.last_hit_time
-        event_type = ContactHistoryEvent.EMAIL_OPEN
 
-        timeline.append(dict(
-            id=hashlib.md5('{}{}{}'.format(str(event_datetime), event_type, str(email_campaign.id))).hexdigest(),
-            email_campaign_id=email_campaign.id,
-            campaign_name=email_campaign.name,
-            event_type=event_type,
-            event_datetime=event_datetime
-        ))
+def encode_contact_history_cursor(row):
+    """
+    Encodes position of an event in timeline, so next page starts right after it
+    :rtype: str
+    """
+    sort_datetime, send_id, event_type = _contact_history_sort_key(row)
+    # strftime() doesn't support years before 1900 i.e. NULL_EVENT_DATETIME, isoformat() does
+    return base64.urlsafe_b64encode(json.dumps([sort_datetime.replace(microsecond=0).isoformat(), send_id,
+                                                event_type]))
 
-    timeline_with_valid_event_datetime = filter(lambda entry: isinstance(entry['event_datetime'],
-                                                                         datetime.datetime), timeline)
-    timeline_with_null_event_datetime = filter(lambda entry: entry['event_datetime'] is None, timeline)
 
-    # Sort events by datetime and convert all date-times to ISO format
-    timeline = sorted(timeline_with_valid_event_datetime, key=lambda entry: entry['event_datetime'], reverse=True)
-    for event in timeline:
-        event['event_datetime'] = event['event_datetime'].isoformat()
+def decode_contact_history_cursor(cursor):
+    """
+    :param str cursor: Value returned by encode_contact_history_cursor()
+    :return: (sort_datetime, email_campaign_send_id, event_type)
+    :rtype: tuple
+    """
+    try:
+        sort_datetime, send_id, event_type = json.loads(base64.urlsafe_b64decode(str(cursor)))
+        return datetime.datetime.strptime(sort_datetime, '%Y-%m-%dT%H:%M:%S'), int(send_id), str(event_type)
+    except (TypeError, ValueError):
+        raise InvalidUsage('Invalid contact history cursor: %s' % cursor, custom_error.INVALID_INPUT)
 
-    timeline += timeline_with_null_event_datetime
 
-    return dict(timeline=timeline)
+def candidate_contact_history(candidate_id, limit=None, cursor=None):
+    """
+    Returns contact history of a candidate, newest events first and events without datetime in the end.
+    Sends, campaigns and opens & clicks are fetched with a single statement. If limit is given, only that many
+    events after given cursor are returned along with cursor of next page, which is None on last page.
+    :param int | long candidate_id: Id of candidate
+    :param int | None limit: Maximum number of events to return
+    :param str | None cursor: next_cursor of previous page
+    :rtype: dict
+    """
+    events = _contact_history_events([candidate_id])
+    sort_datetime = func.coalesce(events.c.event_datetime, NULL_EVENT_DATETIME)
+    query = select([events]).order_by(sort_datetime.desc(), events.c.email_campaign_send_id.desc(),
+                                      events.c.event_type.desc())
+    if cursor:
+        query = query.where(tuple_(sort_datetime, events.c.email_campaign_send_id, events.c.event_type) <
+                            tuple_(*decode_contact_history_cursor(cursor)))
+    if limit:
+        # One extra event tells if there is a next page
+        query = query.limit(limit + 1)
+    rows = db.session.execute(query).fetchall()
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_contact_history_cursor(rows[-1])
+    return dict(timeline=[_format_contact_history_event(row) for row in rows], next_cursor=next_cursor)
+
+
+def candidate_contact_histories(candidate_ids):
+    """
+    Returns complete contact histories of many candidates with a single statement
+    :param list[int | long] candidate_ids: Ids of candidates
+    :return: {candidate_id: {'timeline': [events]}}
+    :rtype: dict
+    """
+    rows = db.session.execute(select([_contact_history_events(candidate_ids)])).fetchall()
+    rows.sort(key=_contact_history_sort_key, reverse=True)
+    return _group_by_candidate(rows, lambda candidate_rows: dict(
+        timeline=[_format_contact_history_event(row) for row in candidate_rows]))
+
+
+# Fields of candidate profile which can be requested with `fields`, in order they are loaded
+CANDIDATE_PROFILE_FIELDS = ('full_name', 'created_at_datetime', 'emails', 'phones', 'addresses', 'work_experiences',
+                            'work_preferences', 'preferred_locations', 'educations', 'skills', 'areas_of_interest',
+                            'military_services', 'custom_fields', 'social_networks', 'contact_history',
+                            'openweb_id', 'dice_profile_id', 'talent_pool_ids', 'resume_url')
+
+# Loaders of child tables of candidate profile, each loads a field of many candidates with a single query
+CANDIDATE_PROFILE_LOADERS = {
+    'emails': candidate_emails,
+    'phones': candidate_phones,
+    'addresses': candidate_addresses,
+    'work_experiences': candidate_experiences,
+    'work_preferences': candidate_work_preference,
+    'preferred_locations': candidate_preferred_locations,
+    'educations': candidate_educations,
+    'skills': candidate_skills,
+    'areas_of_interest': candidate_areas_of_interest,
+    'military_services': candidate_military_services,
+    'custom_fields': candidate_custom_fields,
+    'social_networks': candidate_social_networks,
+    'contact_history': candidate_contact_histories,
+    'talent_pool_ids': candidate_talent_pool_ids
+}
 
 
 def date_of_employment(year, month, day=1):
@@ -705,6 +791,26 @@ def add_or_update_candidate_subs_preference(candidate_id, frequency_id, is_updat
     db.session.commit()
 
 
+def add_or_update_candidates_subs_preferences(candidate_ids, frequency_id):
+    """
+    Function sets subscription preference of many candidates. Existing preferences are updated with a single
+    UPDATE statement and missing ones are inserted with a single INSERT statement.
+    :type candidate_ids: list
+    :type frequency_id: int|long|None
+    """
+    existing_candidate_ids = set(candidate_id for candidate_id, in db.session.query(
+        CandidateSubscriptionPreference.candidate_id).filter(
+        CandidateSubscriptionPreference.candidate_id.in_(candidate_ids)))
+    if existing_candidate_ids:
+        CandidateSubscriptionPreference.query.filter(
+            CandidateSubscriptionPreference.candidate_id.in_(existing_candidate_ids)).update(
+            dict(frequency_id=frequency_id), synchronize_session=False)
+    db.session.bulk_insert_mappings(CandidateSubscriptionPreference,
+                                    [dict(candidate_id=candidate_id, frequency_id=frequency_id)
+                                     for candidate_id in set(candidate_ids) - existing_candidate_ids])
+    db.session.commit()
+
+
 #######################################
 # Helper Functions For Candidate Photos
 #######################################
@@ -969,14 +1075,8 @@ def create_or_update_candidate_from_params(
                                error_code=custom_error.CANDIDATE_ALREADY_EXISTS,
                                additional_error_info={'id': candidate_id_from_dice_profile})
 
-        # Figure out first_name, last_name, middle_name, and formatted_name from inputs
-        if first_name or last_name or middle_name or formatted_name:
-            if (first_name or last_name) and not formatted_name:
-                # If first_name and last_name given but not formatted_name, guess it
-                formatted_name = get_fullname_from_name_fields(first_name or '', middle_name or '', last_name or '')
-            elif formatted_name and (not first_name or not last_name):
-                # Otherwise, guess formatted_name from the other fields
-                first_name, middle_name, last_name = get_name_fields_from_name(formatted_name)
+        first_name, middle_name, last_name, formatted_name = parse_candidate_names(first_name, middle_name,
+                                                                                  last_name, formatted_name)
 
     # Update is not possible without candidate ID
     if not candidate_id and is_updating:
@@ -1066,6 +1166,22 @@ def create_or_update_candidate_from_params(
     return dict(candidate_id=candidate_id)
 
 
+def parse_candidate_names(first_name, middle_name, last_name, formatted_name):
+    """
+    Function will figure out first_name, middle_name, last_name, and formatted_name of a new candidate from inputs
+    :return: first_name, middle_name, last_name, formatted_name
+    :rtype: tuple
+    """
+    if first_name or last_name or middle_name or formatted_name:
+        if (first_name or last_name) and not formatted_name:
+            # If first_name and last_name given but not formatted_name, guess it
+            formatted_name = get_fullname_from_name_fields(first_name or '', middle_name or '', last_name or '')
+        elif formatted_name and (not first_name or not last_name):
+            # Otherwise, guess formatted_name from the other fields
+            first_name, middle_name, last_name = get_name_fields_from_name(formatted_name)
+    return first_name, middle_name, last_name, formatted_name
+
+
 def get_fullname_from_name_fields(first_name, middle_name, last_name):
     """
     Function will concatenate names if any, otherwise will return empty string
@@ -1524,42 +1640,8 @@ def _add_or_update_work_experiences(candidate, work_experiences, added_time, use
     latest_start_date = max(experience.get('start_year') for experience in work_experiences)
     for work_experience in work_experiences:
 
-        start_year = work_experience.get('start_year')
-
-        # end_year of job must be None if it's candidate's current job
-        is_current, end_year = work_experience.get('is_current'), work_experience.get('end_year')
-        if is_current:
-            end_year = None
-
-        if start_year:
-            # if end_year is not provided, it will be set to current_year assuming it's the most recent job
-            if not end_year and (start_year == latest_start_date):
-                end_year = current_year
-            # if end_year is not provided, and it's not the latest job, end_year will be latest job's start_year + 1
-            elif not end_year and (start_year != latest_start_date):
-                end_year = start_year + 1
-
-        # Start year cannot be greater than end year
-        if (start_year and end_year) and start_year > end_year:
-            raise InvalidUsage('Start year ({}) cannot be greater than end year ({})'.format(start_year, end_year))
-
-        country_code = work_experience['country_code'].upper().strip() if work_experience.get('country_code') else None
-        subdivision_code = work_experience['subdivision_code'].upper().strip() \
-            if work_experience.get('subdivision_code') else None
-        experience_dict = dict(
-            list_order=work_experience.get('list_order') or 1,
-            organization=work_experience['organization'].strip() if work_experience.get('organization') else None,
-            position=work_experience['position'].strip() if work_experience.get('position') else None,
-            city=work_experience['city'].strip() if work_experience.get('city') else None,
-            iso3166_subdivision=subdivision_code,
-            state=(work_experience.get('state') or '').strip(),
-            iso3166_country=country_code,
-            end_month=work_experience.get('end_month') or 1,
-            start_year=start_year,
-            start_month=work_experience.get('start_month') or 1,
-            end_year=end_year,
-            is_current=is_current
-        )
+        experience_dict = format_work_experience(work_experience, latest_start_date, current_year)
+        start_year, end_year = experience_dict['start_year'], experience_dict['end_year']
 
         experience_id = work_experience.get('id')
         if experience_id:  # Update
@@ -1599,11 +1681,7 @@ def _add_or_update_work_experiences(candidate, work_experiences, added_time, use
             experience_bullets = work_experience.get('bullets') or []
             for experience_bullet in remove_duplicates(experience_bullets):
 
-                description = (experience_bullet.get('description') or '').strip()
-                experience_bullet_dict = dict(list_order=experience_bullet.get('list_order'), description=description)
-
-                # Remove keys with None values
-                experience_bullet_dict = purge_dict(experience_bullet_dict)
+                experience_bullet_dict = format_experience_bullet(experience_bullet)
 
                 # Prevent empty data from being inserted into db
                 if not experience_bullet_dict:
@@ -1663,11 +1741,7 @@ def _add_or_update_work_experiences(candidate, work_experiences, added_time, use
             experience_bullets = work_experience.get('bullets') or []
             for experience_bullet in remove_duplicates(experience_bullets):
 
-                description = (experience_bullet.get('description') or '').strip()
-                experience_bullet_dict = dict(list_order=experience_bullet.get('list_order'), description=description)
-
-                # Remove keys with None values
-                experience_bullet_dict = purge_dict(experience_bullet_dict)
+                experience_bullet_dict = format_experience_bullet(experience_bullet)
 
                 # Prevent empty data from being inserted into db
                 if not experience_bullet_dict:
@@ -1685,6 +1759,65 @@ def _add_or_update_work_experiences(candidate, work_experiences, added_time, use
                                     candidate_id=candidate_id, user_id=user_id)
 
 
+def format_work_experience(work_experience, latest_start_date, current_year):
+    """
+    Function will format a work experience provided for CandidateExperience. If end year is missing, it will be
+    assumed from current year for the latest job and from start year for others.
+    :param dict work_experience: Work experience provided by client
+    :param int latest_start_date: Maximum start_year of all provided work experiences
+    :param int current_year: Current year
+    :rtype: dict
+    """
+    start_year = work_experience.get('start_year')
+
+    # end_year of job must be None if it's candidate's current job
+    is_current, end_year = work_experience.get('is_current'), work_experience.get('end_year')
+    if is_current:
+        end_year = None
+
+    if start_year:
+        # if end_year is not provided, it will be set to current_year assuming it's the most recent job
+        if not end_year and (start_year == latest_start_date):
+            end_year = current_year
+        # if end_year is not provided, and it's not the latest job, end_year will be latest job's start_year + 1
+        elif not end_year and (start_year != latest_start_date):
+            end_year = start_year + 1
+
+    # Start year cannot be greater than end year
+    if (start_year and end_year) and start_year > end_year:
+        raise InvalidUsage('Start year ({}) cannot be greater than end year ({})'.format(start_year, end_year))
+
+    country_code = work_experience['country_code'].upper().strip() if work_experience.get('country_code') else None
+    subdivision_code = work_experience['subdivision_code'].upper().strip() \
+        if work_experience.get('subdivision_code') else None
+    return dict(
+        list_order=work_experience.get('list_order') or 1,
+        organization=work_experience['organization'].strip() if work_experience.get('organization') else None,
+        position=work_experience['position'].strip() if work_experience.get('position') else None,
+        city=work_experience['city'].strip() if work_experience.get('city') else None,
+        iso3166_subdivision=subdivision_code,
+        state=(work_experience.get('state') or '').strip(),
+        iso3166_country=country_code,
+        end_month=work_experience.get('end_month') or 1,
+        start_year=start_year,
+        start_month=work_experience.get('start_month') or 1,
+        end_year=end_year,
+        is_current=is_current
+    )
+
+
+def format_experience_bullet(experience_bullet):
+    """
+    Function will format a bullet of work experience, empty values are removed
+    :rtype: dict
+    """
+    description = (experience_bullet.get('description') or '').strip()
+    experience_bullet_dict = dict(list_order=experience_bullet.get('list_order'), description=description)
+
+    # Remove keys with None values
+    return purge_dict(experience_bullet_dict)
+
+
 def _add_or_update_work_preference(candidate_id, work_preference, user_id):
     """
     Function will update CandidateWorkPreference or create a new one.
@@ -1871,26 +2004,8 @@ def _add_or_update_phones(candidate, phones, user_id, is_updating):
             else (phone.get('label') or '').strip().title()
 
         # Format phone number
-        value = (phone.get('value') or '').strip()
-
-        # Phone number must contain at least 7 digits
-        # http://stackoverflow.com/questions/14894899/what-is-the-minimum-length-of-a-valid-international-phone-number
-        number = re.sub('\D', '', value)
-        if len(number) < 7:
-            raise InvalidUsage("Phone number ({}) must be at least 7 digits".format(value), custom_error.INVALID_PHONE)
-
         iso3166_country_code = CachedData.country_codes[0] if CachedData.country_codes else None
-        phone_number_obj = parse_phone_number(value, iso3166_country_code=iso3166_country_code) if value else None
-        """
-        :type phone_number_obj: PhoneNumber
-        """
-
-        # phonenumbers.format() will append "+None" if phone_number_obj.country_code is None
-        if phone_number_obj:
-            if not phone_number_obj.country_code:
-                value = str(phone_number_obj.national_number)
-            else:
-                value = str(phonenumbers.format_number(phone_number_obj, phonenumbers.PhoneNumberFormat.E164))
+        value, extension = format_phone_number(phone.get('value'), iso3166_country_code)
 
         # Phone number must not belong to any other candidate in the same domain
         matching_phone_values = CandidatePhone.search_phone_number_in_user_domain(value, request.user)
@@ -1906,7 +2021,7 @@ def _add_or_update_phones(candidate, phones, user_id, is_updating):
         # if value:
         phone_dict = dict(
             value=value,
-            extension=phone_number_obj.extension if phone_number_obj else None,
+            extension=extension,
             phone_label_id=PhoneLabel.phone_label_id_from_phone_label(phone_label),
             is_default=is_default
         )
@@ -1966,6 +2081,36 @@ def _add_or_update_phones(candidate, phones, user_id, is_updating):
                     db.session.add(CandidatePhone(**phone_dict))
 
 
+def format_phone_number(value, iso3166_country_code=None):
+    """
+    Function will validate a phone number and format it in E164 format if its country is known
+    :type value: basestring | None
+    :param iso3166_country_code: Country code of candidate's address, if any
+    :return: formatted value, extension
+    :rtype: tuple
+    """
+    value = (value or '').strip()
+
+    # Phone number must contain at least 7 digits
+    # http://stackoverflow.com/questions/14894899/what-is-the-minimum-length-of-a-valid-international-phone-number
+    number = re.sub('\D', '', value)
+    if len(number) < 7:
+        raise InvalidUsage("Phone number ({}) must be at least 7 digits".format(value), custom_error.INVALID_PHONE)
+
+    phone_number_obj = parse_phone_number(value, iso3166_country_code=iso3166_country_code) if value else None
+    """
+    :type phone_number_obj: PhoneNumber
+    """
+
+    # phonenumbers.format() will append "+None" if phone_number_obj.country_code is None
+    if phone_number_obj:
+        if not phone_number_obj.country_code:
+            value = str(phone_number_obj.national_number)
+        else:
+            value = str(phonenumbers.format_number(phone_number_obj, phonenumbers.PhoneNumberFormat.E164))
+    return value, phone_number_obj.extension if phone_number_obj else None
+
+
 def _add_or_update_military_services(candidate, military_services, user_id, is_updating):
     """
     Function will update CandidateMilitaryService or create new one(s).
@@ -2095,24 +2240,8 @@ def _add_or_update_skills(candidate, skills, added_time, user_id, is_updating):
     candidate_id = candidate.id
     for skill in remove_duplicates(skills):
 
-        # Convert ISO 8601 date format to datetime object
-        last_used_date = skill.get('last_used_date')
-        if last_used_date:
-            last_used_date = dateutil.parser.parse(skill.get('last_used_date'))
-
         skill_id = skill.get('id')
-        description = skill['name'].strip() if skill.get('name') else None
-
-        # total_months & last_used will only be retrieved if skill-name (description) or skill_id is provided
-        skill_dict = dict(
-            list_order=skill.get('list_order'),
-            description=description,
-            total_months=skill.get('months_used') if (description or skill_id) else None,
-            last_used=last_used_date if (description or skill_id) else None
-        )
-
-        # Remove keys with empty values
-        skill_dict = purge_dict(skill_dict)
+        skill_dict = format_skill(skill)
 
         # Prevent adding records if empty dict
         if not skill_dict:
@@ -2146,6 +2275,31 @@ def _add_or_update_skills(candidate, skills, added_time, user_id, is_updating):
                                 candidate_id=candidate_id, user_id=user_id)
 
 
+def format_skill(skill):
+    """
+    Function will format a skill provided for CandidateSkill, empty values are removed
+    :rtype: dict
+    """
+    # Convert ISO 8601 date format to datetime object
+    last_used_date = skill.get('last_used_date')
+    if last_used_date:
+        last_used_date = dateutil.parser.parse(skill.get('last_used_date'))
+
+    skill_id = skill.get('id')
+    description = skill['name'].strip() if skill.get('name') else None
+
+    # total_months & last_used will only be retrieved if skill-name (description) or skill_id is provided
+    skill_dict = dict(
+        list_order=skill.get('list_order'),
+        description=description,
+        total_months=skill.get('months_used') if (description or skill_id) else None,
+        last_used=last_used_date if (description or skill_id) else None
+    )
+
+    # Remove keys with empty values
+    return purge_dict(skill_dict)
+
+
 def _add_or_update_social_networks(candidate, social_networks, user_id, is_updating):
     """
     Function will update CandidateSocialNetwork or create new one(s).
@@ -2442,7 +2596,6 @@ class CachedData(object):
     Note: Should be cleared when its data is no longer needed
     """
     country_codes = []
-    candidate_emails = []
 
 
 def get_value(dict_item, key, function_name=None, default=None):
@@ -1,5 +1,7 @@
 import math
-import sys
+import itertools
+import Queue
+import threading
 # import operator
 import os
 import time
@@ -8,23 +10,27 @@ import boto
 import boto.exception
 import simplejson
 from sqlalchemy.sql import text
+from array import array
 from copy import deepcopy
+from collections import OrderedDict
 from datetime import datetime
-from flask import request
+from flask import request, Response, stream_with_context
 from flask_sqlalchemy import Model
 from candidate_service.candidate_app import app, celery_app, logger
 from candidate_service.common.utils.timeout import Timeout, TimeoutException
 from candidate_service.common.utils.validators import is_number
 from candidate_service.common.talent_celery import OneTimeSQLConnection
-from candidate_service.common.models.candidate import Candidate, CandidateSource, CandidateStatus
+from candidate_service.common.models.candidate import Candidate, CandidateSource
 from candidate_service.common.models.candidate import CandidateCustomField
 from candidate_service.common.models.misc import CustomFieldCategory
 from candidate_service.common.models.user import User, Domain
 from candidate_service.common.models.tag import Tag
-from candidate_service.common.models.misc import AreaOfInterest
 from candidate_service.common.talent_config_manager import TalentConfigKeys
 from candidate_service.common.error_handling import InternalServerError, InvalidUsage
 from candidate_service.common.geo_services.geo_coordinates import get_geocoordinates_bounding
+from candidate_service.modules.facet_labels import get_facet_info_with_labels
+from candidate_service.modules.search_cache import (get_search_cache_key, get_cached_search_results,
+                                                    cache_search_results, invalidate_search_cache)
 
 API_VERSION = "2013-01-01"
 MYSQL_DATE_FORMAT = '%Y-%m-%dT%H:%i:%S.%fZ'
@@ -439,8 +445,6 @@ def _build_candidate_documents(candidate_ids, domain_id=None):
         # Go through results & build action dicts
         for field_name_to_sql_value in results:
             candidate_id = field_name_to_sql_value['id']
-            
-            action_dict = dict(type='add', id=str(candidate_id))
 
             # Remove keys with empty values
             field_name_to_sql_value = {k: v for k, v in field_name_to_sql_value.items() if v}
@@ -493,80 +497,284 @@ def _build_candidate_documents(candidate_ids, domain_id=None):
                 candidate_source = session.query(CandidateSource).get(source_id)
                 field_name_to_sql_value['source_name'] = candidate_source.description
 
-            # Massage 'field_name_to_sql_value' values into the types they are supposed to be
-            resume_text = ''
-            for field_name in field_name_to_sql_value.keys():
-                index_field_options = INDEX_FIELD_NAME_TO_OPTIONS.get(field_name)
-
-                if field_name == 'phone' and field_name_to_sql_value[field_name]:
-                    # Add Phone numbers in Resume Text
-                    phone_numbers = field_name_to_sql_value[field_name].split(group_concat_separator)
-                    phone_numbers = map(lambda phone_number: re.sub('[^0-9]', '', phone_number), phone_numbers)
-                    resume_text += ' ' + ' '.join(phone_numbers)
-                    del field_name_to_sql_value[field_name]
-                    continue
+            action_dicts.append(_finalize_candidate_document(candidate_id, field_name_to_sql_value,
+                                                             candidate_source.description if candidate_source
+                                                             else None, group_concat_separator))
 
-                if not index_field_options:
-                    logger.error("Unknown field name, could not build document: %s", field_name)
-                    continue
+    return action_dicts
+
+
+def _finalize_candidate_document(candidate_id, field_name_to_sql_value, source_description, group_concat_separator):
+    """
+    Massages raw SQL values of a candidate into the types defined in INDEX_FIELD_NAME_TO_OPTIONS, builds
+    candidate's resume_text and returns the action dict to be sent to CloudSearch.
+    Array fields may either be a string joined with group_concat_separator or a list of values.
+    :param candidate_id: Candidate's ID
+    :param field_name_to_sql_value: Index field name -> SQL value(s) of candidate
+    :param source_description: Description of candidate's source, it's also added to resume_text
+    :param group_concat_separator: Separator used for joining array values
+    :rtype: dict
+    """
+    action_dict = dict(type='add', id=str(candidate_id))
+
+    resume_text = ''
+    for field_name in field_name_to_sql_value.keys():
+        index_field_options = INDEX_FIELD_NAME_TO_OPTIONS.get(field_name)
+
+        if field_name == 'phone' and field_name_to_sql_value[field_name]:
+            # Add Phone numbers in Resume Text
+            phone_numbers = field_name_to_sql_value[field_name]
+            if isinstance(phone_numbers, basestring):
+                phone_numbers = phone_numbers.split(group_concat_separator)
+            phone_numbers = map(lambda phone_number: re.sub('[^0-9]', '', phone_number), phone_numbers)
+            resume_text += ' ' + ' '.join(phone_numbers)
+            del field_name_to_sql_value[field_name]
+            continue
+
+        if not index_field_options:
+            logger.error("Unknown field name, could not build document: %s", field_name)
+            continue
+
+        sql_value = field_name_to_sql_value[field_name]
+        if not sql_value:
+            continue
+
+        if field_name == 'source_id' and source_description:
+            resume_text += (' ' + source_description)
+
+        index_field_type = index_field_options['IndexFieldType']
+        if 'array' in index_field_type:
+            if isinstance(sql_value, basestring):
+                sql_value_array = sql_value.split(group_concat_separator)
+            else:
+                sql_value_array = list(sql_value)
+
+            """
+            For now we are indexing candidate's custom-field-values and candidate's custom-field-categories
+            in custom_field_id_and_value field.
+            If, however, candidate is updated with only cf-categories we will end up with at least one incorrect
+            string-value, such as: "1920|", which should be removed. The correct value(s) will be retained,
+            that is: "1920|cf-category"
+            """
+            sql_value_array = [value for value in sql_value_array
+                               if not isinstance(value, basestring) or value[-1] != '|']
+
+            if index_field_type == 'int-array':
+                # If int-array, turn all values to ints
+                sql_value_array = [int(field_value) for field_value in sql_value_array]
+            field_name_to_sql_value[field_name] = sql_value_array
+
+        if 'literal' in index_field_type:
+            sql_value = field_name_to_sql_value[field_name]
+            if isinstance(sql_value, (list, set, tuple)):
+                if field_name == 'custom_field_id_and_value':
+                    resume_text += ' ' + ' '.join(map(lambda value: value.split('|')[1].strip(), sql_value))
+                else:
+                    resume_text += ' ' + ' '.join(sql_value)
+            else:
+                if field_name == 'custom_field_id_and_value':
+                    resume_text += ' ' + sql_value.split('|')[1].strip()
+                else:
+                    resume_text += ' ' + sql_value
+
+    field_name_to_sql_value['resume_text'] = resume_text.strip()
+    action_dict['fields'] = field_name_to_sql_value
+    return action_dict
+
+
+"""
+Queries used by _build_candidate_documents_bulk(). Every query is executed once per batch of candidates and
+returns candidate's ID as first column followed by one column for each of the given index field names.
+Values are collected (without duplicates) in the order returned by MySQL.
+"""
+BULK_DOCUMENT_CHILD_QUERIES = (
+    (('email',), "SELECT CandidateId, Address FROM candidate_email WHERE CandidateId IN :candidate_ids"),
+    (('phone',), "SELECT CandidateId, Value FROM candidate_phone WHERE CandidateId IN :candidate_ids"),
+    (('talent_pools',), "SELECT candidate_id, talent_pool_id FROM talent_pool_candidate "
+                        "WHERE candidate_id IN :candidate_ids"),
+    (('dumb_lists',), "SELECT candidateId, smartlistId FROM smart_list_candidate WHERE candidateId IN :candidate_ids"),
+    (('added_talent_pipelines',), "SELECT candidate_id, talent_pipeline_id FROM talent_pipeline_included_candidates "
+                                  "WHERE candidate_id IN :candidate_ids"),
+    (('removed_talent_pipelines',), "SELECT candidate_id, talent_pipeline_id FROM talent_pipeline_excluded_candidates "
+                                    "WHERE candidate_id IN :candidate_ids"),
+    (('area_of_interest_id',), "SELECT candidateId, areaOfInterestId FROM candidate_area_of_interest "
+                               "WHERE candidateId IN :candidate_ids"),
+    (('custom_field_id_and_value',), "SELECT candidateId, CONCAT(customFieldId, '|', value) "
+                                     "FROM candidate_custom_field WHERE candidateId IN :candidate_ids"),
+    (('military_highest_grade', 'military_service_status', 'military_branch', 'military_end_date'),
+     "SELECT candidateId, highestGrade, serviceStatus, branch, DATE_FORMAT(toDate, :date_format) "
+     "FROM candidate_military_service WHERE candidateId IN :candidate_ids"),
+    (('organization', 'position'), "SELECT candidateId, organization, position FROM candidate_experience "
+                                   "WHERE candidateId IN :candidate_ids "
+                                   "ORDER BY IsCurrent DESC, StartYear DESC, StartMonth DESC"),
+    (('experience_description',), "SELECT candidate_experience.candidateId, candidate_experience_bullet.description "
+                                  "FROM candidate_experience_bullet JOIN candidate_experience ON "
+                                  "(candidate_experience.id = candidate_experience_bullet.candidateExperienceId) "
+                                  "WHERE candidate_experience.candidateId IN :candidate_ids"),
+    (('school_name',), "SELECT candidateId, schoolName FROM candidate_education WHERE candidateId IN :candidate_ids"),
+    (('degree_type', 'degree_title', 'degree_end_date'),
+     "SELECT candidate_education.candidateId, candidate_education_degree.degreeType, "
+     "candidate_education_degree.degreeTitle, DATE_FORMAT(candidate_education_degree.endTime, :date_format) "
+     "FROM candidate_education_degree JOIN candidate_education ON "
+     "(candidate_education.id = candidate_education_degree.candidateEducationId) "
+     "WHERE candidate_education.candidateId IN :candidate_ids"),
+    (('concentration_type',), "SELECT candidate_education.candidateId, candidate_education_degree_bullet.concentrationType "
+                              "FROM candidate_education_degree_bullet JOIN candidate_education_degree ON "
+                              "(candidate_education_degree.id = "
+                              "candidate_education_degree_bullet.candidateEducationDegreeId) "
+                              "JOIN candidate_education ON "
+                              "(candidate_education.id = candidate_education_degree.candidateEducationId) "
+                              "WHERE candidate_education.candidateId IN :candidate_ids"),
+    (('skill_description',), "SELECT candidateId, description FROM candidate_skill WHERE candidateId IN :candidate_ids"),
+    (('unidentified_description',), "SELECT candidateId, description FROM candidate_unidentified "
+                                    "WHERE candidateId IN :candidate_ids"),
+    (('candidate_rating_id_and_value',), "SELECT candidateId, CONCAT(ratingTagId, '|', value) FROM candidate_rating "
+                                         "WHERE candidateId IN :candidate_ids"),
+    (('text_comment',), "SELECT candidateId, comment FROM candidate_text_comment WHERE candidateId IN :candidate_ids"),
+    (('tag_ids', 'tags'), "SELECT candidate_tag.candidate_id, candidate_tag.tag_id, tag.name FROM candidate_tag "
+                          "LEFT JOIN tag ON (tag.id = candidate_tag.tag_id) "
+                          "WHERE candidate_tag.candidate_id IN :candidate_ids ORDER BY tag.id"),
+    # Custom field categories are indexed as "custom_field.id|custom_field_category.name"
+    (('custom_field_id_and_value',), "SELECT candidate_custom_field.candidateId, "
+                                     "CONCAT(custom_field_category.custom_field_id, '|', custom_field_category.name) "
+                                     "FROM candidate_custom_field JOIN custom_field_category ON "
+                                     "(custom_field_category.id = candidate_custom_field.custom_field_category_id) "
+                                     "WHERE candidate_custom_field.candidateId IN :candidate_ids")
+)
+
+
+def _build_candidate_documents_bulk(candidate_ids, domain_id=None):
+    """
+    Set-based version of _build_candidate_documents().
+    Instead of joining all child tables into one GROUP_CONCAT query and querying custom field categories, tags,
+    sources & users for every candidate, it fetches every child table once for the whole batch (keyed by candidate's
+    ID) and assembles the documents in memory.
+    Returns dicts like: {type="add", id="{candidate_id}", fields={dict of fields to values}}
+    :param list[int] candidate_ids: IDs of candidates
+    :param int | None domain_id: Domain ID of candidates, if not provided, it will be taken from candidate's owner
+    :rtype: list[dict]
+    """
+    if not candidate_ids:
+        logger.warn("Attempted to build candidate documents when candidate_ids=%s", candidate_ids)
+        return []
+    group_concat_separator = '~~~'
+
+    candidates_query = """
+    SELECT      candidate.id AS `id`, candidate.firstName AS `first_name`, candidate.lastName AS `last_name`,
+                candidate.statusId AS `status_id`, DATE_FORMAT(candidate.addedTime, :date_format) AS `added_time`,
+                candidate.ownerUserId AS `user_id`, candidate.objective AS `objective`,
+                candidate.is_archived AS `is_archived`, candidate.source_detail AS `source_details`,
+                HOUR(candidate.addedTime) AS `added_time_hour`, candidate.sourceId AS `source_id`,
+                candidate.sourceProductId AS `source_product_id`, candidate.totalMonthsExperience AS
+                `total_months_experience`, candidate.title AS `title`,
+                candidate_source.description AS `source_name`, `user`.domainId AS `domain_id`
+    FROM        candidate
+    LEFT JOIN   candidate_source ON (candidate.sourceId = candidate_source.id)
+    LEFT JOIN   `user` ON (candidate.ownerUserId = `user`.id)
+    WHERE       candidate.id IN :candidate_ids
+    """
+
+    # Only first address of candidate is indexed
+    address_query = """
+    SELECT      candidateId, city, state, zipCode, coordinates FROM candidate_address
+    WHERE       candidateId IN :candidate_ids ORDER BY id
+    """
+
+    start_date_at_current_job_query = """
+    SELECT      candidateId, DATE_FORMAT(MIN(DATE_ADD(MAKEDATE((CASE WHEN StartYear THEN StartYear ELSE YEAR(CURDATE()) END), 1),
+                INTERVAL (CASE WHEN StartMonth THEN StartMonth ELSE MONTH(CURDATE()) END)-1 MONTH)), :date_format)
+    FROM        candidate_experience
+    WHERE       candidateId IN :candidate_ids AND IsCurrent = 1
+    GROUP BY    candidateId
+    """
 
-                sql_value = field_name_to_sql_value[field_name]
-                if not sql_value:
+    engagement_query = """
+    SELECT      DISTINCT CandidateId FROM email_campaign_send WHERE CandidateId IN :candidate_ids
+    """
+
+    action_dicts = []
+    candidate_ids = tuple(candidate_ids)
+    with OneTimeSQLConnection(app) as session:
+        connection = session.connection()
+
+        documents = OrderedDict()
+        for row in connection.execute(text(candidates_query), candidate_ids=candidate_ids,
+                                      date_format=MYSQL_DATE_FORMAT):
+            documents[row['id']] = dict(row.items())
+
+        for candidate_id, city, state, zip_code, coordinates_ in connection.execute(text(address_query),
+                                                                                   candidate_ids=candidate_ids):
+            document = documents.get(candidate_id)
+            if document is not None and 'city' not in document:
+                document.update(city=city, state=state, zip_code=zip_code, coordinates=coordinates_)
+
+        for candidate_id, start_date in connection.execute(text(start_date_at_current_job_query),
+                                                           candidate_ids=candidate_ids, date_format=MYSQL_DATE_FORMAT):
+            if candidate_id in documents:
+                documents[candidate_id]['start_date_at_current_job'] = start_date
+
+        # Collect array fields of all candidates, every child table is read only once
+        for field_names, sql_query in BULK_DOCUMENT_CHILD_QUERIES:
+            results = connection.execute(text(sql_query), candidate_ids=candidate_ids, date_format=MYSQL_DATE_FORMAT)
+            for row in results:
+                document = documents.get(row[0])
+                if document is None:
                     continue
+                for field_name, value in zip(field_names, row[1:]):
+                    if value is None or value == '':
+                        continue
+                    values = document.setdefault(field_name, [])
+                    if value not in values:
+                        values.append(value)
+
+        engaged_candidate_ids = {row[0] for row in connection.execute(text(engagement_query),
+                                                                     candidate_ids=candidate_ids)}
+
+    for candidate_id, field_name_to_sql_value in documents.iteritems():
+        if domain_id:
+            field_name_to_sql_value['domain_id'] = domain_id
+
+        # Remove keys with empty values
+        field_name_to_sql_value = {k: v for k, v in field_name_to_sql_value.items() if v}
 
-                if field_name == 'source_id' and candidate_source:
-                    resume_text += (' ' + candidate_source.description)
-
-                index_field_type = index_field_options['IndexFieldType']
-                if 'array' in index_field_type:
-                    sql_value_array = sql_value.split(group_concat_separator)
-
-                    """
-                    For now we are indexing candidate's custom-field-values and candidate's custom-field-categories
-                    in custom_field_id_and_value field.
-                    If, however, candidate is updated with only cf-categories we will end up with at least one incorrect
-                    string-value, such as: "1920|", which should be removed. The correct value(s) will be retained,
-                    that is: "1920|cf-category"
-                    """
-                    sql_value_array = [string_value for string_value in sql_value_array if string_value[-1] != '|']
-
-                    if index_field_type == 'int-array':
-                        # If int-array, turn all values to ints
-                        sql_value_array = [int(field_value) for field_value in sql_value_array]
-                    field_name_to_sql_value[field_name] = sql_value_array
-
-                if 'literal' in index_field_type:
-                    sql_value = field_name_to_sql_value[field_name]
-                    if isinstance(sql_value, (list, set, tuple)):
-                        if field_name == 'custom_field_id_and_value':
-                            resume_text += ' ' + ' '.join(map(lambda value: value.split('|')[1].strip(), sql_value))
-                        else:
-                            resume_text += ' ' + ' '.join(sql_value)
-                    else:
-                        if field_name == 'custom_field_id_and_value':
-                            resume_text += ' ' + sql_value.split('|')[1].strip()
-                        else:
-                            resume_text += ' ' + sql_value
-
-            field_name_to_sql_value['resume_text'] = resume_text.strip()
-            action_dict['fields'] = field_name_to_sql_value
-            action_dicts.append(action_dict)
+        # Set candidate engagement score
+        field_name_to_sql_value['candidate_engagement_score'] = 1.0 if candidate_id in engaged_candidate_ids else 0.0
 
+        action_dicts.append(_finalize_candidate_document(candidate_id, field_name_to_sql_value,
+                                                         field_name_to_sql_value.get('source_name'),
+                                                         group_concat_separator))
     return action_dicts
 
 
+"""
+Builders which can be used for generating candidate documents in upload_candidate_documents()
+"""
+DOCUMENT_BUILDER_JOIN = 'join'
+DOCUMENT_BUILDER_BULK = 'bulk'
+DOCUMENT_BUILDERS = {
+    DOCUMENT_BUILDER_JOIN: _build_candidate_documents,
+    DOCUMENT_BUILDER_BULK: _build_candidate_documents_bulk
+}
+
+
 @celery_app.task()
-def upload_candidate_documents(candidate_ids, domain_id=None, max_number_of_candidate=10):
+def upload_candidate_documents(candidate_ids, domain_id=None, max_number_of_candidate=10,
+                               document_builder=DOCUMENT_BUILDER_JOIN):
     """
     Upload all the candidate documents to cloud search
     :param candidate_ids: id of candidates for documents to be uploaded
     :param domain_id: Domain Id
     :param max_number_of_candidate: Default value is 10
+    :param document_builder: Name of builder (one of DOCUMENT_BUILDERS) used for generating candidate documents
     :return:
     """
     if isinstance(candidate_ids, (int, long)):
         candidate_ids = [candidate_ids]
 
+    if document_builder not in DOCUMENT_BUILDERS:
+        raise InvalidUsage("Invalid document builder: %s" % document_builder)
+    build_candidate_documents = DOCUMENT_BUILDERS[document_builder]
+
     for i in xrange(0, len(candidate_ids), max_number_of_candidate):
         try:
             logger.info("Uploading %s candidate documents (%s). Generating action dicts...",
@@ -575,7 +783,7 @@ def upload_candidate_documents(candidate_ids, domain_id=None, max_number_of_cand
 
             with Timeout(seconds=120):
                 # If _build_candidate_documents take more than 120 seconds Timeout will raise an exception
-                action_dicts = _build_candidate_documents(candidate_ids[i:i + max_number_of_candidate], domain_id)
+                action_dicts = build_candidate_documents(candidate_ids[i:i + max_number_of_candidate], domain_id)
 
             logger.info("Action dicts generated (took %ss). Sending %s action dicts", time.time() - start_time,
                         len(action_dicts))
@@ -593,16 +801,13 @@ def upload_candidate_documents(candidate_ids, domain_id=None, max_number_of_cand
 
 def upload_candidate_documents_in_domain(domain_id):
     """
-    Upload all the candidates from given domain to cloudsearch
+    Upload all the candidates from given domain to cloudsearch.
+    Candidates are streamed & uploaded in parallel batches, see cloudsearch_reindex.start_domain_reindex()
     :param domain_id: Domain id of which all the candidates needs to be uploaded to cloudsearch
-    :return: count of total uploaded candidates
+    :return: progress of domain's re-index
     """
-
-    candidates = Candidate.query.with_entities(Candidate.id).join(User).filter(Candidate.user_id == User.id,
-                                                                               User.domain_id == domain_id).all()
-    candidate_ids = [candidate.id for candidate in candidates]
-    logger.info("Uploading %s candidates of domain id %s", len(candidate_ids), domain_id)
-    return upload_candidate_documents.delay(candidate_ids, domain_id, 10)
+    from candidate_service.modules.cloudsearch_reindex import start_domain_reindex
+    return start_domain_reindex(domain_id)
 
 
 def upload_candidate_documents_of_user(user_id):
@@ -629,8 +834,13 @@ def upload_all_candidate_documents():
         upload_candidate_documents_in_domain(domain.id)
 
 
-def delete_candidate_documents(candidate_ids):
-    """Delete specified candidate's documents from cloudsearch"""
+def delete_candidate_documents(candidate_ids, domain_id=None):
+    """
+    Delete specified candidate's documents from cloudsearch
+    :param candidate_ids: IDs of candidates
+    :param domain_id: Domain ID of candidates, used for invalidating cached search results of the domain only.
+                      If not provided, cached search results of all domains are invalidated
+    """
     if isinstance(candidate_ids, int):
         candidate_ids = [candidate_ids]
     action_dicts = [dict(type='delete', id=candidate_id) for candidate_id in candidate_ids]
@@ -638,6 +848,7 @@ def delete_candidate_documents(candidate_ids):
     if adds:
         logger.error("Shouldn't have gotten any adds in a batch delete operation.Got %s adds.candidate_ids: %s", adds,
                      candidate_ids)
+    invalidate_search_cache([domain_id] if domain_id else None)
     return deletes
 
 
@@ -681,6 +892,8 @@ def delete_all_candidate_documents():
 
 def _send_batch_request(action_dicts):
     adds, deletes = 0, 0
+    # Domains whose cached search results become stale with these documents
+    domain_ids = set()
     get_cloud_search_connection()
     import boto.cloudsearch2.document
     document_service_connection = boto.cloudsearch2.document.DocumentServiceConnection(domain=_cloud_search_domain)
@@ -706,6 +919,8 @@ def _send_batch_request(action_dicts):
                 max_possible_request_size_bytes += 30  # approx. delete dict size
             else:
                 document_service_connection.add(action_dict['id'], fields=action_dict['fields'])
+                if action_dict['fields'].get('domain_id'):
+                    domain_ids.add(action_dict['fields']['domain_id'])
                 max_possible_request_size_bytes += 40 + len(action_dict_json)  # approx. add dict size
 
         if (len(action_dicts) == i + 1) or \
@@ -728,6 +943,8 @@ def _send_batch_request(action_dicts):
                 adds += result.adds
                 deletes += result.deletes
 
+    if domain_ids:
+        invalidate_search_cache(domain_ids)
     return adds, deletes
 
 
@@ -746,7 +963,8 @@ def search_candidates(domain_id, request_vars, facets="", search_limit=15, count
     :param search_limit: Defaults to 15,
     :param facets: Facets String
     :param count_only: Candidate Count only or data too
-    :return: Search results in format described on `search service` apiary document.
+    :return: Search results in format described on `search service` apiary document. If search_limit is
+             CLOUD_SEARCH_MAX_LIMIT or more, a streamed JSON response of all candidate ids is returned instead.
 
     Set search_limit = 0 for no limit, candidate_ids_only returns dict of candidate_ids.
     Parameters in 'request_vars' could be single values or arrays.
@@ -959,10 +1177,16 @@ def search_candidates(domain_id, request_vars, facets="", search_limit=15, count
 
     # Max cloud_search search limit, then implement cursor (paging beyond 10000 limit)
     if search_limit >= CLOUD_SEARCH_MAX_LIMIT:
-        candidate_ids, total_found, error = _cloud_search_fetch_all(params)
-        if error:
+        candidate_ids_json = _stream_candidate_ids_json(params)
+        if candidate_ids_json is None:
             return search_results
-        return dict(total_found=total_found, candidate_ids=candidate_ids)
+        return Response(stream_with_context(candidate_ids_json), mimetype='application/json')
+
+    # Serve repeated searches from cache, key is built before params are modified by _get_max_score()
+    cache_key = get_search_cache_key(domain_id, params, count_only)
+    cached_search_results = get_cached_search_results(cache_key)
+    if cached_search_results is not None:
+        return cached_search_results
 
     # Make search request with error handling
     search_service = _cloud_search_domain_connection()
@@ -980,14 +1204,17 @@ def search_candidates(domain_id, request_vars, facets="", search_limit=15, count
     total_found = results['hits']['found']
 
     if count_only:
-        return dict(total_found=total_found, candidate_ids=[], facets={
+        count_results = dict(total_found=total_found, candidate_ids=[], facets={
             'added_time_hour': get_added_time_hour_facet_count(results.get('facets').get('added_time_hour').get('buckets'))})
+        cache_search_results(cache_key, count_results)
+        return count_results
 
-    facets = get_faceting_information(results.get('facets', {}))
+    facets = get_faceting_information(domain_id, results.get('facets', {}))
 
     # Update facets
     if total_found > 0:
-        _update_facet_counts(filter_queries_list, params['filter_query'], facets, search_query, request_facets)
+        _update_facet_counts(domain_id, filter_queries_list, params['filter_query'], facets, search_query,
+                             request_facets)
 
     # for facet_field_name, facet_dict in facets.iteritems():
     #     facets[facet_field_name] = sorted(facet_dict.iteritems(), key=operator.itemgetter(1), reverse=True)
@@ -1006,6 +1233,7 @@ def search_candidates(domain_id, request_vars, facets="", search_limit=15, count
     search_results['facets'] = facets
     if 'cursor' in results['hits']:
         search_results['cursor'] = results['hits']['cursor']
+    cache_search_results(cache_key, search_results)
     # for values in search_results['candidates']:
     #     if 'email' in values:
     #         values['email'] = {"address": values['email']}
@@ -1014,7 +1242,7 @@ def search_candidates(domain_id, request_vars, facets="", search_limit=15, count
 
 
 # Get the facet information from database with given ids
-def get_faceting_information(facets):
+def get_faceting_information(domain_id, facets):
 
     if not facets:
         return dict()
@@ -1042,19 +1270,19 @@ def get_faceting_information(facets):
     facet_tag_ids = facets.get('tag_ids', {}).get('buckets')
 
     if facet_owner:
-        search_facets_values['username'] = get_username_facet_info_with_ids(facet_owner)
+        search_facets_values['username'] = get_facet_info_with_labels(domain_id, 'username', facet_owner)
 
     if facet_aoi:
-        search_facets_values['area_of_interest'] = get_facet_info_with_ids(AreaOfInterest, facet_aoi, 'name')
+        search_facets_values['area_of_interest'] = get_facet_info_with_labels(domain_id, 'area_of_interest', facet_aoi)
 
     if facet_source:
-        search_facets_values['source'] = get_facet_info_with_ids(CandidateSource, facet_source, 'description')
+        search_facets_values['source'] = get_facet_info_with_labels(domain_id, 'source', facet_source)
 
     if facet_source_details:
         search_facets_values['source_details'] = get_bucket_facet_value_count(facet_source_details)
 
     if facet_status:
-        search_facets_values['status'] = get_facet_info_with_ids(CandidateStatus, facet_status, 'description')
+        search_facets_values['status'] = get_facet_info_with_labels(domain_id, 'status', facet_status)
 
     if facet_skills:
         search_facets_values['skills'] = get_bucket_facet_value_count(facet_skills)
@@ -1091,7 +1319,7 @@ def get_faceting_information(facets):
         search_facets_values['total_months_experience'] = get_bucket_facet_value_count(facet_total_months_experience)
 
     if facet_tag_ids:
-        search_facets_values['tags'] = get_facet_info_with_ids(Tag, facet_tag_ids, 'name')
+        search_facets_values['tags'] = get_facet_info_with_labels(domain_id, 'tags', facet_tag_ids)
 
     # TODO: productFacet, customFieldKP facets are remaining, how to do it?
     if facet_custom_field_id_and_value:
@@ -1101,43 +1329,6 @@ def get_faceting_information(facets):
     return search_facets_values
 
 
-def get_username_facet_info_with_ids(facet_owner):
-    tmp_dict = get_facet_info_with_ids(User, facet_owner, 'email')
-    # Dict is (email, value) -> count
-    username_facets = []
-    # Replace each user's email with name
-    for username_facet in tmp_dict:
-        new_tmp_dict = {}
-        user_row = User.query.filter_by(email=username_facet['value']).first()
-        new_tmp_dict['id'] = username_facet['id']
-        new_tmp_dict['value'] = (user_row.first_name or "") + " " + (user_row.last_name or "")
-        new_tmp_dict['count'] = username_facet['count']
-        username_facets.append(new_tmp_dict)
-    return username_facets
-
-
-def get_facet_info_with_ids(table_name, facet, field_name):
-    """
-    Few facets are filtering using ids, for those facets with ids, get their names (from db) for displaying on html
-    also send ids so as to ease search with filter queries,
-    returned ids will serve as values to checkboxes.
-    :type table_name: Model
-    :param facet: Facet as received from cloudsearch (bucket value contains id of facet)
-    :param field_name: Name which is to be returned for UI. This is name of field from table
-    :return: Dictionary with field name as key and count of candidates + facet id as value
-    """
-    facets_list = []
-    for bucket in facet:
-        tmp_dict = {}
-        row = table_name.query.filter_by(id=int(bucket['value'])).first()
-        if row:
-            tmp_dict['id'] = bucket['value']
-            tmp_dict['value'] = getattr(row, field_name)
-            tmp_dict['count'] = bucket['count']
-            facets_list.append(tmp_dict)
-    return facets_list
-
-
 def get_bucket_facet_value_count(facet):
     """
     This function is specifically for those facets which are having proper values not ids(which need database query)
@@ -1163,7 +1354,7 @@ def get_added_time_hour_facet_count(facet):
     return facet_bucket
 
 
-def _update_facet_counts(filter_queries, params_fq, existing_facets, query_string, facets_input):
+def _update_facet_counts(domain_id, filter_queries, params_fq, existing_facets, query_string, facets_input):
     """
     For multi-select facets, return facet count and values based on filter queries
     If a filter query has parameter 'X' included and we want facet counts for that parameter too, in that case
@@ -1210,7 +1401,7 @@ def _update_facet_counts(filter_queries, params_fq, existing_facets, query_strin
                                'facet': "{user_id: {size:%s}}" % facet_size}
         result_user_id_facet = search_service.search(**query_user_id_facet)
         facet_owner = result_user_id_facet['facets']['user_id']['buckets']
-        existing_facets['username'] = get_username_facet_info_with_ids(facet_owner)
+        existing_facets['username'] = get_facet_info_with_labels(domain_id, 'username', facet_owner)
 
     if aoi_filter_queries and 'area_of_interest_id' in facets_input:
         for aoi_filter_query in aoi_filter_queries:
@@ -1223,7 +1414,7 @@ def _update_facet_counts(filter_queries, params_fq, existing_facets, query_strin
                                         'ret': '_no_fields', 'facet': "{area_of_interest_id: {size:%s}}" % facet_size}
         result_area_of_interest_facet = search_service.search(**query_area_of_interest_facet)
         facet_aoi = result_area_of_interest_facet['facets']['area_of_interest_id']['buckets']
-        existing_facets['area_of_interest'] = get_facet_info_with_ids(AreaOfInterest, facet_aoi, 'name')
+        existing_facets['area_of_interest'] = get_facet_info_with_labels(domain_id, 'area_of_interest', facet_aoi)
 
     if source_filter_queries and 'source_id' in facets_input:
         for source_filter_query in source_filter_queries:
@@ -1236,7 +1427,7 @@ def _update_facet_counts(filter_queries, params_fq, existing_facets, query_strin
                                  'facet': "{source_id: {size:%s}}" % facet_size}
         result_source_id_facet = search_service.search(**query_source_id_facet)
         facet_source = result_source_id_facet['facets']['source_id']['buckets']
-        existing_facets['source'] = get_facet_info_with_ids(CandidateSource, facet_source, 'description')
+        existing_facets['source'] = get_facet_info_with_labels(domain_id, 'source', facet_source)
 
     if school_filter_queries and 'school_name' in facets_input:
         for school_filter_query in school_filter_queries:
@@ -1265,40 +1456,132 @@ def _update_facet_counts(filter_queries, params_fq, existing_facets, query_strin
         existing_facets['degree_type'] = get_bucket_facet_value_count(facet_degree_type)
 
 
-def _cloud_search_fetch_all(params):
-    """ Fetches all candidates from cloudsearch using cursor i.e. when search is more than 10000 candidates
+class CandidateIdScanner(object):
+    """
+    Streams ids of all candidates matching a search, i.e. when search is more than 10000 candidates.
+    Pages are fetched with CloudSearch cursor without any document fields. Next page is fetched in a background
+    thread while caller consumes current one, and every page is kept as compact array of ints, so ids can be streamed
+    into a send pipeline without holding whole result in memory.
+        scanner = CandidateIdScanner(params)
+        for candidate_id in scanner:
+            ...
+        scanner.total_found  # Available once first page has arrived
+    """
+    # Seconds to wait for a page before checking whether consumer has stopped iterating
+    QUEUE_POLL_SECONDS = 1
+
+    def __init__(self, params, page_size=CLOUD_SEARCH_MAX_LIMIT, prefetch_pages=1):
+        """
+        :param dict params: CloudSearch search params
+        :param int page_size: Number of ids per request, can't be more than CLOUD_SEARCH_MAX_LIMIT
+        :param int prefetch_pages: Number of pages fetched ahead of caller
+        """
+        self.params = dict(params, cursor='initial', ret='_no_fields', size=min(page_size, CLOUD_SEARCH_MAX_LIMIT))
+        # Start produces error with cursor
+        self.params.pop('start', None)
+        self.params.pop('facet', None)
+        self.prefetch_pages = prefetch_pages
+        self.total_found = None
+
+    def pages(self):
+        """
+        Generator of pages of candidate ids, each page is an array('l')
+        """
+        pages_queue = Queue.Queue(maxsize=self.prefetch_pages)
+        stopped = threading.Event()
+        fetcher = threading.Thread(target=self._fetch_pages, args=(pages_queue, stopped))
+        fetcher.daemon = True
+        fetcher.start()
+        try:
+            while True:
+                page = pages_queue.get()
+                if page is None:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+                yield page
+        finally:
+            # Caller may stop iterating early, let fetcher thread exit
+            stopped.set()
+
+    def __iter__(self):
+        for page in self.pages():
+            for candidate_id in page:
+                yield candidate_id
+
+    def _fetch_pages(self, pages_queue, stopped):
+        """
+        Runs in background thread, puts pages in queue followed by None when all ids have been fetched
+        """
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    pages_queue.put(item, timeout=self.QUEUE_POLL_SECONDS)
+                    return True
+                except Queue.Full:
+                    pass
+            return False
+
+        params = dict(self.params)
+        fetched = 0
+        try:
+            search_service = _cloud_search_domain_connection()
+            while True:
+                results = search_service.search(**params)
+                self.total_found = results['hits']['found']
+                page = array('l', (int(match['id']) for match in results['hits']['hit']))
+                fetched += len(page)
+                if page and not put(page):
+                    return
+                if not page or fetched >= self.total_found:
+                    break
+                params['cursor'] = results['hits']['cursor']
+        except Exception as error:
+            logger.exception("CandidateIdScanner: Error while fetching candidate ids. Search params: %s", params)
+            put(error)
+            return
+        put(None)
+
+
+def _stream_candidate_ids_json(params):
+    """ Streams ids of all candidates from cloudsearch using cursor i.e. when search is more than 10000 candidates.
+    JSON body {"candidate_ids": ["1", "2", ...], "total_found": 2} is generated page by page as CandidateIdScanner
+    fetches them, so ids of whole search are never held in memory.
+    First page is fetched before returning, so a failing search can still be answered with an error response.
+    If fetching a later page fails, document is closed with "truncated": true and an "error" message.
     :param params: search params
-    :return: candidate_ids:all candidate ids,
-    :return: total_found: total number of candidate found
-    :return: error: if there was error while executing search query
+    :return: generator of JSON chunks, or None if there was error while executing search query
     """
-    search_service = _cloud_search_domain_connection()
-    params['cursor'] = 'initial'  # Initialize cursor
-    # remove start, as it is produces error with cursor
-    if 'start' in params:
-        del params['start']
-    no_more_candidates = False
-    total_found = 0
-    candidate_ids = []
-    error = False
-    # If size is more than 10000, cloud_search will give error, so set size to chunk of 10000 candidates and fetch all
-    params['size'] = min(params.get('size', sys.maxint), CLOUD_SEARCH_MAX_LIMIT)
-    while not no_more_candidates:
-        # Get the next batch of candidates
-        results = search_service.search(**params)
-        total_found = results['hits']['found']
-        start = results['hits']['start']
-        matches = results['hits']['hit']
-        candidate_ids.extend([match.get('id') for match in matches])
-
-        # Update cursor for next run
-        new_cursor = results['hits']['cursor']
-        params['cursor'] = new_cursor
-
-        if start == total_found:
-            no_more_candidates = True
-
-    return candidate_ids, total_found, error
+    scanner = CandidateIdScanner(params)
+    pages = scanner.pages()
+    try:
+        first_page = next(pages, array('l'))
+    except Exception:
+        return None
+
+    def generate():
+        yield '{"candidate_ids": ['
+        separator = ''
+        all_pages = itertools.chain([first_page], pages)
+        while True:
+            try:
+                page = next(all_pages)
+            except StopIteration:
+                break
+            except Exception:
+                # Response has already been started with 200, so close the document and flag it as incomplete
+                logger.exception("_stream_candidate_ids_json: Couldn't fetch next page of candidate ids, "
+                                 "truncating response. Search params: %s", params)
+                yield '], "total_found": %d, "truncated": true, "error": "Couldn\'t fetch all candidate ids"}' \
+                      % (scanner.total_found or 0)
+                return
+            if page:
+                # Ids are returned as strings, same as hits of CloudSearch
+                yield separator + ', '.join('"%d"' % candidate_id for candidate_id in page)
+                separator = ', '
+        yield '], "total_found": %d}' % (scanner.total_found or 0)
+
+    return generate()
 
 
 def _convert_date_range_in_cloudsearch_format(from_date, to_date):
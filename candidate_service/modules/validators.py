@@ -70,6 +70,27 @@ def get_candidate_if_exists(candidate_id):
     return candidate
 
 
+def get_candidates_if_exist(candidate_ids):
+    """
+    Function loads candidates with a single query and checks that all of them exist and are not archived,
+    like get_candidate_if_exists() does for a single candidate.
+    :type candidate_ids: list[int|long]
+    :return  Candidate-objects in order of given ids or raises NotFoundError
+    :rtype: list[Candidate]
+    """
+    candidates = {candidate.id: candidate for candidate in Candidate.get_by_id(list(candidate_ids))} \
+        if candidate_ids else {}
+    for candidate_id in candidate_ids:
+        candidate = candidates.get(candidate_id)
+        if not candidate:
+            raise NotFoundError(error_message='Candidate not found: {}'.format(candidate_id),
+                                error_code=custom_error.CANDIDATE_NOT_FOUND)
+        if candidate.is_archived:
+            raise NotFoundError(error_message='Candidate not found: {}'.format(candidate_id),
+                                error_code=custom_error.CANDIDATE_IS_ARCHIVED)
+    return [candidates[candidate_id] for candidate_id in candidate_ids]
+
+
 def get_candidate_if_validated(user, candidate_id):
     """
     Function will return candidate if:
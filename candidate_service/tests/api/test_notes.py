@@ -39,6 +39,41 @@ class TestAddNotes(object):
         assert len(create_resp.json()['candidate_notes']) == len(notes_data['notes'])
 
 
+class TestAddNotesOfCandidates(object):
+    def test_add_notes_of_candidates(self, access_token_first, candidate_first, candidate_first_2):
+        """
+        Test:  Add notes of many candidates with a single request
+        """
+        notes_data = {'notes': [
+            {'candidate_id': candidate_first.id, 'title': 'interests', 'comment': 'Interested in internet security'},
+            {'candidate_id': candidate_first.id, 'comment': fake.bs()},
+            {'candidate_id': candidate_first_2.id, 'comment': fake.bs()}
+        ]}
+        create_resp = send_request('post', CandidateApiUrl.CANDIDATES_NOTES, access_token_first, notes_data)
+        print response_info(create_resp)
+        assert create_resp.status_code == requests.codes.CREATED
+        assert create_resp.json()['count'] == len(notes_data['notes'])
+
+        get_resp = send_request('get', CandidateApiUrl.NOTES % candidate_first.id, access_token_first)
+        assert len(get_resp.json()['candidate_notes']) == 2
+        get_resp = send_request('get', CandidateApiUrl.NOTES % candidate_first_2.id, access_token_first)
+        assert len(get_resp.json()['candidate_notes']) == 1
+
+    def test_add_notes_of_candidates_of_other_domain(self, access_token_first, candidate_first, user_second):
+        """
+        Test:  Add notes of candidates when one of them belongs to some other domain
+        Expect: 403
+        """
+        candidate = Candidate(first_name=fake.first_name(), user_id=user_second.id)
+        db.session.add(candidate)
+        db.session.commit()
+        notes_data = {'notes': [{'candidate_id': candidate_first.id, 'comment': fake.bs()},
+                                {'candidate_id': candidate.id, 'comment': fake.bs()}]}
+        create_resp = send_request('post', CandidateApiUrl.CANDIDATES_NOTES, access_token_first, notes_data)
+        print response_info(create_resp)
+        assert create_resp.status_code == requests.codes.FORBIDDEN
+
+
 class TestGetNotes(object):
     def test_get_candidate_notes(self, notes_first, access_token_first):
         """
@@ -570,6 +570,48 @@ class TestCreateInvalidCandidates(object):
         assert response.json()['errors']
 
 
+class TestCreateCandidatesInBulk(object):
+    def test_create_candidates_in_bulk(self, access_token_first, talent_pool):
+        """
+        Test: Add candidates with children written by multi-row inserts, a candidate with an email already given
+              to an earlier candidate, and a candidate with an address which is created on its own
+        Expect: 201, valid candidates should be created in order they were posted along with their children and
+                duplicate candidate should be returned in errors
+        """
+        email = fake.safe_email()
+        work_experience = {'organization': fake.company(), 'position': fake.job(), 'start_year': 2010,
+                           'end_year': 2012, 'bullets': [{'description': fake.sentence()}]}
+        address = GenerateCandidateData.addresses([talent_pool.id])['candidates'][0]['addresses'][0]
+        data = {'candidates': [
+            {'talent_pool_ids': {'add': [talent_pool.id]}, 'full_name': fake.name(), 'emails': [{'address': email}],
+             'phones': [{'value': '4084561234'}], 'work_experiences': [work_experience],
+             'skills': [{'name': 'Python', 'months_used': 24}]},
+            {'talent_pool_ids': {'add': [talent_pool.id]}, 'emails': [{'address': email}]},
+            {'talent_pool_ids': {'add': [talent_pool.id]}, 'emails': [{'address': fake.safe_email()}],
+             'addresses': [address]},
+            {'talent_pool_ids': {'add': [talent_pool.id]}, 'emails': [{'address': fake.safe_email()}]}
+        ]}
+        create_resp = send_request('post', CANDIDATES_URL, access_token_first, data)
+        print response_info(create_resp)
+        assert create_resp.status_code == requests.codes.CREATED
+        candidate_ids = [candidate['id'] for candidate in create_resp.json()['candidates']]
+        assert len(candidate_ids) == 3
+        assert len(create_resp.json()['errors']) == 1
+        assert create_resp.json()['errors'][0]['candidate_data']['emails'][0]['address'] == email
+
+        get_resp = send_request('get', CANDIDATE_URL % candidate_ids[0], access_token_first)
+        print response_info(get_resp)
+        candidate = get_resp.json()['candidate']
+        assert candidate['emails'][0]['address'] == email
+        assert len(candidate['phones']) == 1
+        assert len(candidate['work_experiences'][0]['bullets']) == 1
+        assert candidate['skills'][0]['name'] == 'Python'
+        assert candidate['talent_pool_ids'] == [talent_pool.id]
+
+        get_resp = send_request('get', CANDIDATE_URL % candidate_ids[1], access_token_first)
+        assert len(get_resp.json()['candidate']['addresses']) == 1
+
+
 class TestCreateArchivedCandidate(object):
     def test_create_archived_candidate(self, access_token_first, talent_pool):
         """
@@ -0,0 +1,98 @@
+"""
+Test cases for CloudSearch admin APIs: domain re-index, documents' queue & search cache stats
+"""
+import requests
+from candidate_service.common.tests.conftest import *
+from candidate_service.common.models.user import Role
+from candidate_service.common.routes import CandidateApiUrl
+from candidate_service.common.utils.test_utils import send_request, response_info
+
+
+class TestCandidateDocumentsReindex(object):
+    URL = CandidateApiUrl.CANDIDATES_DOCUMENTS_REINDEX_URI
+
+    def test_reindex_without_talent_admin_role(self, access_token_first, user_first):
+        """
+        Test: Start re-index of domain using a user who is not TALENT_ADMIN
+        Expect: 401
+        """
+        user_first.role_id = Role.get_by_name('DOMAIN_ADMIN').id
+        db.session.commit()
+        resp = send_request('post', self.URL, access_token_first, {'domain_id': user_first.domain_id})
+        print response_info(resp)
+        assert resp.status_code == requests.codes.UNAUTHORIZED
+
+    def test_reindex_and_get_progress(self, access_token_first, user_first, candidate_first):
+        """
+        Test: Start re-index of user's domain and retrieve its progress
+        Expect: 202 with progress of re-index, progress should contain throughput & ETA
+        """
+        user_first.role_id = Role.get_by_name(Role.TALENT_ADMIN).id
+        db.session.commit()
+        resp = send_request('post', self.URL, access_token_first, {'domain_id': user_first.domain_id})
+        print response_info(resp)
+        assert resp.status_code == requests.codes.ACCEPTED
+        assert resp.json()['reindex']['total'] >= 1
+
+        resp = send_request('get', self.URL + '?domain_id=%s' % user_first.domain_id, access_token_first)
+        print response_info(resp)
+        assert resp.status_code == requests.codes.OK
+        progress = resp.json()['reindex']
+        assert progress['domain_id'] == user_first.domain_id
+        assert 'docs_per_sec' in progress and 'eta_seconds' in progress
+
+    def test_reindex_with_invalid_domain(self, access_token_first, user_first):
+        """
+        Test: Start re-index without a valid domain ID
+        Expect: 400
+        """
+        user_first.role_id = Role.get_by_name(Role.TALENT_ADMIN).id
+        db.session.commit()
+        resp = send_request('post', self.URL, access_token_first, {'domain_id': 'foo'})
+        print response_info(resp)
+        assert resp.status_code == requests.codes.BAD_REQUEST
+
+
+class TestCandidateDocumentsQueue(object):
+    URL = CandidateApiUrl.CANDIDATES_DOCUMENTS_QUEUE_URI
+
+    def test_get_queue_status(self, access_token_first, user_first, talent_pool):
+        """
+        Test: Create a candidate and retrieve status of documents' queue
+        Expect: 200 with queue depth & indexing lag
+        """
+        user_first.role_id = Role.get_by_name(Role.TALENT_ADMIN).id
+        db.session.commit()
+        data = {'candidates': [{'talent_pool_ids': {'add': [talent_pool.id]}}]}
+        create_resp = send_request('post', CandidateApiUrl.CANDIDATES, access_token_first, data)
+        assert create_resp.status_code == requests.codes.CREATED
+
+        resp = send_request('get', self.URL, access_token_first)
+        print response_info(resp)
+        assert resp.status_code == requests.codes.OK
+        queue = resp.json()['queue']
+        assert queue['recorded'] >= 1
+        assert queue['queue_depth'] >= 0 and queue['indexing_lag_seconds'] >= 0
+
+
+class TestCandidateSearchCacheStats(object):
+    URL = CandidateApiUrl.CANDIDATE_SEARCH_CACHE_URI
+
+    def test_repeated_search_is_a_cache_hit(self, access_token_first, user_first):
+        """
+        Test: Search candidates twice with same criteria and retrieve search cache stats
+        Expect: Same results for both searches & hits should have been incremented
+        """
+        user_first.role_id = Role.get_by_name(Role.TALENT_ADMIN).id
+        db.session.commit()
+        hits = send_request('get', self.URL, access_token_first).json()['search_cache']['hits']
+
+        first_resp = send_request('get', CandidateApiUrl.CANDIDATE_SEARCH_URI, access_token_first)
+        second_resp = send_request('get', CandidateApiUrl.CANDIDATE_SEARCH_URI, access_token_first)
+        assert first_resp.status_code == second_resp.status_code == requests.codes.OK
+        assert first_resp.json() == second_resp.json()
+
+        resp = send_request('get', self.URL, access_token_first)
+        print response_info(resp)
+        assert resp.status_code == requests.codes.OK
+        assert resp.json()['search_cache']['hits'] >= hits + 1
@@ -221,3 +221,41 @@ class TestGetCandidate(object):
         assert get_resp.status_code == codes.OK, 'Expected status: {}, Found: {}'.format(codes.OK, get_resp.status_code)
         assert len(get_resp.json()['candidate']['contact_history']['timeline']) == 4, 'Expected length: 4, got: {}'\
             .format(len(get_resp.json()['candidate']['contact_history']['timeline']))
+        timeline = get_resp.json()['candidate']['contact_history']['timeline']
+        assert all(event['email_campaign_id'] == campaign.id for event in timeline)
+
+        # Contact history should be same when it is paged through with a limit and cursor
+        url = CandidateApiUrl.CONTACT_HISTORY % email_campaign_send[0].candidate_id
+        page_resp = send_request('get', url + '?limit=3', access_token_first)
+        assert page_resp.status_code == codes.OK, page_resp.text
+        first_page = page_resp.json()
+        assert len(first_page['timeline']) == 3 and first_page['next_cursor']
+        page_resp = send_request('get', url + '?limit=3&cursor=' + first_page['next_cursor'], access_token_first)
+        assert page_resp.status_code == codes.OK, page_resp.text
+        assert page_resp.json()['next_cursor'] is None
+        assert first_page['timeline'] + page_resp.json()['timeline'] == timeline
+
+    def test_page_contact_history_ending_on_send_without_datetime(self, access_token_first, candidate_first,
+                                                                 email_campaign_first):
+        """
+        Test: Page through contact history of a candidate whose sends have no sent datetime, so first page ends
+              on an event sorted with NULL_EVENT_DATETIME
+        Expect: 200, all sends are returned across pages
+        """
+        for _ in range(3):
+            EmailCampaignSend.save(EmailCampaignSend(campaign_id=email_campaign_first.id,
+                                                     candidate_id=candidate_first.id))
+        EmailCampaignSend.query.filter_by(candidate_id=candidate_first.id).update(dict(sent_datetime=None))
+        db.session.commit()
+
+        url = CandidateApiUrl.CONTACT_HISTORY % candidate_first.id
+        page_resp = send_request('get', url + '?limit=2', access_token_first)
+        assert page_resp.status_code == codes.OK, page_resp.text
+        first_page = page_resp.json()
+        assert len(first_page['timeline']) == 2 and first_page['next_cursor']
+        assert all(event['event_datetime'] is None for event in first_page['timeline'])
+
+        page_resp = send_request('get', url + '?limit=2&cursor=' + first_page['next_cursor'], access_token_first)
+        assert page_resp.status_code == codes.OK, page_resp.text
+        assert len(page_resp.json()['timeline']) == 1
+        assert page_resp.json()['next_cursor'] is None
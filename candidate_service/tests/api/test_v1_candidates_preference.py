@@ -66,6 +66,36 @@ class TestCreateSubscriptionPreference(object):
         print response_info(resp)
 
 
+class TestSetSubscriptionPreferenceOfCandidates(object):
+    def test_set_subscription_preference_of_candidates(self, access_token_first, candidate_first, candidate_first_2):
+        """
+        Test: Add subscription preference of a candidate & update existing preference of other, with one request
+        Expect: 204
+        """
+        data = dict(frequency_id=1)
+        resp = send_request('post', CandidateApiUrl.CANDIDATE_PREFERENCE % candidate_first.id, access_token_first, data)
+        assert resp.status_code == 204
+
+        data = {'candidate_ids': [candidate_first.id, candidate_first_2.id], 'frequency_id': 2}
+        resp = send_request('put', CandidateApiUrl.CANDIDATES_PREFERENCES, access_token_first, data)
+        print response_info(resp)
+        assert resp.status_code == 204
+
+        for candidate in (candidate_first, candidate_first_2):
+            resp = send_request('get', CandidateApiUrl.CANDIDATE_PREFERENCE % candidate.id, access_token_first)
+            assert resp.json()['candidate']['subscription_preference']['frequency_id'] == 2
+
+    def test_set_subscription_preference_of_non_existing_candidates(self, access_token_first, candidate_first):
+        """
+        Test: Set subscription preference of candidates when one of them doesn't exist
+        Expect: 404
+        """
+        data = {'candidate_ids': [candidate_first.id, candidate_first.id + 1000000], 'frequency_id': 1}
+        resp = send_request('put', CandidateApiUrl.CANDIDATES_PREFERENCES, access_token_first, data)
+        print response_info(resp)
+        assert resp.status_code == 404
+
+
 class TestGetSubscriptionPreference(object):
     def test_access_without_auth_token(self):
         """
@@ -0,0 +1,39 @@
+"""
+Test cases for streaming candidate ids from CloudSearch using CandidateIdScanner
+"""
+import time
+import json
+from array import array
+
+from candidate_service.common.tests.conftest import *
+from candidate_service.modules.talent_cloud_search import CandidateIdScanner, _stream_candidate_ids_json
+from candidate_service.tests.modules.test_talent_cloud_search import populate_candidates
+
+
+def _domain_search_params(domain_id):
+    return dict(query='*:*', query_parser='lucene', filter_query="(term field=domain_id %s)" % domain_id)
+
+
+def test_scanner_streams_all_pages(access_token_first, user_first, talent_pool):
+    """
+    Test: Scan domain's candidates with page size smaller than number of candidates
+    Expect: All candidate ids should be yielded as ints, in arrays of at most page size
+    """
+    candidate_ids = populate_candidates(access_token_first, talent_pool, count=5)
+    time.sleep(30)  # Wait for cloud_search to update
+
+    scanner = CandidateIdScanner(_domain_search_params(user_first.domain_id), page_size=2)
+    pages = list(scanner.pages())
+    assert all(isinstance(page, array) and len(page) <= 2 for page in pages)
+    scanned_ids = [candidate_id for page in pages for candidate_id in page]
+    assert set(candidate_ids).issubset(scanned_ids)
+    assert len(scanned_ids) == len(set(scanned_ids)) == scanner.total_found
+
+    # Consumer may stop before all pages are fetched
+    first_page = next(CandidateIdScanner(_domain_search_params(user_first.domain_id), page_size=2).pages())
+    assert len(first_page) == 2
+
+    # All ids should be streamed as JSON, same as search API returned them before streaming
+    streamed_json = json.loads(''.join(_stream_candidate_ids_json(_domain_search_params(user_first.domain_id))))
+    assert sorted(map(int, streamed_json['candidate_ids'])) == sorted(scanned_ids)
+    assert streamed_json['total_found'] == scanner.total_found
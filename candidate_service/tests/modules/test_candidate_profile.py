@@ -0,0 +1,45 @@
+"""
+Test cases for assembling profiles of many candidates with fetch_candidates_info()
+"""
+from datetime import datetime
+
+from candidate_service.common.tests.conftest import *
+from candidate_service.common.models.candidate import CandidateExperience, CandidateExperienceBullet, CandidateSkill
+from candidate_service.modules.talent_candidates import fetch_candidate_info, fetch_candidates_info
+from candidate_service.modules.profile_benchmark import StatementCounter
+
+
+def _add_experience_and_skill(candidate):
+    experience = CandidateExperience(candidate_id=candidate.id, organization=gen_salt(10), position=gen_salt(10),
+                                     start_year=2010, is_current=True, added_time=datetime.utcnow())
+    db.session.add(experience)
+    db.session.flush()
+    db.session.add(CandidateExperienceBullet(candidate_experience_id=experience.id, description=gen_salt(20),
+                                             added_time=datetime.utcnow()))
+    db.session.add(CandidateSkill(candidate_id=candidate.id, description=gen_salt(10), total_months=12,
+                                  added_time=datetime.utcnow()))
+    db.session.commit()
+
+
+def test_profiles_of_many_candidates_are_loaded_with_fixed_statements(candidate_first, candidate_first_2):
+    """
+    Test: Fetch work experiences and skills of one candidate, then of two candidates in one call
+    Expect: Profiles should be same as those fetched one by one and both calls should run same number of statements
+    """
+    candidates = [candidate_first, candidate_first_2]
+    for candidate in candidates:
+        _add_experience_and_skill(candidate)
+    fields = 'work_experiences,skills'
+    expected_profiles = [fetch_candidate_info(candidate, fields) for candidate in candidates]
+
+    db.session.expire_all()
+    with StatementCounter() as single_counter:
+        fetch_candidates_info(candidates[:1], fields)
+    db.session.expire_all()
+    with StatementCounter() as batch_counter:
+        profiles = fetch_candidates_info(candidates, fields)
+
+    assert profiles == expected_profiles
+    assert len(profiles[1]['work_experiences'][0]['bullets']) == 1
+    assert profiles[0]['emails'] is None
+    assert batch_counter.statements == single_counter.statements
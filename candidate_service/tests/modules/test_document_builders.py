@@ -0,0 +1,41 @@
+"""
+Test cases for comparing candidate documents built by available CloudSearch document builders
+"""
+from candidate_service.common.tests.conftest import *
+from candidate_service.modules.talent_cloud_search import (_build_candidate_documents,
+                                                           _build_candidate_documents_bulk)
+from candidate_service.tests.modules.test_talent_cloud_search import populate_candidates
+
+
+def _normalize_document(action_dict):
+    """
+    Array values are collected in different orders by the builders, so compare them as sorted lists
+    """
+    fields = action_dict['fields']
+    return action_dict['id'], {key: sorted(value) if isinstance(value, list) else value
+                               for key, value in fields.items() if key != 'resume_text'}
+
+
+def test_bulk_builder_matches_join_builder(access_token_first, user_first, talent_pool):
+    """
+    Test: Build documents of multiple candidates using both builders
+    Expect: Both builders should generate same documents
+    """
+    candidate_ids = populate_candidates(access_token_first, talent_pool, count=3, is_current_job=True)
+
+    join_documents = _build_candidate_documents(candidate_ids, user_first.domain_id)
+    bulk_documents = _build_candidate_documents_bulk(candidate_ids, user_first.domain_id)
+
+    assert len(bulk_documents) == len(join_documents) == len(candidate_ids)
+    assert sorted(map(_normalize_document, bulk_documents)) == sorted(map(_normalize_document, join_documents))
+    for document in bulk_documents:
+        assert document['fields']['domain_id'] == user_first.domain_id
+        assert document['fields']['resume_text']
+
+
+def test_bulk_builder_with_empty_list():
+    """
+    Test: Call bulk builder without candidate IDs
+    Expect: Empty list of documents
+    """
+    assert _build_candidate_documents_bulk([]) == []
@@ -0,0 +1,31 @@
+"""
+Test cases for labels of id facets served from in-process facet labels cache
+"""
+from candidate_service.common.tests.conftest import *
+from candidate_service.modules.facet_labels import (get_facet_info_with_labels, invalidate_facet_labels,
+                                                    get_facet_labels_cache_key, facet_labels_cache)
+
+
+def test_username_facet_labels_are_cached(user_first):
+    """
+    Test: Decorate owner facet twice, including an id which doesn't exist
+    Expect: Owner's name should be returned as label, unknown id should be skipped and labels should be cached
+    """
+    domain_id = user_first.domain_id
+    invalidate_facet_labels(domain_id)
+    buckets = [{'value': str(user_first.id), 'count': 3}, {'value': '0', 'count': 1}]
+
+    facets = get_facet_info_with_labels(domain_id, 'username', buckets)
+    expected = [dict(id=str(user_first.id), value=(user_first.first_name or "") + " " + (user_first.last_name or ""),
+                     count=3)]
+    assert facets == expected
+    cache_key = get_facet_labels_cache_key(domain_id, 'username')
+    assert facet_labels_cache.get(cache_key) == {user_first.id: expected[0]['value'], 0: None}
+
+    # Warm cache should return same labels
+    assert get_facet_info_with_labels(domain_id, 'username', buckets) == expected
+
+    # Invalidation should change cache key, so labels are reloaded in every process
+    invalidate_facet_labels(domain_id)
+    assert cache_key not in facet_labels_cache
+    assert get_facet_labels_cache_key(domain_id, 'username') != cache_key
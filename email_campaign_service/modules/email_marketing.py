@@ -10,6 +10,7 @@ import re
 import json
 import uuid
 import getpass
+from itertools import islice
 from time import sleep
 from datetime import datetime
 
@@ -27,8 +28,10 @@ from email_campaign_service.json_schema.test_email import TEST_EMAIL_SCHEMA
 from email_campaign_service.modules.validators import get_or_set_valid_value
 from email_campaign_service.email_campaign_app import (logger, celery_app, app)
 from email_campaign_service.modules.email_campaign_base import EmailCampaignBase
+from email_campaign_service.modules.email_personalization import get_compiled_campaign_template
 from email_campaign_service.modules.utils import (get_candidates_from_smartlist,
                                                   do_mergetag_replacements, create_email_campaign_url_conversions,
+                                                  create_email_campaign_url_conversions_in_bulk,
                                                   decrypt_password, get_priority_emails, get_topic_arn_and_region_name)
 # Common Utils
 from email_campaign_service.common.models.db import db
@@ -50,9 +53,11 @@ from email_campaign_service.common.models.email_campaign import (EmailCampaign,
 from email_campaign_service.common.models.candidate import (Candidate, CandidateEmail,
                                                             CandidateSubscriptionPreference)
 from email_campaign_service.common.error_handling import (InvalidUsage, InternalServerError)
+from email_campaign_service.common.utils.engagement_utils import refresh_campaign_engagement
 from email_campaign_service.common.utils.talent_reporting import email_notification_to_admins
 from email_campaign_service.common.campaign_services.validators import validate_smartlist_ids
-from email_campaign_service.common.utils.amazon_ses import (send_email, get_default_email_info)
+from email_campaign_service.common.utils.amazon_ses import (send_email, get_default_email_info,
+                                                            get_boto_ses_connection)
 from email_campaign_service.common.utils.handy_functions import (http_request, JSON_CONTENT_TYPE_HEADER)
 from email_campaign_service.common.utils.validators import (raise_if_not_instance_of, get_json_data_if_validated,
                                                             raise_if_not_positive_int_or_long)
@@ -63,6 +68,12 @@ from email_campaign_service.common.custom_errors.campaign import (INVALID_REQUES
                                                                   ERROR_SENDING_EMAIL, SMARTLIST_NOT_FOUND,
                                                                   SMARTLIST_FORBIDDEN)
 
+# Send modes of email campaigns, see send_campaign_to_candidates()
+SEND_MODE_PER_CANDIDATE = 'per_candidate'
+SEND_MODE_CHUNKED = 'chunked'
+# Number of candidates a chunked send task sends campaign to
+SEND_CHUNK_SIZE = 100
+
 
 def create_email_campaign_smartlists(smartlist_ids, email_campaign_id):
     """ Maps smart lists to email campaign
@@ -233,19 +244,25 @@ def send_email_campaign(current_user, campaign, new_candidates_only=False):
 
 
 def send_campaign_to_candidates(user_id, candidate_ids_and_emails, email_campaign_blast_id, campaign,
-                                new_candidates_only):
+                                new_candidates_only, send_mode=SEND_MODE_CHUNKED, chunk_size=SEND_CHUNK_SIZE):
     """
-    This creates one Celery task per candidate to send campaign emails asynchronously.
+    This creates Celery tasks to send campaign emails asynchronously.
+    In chunked mode (default) every task sends campaign to chunk_size candidates, so a blast puts only
+    len(candidates) / chunk_size messages on broker. In per-candidate mode one task is created for each candidate.
     :param user_id: ID of user
     :param candidate_ids_and_emails: list of tuples containing candidate_ids and email addresses
     :param email_campaign_blast_id: id of email campaign blast object
     :param campaign: EmailCampaign object
     :param new_candidates_only: Identifier if candidates are new
+    :param send_mode: SEND_MODE_CHUNKED or SEND_MODE_PER_CANDIDATE
+    :param chunk_size: Number of candidates per task in chunked mode
     :type user_id: int | long
     :type candidate_ids_and_emails: list
     :type email_campaign_blast_id: int | long
     :type campaign: EmailCampaign
     :type new_candidates_only: bool
+    :type send_mode: str
+    :type chunk_size: int
     """
     if not isinstance(campaign, EmailCampaign):
         raise InternalServerError(error_message='Must provide valid EmailCampaign object.')
@@ -256,22 +273,43 @@ def send_campaign_to_candidates(user_id, candidate_ids_and_emails, email_campaig
     campaign_type = campaign.__tablename__
     callback = post_processing_campaign_sent.subtask((campaign, new_candidates_only, email_campaign_blast_id,),
                                                      queue=campaign_type)
-    # Here we create list of all tasks.
-    tasks = [send_email_campaign_to_candidate.subtask((user_id, campaign, candidate_id, candidate_address,
-             email_campaign_blast_id), link_error=celery_error_handler(
-             campaign_type), queue=campaign_type) for candidate_id, candidate_address in candidate_ids_and_emails]
+    tasks = get_send_tasks(user_id, candidate_ids_and_emails, email_campaign_blast_id, campaign, send_mode,
+                           chunk_size)
     # This runs all tasks asynchronously and sets callback function to be hit once all
     # tasks in list finish running without raising any error. Otherwise callback
     # results in failure status.
     chord(tasks)(callback)
 
 
+def get_send_tasks(user_id, candidate_ids_and_emails, email_campaign_blast_id, campaign, send_mode=SEND_MODE_CHUNKED,
+                   chunk_size=SEND_CHUNK_SIZE):
+    """
+    This returns signatures of Celery tasks sending campaign to given candidates in given send mode.
+    See send_campaign_to_candidates() for params.
+    :rtype: list
+    """
+    if send_mode not in (SEND_MODE_CHUNKED, SEND_MODE_PER_CANDIDATE):
+        raise InternalServerError(error_message='Invalid send mode: %s' % send_mode)
+    campaign_type = campaign.__tablename__
+    # Here we create list of all tasks.
+    if send_mode == SEND_MODE_CHUNKED:
+        tasks = [send_email_campaign_to_candidates_chunk.subtask(
+                 (user_id, campaign.id, candidate_ids_and_emails[index:index + chunk_size], email_campaign_blast_id),
+                 link_error=celery_error_handler.subtask(queue=campaign_type), queue=campaign_type)
+                 for index in xrange(0, len(candidate_ids_and_emails), chunk_size)]
+    else:
+        tasks = [send_email_campaign_to_candidate.subtask((user_id, campaign, candidate_id, candidate_address,
+                 email_campaign_blast_id), link_error=celery_error_handler(
+                 campaign_type), queue=campaign_type) for candidate_id, candidate_address in candidate_ids_and_emails]
+    return tasks
+
+
 @celery_app.task(name='post_processing_campaign_sent')
 def post_processing_campaign_sent(celery_result, campaign, new_candidates_only, email_campaign_blast_id):
     """
     Callback for all celery tasks sending campaign emails to candidates. celery_result would contain the return
-    values of all the tasks, we would update the sends count with the number of email sending tasks that were
-    successful.
+    values of all the tasks, we would update the sends count with the number of emails that were sent successfully.
+    Per-candidate tasks return True/False and chunk tasks return number of successful sends of their chunk.
     :param celery_result: result af all celery tasks
     :param campaign: Valid EmailCampaign object
     :param new_candidates_only: True if emails sent to new candidates only
@@ -294,7 +332,7 @@ def post_processing_campaign_sent(celery_result, campaign, new_candidates_only,
         if not isinstance(email_campaign_blast_id, (int, long)) or email_campaign_blast_id <= 0:
             logger.error('email_campaign_blast_id must be positive int or long')
             return
-        sends = celery_result.count(True)
+        sends = sum(int(result or 0) for result in celery_result)
         logger.info('Campaigns sends:%s, celery_result: %s' % (sends, celery_result))
         _update_blast_sends(email_campaign_blast_id, sends, campaign,  new_candidates_only)
 
@@ -501,6 +539,154 @@ def send_campaign_emails_to_candidate(user_id, campaign_id, candidate_id, candid
                                                     current_user,
                                                     email_campaign_blast_id=email_campaign_blast_id)
     domain = Domain.get_by_id(campaign.user.domain_id)
+    to_address = get_campaign_to_address(campaign, domain, candidate_address)
+    logger.info("sending email-campaign(id:%s) to candidate(id:%s)'s email_address:%s"
+                % (campaign_id, candidate_id, to_address))
+    is_sent, ses_ids = _send_campaign_email(campaign, candidate.id, to_address, subject, new_text, new_html,
+                                            email_campaign_send)
+    if not is_sent:
+        return False
+    if ses_ids:
+        email_campaign_send.update(**ses_ids)
+
+    # Create activity in a celery task
+    activity_message_id = CampaignUtils.get_campaign_activity_type_id(campaign, 'SEND')
+
+    celery_create_activity.delay(campaign.user.id,
+                                 activity_message_id,
+                                 email_campaign_send,
+                                 dict(campaign_name=campaign.name, candidate_name=candidate.name),
+                                 'Could not add `campaign send activity` for email-campaign(id:%s) and User(id:%s)' %
+                                 (campaign.id, campaign.user.id))
+    celery_refresh_campaign_engagement.delay(campaign.id, [candidate.id])
+    return True
+
+
+def send_campaign_emails_to_candidates(user_id, campaign_id, candidate_ids_and_emails, email_campaign_blast_id):
+    """
+    This function sends the email campaign to a chunk of candidates. Campaign, user, domain and candidates are loaded
+    once for whole chunk, EmailCampaignSend rows are inserted in bulk, one SES connection is used for all emails and
+    send activities are created by a single Celery task. Emails are rendered from campaign's template compiled once
+    per blast (see email_personalization.py) and URL conversions of all tracked URLs of chunk are created in bulk.
+    Number of successful sends is added to sends of blast, so progress of blast can be seen while it is being sent.
+    :param user_id: id of user
+    :param campaign_id: email campaign id
+    :param candidate_ids_and_emails: list of tuples containing candidate_ids and email addresses
+    :param email_campaign_blast_id: id of email campaign blast object
+    :type user_id: int | long
+    :type campaign_id: int | long
+    :type candidate_ids_and_emails: list
+    :type email_campaign_blast_id: int|long
+    :return: Number of emails sent successfully
+    :rtype: int
+    """
+    raise_if_not_positive_int_or_long(user_id)
+    raise_if_not_positive_int_or_long(campaign_id)
+    raise_if_not_positive_int_or_long(email_campaign_blast_id)
+    raise_if_not_instance_of(candidate_ids_and_emails, list)
+
+    campaign = EmailCampaign.get_by_id(campaign_id)
+    current_user = User.get_by_id(user_id)
+    domain = Domain.get_by_id(campaign.user.domain_id)
+    candidate_ids = [candidate_id for candidate_id, _ in candidate_ids_and_emails]
+    candidates = {candidate.id: candidate for candidate in Candidate.query.filter(Candidate.id.in_(candidate_ids))}
+    email_campaign_sends = create_email_campaign_sends(campaign_id, email_campaign_blast_id, candidates.keys())
+    ses_connection = None if campaign.email_client_credentials_id else get_boto_ses_connection()
+    template = get_compiled_campaign_template(campaign, current_user, email_campaign_blast_id)
+
+    recipients = []
+    for candidate_id, candidate_address in candidate_ids_and_emails:
+        candidate = candidates.get(candidate_id)
+        if not candidate:
+            logger.error('send_campaign_emails_to_candidates: Candidate(id:%s) not found, email-campaign(id:%s)'
+                         % (candidate_id, campaign_id))
+            continue
+        try:
+            values = template.get_merge_values(candidate, candidate_address)
+        except Exception as error:
+            logger.exception('Error while personalizing email campaign(id:%s) for candidate(id:%s). Error is: %s'
+                             % (campaign_id, candidate_id, error.message))
+            continue
+        recipients.append((candidate, candidate_address, email_campaign_sends[candidate_id], values))
+
+    # Create URL conversions of all recipients at once
+    url_conversions = [(destination_url, email_campaign_send.id, type_, custom_params)
+                       for _, _, email_campaign_send, values in recipients
+                       for destination_url, type_, custom_params in template.get_tracked_urls(values)]
+    source_urls = iter(create_email_campaign_url_conversions_in_bulk(url_conversions))
+
+    ses_ids_of_sends = []
+    activities = []
+    for candidate, candidate_address, email_campaign_send, values in recipients:
+        candidate_id = candidate.id
+        try:
+            new_text, new_html, subject = template.render_with_source_urls(
+                values, list(islice(source_urls, len(template.tracked_urls))))
+            to_address = get_campaign_to_address(campaign, domain, candidate_address)
+            is_sent, ses_ids = _send_campaign_email(campaign, candidate_id, to_address, subject, new_text,
+                                                    new_html, email_campaign_send, ses_connection=ses_connection)
+        except Exception as error:
+            logger.exception('Error while sending email campaign(id:%s) to candidate(id:%s). Error is: %s'
+                             % (campaign_id, candidate_id, error.message))
+            db.session.rollback()
+            continue
+        if not is_sent:
+            continue
+        if ses_ids:
+            ses_ids_of_sends.append(dict(ses_ids, id=email_campaign_send.id))
+        activities.append((email_campaign_send.id, dict(campaign_name=campaign.name, candidate_name=candidate.name)))
+
+    sends = len(activities)
+    if ses_ids_of_sends:
+        db.session.bulk_update_mappings(EmailCampaignSend, ses_ids_of_sends)
+    EmailCampaignBlast.query.filter_by(id=email_campaign_blast_id).update(
+        {EmailCampaignBlast.sends: EmailCampaignBlast.sends + sends}, synchronize_session=False)
+    db.session.commit()
+    logger.info('Email-campaign(id:%s) sent to %s of %s candidates of chunk, blast_id:%s'
+                % (campaign_id, sends, len(candidate_ids_and_emails), email_campaign_blast_id))
+
+    if activities:
+        celery_create_send_activities.delay(campaign.user.id, CampaignUtils.get_campaign_activity_type_id(campaign,
+                                                                                                         'SEND'),
+                                            activities)
+    # New sends are not engaged yet, but they lower average scores of campaign, its candidates and pipelines
+    celery_refresh_campaign_engagement.delay(campaign_id, candidates.keys())
+    return sends
+
+
+def create_email_campaign_sends(campaign_id, email_campaign_blast_id, candidate_ids):
+    """
+    Inserts EmailCampaignSend rows for given candidates with a single INSERT statement.
+    Every send gets a unique temporary ses_message_id (same as get_new_text_html_subject_and_campaign_send()),
+    which is used to read back ids of inserted rows.
+    :param int | long campaign_id: email campaign id
+    :param int | long email_campaign_blast_id: id of email campaign blast object
+    :param list candidate_ids: ids of candidates
+    :return: Dictionary of candidate_id -> EmailCampaignSend object
+    :rtype: dict
+    """
+    if not candidate_ids:
+        return {}
+    message_ids = [str(uuid.uuid4()) for _ in candidate_ids]
+    db.session.bulk_insert_mappings(EmailCampaignSend, [dict(campaign_id=campaign_id, candidate_id=candidate_id,
+                                                             blast_id=email_campaign_blast_id,
+                                                             ses_message_id=message_id)
+                                                        for candidate_id, message_id in zip(candidate_ids,
+                                                                                            message_ids)])
+    db.session.commit()
+    email_campaign_sends = EmailCampaignSend.query.filter(EmailCampaignSend.ses_message_id.in_(message_ids)).all()
+    return {email_campaign_send.candidate_id: email_campaign_send for email_campaign_send in email_campaign_sends}
+
+
+def get_campaign_to_address(campaign, domain, candidate_address):
+    """
+    If working environment is prod, campaign is sent to candidate's email address, otherwise it is sent to
+    'gettalentmailtest@gmail.com' or email of user. Test domains always get campaigns on user's email address.
+    :param EmailCampaign campaign: Email campaign being sent
+    :param Domain domain: Domain of campaign's owner
+    :param basestring candidate_address: Email address of candidate
+    :rtype: basestring
+    """
     is_prod = not CampaignUtils.IS_DEV
     # Only in case of production we should send mails to candidate address else mails will
     # go to test account. To avoid spamming actual email addresses, while testing.
@@ -517,8 +703,21 @@ def send_campaign_emails_to_candidate(user_id, campaign_id, candidate_id, candid
         domain_name = domain.name.lower()
         if domain.is_test_domain or any([name in domain_name for name in ['gettalent', 'bluth', 'dice']]):
             to_address = campaign.user.email
-    logger.info("sending email-campaign(id:%s) to candidate(id:%s)'s email_address:%s"
-                % (campaign_id, candidate_id, to_address))
+    return to_address
+
+
+def _send_campaign_email(campaign, candidate_id, to_address, subject, new_text, new_html, email_campaign_send,
+                         ses_connection=None):
+    """
+    Sends personalized email of campaign via SMTP server added by user (if any) or via Amazon SES.
+    :param EmailCampaign campaign: Email campaign being sent
+    :param int | long candidate_id: id of candidate
+    :param basestring to_address: Address email is sent to
+    :param EmailCampaignSend email_campaign_send: Send object of candidate
+    :param ses_connection: SES connection to reuse, if not given a new connection is made
+    :return: True if email was sent and SES message & request ids (empty dict if sent via SMTP)
+    :rtype: (bool, dict)
+    """
     email_client_credentials_id = campaign.email_client_credentials_id
     if email_client_credentials_id:  # In case user wants to send email-campaign via added SMTP server.
         try:
@@ -529,51 +728,42 @@ def send_campaign_emails_to_candidate(user_id, campaign_id, candidate_id, candid
             client.send_email(to_address, subject, new_text)
         except Exception as error:
             logger.exception('Error occurred while sending campaign via SMTP server. Error:%s' % error.message)
-            return False
-    else:
-        try:
-            default_email = get_default_email_info()['email']
-            email_response = send_email(source='"%s" <%s>' % (campaign._from, default_email),
-                                        # Emails will be sent from verified email by Amazon SES for respective
-                                        #  environment.
-                                        subject=subject,
-                                        html_body=new_html or None,
-                                        # Can't be '', otherwise, text_body will not show in email
-                                        text_body=new_text,
-                                        to_addresses=to_address,
-                                        reply_address=campaign.reply_to.strip(),
-                                        # BOTO doesn't seem to work with an array as to_addresses
-                                        body=None,
-                                        email_format='html' if campaign.body_html else 'text')
-        except Exception as error:
-            # Mark email as bounced
-            _handle_email_sending_error(email_campaign_send, candidate.id, to_address, error)
-            return False
+            return False, {}
+        return True, {}
 
-        username = getpass.getuser()
-        # Save SES message ID & request ID
-        logger.info('''Marketing email(id:%s) sent successfully.
-                       Recipients    : %s,
-                       UserId        : %s,
-                       System User Name: %s,
-                       Environment   : %s,
-                       Email Response: %s
-                    ''', campaign_id, to_address, user_id, username, app.config[TalentConfigKeys.ENV_KEY],
-                    email_response)
-        request_id = email_response[u"SendEmailResponse"][u"ResponseMetadata"][u"RequestId"]
-        message_id = email_response[u"SendEmailResponse"][u"SendEmailResult"][u"MessageId"]
-        email_campaign_send.update(ses_message_id=message_id, ses_request_id=request_id)
-
-    # Create activity in a celery task
-    activity_message_id = CampaignUtils.get_campaign_activity_type_id(campaign, 'SEND')
-
-    celery_create_activity.delay(campaign.user.id,
-                                 activity_message_id,
-                                 email_campaign_send,
-                                 dict(campaign_name=campaign.name, candidate_name=candidate.name),
-                                 'Could not add `campaign send activity` for email-campaign(id:%s) and User(id:%s)' %
-                                 (campaign.id, campaign.user.id))
-    return True
+    try:
+        default_email = get_default_email_info()['email']
+        email_response = send_email(source='"%s" <%s>' % (campaign._from, default_email),
+                                    # Emails will be sent from verified email by Amazon SES for respective
+                                    #  environment.
+                                    subject=subject,
+                                    html_body=new_html or None,
+                                    # Can't be '', otherwise, text_body will not show in email
+                                    text_body=new_text,
+                                    to_addresses=to_address,
+                                    reply_address=campaign.reply_to.strip(),
+                                    # BOTO doesn't seem to work with an array as to_addresses
+                                    body=None,
+                                    email_format='html' if campaign.body_html else 'text',
+                                    connection=ses_connection)
+    except Exception as error:
+        # Mark email as bounced
+        _handle_email_sending_error(email_campaign_send, candidate_id, to_address, error)
+        return False, {}
+
+    username = getpass.getuser()
+    # Save SES message ID & request ID
+    logger.info('''Marketing email(id:%s) sent successfully.
+                   Recipients    : %s,
+                   UserId        : %s,
+                   System User Name: %s,
+                   Environment   : %s,
+                   Email Response: %s
+                ''', campaign.id, to_address, campaign.user_id, username, app.config[TalentConfigKeys.ENV_KEY],
+                email_response)
+    request_id = email_response[u"SendEmailResponse"][u"ResponseMetadata"][u"RequestId"]
+    message_id = email_response[u"SendEmailResponse"][u"SendEmailResult"][u"MessageId"]
+    return True, dict(ses_message_id=message_id, ses_request_id=request_id)
 
 
 @celery_app.task(name='send_email_campaign_to_candidate')
@@ -615,6 +805,34 @@ def send_email_campaign_to_candidate(user_id, campaign, candidate_id, candidate_
             return False
 
 
+@celery_app.task(name='send_email_campaign_to_candidates_chunk')
+def send_email_campaign_to_candidates_chunk(user_id, campaign_id, candidate_ids_and_emails, email_campaign_blast_id):
+    """
+    This sends email campaign to a chunk of candidates. Only ids are passed to this task, so its message on broker
+    stays small.
+    :param user_id: Id of user
+    :param campaign_id: Id of email campaign
+    :param candidate_ids_and_emails: list of tuples containing candidate_ids and email addresses
+    :param email_campaign_blast_id: email campaign blast object id.
+    :type user_id: int | long
+    :type campaign_id: int | long
+    :type candidate_ids_and_emails: list
+    :type email_campaign_blast_id: int|long
+    :return: Number of emails sent successfully
+    :rtype: int
+    """
+    with app.app_context():
+        try:
+            return send_campaign_emails_to_candidates(user_id, campaign_id,
+                                                      [tuple(item) for item in candidate_ids_and_emails],
+                                                      email_campaign_blast_id)
+        except Exception as error:
+            logger.exception('Error while sending email campaign(id:%s) to candidates %s. Error is: %s'
+                             % (campaign_id, candidate_ids_and_emails, error.message))
+            db.session.rollback()
+            return 0
+
+
 def get_new_text_html_subject_and_campaign_send(campaign_id, candidate_id, candidate_address, current_user,
                                                 email_campaign_blast_id=None):
     """
@@ -645,6 +863,24 @@ def get_new_text_html_subject_and_campaign_send(campaign_id, candidate_id, candi
     email_campaign_send = EmailCampaignSend(campaign_id=campaign_id, candidate_id=candidate.id,
                                             blast_id=email_campaign_blast_id, ses_message_id=str(uuid.uuid4()))
     EmailCampaignSend.save(email_campaign_send)
+    new_text, new_html, subject = personalize_campaign_email(campaign, current_user, candidate, candidate_address,
+                                                             email_campaign_send.id)
+    return new_text, new_html, subject, email_campaign_send
+
+
+def personalize_campaign_email(campaign, current_user, candidate, candidate_address, email_campaign_send_id,
+                               convert_url=None):
+    """
+    This replaces merge tags in body & subject of campaign and performs URL conversions for given send.
+    :param EmailCampaign campaign: Email campaign being sent
+    :param User current_user: User sending the campaign
+    :param Candidate candidate: Candidate campaign is sent to
+    :param basestring candidate_address: Address of Candidate
+    :param int | long email_campaign_send_id: id of EmailCampaignSend object of candidate
+    :param convert_url: Function creating URL conversion, defaults to create_email_campaign_url_conversion()
+    :return: new_text, new_html and subject
+    :rtype: tuple
+    """
     # If the campaign is a subscription campaign, its body & subject are
     # candidate-specific and will be set here
     if campaign.is_subscription:
@@ -659,7 +895,7 @@ def get_new_text_html_subject_and_campaign_send(campaign_id, candidate_id, candi
     #                 campaign[campaign_field_name] = campaign_field_value
     new_html, new_text = campaign.body_html or "", campaign.body_text or ""
     logger.info('get_new_text_html_subject_and_campaign_send: campaign_id:%s, candidate_id: %s'
-                % (campaign_id, candidate.id))
+                % (campaign.id, candidate.id))
 
     # Perform MERGETAG replacements
     [new_html, new_text, subject] = do_mergetag_replacements([new_html, new_text, campaign.subject],
@@ -667,7 +903,7 @@ def get_new_text_html_subject_and_campaign_send(campaign_id, candidate_id, candi
                                                              candidate_address=candidate_address)
     # Perform URL conversions and add in the custom HTML
     logger.info('get_new_text_html_subject_and_campaign_send: campaign_id:%s, email_campaign_send_id: %s'
-                % (campaign_id, email_campaign_send.id))
+                % (campaign.id, email_campaign_send_id))
     new_text, new_html = create_email_campaign_url_conversions(new_html=new_html,
                                                                new_text=new_text,
                                                                is_track_text_clicks=campaign.is_track_text_clicks,
@@ -675,8 +911,9 @@ def get_new_text_html_subject_and_campaign_send(campaign_id, candidate_id, candi
                                                                custom_url_params_json=campaign.custom_url_params_json,
                                                                is_email_open_tracking=campaign.is_email_open_tracking,
                                                                custom_html=campaign.custom_html,
-                                                               email_campaign_send_id=email_campaign_send.id)
-    return new_text, new_html, subject, email_campaign_send
+                                                               email_campaign_send_id=email_campaign_send_id,
+                                                               convert_url=convert_url)
+    return new_text, new_html, subject
 
 
 def _handle_email_sending_error(email_campaign_send, candidate_id, to_addresses, exception):
@@ -728,10 +965,13 @@ def update_hit_count(url_conversion):
                         "email_campaign_send(id:%s)",
                         email_campaign_send.candidate_id, email_campaign_send.id)
 
-        # Update email_campaign_blast entry only if it's a new hit
+        # Update email_campaign_blast entry and engagement scores only if it's a new hit, later hits of a URL don't
+        # change engagement score of send
         if new_hit_count == 1:
             retry(_assert_opens_or_clicks_updated, sleeptime=3, attempts=5, sleepscale=1,
                   args=(is_open, email_campaign_send), retry_exceptions=(AssertionError, OperationalError))
+            celery_refresh_campaign_engagement.delay(email_campaign_send.campaign_id,
+                                                     [email_campaign_send.candidate_id])
     except Exception:
         logger.exception("Received exception doing url_redirect (url_conversion_id=%s)",
                          url_conversion.id)
@@ -1119,6 +1359,40 @@ def celery_create_activity(user_id, _type, source, params, error_message="Error
         logger.exception('%s\nError: %s' % (error_message, e.message))
 
 
+@celery_app.task(name='create_send_activities')
+def celery_create_send_activities(user_id, _type, send_ids_and_params):
+    """
+    This creates campaign send activities of all sends of a chunk in one celery task.
+    :param int | long user_id: id of user
+    :param int _type: type of activity
+    :param list send_ids_and_params: list of tuples containing EmailCampaignSend ids and activity params
+    """
+    send_ids = [send_id for send_id, _ in send_ids_and_params]
+    sends = {send.id: send for send in EmailCampaignSend.query.filter(EmailCampaignSend.id.in_(send_ids))}
+    for send_id, params in send_ids_and_params:
+        try:
+            CampaignBase.create_activity(user_id, _type, sends[send_id], params)
+        except Exception as e:
+            logger.exception('Could not add `campaign send activity` for email-campaign-send(id:%s) and User(id:%s)'
+                             '\nError: %s' % (send_id, user_id, e.message))
+
+
+@celery_app.task(name='refresh_campaign_engagement')
+def celery_refresh_campaign_engagement(campaign_id, candidate_ids):
+    """
+    This refreshes engagement scores of given candidates in an email-campaign and its pipelines in a celery task.
+    :param int | long campaign_id: id of email-campaign
+    :param list candidate_ids: ids of candidates whose sends are created or opened/clicked
+    """
+    with app.app_context():
+        try:
+            refresh_campaign_engagement(campaign_id, candidate_ids)
+        except Exception as e:
+            db.session.rollback()
+            logger.exception('Could not refresh engagement scores of email-campaign(id:%s), candidates:%s'
+                             '\nError: %s' % (campaign_id, candidate_ids, e.message))
+
+
 def send_test_email(user, request):
     """
     This function sends a test email to given email addresses. Email sender depends on environment:
@@ -0,0 +1,217 @@
+"""
+Compile-once personalization of email campaigns.
+
+Personalizing a campaign email for every recipient with do_mergetag_replacements() and
+create_email_campaign_url_conversions() re-parses campaign's HTML with BeautifulSoup, prettifies and unescapes it
+for every candidate. Only merge tag values and tracked URLs differ between recipients, so here campaign's subject,
+body_text and body_html are compiled once per blast into a list of segments: literal strings and slots for merge
+tags and tracked URLs (links, open-tracking image or pixel). Open-tracking pixel and custom_html are added to
+compiled HTML, so rendering an email for a recipient is filling slots & joining segments.
+
+To compile, every merge tag is replaced with a unique placeholder and HTML is transformed exactly like
+create_email_campaign_url_conversions() does, with placeholders returned in place of tracked URLs. Rendered emails
+are therefore same as ones produced by the per-recipient functions.
+
+    template = get_compiled_campaign_template(campaign, current_user, blast_id)
+    new_text, new_html, subject = template.render(candidate, candidate_address, email_campaign_send_id)
+"""
+import re
+import json
+import uuid
+import HTMLParser
+
+from bs4 import BeautifulSoup
+
+from email_campaign_service.email_campaign_app import logger
+from email_campaign_service.modules.utils import (create_email_campaign_url_conversion, convert_html_tag_attributes,
+                                                  get_candidate_preferences_url, DEFAULT_FIRST_NAME_MERGETAG,
+                                                  DEFAULT_LAST_NAME_MERGETAG, DEFAULT_USER_NAME_MERGETAG,
+                                                  DEFAULT_PREFERENCES_URL_MERGETAG, TRACKING_PIXEL_URL)
+from email_campaign_service.common.utils.lru_cache import TTLLRUCache
+from email_campaign_service.common.models.email_campaign import TRACKING_URL_TYPE, HTML_CLICK_URL_TYPE
+
+MERGE_TAGS = (DEFAULT_FIRST_NAME_MERGETAG, DEFAULT_LAST_NAME_MERGETAG, DEFAULT_USER_NAME_MERGETAG,
+              DEFAULT_PREFERENCES_URL_MERGETAG)
+
+# Compiled templates of blasts being sent by this worker
+compiled_templates_cache = TTLLRUCache(max_size=100, ttl=3600)
+
+
+class CompiledText(object):
+    """
+    Text compiled into segments. Segments at even indices are literal strings, at odd indices are slot keys which
+    are ('merge', merge_tag) or ('url', index of tracked URL).
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.merge_tags = set(slot[1] for slot in segments[1::2] if slot[0] == 'merge')
+
+    def render(self, values):
+        """
+        :param dict values: Value of every slot key of this text
+        :rtype: unicode | str
+        """
+        segments = list(self.segments)
+        segments[1::2] = [values[slot] for slot in segments[1::2]]
+        return ''.join(segments)
+
+
+class CampaignEmailTemplate(object):
+    """
+    Subject, body_text and body_html of a campaign compiled for fast per-recipient rendering.
+    """
+
+    def __init__(self, campaign, current_user):
+        """
+        :param EmailCampaign campaign: Email campaign being sent
+        :param User current_user: User sending the campaign, used for *|USERNAME|* merge tag
+        """
+        self.user_name = current_user.name
+        self._placeholder_prefix = 'gtslot%s' % uuid.uuid4().hex[:12]
+        self._placeholder_regex = re.compile(r'%s_(merge|url)(\d+)_' % self._placeholder_prefix)
+        self._merge_placeholders = {tag: '%s_merge%d_' % (self._placeholder_prefix, index)
+                                    for index, tag in enumerate(MERGE_TAGS)}
+        # (destination URL with merge placeholders, type of URL, custom URL params) of every tracked URL, in order
+        # they are created by create_email_campaign_url_conversions()
+        self.tracked_urls = []
+
+        self.subject = self._compile_text(self._add_merge_placeholders(campaign.subject))
+        self.text = self._compile_text(self._add_merge_placeholders(campaign.body_text or ""))
+        self.html = self._compile_text(self._compile_html(self._add_merge_placeholders(campaign.body_html or ""),
+                                                          campaign))
+        self.tracked_urls = [(self._compile_text(destination_url), type_, custom_params)
+                             for destination_url, type_, custom_params in self.tracked_urls]
+
+    def _add_merge_placeholders(self, text):
+        if not text:
+            return text
+        # In case the user accidentally wrote http://*|PREFERENCES_URL|* or https://*|PREFERENCES_URL|*
+        for scheme in ('http://', 'https://'):
+            text = text.replace(scheme + DEFAULT_PREFERENCES_URL_MERGETAG, DEFAULT_PREFERENCES_URL_MERGETAG)
+        for tag, placeholder in self._merge_placeholders.iteritems():
+            text = text.replace(tag, placeholder)
+        return text
+
+    def _tracked_url_placeholder(self, destination_url, type_, custom_params=None):
+        self.tracked_urls.append((destination_url, type_, custom_params))
+        return '%s_url%d_' % (self._placeholder_prefix, len(self.tracked_urls) - 1)
+
+    def _compile_html(self, new_html, campaign):
+        """
+        Transforms HTML same as create_email_campaign_url_conversions(), but with placeholders of tracked URLs
+        """
+        soup = None
+        if new_html and campaign.is_email_open_tracking:
+            soup = BeautifulSoup(new_html, "lxml")
+            num_conversions = convert_html_tag_attributes(
+                soup, lambda url: self._tracked_url_placeholder(url, TRACKING_URL_TYPE), tag="img", attribute="src",
+                convert_first_only=True)
+            # If no images found, add a tracking pixel
+            if not num_conversions:
+                soup.insert(0, soup.new_tag("img", src=self._tracked_url_placeholder(TRACKING_PIXEL_URL,
+                                                                                     TRACKING_URL_TYPE)))
+
+        if new_html and campaign.is_track_html_clicks:
+            soup = soup or BeautifulSoup(new_html)
+            custom_params = json.loads(campaign.custom_url_params_json) if campaign.custom_url_params_json else {}
+            convert_html_tag_attributes(
+                soup, lambda url: self._tracked_url_placeholder(url, HTML_CLICK_URL_TYPE, custom_params), tag="a",
+                attribute="href")
+
+        if new_html and campaign.custom_html:
+            soup = soup or BeautifulSoup(new_html)
+            body_tag = soup.find(name="body") or soup.find(name="html")
+            if body_tag:
+                body_tag.insert(0, BeautifulSoup(campaign.custom_html))
+            else:
+                logger.error("Email campaign HTML did not have a body or html tag, "
+                             "so couldn't insert custom_html! email_campaign_id=%s", campaign.id)
+
+        if new_html and soup:
+            new_html = HTMLParser.HTMLParser().unescape(soup.prettify())
+        return new_html
+
+    def _compile_text(self, text):
+        if not text:
+            return CompiledText([text or ""])
+        parts = self._placeholder_regex.split(text)
+        # re.split() returns literal, slot type, slot index, literal, ..., so pair up slot types & indices
+        segments = [parts[0]]
+        for index in xrange(1, len(parts), 3):
+            slot_type, slot_index = parts[index], int(parts[index + 1])
+            segments.append(('merge', MERGE_TAGS[slot_index]) if slot_type == 'merge' else ('url', slot_index))
+            segments.append(parts[index + 2])
+        return CompiledText(segments)
+
+    def get_merge_values(self, candidate, candidate_address):
+        """
+        Returns values of merge tags for given candidate.
+        :param Candidate candidate: Candidate campaign is sent to
+        :param basestring candidate_address: Address of Candidate
+        :return: Dictionary of slot key -> value
+        :rtype: dict
+        """
+        values = {('merge', DEFAULT_FIRST_NAME_MERGETAG): candidate.first_name or "John",
+                  ('merge', DEFAULT_LAST_NAME_MERGETAG): candidate.last_name or "Doe",
+                  ('merge', DEFAULT_USER_NAME_MERGETAG): self.user_name}
+        if any(DEFAULT_PREFERENCES_URL_MERGETAG in compiled.merge_tags
+               for compiled in [self.subject, self.text, self.html] + [url[0] for url in self.tracked_urls]):
+            values[('merge', DEFAULT_PREFERENCES_URL_MERGETAG)] = get_candidate_preferences_url(candidate.id,
+                                                                                               candidate_address)
+        return values
+
+    def get_tracked_urls(self, values):
+        """
+        Returns tracked URLs of an email, for which URL conversions are to be created.
+        :param dict values: Merge tag values returned by get_merge_values()
+        :return: List of tuples (destination URL, type of URL, custom URL params)
+        :rtype: list
+        """
+        return [(destination_url.render(values), type_, custom_params)
+                for destination_url, type_, custom_params in self.tracked_urls]
+
+    def render_with_source_urls(self, values, source_urls):
+        """
+        Renders personalized email from merge tag values and source URLs of tracked URLs.
+        :param dict values: Merge tag values returned by get_merge_values()
+        :param list source_urls: Source URLs of URL conversions of get_tracked_urls(), in same order
+        :return: new_text, new_html and subject
+        :rtype: tuple
+        """
+        values = dict(values)
+        values.update((('url', index), source_url) for index, source_url in enumerate(source_urls))
+        return self.text.render(values), self.html.render(values), self.subject.render(values)
+
+    def render(self, candidate, candidate_address, email_campaign_send_id,
+               convert_url=create_email_campaign_url_conversion):
+        """
+        Renders personalized email of given candidate. URL conversions are created for all tracked URLs.
+        :param Candidate candidate: Candidate campaign is sent to
+        :param basestring candidate_address: Address of Candidate
+        :param int | long email_campaign_send_id: id of EmailCampaignSend object of candidate
+        :param convert_url: Function creating URL conversion, called with destination URL, send id, type of URL
+                            and custom URL params. Returns source URL.
+        :return: new_text, new_html and subject
+        :rtype: tuple
+        """
+        values = self.get_merge_values(candidate, candidate_address)
+        source_urls = [convert_url(destination_url, email_campaign_send_id, type_, custom_params)
+                       for destination_url, type_, custom_params in self.get_tracked_urls(values)]
+        return self.render_with_source_urls(values, source_urls)
+
+
+def get_compiled_campaign_template(campaign, current_user, email_campaign_blast_id):
+    """
+    Returns compiled template of campaign for given blast. Templates are compiled once per blast in a worker.
+    :param EmailCampaign campaign: Email campaign being sent
+    :param User current_user: User sending the campaign
+    :param int | long email_campaign_blast_id: id of email campaign blast object
+    :rtype: CampaignEmailTemplate
+    """
+    key = (campaign.id, email_campaign_blast_id)
+    template = compiled_templates_cache.get(key)
+    if template is None:
+        template = CampaignEmailTemplate(campaign, current_user)
+        compiled_templates_cache.set(key, template)
+    return template
@@ -0,0 +1,64 @@
+"""
+Compares per-recipient CPU time of personalizing campaign emails with do_mergetag_replacements() &
+create_email_campaign_url_conversions() and with campaign's template compiled once per blast.
+
+Emails of given campaign are personalized for --recipients candidates (not saved in database) in both ways.
+URL conversions are not saved in database either, so that only CPU time of personalization is measured.
+    python modules/personalization_benchmark.py --campaign-id 1 --recipients 1000
+"""
+import time
+import argparse
+
+from email_campaign_service.email_campaign_app import app
+from email_campaign_service.modules.email_marketing import personalize_campaign_email
+from email_campaign_service.modules.email_personalization import CampaignEmailTemplate
+from email_campaign_service.common.models.candidate import Candidate
+from email_campaign_service.common.models.email_campaign import EmailCampaign
+
+
+def convert_url(destination_url, email_campaign_send_id, url_type, custom_params=None):
+    """
+    Returns a source URL like create_email_campaign_url_conversion() does, without saving anything in database
+    """
+    return 'https://emailcampaign.gettalent.com/v1/redirect/%s?type=%s&destination=%s&params=%s' \
+           % (email_campaign_send_id, url_type, destination_url, custom_params)
+
+
+def get_personalization_cpu_time(campaign, recipients):
+    """
+    Returns CPU milliseconds per recipient spent by per-recipient personalization, and by compiled template
+    (including time spent in compiling it)
+    :rtype: dict
+    """
+    candidates = [Candidate(id=candidate_id, first_name='First%s' % candidate_id, last_name='Last%s' % candidate_id)
+                  for candidate_id in xrange(1, recipients + 1)]
+    cpu_time = {}
+
+    start_time = time.clock()
+    for candidate in candidates:
+        personalize_campaign_email(campaign, campaign.user, candidate, 'candidate-%s@example.com' % candidate.id,
+                                   candidate.id, convert_url=convert_url)
+    cpu_time['per_recipient'] = (time.clock() - start_time) * 1000 / recipients
+
+    start_time = time.clock()
+    template = CampaignEmailTemplate(campaign, campaign.user)
+    compile_time = time.clock() - start_time
+    for candidate in candidates:
+        template.render(candidate, 'candidate-%s@example.com' % candidate.id, candidate.id, convert_url=convert_url)
+    cpu_time['compiled'] = (time.clock() - start_time) * 1000 / recipients
+    cpu_time['compile'] = compile_time * 1000
+    return cpu_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares per-recipient CPU time of personalizing campaign emails.')
+    parser.add_argument('--campaign-id', type=int, required=True, help='Id of email campaign used in benchmark')
+    parser.add_argument('--recipients', type=int, default=1000, help='Number of recipients emails are rendered for')
+    args = parser.parse_args()
+
+    with app.app_context():
+        email_campaign = EmailCampaign.get_by_id(args.campaign_id)
+        result = get_personalization_cpu_time(email_campaign, args.recipients)
+        print 'Per-recipient personalization: %.3f ms CPU per recipient' % result['per_recipient']
+        print 'Compiled template: %.3f ms CPU per recipient (compiled once in %.3f ms)' % (result['compiled'],
+                                                                                          result['compile'])
@@ -0,0 +1,98 @@
+"""
+Compares per-candidate and chunked send modes of email campaigns.
+
+Broker cost (number of messages, bytes put on broker and results joined by chord) is measured by serializing the
+task messages a blast of --recipients candidates would create. Nothing is sent to broker.
+    python modules/send_modes_benchmark.py --campaign-id 1 --recipients 100000
+
+With --execute N, campaign is also sent to N candidates of its smartlists in both modes (tasks run in this process)
+and throughput (emails/sec) of each mode is reported. Outside production, emails go to test addresses only.
+    python modules/send_modes_benchmark.py --campaign-id 1 --execute 500
+"""
+import time
+import uuid
+import pickle
+import argparse
+
+from email_campaign_service.email_campaign_app import app
+from email_campaign_service.modules.email_marketing import (get_send_tasks, get_priority_emails,
+                                                            get_subscribed_and_unsubscribed_candidate_ids,
+                                                            get_candidates_from_smartlist_for_email_client_id,
+                                                            send_email_campaign_to_candidate,
+                                                            send_email_campaign_to_candidates_chunk,
+                                                            SEND_MODE_PER_CANDIDATE, SEND_MODE_CHUNKED,
+                                                            SEND_CHUNK_SIZE)
+from email_campaign_service.common.models.email_campaign import (EmailCampaign, EmailCampaignBlast,
+                                                                 EmailCampaignSmartlist)
+
+SEND_MODES = (SEND_MODE_PER_CANDIDATE, SEND_MODE_CHUNKED)
+
+
+def get_broker_cost(campaign, recipients, chunk_size):
+    """
+    Returns number of messages & bytes put on broker (pickled as Celery does) by tasks of a blast in each send mode
+    :rtype: dict
+    """
+    candidate_ids_and_emails = [(candidate_id, 'candidate-%s@example.com' % candidate_id)
+                                for candidate_id in xrange(1, recipients + 1)]
+    cost = {}
+    for send_mode in SEND_MODES:
+        tasks = get_send_tasks(campaign.user_id, candidate_ids_and_emails, 1, campaign, send_mode, chunk_size)
+        message_bytes = sum(len(pickle.dumps(dict(task=task.task, id=str(uuid.uuid4()), args=task.args,
+                                                  kwargs=task.kwargs, errbacks=task.options.get('link_error')),
+                                             protocol=pickle.HIGHEST_PROTOCOL))
+                            for task in tasks)
+        cost[send_mode] = dict(messages=len(tasks), message_bytes=message_bytes, chord_results=len(tasks))
+    return cost
+
+
+def get_throughput(campaign, sample_size, chunk_size):
+    """
+    Sends campaign to sample_size candidates of its smartlists in each send mode and returns emails/sec of each mode
+    :rtype: dict
+    """
+    smartlist_ids = EmailCampaignSmartlist.get_smartlists_of_campaign(campaign.id, smartlist_ids_only=True)
+    candidate_ids = get_candidates_from_smartlist_for_email_client_id(campaign, smartlist_ids)
+    subscribed_candidate_ids, _ = get_subscribed_and_unsubscribed_candidate_ids(campaign, candidate_ids)
+    candidate_ids_and_emails = get_priority_emails(campaign.user, subscribed_candidate_ids)[:sample_size]
+    throughput = {}
+    for send_mode in SEND_MODES:
+        blast = EmailCampaignBlast.save(EmailCampaignBlast(campaign_id=campaign.id))
+        start_time = time.time()
+        if send_mode == SEND_MODE_CHUNKED:
+            sends = sum(send_email_campaign_to_candidates_chunk(campaign.user_id, campaign.id,
+                                                                candidate_ids_and_emails[index:index + chunk_size],
+                                                                blast.id)
+                        for index in xrange(0, len(candidate_ids_and_emails), chunk_size))
+        else:
+            sends = sum(int(send_email_campaign_to_candidate(campaign.user_id, campaign, candidate_id,
+                                                             candidate_address, blast.id))
+                        for candidate_id, candidate_address in candidate_ids_and_emails)
+        elapsed = time.time() - start_time
+        throughput[send_mode] = dict(sends=sends, seconds=round(elapsed, 2),
+                                     emails_per_sec=round(sends / elapsed, 2) if elapsed else 0)
+    return throughput
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares per-candidate and chunked send modes of email campaigns.')
+    parser.add_argument('--campaign-id', type=int, required=True, help='Id of email campaign used in benchmark')
+    parser.add_argument('--recipients', type=int, default=100000,
+                        help='Number of recipients of blast used for measuring broker cost')
+    parser.add_argument('--chunk-size', type=int, default=SEND_CHUNK_SIZE,
+                        help='Number of candidates per task in chunked mode')
+    parser.add_argument('--execute', type=int, default=0,
+                        help='Optional: Send campaign to this many candidates in both modes and measure throughput')
+    args = parser.parse_args()
+
+    with app.app_context():
+        email_campaign = EmailCampaign.get_by_id(args.campaign_id)
+        for mode, mode_cost in get_broker_cost(email_campaign, args.recipients, args.chunk_size).iteritems():
+            print '%s: %s messages, %.2f MB on broker, %s results joined by chord' \
+                  % (mode, mode_cost['messages'], mode_cost['message_bytes'] / 1024.0 / 1024,
+                     mode_cost['chord_results'])
+        if args.execute:
+            for mode, mode_throughput in get_throughput(email_campaign, args.execute, args.chunk_size).iteritems():
+                print '%s: %s emails sent in %ss, %s emails/sec' % (mode, mode_throughput['sends'],
+                                                                    mode_throughput['seconds'],
+                                                                    mode_throughput['emails_per_sec'])
@@ -24,6 +24,7 @@ from dateutil.relativedelta import relativedelta
 from email_campaign_service.email_campaign_app import (logger, celery_app, cache, app)
 
 # Common Utils
+from email_campaign_service.common.models.db import db
 from email_campaign_service.common.redis_cache import redis_store
 from email_campaign_service.common.models.misc import UrlConversion
 from email_campaign_service.common.error_handling import InvalidUsage
@@ -132,7 +133,7 @@ def do_mergetag_replacements(texts, current_user, requested_object=None, candida
     logger.info('Replacing merge tags for campaign of user(id:%s, name:%s)' % (current_user.id, current_user.name))
     for text in texts:
         if text:
-            logger.info('Replacing merge tags for string:%s' % text)
+            logger.debug('Replacing merge tags for string:%s' % text)
             for key, value in merge_tag_replacement_dict.iteritems():
                 if key in text:
                     # Do first_name, last_name and username replacements
@@ -147,7 +148,7 @@ def do_mergetag_replacements(texts, current_user, requested_object=None, candida
                 text = text.replace(DEFAULT_PREFERENCES_URL_MERGETAG, TEST_PREFERENCE_URL)
 
         new_texts.append(text)
-    logger.info('Converted body_html, body_text and subject are:%s' % new_texts)
+    logger.debug('Converted body_html, body_text and subject are:%s' % new_texts)
     return new_texts
 
 
@@ -166,6 +167,24 @@ def do_prefs_url_replacement(text, candidate, candidate_address):
         raise InvalidUsage('Text should be non-empty string')
     if not (isinstance(candidate_id, (int, long)) and candidate_id):
         raise InvalidUsage('candidate_id should be positive int"long')
+    unsubscribe_url = get_candidate_preferences_url(candidate_id, candidate_address)
+
+    # In case the user accidentally wrote http://*|PREFERENCES_URL|* or https://*|PREFERENCES_URL|*
+    text = text.replace("http://" + DEFAULT_PREFERENCES_URL_MERGETAG, unsubscribe_url)
+    text = text.replace("https://" + DEFAULT_PREFERENCES_URL_MERGETAG, unsubscribe_url)
+
+    # The normal case
+    text = text.replace(DEFAULT_PREFERENCES_URL_MERGETAG, unsubscribe_url)
+    return text
+
+
+def get_candidate_preferences_url(candidate_id, candidate_address):
+    """
+    Returns URL for the candidate to unsubscribe the email-campaign, with a signed token of candidate.
+    :param int | long candidate_id: Id of candidate
+    :param basestring candidate_address: Address of Candidate to which email campaign is being sent
+    :rtype: string
+    """
     host_name = get_web_app_url()
     secret_key_id = jwt_security_key()
     secret_key = redis_store.get(secret_key_id)
@@ -175,19 +194,11 @@ def do_prefs_url_replacement(text, candidate, candidate_address):
         "candidate_id": candidate_id
     }
 
-    unsubscribe_url = host_name + ('/candidates/%s/preferences?%s' % (str(candidate_id), urllib.urlencode({
+    return host_name + ('/candidates/%s/preferences?%s' % (str(candidate_id), urllib.urlencode({
         'token': '%s.%s' % (s.dumps(payload), secret_key_id),
         'email': candidate_address or ''
     })))
 
-    # In case the user accidentally wrote http://*|PREFERENCES_URL|* or https://*|PREFERENCES_URL|*
-    text = text.replace("http://" + DEFAULT_PREFERENCES_URL_MERGETAG, unsubscribe_url)
-    text = text.replace("https://" + DEFAULT_PREFERENCES_URL_MERGETAG, unsubscribe_url)
-
-    # The normal case
-    text = text.replace(DEFAULT_PREFERENCES_URL_MERGETAG, unsubscribe_url)
-    return text
-
 
 def set_query_parameters(url, param_dict):
     """
@@ -242,10 +253,66 @@ def create_email_campaign_url_conversion(destination_url, email_campaign_send_id
     return signed_source_url
 
 
+def create_email_campaign_url_conversions_in_bulk(url_conversions):
+    """
+    Creates url_conversions of many sends (e.g. all tracked URLs of a chunk of recipients) in DB and returns their
+    source URLs. Same as calling create_email_campaign_url_conversion() for every item, but with a fixed number of
+    queries regardless of number of URLs.
+    UrlConversion rows are inserted with a single multi-row INSERT, each with a unique temporary source_url. Their ids
+    are then read back from the range of ids starting at LAST_INSERT_ID() (first id of the INSERT), and redirect URLs
+    are signed with those ids.
+    :param list url_conversions: List of tuples (destination_url, email_campaign_send_id, type_,
+                                 destination_url_custom_params)
+    :return: Signed source URLs in same order as url_conversions
+    :rtype: list
+    """
+    if not url_conversions:
+        return []
+    markers = [str(uuid.uuid4()) for _ in url_conversions]
+    added_time = datetime.utcnow()
+    rows = []
+    for marker, (destination_url, _, _, destination_url_custom_params) in zip(markers, url_conversions):
+        if destination_url_custom_params:
+            destination_url = set_query_parameters(destination_url, destination_url_custom_params)
+        # Keys are column names of url_conversion table
+        rows.append(dict(DestinationUrl=destination_url, SourceUrl=marker, HitCount=0, AddedTime=added_time))
+    db.session.execute(UrlConversion.__table__.insert().values(rows))
+    first_id = db.session.execute('SELECT LAST_INSERT_ID()').scalar()
+    ids = dict(db.session.query(UrlConversion.source_url, UrlConversion.id).filter(
+        UrlConversion.id >= first_id, UrlConversion.source_url.in_(markers)))
+    url_conversion_ids = [ids[marker] for marker in markers]
+
+    expiry_time = datetime.utcnow() + relativedelta(years=+1)
+    signed_source_urls = [CampaignUtils.sign_redirect_url(EmailCampaignApiUrl.URL_REDIRECT % url_conversion_id,
+                                                          expiry_time)
+                          for url_conversion_id in url_conversion_ids]
+    # In case of prod, do not save source URL
+    if CampaignUtils.IS_DEV:
+        db.session.bulk_update_mappings(UrlConversion, [dict(id=url_conversion_id, source_url=signed_source_url)
+                                                        for url_conversion_id, signed_source_url
+                                                        in zip(url_conversion_ids, signed_source_urls)])
+    else:
+        UrlConversion.query.filter(UrlConversion.id.in_(url_conversion_ids)).update(
+            {UrlConversion.source_url: ''}, synchronize_session=False)
+    db.session.bulk_insert_mappings(EmailCampaignSendUrlConversion,
+                                    [dict(email_campaign_send_id=email_campaign_send_id,
+                                          url_conversion_id=url_conversion_id, type=type_)
+                                     for (_, email_campaign_send_id, type_, _), url_conversion_id
+                                     in zip(url_conversions, url_conversion_ids)])
+    db.session.commit()
+    logger.info('create_email_campaign_url_conversions_in_bulk: Created %s url_conversions' % len(url_conversion_ids))
+    return signed_source_urls
+
+
 def create_email_campaign_url_conversions(new_html, new_text, is_track_text_clicks,
                                           is_track_html_clicks, custom_url_params_json,
                                           is_email_open_tracking, custom_html,
-                                          email_campaign_send_id):
+                                          email_campaign_send_id, convert_url=None):
+    """
+    Performs open & click tracking URL conversions and adds custom HTML in campaign's HTML.
+    :param convert_url: Function creating URL conversion, defaults to create_email_campaign_url_conversion()
+    """
+    convert_url = convert_url or create_email_campaign_url_conversion
     soup = None
 
     # HTML open tracking
@@ -255,8 +322,7 @@ def create_email_campaign_url_conversions(new_html, new_text, is_track_text_clic
         soup = BeautifulSoup(new_html, "lxml")
         num_conversions = convert_html_tag_attributes(
             soup,
-            lambda url: create_email_campaign_url_conversion(url, email_campaign_send_id,
-                                                             TRACKING_URL_TYPE),
+            lambda url: convert_url(url, email_campaign_send_id, TRACKING_URL_TYPE),
             tag="img",
             attribute="src",
             convert_first_only=True
@@ -265,9 +331,7 @@ def create_email_campaign_url_conversions(new_html, new_text, is_track_text_clic
         # If no images found, add a tracking pixel
         if not num_conversions:
             image_url = TRACKING_PIXEL_URL
-            new_image_url = create_email_campaign_url_conversion(image_url,
-                                                                 email_campaign_send_id,
-                                                                 TRACKING_URL_TYPE)
+            new_image_url = convert_url(image_url, email_campaign_send_id, TRACKING_URL_TYPE)
             new_image_tag = soup.new_tag("img", src=new_image_url)
             soup.insert(0, new_image_tag)
 
@@ -286,10 +350,7 @@ def create_email_campaign_url_conversions(new_html, new_text, is_track_text_clic
 
         convert_html_tag_attributes(
             soup,
-            lambda url: create_email_campaign_url_conversion(url,
-                                                             email_campaign_send_id,
-                                                             HTML_CLICK_URL_TYPE,
-                                                             destination_url_custom_params),
+            lambda url: convert_url(url, email_campaign_send_id, HTML_CLICK_URL_TYPE, destination_url_custom_params),
             tag="a",
             attribute="href"
         )
@@ -437,29 +498,36 @@ def get_priority_emails(user, candidate_ids):
 
     # If there are multiple emails of a single candidate, then get the primary email if it exist, otherwise get any
     # other email
-    for id_and_email_and_label in group_id_and_email_and_labels:
-        _id, email = get_candidate_id_email_by_priority(id_and_email_and_label, email_label_id_desc_tuples)
-        search_result = CandidateEmail.search_email_in_user_domain(User, user, email)
-        if CandidateEmail.is_bounced_email(email):
+    ids_and_emails = [get_candidate_id_email_by_priority(id_and_email_and_label, email_label_id_desc_tuples)
+                      for id_and_email_and_label in group_id_and_email_and_labels]
+
+    # Bounce status and candidates of every address in user's domain are fetched in bulk. MySQL compares addresses
+    # case-insensitively, so these are looked up by lower-cased address.
+    addresses = set(email for _, email in ids_and_emails)
+    bounced_addresses = CandidateEmail.get_bounced_addresses(addresses)
+    candidate_ids_of_addresses = CandidateEmail.get_candidate_ids_of_addresses_in_domain(user.domain_id, addresses)
+
+    filtered_email_rows = []
+    added_addresses = set()
+    for _id, email in ids_and_emails:
+        if email.lower() in bounced_addresses:
             logger.info('Skipping this email because this email address is marked as bounced.'
                         'CandidateId : %s, Email: %s.' % (_id, email))
             continue
+        candidate_ids = candidate_ids_of_addresses.get(email.lower(), set())
         # If there is only one candidate for an email-address in user's domain, we are good to go,
         # otherwise log error and send campaign email to that email id only once.
-        if len(search_result) == 1:
-            filtered_email_rows.append((_id, email))
-        else:
+        if len(candidate_ids) != 1:
             # Check if this email is already present in list of addresses to which campaign would be sent.
             # If so, omit the entry and continue.
-            if any(email in emails for emails in filtered_email_rows):
+            if email in added_addresses:
                 continue
-            else:
-                logger.error('%s candidates found for email address %s in user(id:%s)`s domain(id:%s). '
-                             'Candidate ids are: %s'
-                             % (len(search_result), email, user.id, user.domain_id,
-                                [candidate_email.candidate_id for candidate_email in search_result]))
-                filtered_email_rows.append((_id, email))
-    
+            logger.error('%s candidates found for email address %s in user(id:%s)`s domain(id:%s). '
+                         'Candidate ids are: %s'
+                         % (len(candidate_ids), email, user.id, user.domain_id, list(candidate_ids)))
+        filtered_email_rows.append((_id, email))
+        added_addresses.add(email)
+
     return filtered_email_rows
 
 
@@ -6,9 +6,29 @@ from contracts import ContractNotRespected
 from email_campaign_service.common.tests.conftest import fake
 from email_campaign_service.common.error_handling import InternalServerError
 from email_campaign_service.common.routes import EmailCampaignApiUrl, HEALTH_CHECK
-from email_campaign_service.modules.utils import do_mergetag_replacements, TEST_PREFERENCE_URL
+from email_campaign_service.modules.utils import (do_mergetag_replacements, TEST_PREFERENCE_URL,
+                                                  get_priority_emails, DEFAULT_FIRST_NAME_MERGETAG,
+                                                  create_email_campaign_url_conversions_in_bulk)
+from email_campaign_service.common.models.db import db
+from email_campaign_service.common.models.misc import UrlConversion
+from email_campaign_service.common.models.candidate import CandidateEmail, EmailLabel
+from email_campaign_service.common.models.email_campaign import (EmailCampaignSend, EmailCampaignSendUrlConversion,
+                                                                 TRACKING_URL_TYPE, HTML_CLICK_URL_TYPE,
+                                                                 EmailCampaignSmartlist)
+from email_campaign_service.common.models.engagement import (CandidateCampaignEngagement, EmailCampaignEngagement,
+                                                             TalentPipelineEngagement,
+                                                             TalentPipelineCandidateEngagement, CandidateEngagement)
+from email_campaign_service.common.models.smartlist import Smartlist
+from email_campaign_service.common.models.talent_pools_pipelines import TalentPoolCandidate
+from email_campaign_service.common.utils.engagement_utils import (refresh_campaign_engagement,
+                                                                   refresh_pipelines_engagement)
+from email_campaign_service.modules.email_marketing import (get_send_tasks, SEND_MODE_CHUNKED,
+                                                            send_email_campaign_to_candidates_chunk,
+                                                            personalize_campaign_email)
+from email_campaign_service.modules.email_personalization import CampaignEmailTemplate
 from email_campaign_service.common.campaign_services.tests_helpers import CampaignsTestsHelpers
-from email_campaign_service.tests.modules.handy_functions import create_email_campaign_with_merge_tags
+from email_campaign_service.tests.modules.handy_functions import (create_email_campaign_with_merge_tags,
+                                                                  create_campaign_blast_and_sends)
 
 __author__ = 'basit'
 
@@ -89,6 +109,146 @@ def test_candidate_name(candidate_first):
     assert candidate_first.name == first_name + ' ' + last_name
 
 
+def test_chunked_send_tasks(user_first):
+    """
+    Here we test that chunked send mode creates one task per chunk of candidates and passes only ids to tasks.
+    """
+    campaign = create_email_campaign_with_merge_tags(user_id=user_first.id, in_db_only=True)
+    candidate_ids_and_emails = [(candidate_id, fake.email()) for candidate_id in xrange(1, 251)]
+    tasks = get_send_tasks(user_first.id, candidate_ids_and_emails, 1, campaign, SEND_MODE_CHUNKED, chunk_size=100)
+    assert len(tasks) == 3
+    assert all(task.task == send_email_campaign_to_candidates_chunk.name for task in tasks)
+    assert [len(task.args[2]) for task in tasks] == [100, 100, 50]
+    assert [item for task in tasks for item in task.args[2]] == candidate_ids_and_emails
+    assert all(task.args[1] == campaign.id for task in tasks)
+
+    # Test with invalid send mode
+    try:
+        get_send_tasks(user_first.id, candidate_ids_and_emails, 1, campaign, 'invalid')
+        assert None, 'It should raise InternalServerError'
+    except InternalServerError as error:
+        assert 'send mode' in error.message
+
+
+def test_get_priority_emails(user_first, candidate_first, candidate_first_2, candidate_second):
+    """
+    Here we test that get_priority_emails() picks primary email of every candidate, skips bounced emails and
+    returns an address shared by multiple candidates of domain only once.
+    """
+    primary_label_id = EmailLabel.query.filter_by(description=EmailLabel.PRIMARY_DESCRIPTION).first().id
+    shared_email, bounced_email = fake.email(), fake.email()
+    primary_email = fake.email()
+    db.session.add_all([CandidateEmail(candidate_id=candidate_first.id, address=fake.email()),
+                        CandidateEmail(candidate_id=candidate_first.id, address=primary_email,
+                                       email_label_id=primary_label_id),
+                        CandidateEmail(candidate_id=candidate_first_2.id, address=shared_email),
+                        CandidateEmail(candidate_id=candidate_second.id, address=shared_email)])
+    db.session.commit()
+
+    candidate_ids = [candidate_first.id, candidate_first_2.id, candidate_second.id]
+    assert get_priority_emails(user_first, candidate_ids) == [(candidate_first.id, primary_email),
+                                                              (candidate_first_2.id, shared_email)]
+
+    # Bounced primary email should be skipped
+    CandidateEmail.query.filter_by(candidate_id=candidate_first.id, address=primary_email).update(
+        dict(address=bounced_email, is_bounced=True))
+    db.session.commit()
+    assert get_priority_emails(user_first, candidate_ids) == [(candidate_first_2.id, shared_email)]
+
+
+def test_compiled_campaign_template(user_first, candidate_first):
+    """
+    Here we test that emails rendered by CampaignEmailTemplate are same as emails personalized by
+    do_mergetag_replacements() and create_email_campaign_url_conversions().
+    """
+    def convert_url(destination_url, send_id, url_type, custom_params=None):
+        return 'http://tracking.example.com/%s/%s?destination=%s&params=%s' % (send_id, url_type, destination_url,
+                                                                             custom_params)
+
+    campaign = create_email_campaign_with_merge_tags(user_id=user_first.id, in_db_only=True)
+    campaign.update(body_html='<html><body><a href="http://www.example.com/%s">Link</a>%s</body></html>'
+                              % (DEFAULT_FIRST_NAME_MERGETAG, campaign.body_html),
+                    is_email_open_tracking=1, is_track_html_clicks=1, custom_url_params_json='{"source": "email"}',
+                    custom_html='<p>Custom HTML</p>')
+    template = CampaignEmailTemplate(campaign, user_first)
+    for send_id in (1, 2):
+        expected = personalize_campaign_email(campaign, user_first, candidate_first, fake.safe_email(), send_id,
+                                              convert_url=convert_url)
+        rendered = template.render(candidate_first, fake.safe_email(), send_id, convert_url=convert_url)
+        # Preferences URL is signed with current time, so compare everything else
+        assert [text.split('Unsubscribe URL is:')[0] for text in rendered] == \
+               [text.split('Unsubscribe URL is:')[0] for text in expected]
+        assert candidate_first.first_name in rendered[2]
+        assert 'destination=http://www.example.com/%s' % candidate_first.first_name in rendered[1]
+
+
+def test_create_url_conversions_in_bulk(user_first, candidate_first):
+    """
+    Here we test that URL conversions of many sends are created in bulk with signed source URLs of their ids.
+    """
+    campaign = create_email_campaign_with_merge_tags(user_id=user_first.id, in_db_only=True)
+    create_campaign_blast_and_sends(campaign.id, candidate_first.id, 2)
+    send_ids = [send.id for send in EmailCampaignSend.query.filter_by(campaign_id=campaign.id)]
+    url_conversions = [('http://www.example.com/%s' % send_id, send_id, HTML_CLICK_URL_TYPE, {'source': 'email'})
+                       for send_id in send_ids]
+    url_conversions.append(('http://www.example.com/pixel.gif', send_ids[0], TRACKING_URL_TYPE, None))
+    source_urls = create_email_campaign_url_conversions_in_bulk(url_conversions)
+    assert len(source_urls) == len(url_conversions)
+
+    url_conversion_ids = [int(source_url.split('/redirect/')[1].split('?')[0]) for source_url in source_urls]
+    assert len(set(url_conversion_ids)) == len(url_conversions)
+    for url_conversion_id, (destination_url, send_id, type_, _) in zip(url_conversion_ids, url_conversions):
+        url_conversion = UrlConversion.get_by_id(url_conversion_id)
+        assert url_conversion.destination_url.startswith(destination_url)
+        send_url_conversion = EmailCampaignSendUrlConversion.get_by_url_conversion_id(url_conversion_id)
+        assert send_url_conversion.email_campaign_send_id == send_id
+        assert send_url_conversion.type == type_
+    assert 'source=email' in UrlConversion.get_by_id(url_conversion_ids[0]).destination_url
+    assert create_email_campaign_url_conversions_in_bulk([]) == []
+
+
+def test_refresh_campaign_engagement(user_first, candidate_first, talent_pipeline):
+    """
+    Here we test that engagement scores of sends are rolled up into campaign, candidate and pipeline scores.
+    A clicked send scores 100 and an only opened send scores 33.3.
+    """
+    TalentPoolCandidate.save(TalentPoolCandidate(talent_pool_id=talent_pipeline.talent_pool_id,
+                                                 candidate_id=candidate_first.id))
+    campaign = create_email_campaign_with_merge_tags(user_id=user_first.id, in_db_only=True)
+    smartlist = Smartlist(name=fake.word(), user_id=user_first.id, talent_pipeline_id=talent_pipeline.id)
+    Smartlist.save(smartlist)
+    EmailCampaignSmartlist.save(EmailCampaignSmartlist(smartlist_id=smartlist.id, campaign_id=campaign.id))
+    create_campaign_blast_and_sends(campaign.id, candidate_first.id, 2)
+    clicked_send_id, opened_send_id = [send.id for send in EmailCampaignSend.query.filter_by(campaign_id=campaign.id)]
+    source_urls = create_email_campaign_url_conversions_in_bulk([
+        ('http://www.example.com/pixel.gif', clicked_send_id, TRACKING_URL_TYPE, None),
+        ('http://www.example.com', clicked_send_id, HTML_CLICK_URL_TYPE, None),
+        ('http://www.example.com/pixel.gif', opened_send_id, TRACKING_URL_TYPE, None),
+        ('http://www.example.com', opened_send_id, HTML_CLICK_URL_TYPE, None)])
+    url_conversion_ids = [int(source_url.split('/redirect/')[1].split('?')[0]) for source_url in source_urls]
+    for url_conversion_id in url_conversion_ids[:3]:
+        UrlConversion.get_by_id(url_conversion_id).update(hit_count=1)
+
+    refresh_campaign_engagement(campaign.id, [candidate_first.id])
+
+    campaign_engagement = EmailCampaignEngagement.query.get(campaign.id)
+    assert campaign_engagement.sends_count == 2
+    assert round(campaign_engagement.engagement_score, 2) == 66.65
+    candidate_engagement = CandidateCampaignEngagement.query.get((candidate_first.id, campaign.id))
+    assert round(candidate_engagement.engagement_score, 2) == 66.65
+    assert round(TalentPipelineEngagement.query.get(talent_pipeline.id).engagement_score, 2) == 66.65
+    pipeline_candidate_engagement = TalentPipelineCandidateEngagement.query.get((talent_pipeline.id,
+                                                                                 candidate_first.id))
+    assert round(pipeline_candidate_engagement.engagement_score, 2) == 66.65
+    assert round(CandidateEngagement.query.get(candidate_first.id).engagement_score, 2) == 66.65
+
+    # Scores of campaign should be dropped from pipeline once its smartlist is moved out of pipeline
+    smartlist.update(talent_pipeline_id=None)
+    refresh_pipelines_engagement([talent_pipeline.id])
+    assert not TalentPipelineEngagement.query.get(talent_pipeline.id)
+    assert not TalentPipelineCandidateEngagement.query.get((talent_pipeline.id, candidate_first.id))
+
+
 # Test for healthcheck
 def test_health_check():
     response = requests.get(EmailCampaignApiUrl.HOST_NAME % HEALTH_CHECK)
@@ -3,9 +3,18 @@ This module contains Dynamodb class which is for CRUD operation for candidate dy
 """
 from graphql_service.application import app
 from decimal import Decimal
+import time
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from graphql_service.common.talent_config_manager import TalentConfigKeys, TalentEnvs
+from graphql_service.common.error_handling import InternalServerError
+
+CANDIDATE_TABLE_NAME = 'candidate'
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_CHUNK_SIZE = 100
+# Retries of keys left unprocessed by BatchGetItem e.g. when table's read capacity is exceeded
+BATCH_GET_MAX_RETRIES = 5
+BATCH_GET_RETRY_DELAY = 0.05
 
 
 class TableSelector(object):
@@ -22,11 +31,16 @@ class TableSelector(object):
         self.table_name = table_name
 
     def __get__(self, instance, owner):
-        if app.config['GT_ENVIRONMENT'] == TalentEnvs.DEV:
-            table = boto3.resource('dynamodb', endpoint_url='http://localhost:8000').Table(self.table_name)
-        else:
-            table = boto3.resource('dynamodb', region_name='us-east-1').Table(self.table_name)
-        return table
+        return get_dynamodb_resource().Table(self.table_name)
+
+
+def get_dynamodb_resource():
+    """
+    Returns dynamodb service resource of current environment
+    """
+    if app.config['GT_ENVIRONMENT'] == TalentEnvs.DEV:
+        return boto3.resource('dynamodb', endpoint_url='http://localhost:8000')
+    return boto3.resource('dynamodb', region_name='us-east-1')
 
 
 class DynamoDB(object):
@@ -42,7 +56,7 @@ class DynamoDB(object):
           any tables accidentally. Should deleting a table be required, it must be done
           via the AWS-DynamoDB's console: https://console.aws.amazon.com/dynamodb/home?region=us-east-1
     """
-    candidate_table = TableSelector('candidate')
+    candidate_table = TableSelector(CANDIDATE_TABLE_NAME)
 
     # assert candidate_table.table_status in {'ACTIVE', 'UPDATING'}
 
@@ -85,6 +99,34 @@ class DynamoDB(object):
 
         return None
 
+    @classmethod
+    def batch_get_attributes(cls, candidate_ids):
+        """
+        Will retrieve data of many candidates from dynamoDB with BatchGetItem, BATCH_GET_CHUNK_SIZE candidates per
+        request, and replace all Decimal objects with ints & floats. Keys left unprocessed by dynamoDB are requested
+        again with exponential backoff.
+        :type candidate_ids: list[int | long]
+        :return: candidates' data keyed by their ids, candidates not found in dynamoDB are left out
+        :rtype: dict
+        """
+        dynamodb = get_dynamodb_resource()
+        keys = [{'id': str(candidate_id)} for candidate_id in set(candidate_ids)]
+        candidates = {}
+        for index in xrange(0, len(keys), BATCH_GET_CHUNK_SIZE):
+            request_items = {CANDIDATE_TABLE_NAME: {'Keys': keys[index:index + BATCH_GET_CHUNK_SIZE]}}
+            for retry in xrange(BATCH_GET_MAX_RETRIES + 1):
+                if retry:
+                    time.sleep(BATCH_GET_RETRY_DELAY * 2 ** (retry - 1))
+                response = dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response['Responses'].get(CANDIDATE_TABLE_NAME, []):
+                    candidates[int(item['id'])] = replace_decimal(item)
+                request_items = response.get('UnprocessedKeys')
+                if not request_items:
+                    break
+            else:
+                raise InternalServerError('Unable to retrieve candidates from DynamoDB, keys left unprocessed')
+        return candidates
+
     @classmethod
     def delete_attributes(cls, candidate_id, attributes):
         """
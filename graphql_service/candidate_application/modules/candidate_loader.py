@@ -0,0 +1,60 @@
+"""
+Per-request loader of candidates' data. Candidates requested by resolvers of a graphql request are validated with
+one MySQL query and retrieved from DynamoDB with BatchGetItem, and each candidate is loaded once per request.
+"""
+from graphql_service.candidate_application.dynamodb import DynamoDB
+from validators import get_validated_candidate_ids
+
+
+class CandidateLoader(object):
+    """
+    Usage:
+        >>> loader = get_candidate_loader(context)
+        >>> loader.load_many([1, 2, 3])
+        [{'id': '1', 'first_name': 'jerry'}, None, {'id': '3', 'first_name': 'larry'}]
+    """
+
+    def __init__(self, user):
+        """
+        :param user: user making the request, candidates are validated per user's permission(s)
+        :type user: User
+        """
+        self.user = user
+        self.candidates = {}
+
+    def load(self, candidate_id):
+        """
+        :type candidate_id: int | long
+        :return: candidate's data or None if candidate is not found or user is not permitted to retrieve it
+        :rtype: dict | None
+        """
+        return self.load_many([candidate_id])[0]
+
+    def load_many(self, candidate_ids):
+        """
+        Will retrieve candidates that are not loaded yet in this request
+        :type candidate_ids: list[int | long]
+        :return: candidates' data in order of given ids, None for candidates that are not found or that user
+                 is not permitted to retrieve
+        :rtype: list[dict | None]
+        """
+        candidate_ids_to_load = set(candidate_ids) - set(self.candidates)
+        if candidate_ids_to_load:
+            validated_candidate_ids = get_validated_candidate_ids(self.user, list(candidate_ids_to_load))
+            candidates = DynamoDB.batch_get_attributes(list(validated_candidate_ids))
+            for candidate_id in candidate_ids_to_load:
+                self.candidates[candidate_id] = candidates.get(candidate_id)
+        return [self.candidates[candidate_id] for candidate_id in candidate_ids]
+
+
+def get_candidate_loader(context):
+    """
+    Returns candidate loader of current request, it is created on first call
+    :param context: context of graphql request i.e. flask's request
+    :rtype: CandidateLoader
+    """
+    loader = getattr(context, 'candidate_loader', None)
+    if loader is None:
+        loader = CandidateLoader(context.user)
+        context.candidate_loader = loader
+    return loader
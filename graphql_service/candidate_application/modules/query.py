@@ -13,9 +13,12 @@ from graphql_service.candidate_application.dynamodb import DynamoDB
 # Validations
 from validators import is_candidate_validated
 
+from candidate_loader import get_candidate_loader
+
 
 class CandidateQuery(graphene.ObjectType):
     candidate = graphene.Field(type=CandidateType, id=graphene.Int(required=True))
+    candidates = graphene.List(CandidateType, ids=graphene.List(graphene.Int, required=True))
 
     @require_oauth()
     # @require_all_permissions(Permission.PermissionNames.CAN_GET_CANDIDATES)
@@ -34,3 +37,14 @@ class CandidateQuery(graphene.ObjectType):
             return None
 
         return DynamoDB.get_attributes(candidate_id)
+
+    @require_oauth()
+    def resolve_candidates(self, args, context, info):
+        """
+        Function will retrieve many candidates, e.g. to show a talent list, with one MySQL query for checking
+        if candidates exist & are permitted to user and with batched requests to DynamoDB
+
+        :param args: arguments provided by the client
+        :return: candidates in order of requested ids, None for candidates that are not found or not permitted
+        """
+        return get_candidate_loader(request).load_many(args.get('ids'))
@@ -1,6 +1,7 @@
 """
 
 """
+from graphql_service.common.models.db import db
 from graphql_service.common.models.user import User
 from graphql_service.common.models.candidate import Candidate
 from graphql_service.common.utils.auth_utils import has_role
@@ -23,3 +24,27 @@ def is_candidate_validated(user, candidate_id, user_role='TALENT_ADMIN'):
         return False
 
     return True
+
+
+def get_validated_candidate_ids(user, candidate_ids, user_role='TALENT_ADMIN'):
+    """
+    Function will return ids of candidates that are 1. found & 2. validated per user's permission(s), same as
+    is_candidate_validated() but with one query for all candidates
+    :type user: User
+    :type candidate_ids: list[int | long]
+    :type user_role: str
+    :rtype: set
+    """
+    if not candidate_ids:
+        return set()
+
+    candidates = db.session.query(Candidate.id, User.domain_id).outerjoin(User, Candidate.user_id == User.id).\
+        filter(Candidate.id.in_(set(candidate_ids))).all()
+    if not candidates:
+        return set()
+
+    # Candidates of other domains are not authorized for user with given role
+    if has_role(user=user, role=user_role):
+        return {candidate_id for candidate_id, domain_id in candidates if domain_id == user.domain_id}
+
+    return {candidate_id for candidate_id, _ in candidates}
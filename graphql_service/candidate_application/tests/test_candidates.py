@@ -21,6 +21,29 @@ class TestQueryCandidate(object):
         print "\ndata = {}".format(response.json())
 
 
+class TestQueryCandidates(object):
+    def test_get_candidates(self):
+        """
+        Test: Add two candidates and retrieve both along with a nonexistent candidate in one query
+        Expect: Candidates in order of requested ids and None for nonexistent candidate
+        """
+        candidate_ids = []
+        for _ in range(2):
+            client = GraphQLClient(is_creating=True, first_name=fake.first_name(), last_name=fake.last_name())
+            response = requests.post(url=client.base_url, headers=headers,
+                                     data=json.dumps(client.generated_query_string))
+            candidate_ids.append(response.json()['data']['create_candidate']['id'])
+
+        requested_ids = [candidate_ids[1], 2147483647, candidate_ids[0]]
+        query_string = "query {candidates(ids: %s) {id, first_name}}" % json.dumps(requested_ids)
+        response = requests.post(url=GraphQLClient.base_url, headers=headers, data=json.dumps(query_string))
+        print '\ndata: {}'.format(response.json())
+        assert response.status_code == requests.codes.ok
+        candidates = response.json()['data']['candidates']
+        assert [candidate and int(candidate['id']) for candidate in candidates] == \
+            [int(candidate_ids[1]), None, int(candidate_ids[0])]
+
+
 class TestAddCandidate(object):
     def test_candidate(self):
         candidate_data = dict(
@@ -60,6 +60,16 @@ ENCRYPTED_PDF = {
     'message': 'The PDF appears to be encrypted and could not be read. Please try using an un-encrypted PDF.'
 }
 
+TOO_MANY_RESUMES = {
+    'code': 3010,
+    'message': 'Too many resumes were given. Please parse at most 500 resumes at once.'
+}
+
+NO_RESUMES_FOUND = {
+    'code': 3011,
+    'message': 'No resumes were found with the given file prefix.'
+}
+
 
 # Issues with third party tools.
 GOOGLE_OCR_UNAVAILABLE = {
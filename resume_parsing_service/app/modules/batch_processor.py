@@ -0,0 +1,112 @@
+"""
+Processing of many resumes of a single request.
+
+OCR, Optic and candidate-service calls of a resume are I/O bound, so resumes are processed by a bounded pool of
+threads and results are yielded in order resumes finish in, to be streamed back to the client. At most
+RESUME_BATCH_CONCURRENCY * 2 resumes are submitted to the pool at a time, so memory used by a batch doesn't grow
+with number of resumes in it.
+"""
+# pylint: disable=wrong-import-position, fixme, import-error
+# Standard Library
+from itertools import islice
+# Third Party
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from flask import current_app
+# Module Specific
+from resume_parsing_service.app import app, logger
+from resume_parsing_service.app.constants import error_constants
+from resume_parsing_service.app.modules.resume_processor import process_resume
+from resume_parsing_service.common.error_handling import InvalidUsage, TalentError
+from resume_parsing_service.common.utils.talent_s3 import boto3_list_keys
+
+RESUME_BATCH_MAX_FILES = 500
+RESUME_BATCH_CONCURRENCY = 8
+# Folder of filepicker bucket which a domain's bulk uploaded resumes are stored in. Resumes can only be listed by
+# prefix within folder of user's own domain, as filepicker bucket is shared by all domains.
+RESUME_BATCH_UPLOAD_FOLDER = 'BulkResumeUploads/{domain_id}/'
+
+
+def get_batch_filepicker_keys(batch_params, domain_id):
+    """
+    Returns filepicker keys given in request, or keys starting with given filepicker prefix within bulk upload
+    folder of user's domain.
+    :param dict batch_params: Params built by build_batch_params_from_json()
+    :param int | long domain_id: Domain id of authenticated user
+    :rtype: list
+    """
+    filepicker_keys = batch_params['filepicker_keys']
+    if not filepicker_keys:
+        # Prefix is always built here, so keys of other domains can't be listed whatever prefix is given
+        prefix = RESUME_BATCH_UPLOAD_FOLDER.format(domain_id=domain_id) + batch_params['filepicker_prefix']
+        filepicker_keys = boto3_list_keys(current_app.config['S3_FILEPICKER_BUCKET_NAME'], prefix,
+                                          max_keys=RESUME_BATCH_MAX_FILES + 1)
+        if not filepicker_keys:
+            raise InvalidUsage(error_message=error_constants.NO_RESUMES_FOUND['message'],
+                               error_code=error_constants.NO_RESUMES_FOUND['code'])
+
+    if len(filepicker_keys) > RESUME_BATCH_MAX_FILES:
+        raise InvalidUsage(error_message=error_constants.TOO_MANY_RESUMES['message'],
+                           error_code=error_constants.TOO_MANY_RESUMES['code'])
+    return filepicker_keys
+
+
+def process_resumes(filepicker_keys, batch_params):
+    """
+    Processes resumes of given filepicker keys concurrently and yields result of every resume as soon as it is
+    processed. Failure of a resume doesn't stop processing of others.
+    :param list filepicker_keys: Keys of resumes in filepicker bucket
+    :param dict batch_params: Params common to all resumes (create_candidate, talent_pool_ids, oauth etc.)
+    :return: Results of resumes in form {'filepicker_key': ..., 'status_code': 200, ...result of process_resume}
+             or {'filepicker_key': ..., 'status_code': 4XX/5XX, 'error': {'code': ..., 'message': ...}}
+    :rtype: collections.Iterable[dict]
+    """
+    filepicker_keys = iter(filepicker_keys)
+    executor = ThreadPoolExecutor(max_workers=RESUME_BATCH_CONCURRENCY)
+    futures = {}
+
+    def submit(filepicker_key):
+        parse_params = dict(batch_params, filepicker_key=filepicker_key, filename=filepicker_key, resume_file=None)
+        futures[executor.submit(_process_resume_in_app_context, parse_params)] = filepicker_key
+
+    try:
+        for filepicker_key in islice(filepicker_keys, RESUME_BATCH_CONCURRENCY * 2):
+            submit(filepicker_key)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                filepicker_key = futures.pop(future)
+                next_filepicker_key = next(filepicker_keys, None)
+                if next_filepicker_key:
+                    submit(next_filepicker_key)
+                yield get_resume_result(filepicker_key, future)
+    finally:
+        # Client may stop reading results, resumes not started yet are not processed then
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _process_resume_in_app_context(parse_params):
+    with app.app_context():
+        return process_resume(parse_params)
+
+
+def get_resume_result(filepicker_key, future):
+    """
+    Returns result of processing a resume, or its error.
+    :param string filepicker_key: Key of resume
+    :param concurrent.futures.Future future: Future of process_resume() of resume
+    :rtype: dict
+    """
+    try:
+        return dict(future.result(), filepicker_key=filepicker_key, status_code=200)
+    except TalentError as error:
+        return dict(error.to_dict(), filepicker_key=filepicker_key, status_code=error.http_status_code())
+    except Exception:
+        logger.exception('ResumeParsingService::UncaughtError::process_resumes Key {}'.format(filepicker_key))
+        return {
+            'filepicker_key': filepicker_key,
+            'status_code': 500,
+            'error': {'code': error_constants.RESUME_UNCAUGHT_EXCEPTION['code'],
+                      'message': error_constants.RESUME_UNCAUGHT_EXCEPTION['message']}
+        }
@@ -14,6 +14,7 @@ import unicodedata
 import urllib2
 # Third Party
 from bs4 import BeautifulSoup as bs4
+from bs4.element import ResultSet
 from contracts import contract
 from flask import current_app
 import phonenumbers
@@ -29,6 +30,8 @@ from resume_parsing_service.common.utils.validators import sanitize_zip_code
 
 ISO8601_DATE_FORMAT = "%Y-%m-%d"
 SPLIT_DESCRIPTION_REGEXP = re.compile(ur"•≅_|≅_| \* |■|•|➢|→|â|˘|\n\n\n")
+# Tags of BG XML which are parsed into candidate's fields
+SECTION_TAG_NAMES = ('contact', 'experience', 'education', 'canonskill', 'summary', 'references')
 
 
 @contract
@@ -94,18 +97,20 @@ def parse_optic_xml(resume_xml_text):
     :return: Results of various parsing functions on the input xml string.
     :rtype: dict
     """
+    # XML is parsed once, section parsers only read the tree.
     resume_soup = bs4(resume_xml_text, 'lxml')
     pretty_text = resume_soup.prettify().encode('utf8', 'replace')
     non_ascii_chars = set(re.sub(u'[\x00-\x7f]', '', pretty_text))
     if non_ascii_chars:
         logger.info('ResumeParsingService::Info::Non-ascii chars in resume: {}'.format(non_ascii_chars))
     encoded_soup_text = b64encode(pretty_text)
-    contact_xml_list = bs4(resume_xml_text, 'lxml').findAll('contact')
-    experience_xml_list = bs4(resume_xml_text, 'lxml').findAll('experience')
-    educations_xml_list = bs4(resume_xml_text, 'lxml').findAll('education')
-    skill_xml_list = bs4(resume_xml_text, 'lxml').findAll('canonskill')
-    summary_xml_list = bs4(resume_xml_text, 'lxml').findAll('summary')
-    references_xml = bs4(resume_xml_text, 'lxml').findAll('references')
+    section_tags = find_section_tags(resume_soup)
+    contact_xml_list = section_tags['contact']
+    experience_xml_list = section_tags['experience']
+    educations_xml_list = section_tags['education']
+    skill_xml_list = section_tags['canonskill']
+    summary_xml_list = section_tags['summary']
+    references_xml = section_tags['references']
     emails = parse_candidate_emails(contact_xml_list)
     first_name, last_name = parse_candidate_name(contact_xml_list)
     references = parse_candidate_reference(references_xml)
@@ -131,6 +136,20 @@ def parse_optic_xml(resume_xml_text):
         social_networks=linkedIn_urls)
 
 
+def find_section_tags(resume_soup):
+    """
+    Finds tags of all sections (SECTION_TAG_NAMES) in a single walk of the tree. Tags of every section are in
+    document order, same as findAll() of the section would return them.
+    :param bs4.BeautifulSoup resume_soup: Parsed BG XML
+    :return: Dictionary of section tag name -> ResultSet of its tags
+    :rtype: dict
+    """
+    section_tags = {tag_name: ResultSet(None) for tag_name in SECTION_TAG_NAMES}
+    for tag in resume_soup.findAll(SECTION_TAG_NAMES):
+        section_tags[tag.name].append(tag)
+    return section_tags
+
+
 @contract
 def parse_candidate_name(bs_contact_xml_list):
     """
@@ -613,16 +632,28 @@ def scrub_candidate_name(name_unicode):
     :rtype string:
     """
 
-    translate_table = dict.fromkeys(
-        i for i in xrange(sys.maxunicode) if unicodedata.category(unichr(i)).startswith('P'))
-
     name_unicode = name_unicode[:35]
-    name_unicode = name_unicode.translate(translate_table)
+    name_unicode = name_unicode.translate(get_punctuation_translate_table())
     name_unicode = name_unicode.title()
 
     return name_unicode
 
 
+def get_punctuation_translate_table():
+    """
+    Returns translate table which removes all unicode punctuation characters. Table is built once per process,
+    as building it takes a scan of all unicode code points.
+    :rtype: dict
+    """
+    global _punctuation_translate_table
+    if _punctuation_translate_table is None:
+        _punctuation_translate_table = dict.fromkeys(
+            i for i in xrange(sys.maxunicode) if unicodedata.category(unichr(i)).startswith('P'))
+    return _punctuation_translate_table
+
+_punctuation_translate_table = None
+
+
 def get_country_code_from_address_tag(address):
     """
     Gets a country code from an address tag.
@@ -11,7 +11,7 @@ from resume_parsing_service.app.constants import error_constants
 from resume_parsing_service.common.error_handling import InvalidUsage
 from resume_parsing_service.common.models.misc import Product
 from resume_parsing_service.common.utils.validators import get_json_data_if_validated
-from resume_parsing_service.json_schemas.resumes_post_schema import create_candidate_schema
+from resume_parsing_service.json_schemas.resumes_post_schema import batch_parse_schema, create_candidate_schema
 
 
 @contract
@@ -41,6 +41,31 @@ def build_params_from_json(request):
     return params
 
 
+@contract
+def build_batch_params_from_json(request):
+    """
+    Takes in flask request object of a batch of resumes and returns params common to all resumes of the batch,
+    along with their filepicker keys or filepicker key prefix.
+    :param flask_request request:
+    :return: Parsing parameters extracted from the requests JSON.
+    :rtype: dict
+    """
+    request_json = get_json_data_if_validated(
+        request,
+        batch_parse_schema,
+        custom_msg=error_constants.JSON_SCHEMA_ERROR['message'],
+        custom_error_code=error_constants.JSON_SCHEMA_ERROR['code'])
+    logger.info('Beginning batch parsing with JSON params: {}'.format(request_json))
+
+    params = {}
+    for k in ('filepicker_keys', 'filepicker_prefix', 'source_id', 'talent_pool_ids', 'source_product_id'):
+        params[k] = request_json.get(k)
+
+    params['create_candidate'] = request_json.get('create_candidate', False)
+
+    return params
+
+
 @contract
 def build_params_from_form(request):
     """
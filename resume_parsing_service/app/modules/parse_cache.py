@@ -0,0 +1,103 @@
+"""
+Content-addressed cache of parsed resumes.
+
+The same resume is often uploaded several times (email intake, Chrome extension, bulk upload). Results of parsing
+are cached in Redis, keyed by SHA-256 of resume's content and PARSED_RESUME_CACHE_VERSION, so a re-uploaded resume
+skips both OCR and the Optic call. Values are zlib-compressed JSON of Optic XML and parsed candidate dict.
+
+Cache is bounded to PARSED_RESUME_CACHE_MAX_ENTRIES: last access time of every entry is kept in a sorted set and
+least recently used entries are evicted when a new one is added. Hits and misses are counted in Redis.
+"""
+__author__ = 'erik@gettalent.com'
+# Standard library
+import json
+import time
+import zlib
+# Module specific
+from resume_parsing_service.app import logger, redis_store
+
+# Bump it when parse_optic_xml() output changes, so that resumes cached by older parser are not served.
+PARSED_RESUME_CACHE_VERSION = 1
+PARSED_RESUME_CACHE_MAX_ENTRIES = 50000
+PARSED_RESUME_CACHE_EXPIRE_TIME = 60 * 60 * 24 * 30  # 30 days in seconds.
+
+PARSED_RESUME_CACHE_PREFIX = 'ParsedResumeCache'
+PARSED_RESUME_CACHE_LRU_KEY = '{}:lru'.format(PARSED_RESUME_CACHE_PREFIX)
+PARSED_RESUME_CACHE_HITS_KEY = '{}:hits'.format(PARSED_RESUME_CACHE_PREFIX)
+PARSED_RESUME_CACHE_MISSES_KEY = '{}:misses'.format(PARSED_RESUME_CACHE_PREFIX)
+
+
+def get_parsed_resume_cache_key(content_hash):
+    """
+    :param string content_hash: Hash of resume's content, see gen_hash_from_file()
+    :rtype: string
+    """
+    return '{}:v{}:{}'.format(PARSED_RESUME_CACHE_PREFIX, PARSED_RESUME_CACHE_VERSION, content_hash)
+
+
+def get_parsed_resume_from_cache(cache_key):
+    """
+    Returns cached parsed resume and marks it as recently used. Redis errors are logged and treated as misses.
+    :param string cache_key: Key returned by get_parsed_resume_cache_key()
+    :return: {'raw_response': Optic XML, 'candidate': {...}} or None
+    :rtype: dict | None
+    """
+    try:
+        cached_value = redis_store.get(cache_key)
+        if not cached_value:
+            redis_store.incr(PARSED_RESUME_CACHE_MISSES_KEY)
+            return None
+        parsed_resume = json.loads(zlib.decompress(cached_value))
+        pipeline = redis_store.pipeline()
+        pipeline.zadd(PARSED_RESUME_CACHE_LRU_KEY, cache_key, time.time())
+        pipeline.incr(PARSED_RESUME_CACHE_HITS_KEY)
+        pipeline.execute()
+        return parsed_resume
+    except Exception:
+        logger.exception('ResumeParsingService::ParseCache - Could not read parsed resume {}'.format(cache_key))
+        return None
+
+
+def add_parsed_resume_to_cache(cache_key, parsed_resume):
+    """
+    Caches parsed resume and evicts least recently used parsed resumes if cache is full. Redis errors are logged.
+    :param string cache_key: Key returned by get_parsed_resume_cache_key()
+    :param dict parsed_resume: {'raw_response': Optic XML, 'candidate': {...}}
+    """
+    try:
+        cached_value = zlib.compress(json.dumps(parsed_resume))
+        pipeline = redis_store.pipeline()
+        pipeline.setex(cache_key, cached_value, PARSED_RESUME_CACHE_EXPIRE_TIME)
+        pipeline.zadd(PARSED_RESUME_CACHE_LRU_KEY, cache_key, time.time())
+        pipeline.zcard(PARSED_RESUME_CACHE_LRU_KEY)
+        number_of_entries = pipeline.execute()[-1]
+
+        excess_entries = number_of_entries - PARSED_RESUME_CACHE_MAX_ENTRIES
+        if excess_entries > 0:
+            evicted_keys = redis_store.zrange(PARSED_RESUME_CACHE_LRU_KEY, 0, excess_entries - 1)
+            if evicted_keys:
+                pipeline = redis_store.pipeline()
+                pipeline.delete(*evicted_keys)
+                pipeline.zrem(PARSED_RESUME_CACHE_LRU_KEY, *evicted_keys)
+                pipeline.execute()
+    except Exception:
+        logger.exception('ResumeParsingService::ParseCache - Could not cache parsed resume {}'.format(cache_key))
+
+
+def get_parsed_resume_cache_stats():
+    """
+    Returns number of hits & misses since counters were created, hit rate and number of cached resumes.
+    :rtype: dict
+    """
+    pipeline = redis_store.pipeline()
+    pipeline.get(PARSED_RESUME_CACHE_HITS_KEY)
+    pipeline.get(PARSED_RESUME_CACHE_MISSES_KEY)
+    pipeline.zcard(PARSED_RESUME_CACHE_LRU_KEY)
+    hits, misses, entries = pipeline.execute()
+    hits, misses = int(hits or 0), int(misses or 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(float(hits) / (hits + misses), 4) if hits + misses else 0.0,
+        'entries': entries
+    }
@@ -13,40 +13,51 @@ from PIL import Image
 from contracts import contract
 from flask import current_app
 from resume_parsing_service.app.modules.ocr_lib import ocr_image
-from resume_parsing_service.app.modules.pdf_utils import convert_pdf_to_text
-from resume_parsing_service.app.modules.pdf_utils import decrypt_pdf
-from resume_parsing_service.app.modules.pdf_utils import detect_pdf_has_form
+from resume_parsing_service.app.modules.pdf_utils import inspect_pdf
 
-from resume_parsing_service.app import logger, redis_store
+from resume_parsing_service.app import logger
 from resume_parsing_service.app.constants import error_constants
 from resume_parsing_service.app.modules.optic_parse_lib import fetch_optic_response
 from resume_parsing_service.app.modules.optic_parse_lib import parse_optic_xml
+from resume_parsing_service.app.modules.parse_cache import add_parsed_resume_to_cache
+from resume_parsing_service.app.modules.parse_cache import get_parsed_resume_cache_key
+from resume_parsing_service.app.modules.parse_cache import get_parsed_resume_from_cache
+from resume_parsing_service.app.modules.utils import gen_hash_from_file
 from resume_parsing_service.common.error_handling import InvalidUsage
 from resume_parsing_service.common.utils.resume_utils import IMAGE_FORMATS, DOC_FORMATS
 from resume_parsing_service.common.utils.talent_s3 import boto3_put
 
-RESUME_EXPIRE_TIME = 60 * 60 * 24 * 7  # one week in seconds.
-
 
 @contract
-def parse_resume(file_obj, filename_str, cache_key=''):
+def parse_resume(file_obj, filename_str):
     """Primary resume parsing function.
+    Resumes already parsed (by content) are returned from cache without OCR or Optic call.
 
     :param cStringIO file_obj: a StringIO representation of the raw binary.
     :param string filename_str: The file_obj file name.
-    :param string cache_key: A key used to get/store BG data.
     :return: Processed candidate data.
     :rtype: dict
     """
     logger.info("Beginning parse_resume(%s)", filename_str)
 
+    cache_key = get_parsed_resume_cache_key(gen_hash_from_file(file_obj))
+    cached_resume = get_parsed_resume_from_cache(cache_key)
+    if cached_resume:
+        logger.info('ResumeParsingService::INFO - Parsed resume {} loaded from cache with key {}'.format(
+            filename_str, cache_key))
+        return cached_resume
+
     file_ext = basename(splitext(filename_str.lower())[-1]) if filename_str else ""
 
-    # PDFs must have attempted decryption with the empty string password if applicable.
+    # PDFs are opened once to be decrypted with the empty string password (if applicable) and classified.
+    pdf_inspection = None
     if file_ext == '.pdf':
-        file_obj = decrypt_pdf(file_obj)
+        pdf_inspection = inspect_pdf(file_obj)
+        file_obj = pdf_inspection.file_obj
+        logger.info('RPS:INFO: {} - PDF is {} with {} chars of text'.format(filename_str, pdf_inspection.kind,
+                                                                            len(pdf_inspection.text)))
 
-    is_image = is_resume_image(file_ext, file_obj)
+    is_image = is_resume_image(file_ext, file_obj, pdf_inspection)
     logger.info('RPS:INFO: {} - {} is image'.format(filename_str, is_image))
 
     # If file is an image, OCR it
@@ -100,13 +111,10 @@ def parse_resume(file_obj, filename_str, cache_key=''):
                 error_message=error_constants.NO_TEXT_EXTRACTED['message'],
                 error_code=error_constants.NO_TEXT_EXTRACTED['code'])
 
-        # GET-2170 specifies caching of resumes only occurs in local/test environments.
-        if current_app.config['GT_ENVIRONMENT'] in ('dev', 'jenkins'):
-            redis_store.set(cache_key, optic_response)
-            redis_store.expire(cache_key, RESUME_EXPIRE_TIME)
-
         candidate_data = parse_optic_xml(optic_response)
-        return {'raw_response': optic_response, 'candidate': candidate_data}
+        parsed_resume = {'raw_response': optic_response, 'candidate': candidate_data}
+        add_parsed_resume_to_cache(cache_key, parsed_resume)
+        return parsed_resume
 
     else:
         logger.info('No XML text received from Optic Response for {}'.format(filename_str))
@@ -116,11 +124,12 @@ def parse_resume(file_obj, filename_str, cache_key=''):
 
 
 @contract
-def is_resume_image(file_ext, file_obj):
+def is_resume_image(file_ext, file_obj, pdf_inspection=None):
     """ Test to see if file is an image
 
     :param string file_ext: File extension of file being tested
     :param cStringIO file_obj: In memory representation of the file being tested
+    :param pdf_inspection: PdfInspection of file if it is a PDF which has already been inspected
     :rtype: bool
     """
 
@@ -137,13 +146,8 @@ def is_resume_image(file_ext, file_obj):
     resume_is_image = False
     if file_ext in IMAGE_FORMATS:
         if file_ext == '.pdf':
-            text = convert_pdf_to_text(file_obj)
-            has_form = detect_pdf_has_form(file_obj)
-            if not text and not has_form:
-                # PDF is likely an image because there is:
-                # NO text extracted
-                # Presence of forms was detected
-                resume_is_image = True
+            # PDF is likely an image if there is NO text extracted and no form is detected
+            resume_is_image = (pdf_inspection or inspect_pdf(file_obj)).is_image
         else:
             resume_is_image = True
     return resume_is_image
@@ -8,6 +8,54 @@ from resume_parsing_service.common.error_handling import InternalServerError
 import PyPDF2
 
 
+# Kinds of PDFs told apart by inspect_pdf()
+PDF_TEXT = 'text'
+PDF_IMAGE = 'image'
+PDF_FORM = 'form'
+
+
+class PdfInspection(object):
+    """
+    Result of inspect_pdf().
+    :ivar file_obj: Unencrypted PDF file object, the given one if it was not encrypted
+    :ivar kind: PDF_TEXT, PDF_IMAGE or PDF_FORM
+    :ivar text: Text of all pages, '' unless PDF is of PDF_TEXT kind
+    """
+
+    def __init__(self, file_obj, kind, text):
+        self.file_obj = file_obj
+        self.kind = kind
+        self.text = text
+
+    @property
+    def is_image(self):
+        return self.kind == PDF_IMAGE
+
+
+def inspect_pdf(pdf_file_obj):
+    """
+    Opens PDF once to decrypt it (if encrypted) and to tell whether it has text or is an image. It is PDF_TEXT if
+    every page has text, otherwise PDF_FORM if it has a form XObject, otherwise PDF_IMAGE. Text extraction stops at
+    first page without text.
+    :param cStringIO pdf_file_obj: PDF file object to be inspected
+    :rtype: PdfInspection
+    """
+    pdf_file_obj.seek(0)
+    pdf_reader = PyPDF2.PdfFileReader(pdf_file_obj)
+    if pdf_reader.isEncrypted:
+        pdf_file_obj = _decrypt_pdf_reader(pdf_reader)
+
+    text = _extract_text(pdf_reader)
+    if text:
+        kind = PDF_TEXT
+    elif _has_form(pdf_reader):
+        kind = PDF_FORM
+    else:
+        kind = PDF_IMAGE
+    pdf_file_obj.seek(0)
+    return PdfInspection(pdf_file_obj, kind, text)
+
+
 @contract
 def convert_pdf_to_text(pdf_file_obj):
     """
@@ -17,24 +65,7 @@ def convert_pdf_to_text(pdf_file_obj):
     :rtype: string
     """
     pdf_file_obj.seek(0)
-    pdf_reader = PyPDF2.PdfFileReader(pdf_file_obj)
-    page_count = pdf_reader.numPages
-    pages_with_text = 0
-    text = ''
-
-    for i in xrange(page_count):
-        new_text = pdf_reader.getPage(i).extractText()
-
-        if new_text:
-            text += new_text
-            pages_with_text += 1
-    """
-    For the time being (8/13/16) we are assuming it is a picture based resume.
-    """
-    if pages_with_text < page_count:
-        return ''
-
-    return text
+    return _extract_text(PyPDF2.PdfFileReader(pdf_file_obj))
 
 
 @contract
@@ -48,21 +79,7 @@ def decrypt_pdf(pdf_file_obj):
     pdf_reader = PyPDF2.PdfFileReader(pdf_file_obj)
 
     if pdf_reader.isEncrypted:
-        decrypted = pdf_reader.decrypt('')
-        if not decrypted:
-            raise InternalServerError(
-                error_message=error_constants.ENCRYPTED_PDF['message'],
-                error_code=error_constants.ENCRYPTED_PDF['code'])
-
-        unencrypted_pdf_io = StringIO()
-        pdf_writer = PyPDF2.PdfFileWriter()
-        page_count = pdf_reader.numPages
-
-        for page_no in xrange(page_count):
-            pdf_writer.addPage(pdf_reader.getPage(page_no))
-            pdf_writer.write(unencrypted_pdf_io)
-
-        return unencrypted_pdf_io
+        return _decrypt_pdf_reader(pdf_reader)
 
     else:
         return pdf_file_obj
@@ -70,7 +87,60 @@ def decrypt_pdf(pdf_file_obj):
 
 def detect_pdf_has_form(pdf_file_obj):
     pdf_file_obj.seek(0)
-    pdf_reader = PyPDF2.PdfFileReader(pdf_file_obj)
+    return _has_form(PyPDF2.PdfFileReader(pdf_file_obj))
+
+
+def _extract_text(pdf_reader):
+    """
+    Returns text of all pages, or '' as soon as a page without text is found.
+    :type pdf_reader: PyPDF2.PdfFileReader
+    :rtype: string
+    """
+    page_count = pdf_reader.numPages
+    if not page_count:
+        return ''
+
+    texts = []
+    for i in xrange(page_count):
+        new_text = pdf_reader.getPage(i).extractText()
+        """
+        For the time being (8/13/16) we are assuming it is a picture based resume.
+        """
+        if not new_text:
+            return ''
+        texts.append(new_text)
+
+    return ''.join(texts)
+
+
+def _decrypt_pdf_reader(pdf_reader):
+    """
+    Decrypts PDF of reader with the empty string password and returns an unencrypted copy of it.
+    :type pdf_reader: PyPDF2.PdfFileReader
+    :rtype: cStringIO
+    """
+    decrypted = pdf_reader.decrypt('')
+    if not decrypted:
+        raise InternalServerError(
+            error_message=error_constants.ENCRYPTED_PDF['message'],
+            error_code=error_constants.ENCRYPTED_PDF['code'])
+
+    unencrypted_pdf_io = StringIO()
+    pdf_writer = PyPDF2.PdfFileWriter()
+    page_count = pdf_reader.numPages
+
+    for page_no in xrange(page_count):
+        pdf_writer.addPage(pdf_reader.getPage(page_no))
+    pdf_writer.write(unencrypted_pdf_io)
+
+    return unencrypted_pdf_io
+
+
+def _has_form(pdf_reader):
+    """
+    :type pdf_reader: PyPDF2.PdfFileReader
+    :rtype: bool
+    """
     page_count = pdf_reader.numPages
     for i in xrange(page_count):
         page = pdf_reader.getPage(i)
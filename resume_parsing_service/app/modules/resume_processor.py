@@ -8,13 +8,10 @@ import requests
 from contracts import contract
 # Module specific
 from flask import current_app
-from resume_parsing_service.app import logger, redis_store
+from resume_parsing_service.app import logger
 from resume_parsing_service.app.constants import error_constants
-from resume_parsing_service.app.modules.decorators import upload_failed_IO
-from resume_parsing_service.app.modules.optic_parse_lib import parse_optic_xml
 from resume_parsing_service.app.modules.parse_lib import parse_resume
 from resume_parsing_service.app.modules.utils import create_parsed_resume_candidate
-from resume_parsing_service.app.modules.utils import gen_hash_from_file
 from resume_parsing_service.app.modules.utils import resume_file_from_params
 from resume_parsing_service.app.modules.utils import send_candidate_references
 from resume_parsing_service.app.modules.utils import update_candidate_from_resume
@@ -25,7 +22,6 @@ from resume_parsing_service.common.utils.talent_s3 import boto3_put
 IMAGE_FORMATS = ['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.tif', '.gif', '.bmp', '.dcx',
                  '.pcx', '.jp2', '.jpc', '.jb2', '.djvu', '.djv']
 DOC_FORMATS = ['.pdf', '.doc', '.docx', '.rtf', '.txt']
-RESUME_EXPIRE_TIME = 60 * 60 * 24 * 7  # one week in seconds.
 
 
 @contract
@@ -44,17 +40,8 @@ def process_resume(parse_params):
     resume_file = resume_file_from_params(parse_params)
     filename_str = parse_params['filename']  # This is always set by param_builders.py
 
-    # GET-2170 specifies caching of resumes only occurs in local/test environments.
-    if current_app.config['GT_ENVIRONMENT'] in ('dev', 'jenkins'):
-        cache_key_from_file = 'parsedResume_{}'.format(gen_hash_from_file(resume_file))
-        cached_resume = get_cached_resume(resume_file, filename_str, cache_key_from_file)
-        if cached_resume:
-            parsed_resume = cached_resume
-        else:
-            parsed_resume = parse_resume(resume_file, filename_str, cache_key_from_file)
-
-    else:
-        parsed_resume = parse_resume(resume_file, filename_str)
+    # Parsed resumes are cached by content in all environments, see parse_cache.py
+    parsed_resume = parse_resume(resume_file, filename_str)
 
     if not create_candidate:
         return parsed_resume
@@ -107,25 +94,3 @@ def process_resume(parse_params):
 
     return candidate
 
-
-@upload_failed_IO
-@contract
-def get_cached_resume(resume_file, filename_str, cache_key):
-    """
-    Tries to retrieve processed resume data from redis or parses it and stores it.
-    :param cStringIO resume_file:
-    :param string filename_str:
-    :rtype: dict
-    """
-    cached_bg_xml = redis_store.get(cache_key)
-
-    if cached_bg_xml:
-        parsed_resume = {
-            'candidate': parse_optic_xml(cached_bg_xml),
-            'raw_response': cached_bg_xml
-        }
-        logger.info('ResumeParsingService::INFO - BG data for {} loaded with key {}'.format(
-            filename_str, cache_key))
-        return parsed_resume
-
-    return {}
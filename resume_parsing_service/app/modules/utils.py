@@ -192,7 +192,7 @@ def get_users_talent_pools(formatted_token_str):
 
 def gen_hash_from_file(_file):
     """Handy function for creating file hashes. Used as redis keys to store parsed resumes."""
-    return hashlib.md5(_file.getvalue()).hexdigest()
+    return hashlib.sha256(_file.getvalue()).hexdigest()
 
 
 def resume_file_from_params(parse_params):
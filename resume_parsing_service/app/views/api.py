@@ -1,11 +1,18 @@
 """API for the Resume Parsing App"""
 # pylint: disable=wrong-import-position, fixme, import-error
 __author__ = 'erikfarmer'
+# Standard Library
+import json
 # Framework specific
 from flask import Blueprint
 from flask import jsonify
 from flask import request
+from flask import Response
+from flask import stream_with_context
 from flask.ext.cors import CORS
+from resume_parsing_service.app.modules.batch_processor import get_batch_filepicker_keys, process_resumes
+from resume_parsing_service.app.modules.parse_cache import get_parsed_resume_cache_stats
+from resume_parsing_service.app.modules.param_builders import build_batch_params_from_json
 from resume_parsing_service.app.modules.param_builders import build_params_from_form
 from resume_parsing_service.app.modules.param_builders import build_params_from_json
 from resume_parsing_service.app.modules.utils import get_users_talent_pools
@@ -14,8 +21,9 @@ from resume_parsing_service.app import logger
 from resume_parsing_service.app.constants import error_constants
 from resume_parsing_service.app.modules.resume_processor import process_resume
 from resume_parsing_service.common.error_handling import InvalidUsage
+from resume_parsing_service.common.models.user import Role
 from resume_parsing_service.common.routes import ResumeApi
-from resume_parsing_service.common.utils.auth_utils import require_oauth
+from resume_parsing_service.common.utils.auth_utils import require_oauth, require_role
 
 PARSE_MOD = Blueprint('resume_api', __name__)
 
@@ -26,6 +34,10 @@ CORS(
         r'/v1/{}'.format(ResumeApi.PARSE): {
             'origins': [r"*.gettalent.com", "http://localhost"],
             'allow_headers': ['Content-Type', 'Authorization']
+        },
+        r'/v1/{}'.format(ResumeApi.BATCH_PARSE): {
+            'origins': [r"*.gettalent.com", "http://localhost"],
+            'allow_headers': ['Content-Type', 'Authorization']
         }
     })
 
@@ -61,3 +73,40 @@ def resume_post_receiver():
         parse_params['talent_pool_ids'] = get_users_talent_pools(oauth)
 
     return jsonify(**process_resume(parse_params))
+
+
+@PARSE_MOD.route(ResumeApi.BATCH_PARSE, methods=['POST'])
+@require_oauth()
+def batch_resume_post_receiver():
+    """
+    Parses many resumes, given by filepicker keys or a filepicker key prefix, and optionally creates candidates
+    from them. Prefix is relative to bulk upload folder of user's domain, i.e. 'BulkResumeUploads/<domain_id>/'.
+    Resumes are processed concurrently and result of every resume is streamed back as a line of JSON as soon as
+    it is processed (see batch_processor.process_resumes()).
+    Input: {'filepicker_keys': ['resume1.pdf', 'resume2.doc'], 'create_candidate': true, 'talent_pool_ids': [1]}
+       or: {'filepicker_prefix': '1234/', 'create_candidate': false}
+    :rtype: Response
+    """
+    oauth = request.oauth_token
+    batch_params = build_batch_params_from_json(request)
+    filepicker_keys = get_batch_filepicker_keys(batch_params, request.user.domain_id)
+
+    batch_params['oauth'] = oauth
+    if batch_params.get('create_candidate') and not batch_params.get('talent_pool_ids'):
+        batch_params['talent_pool_ids'] = get_users_talent_pools(oauth)
+
+    results = process_resumes(filepicker_keys, batch_params)
+    return Response(stream_with_context(json.dumps(result) + '\n' for result in results),
+                    mimetype='application/x-ndjson')
+
+
+@PARSE_MOD.route(ResumeApi.PARSE_CACHE, methods=['GET'])
+@require_oauth()
+@require_role(Role.TALENT_ADMIN)
+def parse_cache_stats():
+    """
+    Hit/miss counts, hit rate & number of entries of parsed resumes cache.
+    Output: {'parse_cache': {'hits': 120, 'misses': 30, 'hit_rate': 0.8, 'entries': 150}}
+    :rtype: Response
+    """
+    return jsonify(parse_cache=get_parsed_resume_cache_stats())
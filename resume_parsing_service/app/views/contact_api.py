@@ -20,7 +20,7 @@ from resume_parsing_service.app import logger
 from resume_parsing_service.app.modules.ocr_lib import ocr_image
 from resume_parsing_service.app.modules.parse_lib import is_resume_image
 from resume_parsing_service.app.modules.parse_lib import validate_content_len
-from resume_parsing_service.app.modules.pdf_utils import decrypt_pdf
+from resume_parsing_service.app.modules.pdf_utils import inspect_pdf
 from resume_parsing_service.app.modules.utils import resume_file_from_params
 from resume_parsing_service.app.modules.param_builders import build_params_from_form
 from resume_parsing_service.common.error_handling import InvalidUsage
@@ -62,9 +62,11 @@ def parse_contact_info(params):
     file_obj = resume_file_from_params(params)
     filename_str = params['filename']
     file_ext = basename(splitext(filename_str.lower())[-1]) if filename_str else ""
+    pdf_inspection = None
     if file_ext == '.pdf':
-        file_obj = decrypt_pdf(file_obj)
-    is_image = is_resume_image(file_ext, file_obj)
+        pdf_inspection = inspect_pdf(file_obj)
+        file_obj = pdf_inspection.file_obj
+    is_image = is_resume_image(file_ext, file_obj, pdf_inspection)
     if is_image:
         start_time = time()
         is_not_pdf = file_ext != '.pdf' and not ('pdf' in magic.from_buffer(file_obj.read()).lower())
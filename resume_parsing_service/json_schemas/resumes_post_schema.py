@@ -20,3 +20,23 @@ create_candidate_schema = {
     },
     'required': ['filepicker_key']
 }
+
+
+"""
+Parse resumes stored in FilePicker, given by their keys or a key prefix within bulk upload folder of user's domain,
+and optionally create candidates from them
+Endpoint:
+    /parse_resumes
+"""
+batch_parse_schema = {
+    'type': 'object',
+    'properties': {
+        'create_candidate': {'type': ['boolean', 'null']},
+        'filepicker_keys': {'type': 'array', 'items': {'type': 'string'}, 'minItems': 1},
+        'filepicker_prefix': {'type': 'string', 'minLength': 1},
+        'source_id': {'type': 'integer'},
+        'source_product_id': {'type': 'integer'},
+        'talent_pool_ids': {'type': ['array', 'null'], 'items': {'type': 'integer'}}
+    },
+    'oneOf': [{'required': ['filepicker_keys']}, {'required': ['filepicker_prefix']}]
+}
@@ -0,0 +1,90 @@
+"""
+Compares parse time & peak memory of parse_optic_xml() with parsing BG XML once per section, as it was done
+before (prettify pass plus one BeautifulSoup tree for each of contact, experience, education, canonskill,
+summary and references).
+
+Corpus is the stored Optic responses of resume_xml.py. Every way of parsing runs in its own process, so that its
+peak memory (max RSS) is not affected by the other one. Skills API (extra_skills_parsing) is not called, so that
+only parsing is measured.
+    python -m resume_parsing_service.tests.optic_parse_benchmark --rounds 5
+"""
+import argparse
+import resource
+from multiprocessing import Process, Queue
+from time import time
+
+from bs4 import BeautifulSoup as bs4
+
+from resume_parsing_service.app import app
+from resume_parsing_service.app.modules import optic_parse_lib
+from resume_parsing_service.tests import resume_xml
+
+
+def get_corpus():
+    """
+    Returns (name, Optic XML) of stored responses
+    :rtype: list[tuple]
+    """
+    return sorted((name, value) for name, value in vars(resume_xml).iteritems()
+                  if name.isupper() and isinstance(value, unicode))
+
+
+def parse_per_section(resume_xml_text):
+    """
+    Parses BG XML into a new tree for every section, like parse_optic_xml() did before it parsed XML once.
+    :rtype: dict
+    """
+    pretty_text = bs4(resume_xml_text, 'lxml').prettify().encode('utf8', 'replace')
+    contact_xml_list = bs4(resume_xml_text, 'lxml').findAll('contact')
+    first_name, last_name = optic_parse_lib.parse_candidate_name(contact_xml_list)
+    return dict(
+        first_name=first_name,
+        last_name=last_name,
+        emails=optic_parse_lib.parse_candidate_emails(contact_xml_list),
+        phones=optic_parse_lib.parse_candidate_phones(contact_xml_list),
+        work_experiences=optic_parse_lib.parse_candidate_experiences(
+            bs4(resume_xml_text, 'lxml').findAll('experience')),
+        educations=optic_parse_lib.parse_candidate_educations(bs4(resume_xml_text, 'lxml').findAll('education')),
+        skills=optic_parse_lib.parse_candidate_skills(bs4(resume_xml_text, 'lxml').findAll('canonskill')),
+        addresses=optic_parse_lib.parse_candidate_addresses(contact_xml_list),
+        references=optic_parse_lib.parse_candidate_reference(bs4(resume_xml_text, 'lxml').findAll('references')),
+        summary=optic_parse_lib.parse_candidate_summary(bs4(resume_xml_text, 'lxml').findAll('summary')),
+        social_networks=optic_parse_lib.parse_candidate_linkedin_urls(pretty_text))
+
+
+def run_benchmark(parse_function_name, rounds, results):
+    """
+    Parses corpus `rounds` times in current process and puts (milliseconds per resume, peak memory increase in KB)
+    into results queue.
+    """
+    optic_parse_lib.extra_skills_parsing = lambda encoded_text: []
+    parse_function = {'single_parse': optic_parse_lib.parse_optic_xml,
+                      'per_section': parse_per_section}[parse_function_name]
+    corpus = get_corpus()
+    with app.app_context():
+        # Translate table of names is built once per process by both, so it is not measured
+        optic_parse_lib.get_punctuation_translate_table()
+        start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start_time = time()
+        for _ in xrange(rounds):
+            for name, resume_xml_text in corpus:
+                parse_function(resume_xml_text)
+        milliseconds_per_resume = (time() - start_time) * 1000 / (rounds * len(corpus))
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_memory
+    results.put((milliseconds_per_resume, peak_memory))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares parse time & peak memory of parsing Optic XML.')
+    parser.add_argument('--rounds', type=int, default=5, help='Number of times corpus is parsed')
+    args = parser.parse_args()
+
+    print 'Corpus: %s stored Optic responses' % len(get_corpus())
+    for function_name in ('per_section', 'single_parse'):
+        queue = Queue()
+        process = Process(target=run_benchmark, args=(function_name, args.rounds, queue))
+        process.start()
+        time_per_resume, memory_increase = queue.get()
+        process.join()
+        print '%s: %.2f ms per resume, peak memory increased by %s KB' % (function_name, time_per_resume,
+                                                                           memory_increase)
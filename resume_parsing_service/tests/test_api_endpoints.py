@@ -9,6 +9,8 @@ import requests
 # Module Specific.
 # Test fixtures, imports required even though not 'used'
 from resume_parsing_service.app.constants import error_constants
+from resume_parsing_service.common.models.db import db
+from resume_parsing_service.common.models.user import Role
 from resume_parsing_service.common.routes import ResumeApiUrl
 from resume_parsing_service.common.tests.conftest import access_token_first
 from resume_parsing_service.common.tests.conftest import domain_first
@@ -37,6 +39,21 @@ def test_health_check():
     assert response.status_code == requests.codes.ok
 
 
+def test_parse_cache_stats(access_token_first, user_first):
+    """Parsed resume cache stats are available to talent admins only."""
+    headers = {'Authorization': 'Bearer {}'.format(access_token_first)}
+    response = requests.get(ResumeApiUrl.PARSE_CACHE, headers=headers)
+    assert response.status_code == requests.codes.unauthorized
+
+    user_first.role_id = Role.get_by_name(Role.TALENT_ADMIN).id
+    db.session.commit()
+    response = requests.get(ResumeApiUrl.PARSE_CACHE, headers=headers)
+    assert response.status_code == requests.codes.ok
+    stats = response.json()['parse_cache']
+    assert 0 <= stats['hit_rate'] <= 1
+    assert stats['entries'] >= 0
+
+
 ####################################################################################################
 # Test Invalid Inputs
 ####################################################################################################
@@ -244,6 +261,45 @@ def test_doc_from_fp_key(access_token_first, domain_source):
                                           'work_experiences': 5})
 
 
+def test_batch_parse_from_fp_keys(access_token_first, domain_source):
+    """Test that many resumes from S3 are parsed in one request, and that one bad key doesn't fail others."""
+    fp_keys = [DOC_FP_KEY, PDF15_FP_KEY, 'MichaelKane/AlfredFromBatman.doc']
+    response = requests.post(
+        ResumeApiUrl.BATCH_PARSE,
+        headers={'Authorization': 'Bearer {}'.format(access_token_first), 'Content-Type': 'application/json'},
+        data=json.dumps({'filepicker_keys': fp_keys, 'source_id': domain_source['source']['id']}),
+        stream=True)
+    assert response.status_code == requests.codes.ok
+    results = {result['filepicker_key']: result
+               for result in (json.loads(line) for line in response.iter_lines() if line)}
+    assert set(results) == set(fp_keys)
+    for fp_key in (DOC_FP_KEY, PDF15_FP_KEY):
+        assert_non_create_content_and_status(results[fp_key], results[fp_key]['status_code'])
+    assert results[fp_keys[2]]['status_code'] == requests.codes.bad_request
+    assert 'error' in results[fp_keys[2]]
+
+
+def test_batch_parse_too_many_fp_keys(access_token_first):
+    """Test that a batch can't have more than 500 resumes."""
+    response = requests.post(
+        ResumeApiUrl.BATCH_PARSE,
+        headers={'Authorization': 'Bearer {}'.format(access_token_first), 'Content-Type': 'application/json'},
+        data=json.dumps({'filepicker_keys': ['resume_{}.pdf'.format(index) for index in xrange(501)]}))
+    assert response.status_code == requests.codes.bad_request
+    assert response.json()['error']['code'] == error_constants.TOO_MANY_RESUMES['code']
+
+
+def test_batch_parse_prefix_is_within_users_domain(access_token_first, domain_source):
+    """Test that a prefix can't list resumes outside bulk upload folder of user's domain."""
+    for prefix in (DOC_FP_KEY, 'BulkResumeUploads/', '../'):
+        response = requests.post(
+            ResumeApiUrl.BATCH_PARSE,
+            headers={'Authorization': 'Bearer {}'.format(access_token_first), 'Content-Type': 'application/json'},
+            data=json.dumps({'filepicker_prefix': prefix, 'source_id': domain_source['source']['id']}))
+        assert response.status_code == requests.codes.bad_request
+        assert response.json()['error']['code'] == error_constants.NO_RESUMES_FOUND['code']
+
+
 def test_v15_pdf_from_fp_key(access_token_first, domain_source):
     """Test that v1.5 pdf files from S3 can be parsed."""
     content, status = fetch_resume_fp_key_response(access_token_first, domain_source, PDF15_FP_KEY)
@@ -0,0 +1,51 @@
+import uuid
+from cStringIO import StringIO
+
+from resume_parsing_service.app import redis_store
+from resume_parsing_service.app.modules import parse_cache
+from resume_parsing_service.app.modules.parse_cache import add_parsed_resume_to_cache
+from resume_parsing_service.app.modules.parse_cache import get_parsed_resume_cache_key
+from resume_parsing_service.app.modules.parse_cache import get_parsed_resume_cache_stats
+from resume_parsing_service.app.modules.parse_cache import get_parsed_resume_from_cache
+from resume_parsing_service.app.modules.utils import gen_hash_from_file
+
+
+def test_parsed_resume_cache_round_trip():
+    """
+    Tests that a parsed resume is cached by content and that hits & misses are counted.
+    """
+    cache_key = get_parsed_resume_cache_key(gen_hash_from_file(StringIO(uuid.uuid4().hex)))
+    parsed_resume = {'raw_response': '<xml>resume</xml>', 'candidate': {'first_name': u'Jos\xe9', 'emails': []}}
+    stats = get_parsed_resume_cache_stats()
+
+    assert get_parsed_resume_from_cache(cache_key) is None
+    add_parsed_resume_to_cache(cache_key, parsed_resume)
+    assert get_parsed_resume_from_cache(cache_key) == parsed_resume
+
+    new_stats = get_parsed_resume_cache_stats()
+    assert new_stats['hits'] >= stats['hits'] + 1
+    assert new_stats['misses'] >= stats['misses'] + 1
+    assert 0 < new_stats['hit_rate'] <= 1
+    redis_store.delete(cache_key)
+    redis_store.zrem(parse_cache.PARSED_RESUME_CACHE_LRU_KEY, cache_key)
+
+
+def test_parsed_resume_cache_evicts_least_recently_used(monkeypatch):
+    """
+    Tests that least recently used resumes are evicted when cache is full.
+    """
+    # Resumes cached by other tests must not be evicted, so a separate sorted set is used
+    monkeypatch.setattr(parse_cache, 'PARSED_RESUME_CACHE_LRU_KEY', 'ParsedResumeCacheTest:{}'.format(uuid.uuid4()))
+    monkeypatch.setattr(parse_cache, 'PARSED_RESUME_CACHE_MAX_ENTRIES', 2)
+    cache_keys = [get_parsed_resume_cache_key(uuid.uuid4().hex) for _ in xrange(3)]
+
+    add_parsed_resume_to_cache(cache_keys[0], {'raw_response': 'first', 'candidate': {}})
+    add_parsed_resume_to_cache(cache_keys[1], {'raw_response': 'second', 'candidate': {}})
+    # Using first resume makes second one least recently used of them
+    assert get_parsed_resume_from_cache(cache_keys[0])
+    add_parsed_resume_to_cache(cache_keys[2], {'raw_response': 'third', 'candidate': {}})
+
+    assert redis_store.zcard(parse_cache.PARSED_RESUME_CACHE_LRU_KEY) == 2
+    assert get_parsed_resume_from_cache(cache_keys[1]) is None
+    assert get_parsed_resume_from_cache(cache_keys[2])
+    redis_store.delete(parse_cache.PARSED_RESUME_CACHE_LRU_KEY, *cache_keys)
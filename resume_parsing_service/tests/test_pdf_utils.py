@@ -6,6 +6,7 @@ import PyPDF2
 from resume_parsing_service.app.modules.pdf_utils import convert_pdf_to_text
 from resume_parsing_service.app.modules.pdf_utils import decrypt_pdf
 from resume_parsing_service.app.modules.pdf_utils import detect_pdf_has_form
+from resume_parsing_service.app.modules.pdf_utils import inspect_pdf, PDF_IMAGE, PDF_TEXT
 
 CURRENT_DIR = os.path.dirname(__file__)
 
@@ -56,3 +57,26 @@ def test_encrypted_pdfs_can_be_decrypted():
 def test_form_detection():
     with open(os.path.join(CURRENT_DIR, 'files/ingram.pdf'), 'rb') as infile:
         assert detect_pdf_has_form(infile)
+
+
+def test_pdf_inspection():
+    """
+    Test that a single inspection classifies text, image and form based pdfs and decrypts encrypted ones.
+    """
+    expected_kinds = {'test_bin.pdf': PDF_TEXT, 'test_bin_13.pdf': PDF_TEXT, 'test_bin_14.pdf': PDF_TEXT,
+                      'GET-1319.pdf': PDF_IMAGE, 'pic_in_encrypted.pdf': PDF_IMAGE}
+
+    for pdf, kind in expected_kinds.iteritems():
+        with open(os.path.join(CURRENT_DIR, 'files/{}'.format(pdf)), 'rb') as infile:
+            data = StringIO(infile.read())
+        pdf_inspection = inspect_pdf(data)
+        assert pdf_inspection.kind == kind
+        assert bool(pdf_inspection.text) == (kind == PDF_TEXT)
+        assert PyPDF2.PdfFileReader(pdf_inspection.file_obj).isEncrypted == 0
+
+    with open(os.path.join(CURRENT_DIR, 'files/ingram.pdf'), 'rb') as infile:
+        assert not inspect_pdf(StringIO(infile.read())).is_image
+
+    with open(os.path.join(CURRENT_DIR, 'files/jDiMaria.pdf'), 'rb') as infile:
+        pdf_inspection = inspect_pdf(StringIO(infile.read()))
+    assert PyPDF2.PdfFileReader(pdf_inspection.file_obj).isEncrypted == 0
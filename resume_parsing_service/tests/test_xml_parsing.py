@@ -15,6 +15,7 @@ import skill_combinations
 from json_schemas import (EMAIL_SCHEMA, PHONE_SCHEMA, EXPERIENCE_SCHEMA, EDU_SCHEMA,\
                           SKILL_SCHEMA, ADDRESS_SCHEMA)
 from resume_parsing_service.app import app
+from resume_parsing_service.app.modules.optic_parse_lib import SECTION_TAG_NAMES, find_section_tags
 from resume_parsing_service.app.modules.optic_parse_lib import is_experience_already_exists
 from resume_parsing_service.app.modules.optic_parse_lib import parse_candidate_addresses
 from resume_parsing_service.app.modules.optic_parse_lib import parse_candidate_educations
@@ -86,6 +87,18 @@ def test_name_parsing():
             assert last == xml['name'].split()[1]
 
 
+def test_section_tags_found_in_single_walk():
+    """
+        Tests that tags of every section found in one walk of the tree are same (and in same order) as ones found
+        by findAll() on a separately parsed tree.
+    """
+    for xml in XML_MAPS:
+        resume = xml['tree_name']
+        section_tags = find_section_tags(bs4(resume, 'lxml'))
+        for tag_name in SECTION_TAG_NAMES:
+            assert map(unicode, section_tags[tag_name]) == map(unicode, bs4(resume, 'lxml').findAll(tag_name))
+
+
 def test_email_parsing():
     """
         Tests parsing function using the JSON response to avoid un-needed API calls
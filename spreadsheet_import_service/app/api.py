@@ -7,7 +7,8 @@ from flask import Blueprint, jsonify
 from flask import request
 
 from . import logger
-from .parsing_utilities import convert_spreadsheet_to_table, import_from_spreadsheet
+from .parsing_utilities import import_from_spreadsheet
+from .spreadsheet_reader import convert_spreadsheet_to_table, count_spreadsheet_rows
 from spreadsheet_import_service.common.routes import SpreadsheetImportApi
 from spreadsheet_import_service.common.utils.auth_utils import require_oauth, require_all_permissions
 from spreadsheet_import_service.common.utils.talent_s3 import *
@@ -36,10 +37,10 @@ def spreadsheet_to_table():
         raise InvalidUsage(error_message="A valid file_picker_key should be provided")
 
     file_picker_bucket, conn = get_s3_filepicker_bucket_and_conn()
-    file_obj = download_file(file_picker_bucket, file_picker_key)
+    file_obj = download_file_to_temporary_file(file_picker_bucket, file_picker_key)
 
-    csv_table = convert_spreadsheet_to_table(file_obj, file_picker_key)
-    first_rows = csv_table[:10]
+    first_rows = convert_spreadsheet_to_table(file_obj, file_picker_key, max_rows=10)
+    file_obj.close()
 
     return jsonify(dict(table=first_rows))
 
@@ -85,33 +86,38 @@ def import_from_table():
 
     logger.info("import_from_table: Converting spreadsheet (key=%s) into table", file_picker_key)
     file_picker_bucket, conn = get_s3_filepicker_bucket_and_conn()
-    file_obj = download_file(file_picker_bucket, file_picker_key)
+    file_obj = download_file_to_temporary_file(file_picker_bucket, file_picker_key)
 
-    candidates_table = convert_spreadsheet_to_table(file_obj, file_picker_key)
+    # Spreadsheet is read lazily (by import task as well), so only first rows and number of rows are needed here
+    first_rows = convert_spreadsheet_to_table(file_obj, file_picker_key, max_rows=2)
+    file_obj.seek(0)
+    number_of_rows = count_spreadsheet_rows(file_obj, file_picker_key)
 
     # Check if first row of spreadsheet was header
-    if any(param in candidates_table[0] for param in HEADER_ROW_PARAMS):
-        candidates_table.pop(0)
+    start_row = 0
+    if first_rows and any(param in first_rows[0] for param in HEADER_ROW_PARAMS):
+        start_row = 1
+    first_rows = first_rows[start_row:]
 
     delete_from_filepicker_s3(file_picker_key)
 
-    file_obj.seek(0)
-
-    url, key = upload_to_s3(file_obj.read(), folder_path="CSVResumes", name=file_picker_key, public=False)
+    url, key = upload_to_s3(file_obj, folder_path="CSVResumes", name=file_picker_key, public=False)
     logger.info("import_from_table: Uploaded CSV of user ID %s to %s", user_id, url)
 
     file_obj.close()
 
-    if candidates_table and len(candidates_table[0]) != len(header_row):
+    if not first_rows:
+        raise InvalidUsage("Spreadsheet doesn't have any candidate")
+
+    if len(first_rows[0]) != len(header_row):
         raise InvalidUsage("Number of Columns should be equal to header row provided")
 
     # Disable Multiple Sources in Header Row
     if header_row.count('candidate.source') > 1:
         raise InvalidUsage('Multiple Candidate Sources are not allowed')
 
-    if len(candidates_table) > 25:
-        import_from_spreadsheet.delay(table=candidates_table,
-                                      spreadsheet_filename=file_picker_key,
+    if number_of_rows - start_row > 25:
+        import_from_spreadsheet.delay(spreadsheet_filename=file_picker_key,
                                       header_row=header_row,
                                       talent_pool_ids=talent_pool_ids,
                                       oauth_token=request.oauth_token,
@@ -119,11 +125,12 @@ def import_from_table():
                                       is_scheduled=True,
                                       source_id=source_id,
                                       formatted_candidate_tags=candidate_tags,
-                                      frequency_id=frequency_id)
-        return jsonify(dict(count=len(candidates_table), status='pending')), 201
+                                      frequency_id=frequency_id,
+                                      start_row=start_row,
+                                      end_row=number_of_rows)
+        return jsonify(dict(count=number_of_rows - start_row, status='pending')), 201
     else:
-        return import_from_spreadsheet(table=candidates_table,
-                                       spreadsheet_filename=file_picker_key,
+        return import_from_spreadsheet(spreadsheet_filename=file_picker_key,
                                        header_row=header_row,
                                        talent_pool_ids=talent_pool_ids,
                                        oauth_token=request.oauth_token,
@@ -131,4 +138,6 @@ def import_from_table():
                                        is_scheduled=False,
                                        source_id=source_id,
                                        formatted_candidate_tags=candidate_tags,
-                                       frequency_id=frequency_id)
+                                       frequency_id=frequency_id,
+                                       start_row=start_row,
+                                       end_row=number_of_rows)
@@ -0,0 +1,288 @@
+"""
+Batched import of spreadsheet candidates.
+
+Importing rows one by one takes a create (or update) request and up to three more requests for tags, notes and
+subscription preference per row. Here rows are grouped into batches: new candidates of a batch are created with a
+single multi-candidate POST (with their tags), existing candidates are updated with a single PATCH, and notes &
+subscription preferences of the whole batch are added with one request each. Several batches are sent to
+candidate-service concurrently over a pooled HTTP session.
+
+Candidates already existing in user's domain (matched by email address) are looked up in database for every batch
+before it is sent, so they are updated instead of failing the create request. Rows which can't be imported in bulk
+(e.g. archived candidates, email addresses repeated in spreadsheet or a batch rejected by candidate-service) are
+imported one at a time, same as before.
+
+    importer = CandidatesBatchImporter(oauth_token, domain_id, frequency_id=frequency_id)
+    candidate_ids, erroneous_rows = importer.import_rows(parsed_rows)
+"""
+import json
+from copy import deepcopy
+
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from spreadsheet_import_service.app import logger
+from spreadsheet_import_service.common.models.candidate import Candidate, CandidateEmail
+from spreadsheet_import_service.common.routes import CandidateApiUrl
+from spreadsheet_import_service.common.utils.candidate_utils import replace_tabs_with_spaces
+
+IMPORT_BATCH_SIZE = 50
+IMPORT_CONCURRENCY = 4
+
+
+class CandidatesBatchImporter(object):
+    """
+    Imports candidates of spreadsheet rows into candidate-service in concurrent batches.
+    """
+
+    def __init__(self, oauth_token, domain_id, frequency_id=None, batch_size=IMPORT_BATCH_SIZE,
+                 concurrency=IMPORT_CONCURRENCY):
+        """
+        :param oauth_token: OAuth token of logged-in user
+        :param int | long domain_id: Domain id of logged-in user
+        :param int | None frequency_id: ID that describes candidate's subscription preference
+        :param int batch_size: Number of rows sent to candidate-service in one request
+        :param int concurrency: Number of batches being sent to candidate-service at a time
+        """
+        self.domain_id = domain_id
+        self.frequency_id = frequency_id
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        self.session.headers.update({'Authorization': oauth_token, 'content-type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Email addresses of rows imported so far, a later row with same address updates that candidate
+        self.imported_addresses = set()
+
+    def import_rows(self, parsed_rows):
+        """
+        Imports given rows and returns ids of imported candidates and rows which couldn't be imported.
+        Rows are read lazily, so only a few batches are held in memory at a time.
+        :param parsed_rows: Iterable of tuples (row index, row, candidate's dict, tags, notes)
+        :return: Candidate ids and list of tuples (row index, row) of erroneous rows
+        :rtype: tuple
+        """
+        candidate_ids, erroneous_rows, deferred_rows = [], [], []
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        futures = set()
+
+        def collect(done_futures):
+            for future in done_futures:
+                batch_candidate_ids, batch_erroneous_rows = future.result()
+                candidate_ids.extend(batch_candidate_ids)
+                erroneous_rows.extend(batch_erroneous_rows)
+
+        try:
+            batch = []
+            for parsed_row in parsed_rows:
+                batch.append(parsed_row)
+                if len(batch) < self.batch_size:
+                    continue
+                futures.add(executor.submit(self.import_batch, *self.split_batch(batch, deferred_rows)))
+                batch = []
+                # Don't let parsing run too far ahead of requests
+                if len(futures) >= self.concurrency * 2:
+                    done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    collect(done)
+            if batch:
+                futures.add(executor.submit(self.import_batch, *self.split_batch(batch, deferred_rows)))
+            collect(wait(futures).done)
+        finally:
+            executor.shutdown(wait=True)
+
+        # Deferred rows may update candidates created by batches, so they are imported after all batches
+        for parsed_row in deferred_rows:
+            row_candidate_ids, row_erroneous_rows = self.import_rows_one_by_one([parsed_row])
+            candidate_ids.extend(row_candidate_ids)
+            erroneous_rows.extend(row_erroneous_rows)
+        return candidate_ids, erroneous_rows
+
+    def split_batch(self, batch, deferred_rows):
+        """
+        Splits rows of a batch into rows of new candidates and rows of candidates already existing in domain (with id
+        set in a copy of candidate's dict). Rows which can't be imported in bulk are added to deferred_rows.
+        :rtype: tuple
+        """
+        addresses_of_rows = [set(email['address'].strip().lower() for email in parsed_row[2].get('emails') or []
+                                 if email.get('address'))
+                             for parsed_row in batch]
+        all_addresses = set().union(*addresses_of_rows)
+        candidate_ids_of_addresses = CandidateEmail.get_candidate_ids_of_addresses_in_domain(self.domain_id,
+                                                                                              all_addresses)
+        existing_candidate_ids = set().union(*candidate_ids_of_addresses.values())
+        archived_candidate_ids = set(candidate_id for candidate_id, in Candidate.query.with_entities(Candidate.id).
+                                     filter(Candidate.id.in_(existing_candidate_ids), Candidate.is_archived == 1)) \
+            if existing_candidate_ids else set()
+
+        new_rows, existing_rows = [], []
+        for parsed_row, addresses in zip(batch, addresses_of_rows):
+            candidate_ids = set().union(*[candidate_ids_of_addresses.get(address, set()) for address in addresses])
+            if addresses & self.imported_addresses or len(candidate_ids) > 1 or \
+                    candidate_ids & archived_candidate_ids:
+                deferred_rows.append(parsed_row)
+            elif candidate_ids:
+                # Parsed row belongs to caller, so candidate's dict is copied before id is set
+                existing_rows.append(parsed_row[:2] + (dict(parsed_row[2], id=candidate_ids.pop()),) +
+                                     parsed_row[3:])
+            else:
+                new_rows.append(parsed_row)
+            self.imported_addresses.update(addresses)
+        return new_rows, existing_rows
+
+    def import_batch(self, new_rows, existing_rows):
+        """
+        Creates candidates of new_rows & updates candidates of existing_rows, then adds notes and subscription
+        preferences of all of them. Runs in a worker thread, so it only makes HTTP requests.
+        :return: Candidate ids and list of tuples (row index, row) of erroneous rows
+        :rtype: tuple
+        """
+        imported_rows, erroneous_rows, candidate_ids = [], [], []
+        for rows, import_function in ((new_rows, self.create_candidates), (existing_rows, self.update_candidates)):
+            if not rows:
+                continue
+            try:
+                batch_imported_rows, batch_erroneous_rows = import_function(rows)
+            except Exception as error:
+                # Rows imported one by one get their notes & preference with their own requests
+                logger.info("CandidatesBatchImporter: Couldn't import batch, importing rows one by one. Error: %s",
+                            error)
+                batch_candidate_ids, batch_erroneous_rows = self.import_rows_one_by_one(rows)
+                candidate_ids.extend(batch_candidate_ids)
+                batch_imported_rows = []
+            imported_rows.extend(batch_imported_rows)
+            erroneous_rows.extend(batch_erroneous_rows)
+
+        notes = [dict(note, candidate_id=candidate_id) for candidate_id, parsed_row in imported_rows
+                 for note in parsed_row[4]]
+        if notes:
+            response = self.session.post(CandidateApiUrl.CANDIDATES_NOTES, data=json.dumps({'notes': notes}))
+            if response.status_code != requests.codes.CREATED:
+                logger.error("Couldn't add Notes to candidates. Response: %s", response.text)
+
+        imported_candidate_ids = [candidate_id for candidate_id, _ in imported_rows]
+        if self.frequency_id and imported_candidate_ids:
+            response = self.session.put(CandidateApiUrl.CANDIDATES_PREFERENCES,
+                                        data=json.dumps({'candidate_ids': imported_candidate_ids,
+                                                         'frequency_id': self.frequency_id}))
+            if response.status_code != requests.codes.NO_CONTENT:
+                logger.error("Couldn't add candidates' subscription preference. Response: %s", response.text)
+        return candidate_ids + imported_candidate_ids, erroneous_rows
+
+    def create_candidates(self, rows):
+        """
+        Creates candidates of given rows, along with their tags, with a single request.
+        Raises if candidate-service rejects whole request (e.g. one of the candidates fails schema validation).
+        :return: List of tuples (candidate id, parsed row) and list of erroneous rows
+        :rtype: tuple
+        """
+        candidates = [get_candidate_dict_with_tags(parsed_row) for parsed_row in rows]
+        response = self.session.post(CandidateApiUrl.CANDIDATES, data=json.dumps({'candidates': candidates}))
+        if response.status_code != requests.codes.CREATED:
+            raise Exception("Batch create failed. Response: %s" % response.text)
+
+        response_body = response.json()
+        created_candidate_ids = [candidate['id'] for candidate in response_body.get('candidates', [])]
+        failed_indices = get_failed_candidate_indices(candidates, response_body.get('errors') or [])
+        imported_rows = zip(created_candidate_ids, [parsed_row for index, parsed_row in enumerate(rows)
+                                                    if index not in failed_indices])
+        return imported_rows, [(rows[index][0], rows[index][1]) for index in sorted(failed_indices)]
+
+    def update_candidates(self, rows):
+        """
+        Updates candidates of given rows with a single request and adds their tags.
+        :return: List of tuples (candidate id, parsed row) and list of erroneous rows
+        :rtype: tuple
+        """
+        response = self.session.patch(CandidateApiUrl.CANDIDATES,
+                                      data=json.dumps({'candidates': [parsed_row[2] for parsed_row in rows]}))
+        if response.status_code != requests.codes.OK:
+            raise Exception("Batch update failed. Response: %s" % response.text)
+        imported_rows = [(parsed_row[2]['id'], parsed_row) for parsed_row in rows]
+        for candidate_id, parsed_row in imported_rows:
+            self.add_tags(candidate_id, parsed_row[3])
+        return imported_rows, []
+
+    def import_rows_one_by_one(self, rows):
+        """
+        Imports given rows with a request per row (and per tags, notes & subscription preference), same as a
+        per-row import does.
+        :return: Candidate ids and list of tuples (row index, row) of erroneous rows
+        :rtype: tuple
+        """
+        candidate_ids, erroneous_rows = [], []
+        for parsed_row in rows:
+            index, row, candidate_dict, tags, notes = parsed_row
+            candidate_id = candidate_dict.get('id')
+            if candidate_id:
+                response = self.session.patch(CandidateApiUrl.CANDIDATES,
+                                              data=json.dumps({'candidates': [candidate_dict]}))
+            else:
+                response = self.session.post(CandidateApiUrl.CANDIDATES,
+                                             data=json.dumps({'candidates': [candidate_dict]}))
+                if response.status_code != requests.codes.CREATED:
+                    # Candidate already exists, so update it
+                    candidate_id = (response.json().get('error') or {}).get('id')
+                    if candidate_id:
+                        response = self.session.patch(CandidateApiUrl.CANDIDATES, data=json.dumps(
+                            {'candidates': [dict(candidate_dict, id=candidate_id)]}))
+            if response.status_code not in (requests.codes.CREATED, requests.codes.OK):
+                logger.info("CandidatesBatchImporter: Could not import candidate row %s: `%s`; error: %s",
+                            index, row, response.text)
+                erroneous_rows.append((index, row))
+                continue
+
+            candidate_id = response.json()['candidates'][0]['id']
+            candidate_ids.append(candidate_id)
+            self.add_tags(candidate_id, tags)
+            if notes:
+                self.session.post(CandidateApiUrl.NOTES % candidate_id, data=json.dumps({'notes': notes}))
+            if self.frequency_id:
+                self.session.put(CandidateApiUrl.CANDIDATES_PREFERENCES,
+                                 data=json.dumps({'candidate_ids': [candidate_id],
+                                                  'frequency_id': self.frequency_id}))
+        return candidate_ids, erroneous_rows
+
+    def add_tags(self, candidate_id, tags):
+        """
+        Adds tags to an existing candidate
+        """
+        if not tags:
+            return
+        response = self.session.post(CandidateApiUrl.TAGS % candidate_id, data=json.dumps({'tags': tags}))
+        if response.status_code != requests.codes.CREATED:
+            logger.error("Couldn't add Tags to candidate with id: %s. Response: %s", candidate_id, response.text)
+
+
+def get_candidate_dict_with_tags(parsed_row):
+    """
+    Returns candidate's dict of a parsed row with its tags, as candidate-service receives it. Tabs are replaced
+    with spaces here, same as candidate-service does.
+    :param tuple parsed_row: (row index, row, candidate's dict, tags, notes)
+    :rtype: dict
+    """
+    candidate_dict = replace_tabs_with_spaces(deepcopy(parsed_row[2]))
+    tags = [{'name': tag['name'].strip().lower()} for tag in parsed_row[3] if (tag.get('name') or '').strip()]
+    if tags:
+        candidate_dict['tags'] = tags
+    return candidate_dict
+
+
+def get_failed_candidate_indices(candidates, errors):
+    """
+    Multi-candidate create skips candidates which fail and returns them as errors with their position in request
+    (starting from 1), while ids of created candidates are returned in order. This returns indices of failed
+    candidates in request, so that created ids can be matched with rows.
+    :param list candidates: Candidate dicts sent to candidate-service
+    :param list errors: Errors returned by candidate-service, each containing 'position'
+    :rtype: set
+    """
+    failed_indices = set()
+    for error in errors:
+        position = error.get('position')
+        if not isinstance(position, (int, long)) or not 1 <= position <= len(candidates):
+            raise Exception("Failed candidate has no valid position in request: %s" % error.get('error_message'))
+        failed_indices.add(position - 1)
+    return failed_indices
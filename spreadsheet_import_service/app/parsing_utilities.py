@@ -1,130 +1,235 @@
 """
     This module defines following utilities:
 
-    * Convert Spreadsheet to Table: This utility will convert a spreadsheet file object to JSON Array
-    * Convert CSV to Table: This utility will convert a csv file object to JSON Array
-    * Import Candidates from Spreadsheet: This utility will create candidates from JSON Array of candidate data
+    * Import Candidates from Spreadsheet: This utility will create candidates from rows of a spreadsheet saved in S3
+      (spreadsheets are read with spreadsheet_reader.py)
 
 """
+import os
+import time
 import datetime
-import xlrd
-import csv
-import chardet
 import json
+from itertools import islice
 import requests
 from flask import request, jsonify
-from sqlalchemy.sql import func
-from sqlalchemy.sql.expression import literal
 from spreadsheet_import_service.app import logger, app, celery_app
+from spreadsheet_import_service.app.batch_import import CandidatesBatchImporter, IMPORT_BATCH_SIZE
+from spreadsheet_import_service.app.reference_data import ImportReferenceData
+from spreadsheet_import_service.app.spreadsheet_reader import iter_spreadsheet_rows, count_spreadsheet_rows
 from spreadsheet_import_service.common.utils.talent_s3 import *
 from spreadsheet_import_service.common.utils.validators import is_valid_email, is_number
 from spreadsheet_import_service.common.models.user import User, db
 from spreadsheet_import_service.common.models.misc import AreaOfInterest
-from spreadsheet_import_service.common.models.candidate import CandidateSource, SocialNetwork
 from spreadsheet_import_service.common.utils.talent_reporting import email_error_to_admins, email_notification_to_admins
 from spreadsheet_import_service.common.error_handling import InvalidUsage
 from spreadsheet_import_service.common.error_handling import InternalServerError
 from spreadsheet_import_service.common.routes import CandidateApiUrl, SchedulerApiUrl, SpreadsheetImportApiUrl
 
 
+IMPORT_MODE_PER_ROW = 'per_row'
+IMPORT_MODE_BATCH = 'batch'
+
 DEFAULT_AREAS_OF_INTEREST = ['Production & Development', 'Marketing', 'Sales', 'Design', 'Finance',
                              'Business & Legal Affairs', 'Human Resources', 'Technology', 'Other']
 
 
-def convert_spreadsheet_to_table(spreadsheet_file, filename):
-    """
-    Convert a spreadsheet file object to a python table object (array of arrays)
-    :param spreadsheet_file: python file object
-    :param filename: spreadsheet file name
-    :return: An array containing rows of spreadsheets
+def get_candidate_data_from_row(row, header_row, talent_pool_ids, user_id, reference_data, source_id=None,
+                                formatted_candidate_tags=None):
     """
-    is_csv = ".csv" in filename
-    if is_csv:
-        return convert_csv_to_table(spreadsheet_file)
-
-    book = xlrd.open_workbook(filename=None, file_contents=spreadsheet_file.read())
-    first_sheet = book.sheet_by_index(0)
-
-    table = []
-    for row_index in range(first_sheet.nrows):
-        cells = first_sheet.row(row_index)  # array of cell objects
-
-        cell_values = []
-        for cell in cells:
-            cell_value = cell.value
-            cell_type = cell.ctype
-
-            if cell_type == xlrd.XL_CELL_NUMBER:  # there should be no float-type data
-                cell_value = str(int(cell_value))
-            elif cell_type == xlrd.XL_CELL_TEXT:
-                cell_value = cell_value.strip()
-            elif cell_type == xlrd.XL_CELL_DATE:
-                cell_value = datetime.datetime(*(xlrd.xldate.xldate_as_tuple(cell_value, book.datemode)))
-                cell_value = cell_value.isoformat()
-
-            cell_values.append(cell_value)
-
-        table.append(cell_values)
-    table = [row for row in table if row]
-    return table
-
-
-def convert_csv_to_table(csv_file):
-    """
-    Convert a CSV file object to a python table object (array of arrays)
-    :param csv_file: python file object
-    :return: An array containing rows of csv file
+    This function will prepare data of candidate (as accepted by candidate-service) from a row of spreadsheet
+    :param row: An array of values of candidate's fields
+    :param header_row: An array of headers of candidate's spreadsheet
+    :param talent_pool_ids: An array on talent_pool_ids
+    :param user_id: User id of logged-in user
+    :param ImportReferenceData reference_data: Sources, social networks & areas of interest of user's domain.
+                                               Sources of row must have been added by add_sources_of_rows()
+    :param source_id: Id of candidates source
+    :type formatted_candidate_tags: list[dict[str]]
+    :return: Candidate's dict, tags & notes of candidate
+    :rtype: tuple
     """
-    catalog = None
-    new_catalog = []
-    try:
-        # Guess dialect with sniffer and read in CSV
-        dialect = csv.Sniffer().sniff(csv_file.readline())
-        csv_file.seek(0)
-        catalog = csv.reader(csv_file.read().splitlines(), dialect=dialect)
-        csv_table = []
-
-        # First, count maximum number of columns in any row. This will be # of cols in table
-        num_columns = 0
-        for row in catalog:
-            if len(row) > num_columns:
-                num_columns = len(row)
-            new_catalog.append(row)
-
-        # Make new candidates from CSV results
-        for row in new_catalog:
-            row_array = []
-            is_row_empty = True
-            for column_index in range(num_columns):  # 0, ..., num_columns-1
-                column = row[column_index] if len(row) > column_index else ''
-                if column:
-                    is_row_empty = False  # to ignore empty rows
-
-                encoding = chardet.detect(column.strip(' '))['encoding']
-                try:
-                    row_array.append(column.strip(' ').decode(encoding or 'cp1252'))
-                except UnicodeDecodeError:
-                    row_array.append(column.strip(' ').decode(encoding or 'latin-1'))
-            if not is_row_empty:
-                csv_table.append(row_array)
-        return csv_table
+    # Candidate state variables: These can be populated for each candidate
+    first_name, middle_name, last_name, formatted_name, status_id = None, None, None, None, None
+    summary = None
+    emails, phones, areas_of_interest, addresses, degrees, candidate_notes = [], [], [], [], [], []
+    school_names, work_experiences, educations, custom_fields, social_networks = [], [], [], [], []
+    skills = []
+    candidate_tags = list(formatted_candidate_tags or [])
+
+    talent_pool_dict = {'add': list(talent_pool_ids)}
+    this_source_id = source_id
+    number_of_educations = 0
+
+    # Go through each row of the spreadsheet and set the state variables
+    for column_index, column in enumerate(row):
+        if column_index >= len(header_row):
+            continue
+        column_name = header_row[column_index]
+        if not column_name or not column:
+            continue
+
+        if column_name == 'candidate.formattedName':
+            formatted_name = column
+        elif column_name == 'candidate.statusId':
+            status_id = int(column) if is_number(column) else column
+        elif column_name == 'candidate.firstName':
+            first_name = column
+        elif column_name == 'candidate.middleName':
+            middle_name = column
+        elif column_name == 'candidate.lastName':
+            last_name = column
+        elif column_name == 'candidate.summary':
+            summary = column
+        elif column_name == 'candidate_email.address':
+            emails.append({'address': column})
+        elif column_name == 'candidate_phone.value':
+            phones.append({'value': column})
+        elif column_name == 'candidate.source':
+            this_source_id = reference_data.get_source_id(column) or this_source_id
+        elif column_name == 'area_of_interest.description':
+            column = column.strip()
+            area_of_interest_id = reference_data.get_area_of_interest_id(column)
+            if area_of_interest_id:
+                areas_of_interest.append({'area_of_interest_id': area_of_interest_id})
+            else:
+                logger.warning("Unknown AOI when importing from CSV, user %s: %s", user_id, column)
+        elif column_name == 'candidate_experience.organization':
+            prepare_candidate_data(work_experiences, 'organization', column)
+        elif column_name == 'candidate_experience.position':
+            prepare_candidate_data(work_experiences, 'position', column)
+        elif column_name == 'candidate_education.schoolName':
+            school_names.append(column)
+        elif column_name == "candidate_education_degree_bullet.concentrationType":
+            prepare_candidate_data(degrees, 'bullets', [{'major': column}])
+        elif column_name == 'student_year':
+            column = column.lower()
+            current_year = datetime.datetime.now().year
+            if 'freshman' in column:
+                graduation_year = current_year + 3
+                university_start_year = current_year - 1  # TODO this is a bug lol
+                degree_title = 'Bachelors'
+            elif 'sophomore' in column:
+                graduation_year = current_year + 2
+                university_start_year = current_year - 2
+                degree_title = 'Bachelors'
+            elif 'junior' in column:
+                graduation_year = current_year + 1
+                university_start_year = current_year - 3
+                degree_title = 'Bachelors'
+            elif 'senior' in column:
+                graduation_year = current_year
+                university_start_year = current_year - 4
+                degree_title = 'Bachelors'
+            elif 'ms' in column or 'mba' in column:
+                graduation_year = current_year
+                university_start_year = current_year - 2
+                degree_title = 'Masters'
+            else:
+                continue
 
-    except Exception as e:
-        from spreadsheet_import_service.common.utils.talent_reporting import email_error_to_admins
-        email_error_to_admins("Error message: %s\nNew catalog: %s\nCatalog: %s" % (e, catalog, new_catalog),
-                              "Error importing CSV")
-        raise InvalidUsage(error_message="Error importing csv because %s" % e.message)
+            prepare_candidate_data(degrees, 'title', degree_title)
+            prepare_candidate_data(degrees, 'start_year', university_start_year)
+            prepare_candidate_data(degrees, 'end_year', graduation_year)
+            prepare_candidate_data(degrees, 'start_month', 6)
+            prepare_candidate_data(degrees, 'end_month', 6)
+
+        # `graduation_year` and `student_year` are mutually exclusive i.e. they cannot come together
+        elif column_name == 'candidate_education.graduation_year' and is_number(column):
+            prepare_candidate_data(degrees, 'end_year', int(column))
+        elif column_name == 'candidate_address.address_line_1':
+            prepare_candidate_data(addresses, 'address_line_1', column)
+        elif column_name == 'candidate_address.address_line_2':
+            prepare_candidate_data(addresses, 'address_line_2', column)
+        elif column_name == 'candidate_address.city':
+            prepare_candidate_data(addresses, 'city', column)
+        elif column_name == 'candidate_address.state':
+            prepare_candidate_data(addresses, 'state', column)
+        elif column_name == 'candidate_address.subdivision_code':
+            prepare_candidate_data(addresses, 'subdivision_code', column)
+        elif column_name == 'candidate_address.zipCode':
+            prepare_candidate_data(addresses, 'zip_code', column)
+        elif column_name == 'candidate_address.country_code':
+            prepare_candidate_data(addresses, 'country_code', column)
+        elif column_name == 'candidate.tags':
+            prepare_candidate_data(candidate_tags, 'name', column)
+        elif column_name == 'candidate.skills':
+            if ',' in column:
+                # Comma Separated Skills
+                column = [skill.strip() for skill in column.split(',') if skill.strip()]
+                for skill in column:
+                    prepare_candidate_data(skills, 'name', skill)
+            else:
+                prepare_candidate_data(skills, 'name', column)
+        elif column_name == 'candidate.notes':
+            prepare_candidate_data(candidate_notes, 'comment', column)
+        elif column_name == 'candidate.social_profile_url':
+            social_network_name = reference_data.get_social_network_name(column)
+            if social_network_name:
+                prepare_candidate_data(social_networks, 'profile_url', column)
+                prepare_candidate_data(social_networks, 'name', social_network_name)
+            else:
+                logger.warning("Couldn't add social profile url: (%s) of candidate ", column)
+
+        elif 'custom_field.' in column_name:
+            custom_fields_dict = {}
+            if isinstance(column, basestring):
+                custom_fields_dict['custom_field_id'] = int(column_name.split('.')[1])
+                custom_fields_dict['value'] = column.strip()
+            if custom_fields_dict:
+                custom_fields.append(custom_fields_dict)
+        elif 'talent_pool.' in column_name:
+            if isinstance(column, basestring):
+                talent_pool_dict['add'].append(int(column_name.split('.')[1]))
+
+        number_of_educations = max(len(degrees), len(school_names))
+
+    # Prepare candidate educational data
+    for index in range(0, number_of_educations):
+        education = {}
+        if index < len(school_names):
+            education['school_name'] = school_names[index]
+
+        if index < len(degrees):
+            education['degrees'] = [degrees[index]]
+
+        educations.append(education)
+
+    # Create candidate object based on candidate state variables
+    candidate_data = dict(full_name=formatted_name,
+                          status_id=status_id,
+                          first_name=first_name,
+                          middle_name=middle_name,
+                          last_name=last_name,
+                          summary=summary,
+                          emails=emails,
+                          phones=phones,
+                          work_experiences=work_experiences,
+                          educations=educations,
+                          addresses=addresses,
+                          source_id=this_source_id,
+                          social_networks=social_networks,
+                          talent_pool_ids=talent_pool_dict,
+                          areas_of_interest=areas_of_interest,
+                          custom_fields=custom_fields,
+                          skills=skills)
+
+    # Remove null values from candidate object
+    candidate_data = {key: value for key, value in candidate_data.items() if value is not None}
+    return candidate_data, candidate_tags, candidate_notes
 
 
 @celery_app.task()
-def import_from_spreadsheet(table, spreadsheet_filename, header_row, talent_pool_ids,
+def import_from_spreadsheet(spreadsheet_filename, header_row, talent_pool_ids,
                             oauth_token, user_id, is_scheduled=False, source_id=None,
-                            formatted_candidate_tags=None, frequency_id=None):
+                            formatted_candidate_tags=None, frequency_id=None, import_mode=IMPORT_MODE_BATCH,
+                            start_row=0, end_row=None):
     """
-    This function will create new candidates from information of candidates given in a csv file
+    This function will create new candidates from information of candidates given in a csv file.
+    Spreadsheet is downloaded from S3 (CSVResumes folder) to disk and given range of its rows is read lazily, so
+    neither the task's arguments nor worker's memory grow with size of spreadsheet.
     :param source_id: Id of candidates source
-    :param table: An array of candidate's dicts
-    :param spreadsheet_filename: Name of spreadsheet file from which candidates are being imported
+    :param spreadsheet_filename: Name of spreadsheet file (in CSVResumes folder of S3) from which candidates are
+                                 being imported
     :param header_row: An array of headers of candidate's spreadsheet
     :param talent_pool_ids: An array on talent_pool_ids
     :param oauth_token: OAuth token of logged-in user
@@ -133,245 +238,97 @@ def import_from_spreadsheet(table, spreadsheet_filename, header_row, talent_pool
     :type formatted_candidate_tags: list[dict[str]]
     :param frequency_id: ID that describes candidate's subscription preference
     :type frequency_id: int
+    :param import_mode: IMPORT_MODE_BATCH to create & update candidates in batches (see batch_import.py) or
+                        IMPORT_MODE_PER_ROW to import every row with its own requests to candidate-service
+    :param int start_row: Index of first non-empty row of spreadsheet to be imported
+    :param int | None end_row: Index after last row to be imported, None to import till end of spreadsheet
     :return: A dictionary containing number of candidates successfully imported
     :rtype: dict
     """
 
-    assert table
     assert spreadsheet_filename
     assert header_row
 
     user = User.query.get(user_id)
     domain_id = user.domain_id
+    spreadsheet_file = None
 
     try:
-
-        domain_areas_of_interest = get_or_create_areas_of_interest(user.domain_id, include_child_aois=True)
+        start_time = time.time()
+        bucket, conn = get_s3_bucket_and_conn()
+        spreadsheet_file = download_file_to_temporary_file(bucket, 'CSVResumes/%s' % os.path.basename(
+            spreadsheet_filename))
+        if end_row is None:
+            end_row = count_spreadsheet_rows(spreadsheet_file, spreadsheet_filename)
+        number_of_rows = max(end_row - start_row, 0)
+        rows = enumerate(islice(iter_spreadsheet_rows(spreadsheet_file, spreadsheet_filename), start_row, end_row),
+                         start=start_row)
+        reference_data = ImportReferenceData(domain_id, get_or_create_areas_of_interest(domain_id,
+                                                                                        include_child_aois=True))
 
         candidate_ids, erroneous_data = [], []
-        candidate_tags = formatted_candidate_tags or []
-
-        for i, row in enumerate(table):
-            # Candidate state variables: These can be populated for each candidate
-            first_name, middle_name, last_name, formatted_name, status_id = None, None, None, None, None
-            summary = None
-            emails, phones, areas_of_interest, addresses, degrees, candidate_notes = [], [], [], [], [], []
-            school_names, work_experiences, educations, custom_fields, social_networks = [], [], [], [], []
-            skills = []
-
-            talent_pool_dict = {'add': talent_pool_ids}
-            this_source_id = source_id
-            number_of_educations = 0
-
-            # Go through each row of the spreadsheet and set the state variables
-            for column_index, column in enumerate(row):
-                if column_index >= len(header_row):
-                    continue
-                column_name = header_row[column_index]
-                if not column_name or not column:
-                    continue
 
-                if column_name == 'candidate.formattedName':
-                    formatted_name = column
-                elif column_name == 'candidate.statusId':
-                    status_id = int(column) if is_number(column) else column
-                elif column_name == 'candidate.firstName':
-                    first_name = column
-                elif column_name == 'candidate.middleName':
-                    middle_name = column
-                elif column_name == 'candidate.lastName':
-                    last_name = column
-                elif column_name == 'candidate.summary':
-                    summary = column
-                elif column_name == 'candidate_email.address':
-                    emails.append({'address': column})
-                elif column_name == 'candidate_phone.value':
-                    phones.append({'value': column})
-                elif column_name == 'candidate.source':
-                    source = CandidateSource.query.filter_by(description=column, domain_id=domain_id).all()
-                    if len(source):
-                        this_source_id = source[0].id
-                    else:
-                        source = CandidateSource(description=column, domain_id=domain_id)
-                        db.session.add(source)
-                        db.session.commit()
-                        this_source_id = source.id
-                elif column_name == 'area_of_interest.description':
-                    column = column.strip()
-                    matching_areas_of_interest = filter(lambda aoi_row: aoi_row.name.lower().
-                                                        replace(' ', '') == column.lower().replace(' ', ''),
-                                                        domain_areas_of_interest)
-                    if matching_areas_of_interest:
-                        areas_of_interest.append({'area_of_interest_id': matching_areas_of_interest[0].id})
-                    else:
-                        logger.warning("Unknown AOI when importing from CSV, user %s: %s", user_id, column)
-                elif column_name == 'candidate_experience.organization':
-                    prepare_candidate_data(work_experiences, 'organization', column)
-                elif column_name == 'candidate_experience.position':
-                    prepare_candidate_data(work_experiences, 'position', column)
-                elif column_name == 'candidate_education.schoolName':
-                    school_names.append(column)
-                elif column_name == "candidate_education_degree_bullet.concentrationType":
-                    prepare_candidate_data(degrees, 'bullets', [{'major': column}])
-                elif column_name == 'student_year':
-                    column = column.lower()
-                    current_year = datetime.datetime.now().year
-                    if 'freshman' in column:
-                        graduation_year = current_year + 3
-                        university_start_year = current_year - 1  # TODO this is a bug lol
-                        degree_title = 'Bachelors'
-                    elif 'sophomore' in column:
-                        graduation_year = current_year + 2
-                        university_start_year = current_year - 2
-                        degree_title = 'Bachelors'
-                    elif 'junior' in column:
-                        graduation_year = current_year + 1
-                        university_start_year = current_year - 3
-                        degree_title = 'Bachelors'
-                    elif 'senior' in column:
-                        graduation_year = current_year
-                        university_start_year = current_year - 4
-                        degree_title = 'Bachelors'
-                    elif 'ms' in column or 'mba' in column:
-                        graduation_year = current_year
-                        university_start_year = current_year - 2
-                        degree_title = 'Masters'
-                    else:
-                        continue
-
-                    prepare_candidate_data(degrees, 'title', degree_title)
-                    prepare_candidate_data(degrees, 'start_year', university_start_year)
-                    prepare_candidate_data(degrees, 'end_year', graduation_year)
-                    prepare_candidate_data(degrees, 'start_month', 6)
-                    prepare_candidate_data(degrees, 'end_month', 6)
-
-                # `graduation_year` and `student_year` are mutually exclusive i.e. they cannot come together
-                elif column_name == 'candidate_education.graduation_year' and is_number(column):
-                    prepare_candidate_data(degrees, 'end_year', int(column))
-                elif column_name == 'candidate_address.address_line_1':
-                    prepare_candidate_data(addresses, 'address_line_1', column)
-                elif column_name == 'candidate_address.address_line_2':
-                    prepare_candidate_data(addresses, 'address_line_2', column)
-                elif column_name == 'candidate_address.city':
-                    prepare_candidate_data(addresses, 'city', column)
-                elif column_name == 'candidate_address.state':
-                    prepare_candidate_data(addresses, 'state', column)
-                elif column_name == 'candidate_address.subdivision_code':
-                    prepare_candidate_data(addresses, 'subdivision_code', column)
-                elif column_name == 'candidate_address.zipCode':
-                    prepare_candidate_data(addresses, 'zip_code', column)
-                elif column_name == 'candidate_address.country_code':
-                    prepare_candidate_data(addresses, 'country_code', column)
-                elif column_name == 'candidate.tags':
-                    prepare_candidate_data(candidate_tags, 'name', column)
-                elif column_name == 'candidate.skills':
-                    if ',' in column:
-                        # Comma Separated Skills
-                        column = [skill.strip() for skill in column.split(',') if skill.strip()]
-                        for skill in column:
-                            prepare_candidate_data(skills, 'name', skill)
-                    else:
-                        prepare_candidate_data(skills, 'name', column)
-                elif column_name == 'candidate.notes':
-                    prepare_candidate_data(candidate_notes, 'comment', column)
-                elif column_name == 'candidate.social_profile_url':
-                    social_network_object = SocialNetwork.query.filter(literal(column.lower()).contains(
-                            func.lower(SocialNetwork.name))).first()
-                    if social_network_object:
-                        prepare_candidate_data(social_networks, 'profile_url', column)
-                        prepare_candidate_data(social_networks, 'name', social_network_object.name)
-                    else:
-                        logger.warning("Couldn't add social profile url: (%s) of candidate ", column)
-
-                elif 'custom_field.' in column_name:
-                    custom_fields_dict = {}
-                    if isinstance(column, basestring):
-                        custom_fields_dict['custom_field_id'] = int(column_name.split('.')[1])
-                        custom_fields_dict['value'] = column.strip()
-                    if custom_fields_dict:
-                        custom_fields.append(custom_fields_dict)
-                elif 'talent_pool.' in column_name:
-                    if isinstance(column, basestring):
-                        talent_pool_dict['add'].append(int(column_name.split('.')[1]))
-
-                number_of_educations = max(len(degrees), len(school_names))
-
-            # Prepare candidate educational data
-            for index in range(0, number_of_educations):
-                education = {}
-                if index < len(school_names):
-                    education['school_name'] = school_names[index]
-
-                if index < len(degrees):
-                    education['degrees'] = [degrees[index]]
-
-                educations.append(education)
-
-            # Create candidate object based on candidate state variables
-            candidate_data = dict(full_name=formatted_name,
-                                  status_id=status_id,
-                                  first_name=first_name,
-                                  middle_name=middle_name,
-                                  last_name=last_name,
-                                  summary=summary,
-                                  emails=emails,
-                                  phones=phones,
-                                  work_experiences=work_experiences,
-                                  educations=educations,
-                                  addresses=addresses,
-                                  source_id=this_source_id,
-                                  social_networks=social_networks,
-                                  talent_pool_ids=talent_pool_dict,
-                                  areas_of_interest=areas_of_interest,
-                                  custom_fields=custom_fields,
-                                  skills=skills)
-
-            # Remove null values from candidate object
-            candidate_data = {key: value for key, value in candidate_data.items() if value is not None}
-
-            # Create the candidate and handle the response
-            created, response = create_candidates_from_parsed_spreadsheet(candidate_data, oauth_token)
-            if created:
-                response_candidate_ids = [candidate.get('id') for candidate in response.get('candidates', [])]
-                candidate_ids += response_candidate_ids
-
-                # Adding Notes and Tags to Candidate Object
-                if response_candidate_ids:
-                    add_extra_fields_to_candidate(response_candidate_ids[0], oauth_token,
-                                                  tags=candidate_tags,
-                                                  notes=candidate_notes,
-                                                  frequency_id=frequency_id)
-
-                logger.info("Successfully imported %s candidates with ids: (%s)",
-                            len(response_candidate_ids), response_candidate_ids)
-            else:
-                # Continue with the rest of the spreadsheet imports despite errors returned from candidate-service
-                logger.info("SpreadSheet Import Service: Could not import candidate row %s: `%s` in file: `%s`;"
-                            "error: %s",
-                            i,
-                            row,
-                            get_s3_url('CSVResumes', spreadsheet_filename),
-                            response.json() if hasattr(response, 'json') else response)
+        parsed_rows = parse_rows(rows, header_row, talent_pool_ids, user_id, reference_data, source_id,
+                                 formatted_candidate_tags)
+        if import_mode == IMPORT_MODE_BATCH:
+            importer = CandidatesBatchImporter(oauth_token, domain_id, frequency_id=frequency_id)
+            candidate_ids, erroneous_rows = importer.import_rows(parsed_rows)
+            for i, row in erroneous_rows:
                 row.insert(0, i + 1)  # Make row number first element in array
                 erroneous_data.append(row)
-                continue
-
-        logger.info("SpreadSheet Import Service: Successfully imported %s candidates from CSV: User %s" % (
-            len(candidate_ids), user.id))
+        else:
+            for i, row, candidate_data, candidate_tags, candidate_notes in parsed_rows:
+                # Create the candidate and handle the response
+                created, response = create_candidates_from_parsed_spreadsheet(candidate_data, oauth_token)
+                if created:
+                    response_candidate_ids = [candidate.get('id') for candidate in response.get('candidates', [])]
+                    candidate_ids += response_candidate_ids
+
+                    # Adding Notes and Tags to Candidate Object
+                    if response_candidate_ids:
+                        add_extra_fields_to_candidate(response_candidate_ids[0], oauth_token,
+                                                      tags=candidate_tags,
+                                                      notes=candidate_notes,
+                                                      frequency_id=frequency_id)
+
+                    logger.info("Successfully imported %s candidates with ids: (%s)",
+                                len(response_candidate_ids), response_candidate_ids)
+                else:
+                    # Continue with rest of the spreadsheet imports despite errors returned from candidate-service
+                    logger.info("SpreadSheet Import Service: Could not import candidate row %s: `%s` in file: `%s`;"
+                                "error: %s",
+                                i,
+                                row,
+                                get_s3_url('CSVResumes', spreadsheet_filename),
+                                response.json() if hasattr(response, 'json') else response)
+                    row.insert(0, i + 1)  # Make row number first element in array
+                    erroneous_data.append(row)
+                    continue
 
+        elapsed_time = time.time() - start_time
+        rows_per_second = round(number_of_rows / elapsed_time, 2) if elapsed_time else number_of_rows
+        logger.info("SpreadSheet Import Service: Successfully imported %s candidates from CSV: User %s. "
+                    "Rows: %s, Time: %.2fs, Rows/sec: %s (%s mode)", len(candidate_ids), user.id, number_of_rows,
+                    elapsed_time, rows_per_second, import_mode)
+
+        msg_body = """
+        import_from_spreadsheet: Import completed.
+        User ID: %s
+        S3_URL: %s
+        Candidates imported: %s of %s rows
+        Import mode: %s
+        Time taken: %.2f seconds (%s rows/sec)""" % (user_id, get_s3_url('CSVResumes', spreadsheet_filename),
+                                                     len(candidate_ids), number_of_rows, import_mode, elapsed_time,
+                                                     rows_per_second)
         if erroneous_data:
             erroneous_data_str = '\n'.join(map(str, erroneous_data))
-            msg_body = """
-            import_from_spreadsheet: Some candidates not imported.
-            User ID: %s
-            S3_URL: %s
-            Erroneous rows (%s):
-            %s"""
-            email_notification_to_admins(msg_body % (user_id,
-                                                     get_s3_url('CSVResumes', spreadsheet_filename),
-                                                     len(erroneous_data),
-                                                     erroneous_data_str),
-                                         subject="import_from_csv")
+            msg_body += """
+        Some candidates not imported.
+        Erroneous rows (%s):
+        %s""" % (len(erroneous_data), erroneous_data_str)
+
+        if erroneous_data or is_scheduled:
+            email_notification_to_admins(msg_body, subject="import_from_csv")
 
         if not is_scheduled:
             return jsonify(dict(count=len(candidate_ids), status='complete')), 201
@@ -385,6 +342,29 @@ def import_from_spreadsheet(table, spreadsheet_filename, header_row, talent_pool
             user_id, spreadsheet_filename, e)
         if not is_scheduled:
             raise InternalServerError(message)
+    finally:
+        if spreadsheet_file:
+            spreadsheet_file.close()
+
+
+def parse_rows(rows, header_row, talent_pool_ids, user_id, reference_data, source_id=None,
+               formatted_candidate_tags=None):
+    """
+    Yields (row index, row, candidate's dict, tags, notes) of every row. Rows are read IMPORT_BATCH_SIZE at a time
+    and new sources of those rows are created together before they are parsed.
+    :param rows: Iterable of (row index, row) of spreadsheet
+    :param ImportReferenceData reference_data: Sources, social networks & areas of interest of user's domain
+    :rtype: collections.Iterable[tuple]
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, IMPORT_BATCH_SIZE))
+        if not batch:
+            break
+        reference_data.add_sources_of_rows([row for _, row in batch], header_row)
+        for i, row in batch:
+            yield (i, row) + get_candidate_data_from_row(row, header_row, talent_pool_ids, user_id, reference_data,
+                                                         source_id, formatted_candidate_tags)
 
 
 def get_or_create_areas_of_interest(domain_id, include_child_aois=False):
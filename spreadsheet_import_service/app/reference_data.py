@@ -0,0 +1,96 @@
+"""
+Reference data (candidate sources, social networks and areas of interest) used while importing a spreadsheet.
+
+All of these are loaded once per import into maps keyed by normalized names, so resolving a cell of a row doesn't
+run any SQL. Sources not present in user's domain are created for a batch of rows at once, before its rows are
+parsed.
+"""
+from spreadsheet_import_service.common.models.db import db
+from spreadsheet_import_service.common.models.candidate import CandidateSource, SocialNetwork
+
+SOURCE_HEADER = 'candidate.source'
+
+
+def normalize_source(description):
+    """
+    Sources are matched the way MySQL compares strings i.e. case-insensitively & ignoring trailing spaces
+    :rtype: basestring
+    """
+    return description.rstrip().lower()
+
+
+def normalize_area_of_interest(name):
+    return name.lower().replace(' ', '')
+
+
+class ImportReferenceData(object):
+    """
+    Per-import lookup of ids of candidate sources & areas of interest and names of social networks.
+    """
+
+    def __init__(self, domain_id, areas_of_interest):
+        """
+        :param int | long domain_id: Domain id of logged-in user
+        :param list[AreaOfInterest] areas_of_interest: Areas of interest of user's domain
+        """
+        self.domain_id = domain_id
+        self.source_ids = {}
+        for source_id, description in db.session.query(CandidateSource.id, CandidateSource.description).filter(
+                CandidateSource.domain_id == domain_id).order_by(CandidateSource.id):
+            self.source_ids.setdefault(normalize_source(description or ''), source_id)
+
+        # Social networks are matched by their name appearing in profile URL, so they are kept in a list
+        self.social_network_names = [(name.lower(), name) for name, in db.session.query(SocialNetwork.name).
+                                     order_by(SocialNetwork.id)]
+
+        self.area_of_interest_ids = {}
+        for area_of_interest in areas_of_interest:
+            self.area_of_interest_ids.setdefault(normalize_area_of_interest(area_of_interest.name),
+                                                 area_of_interest.id)
+
+    def add_sources_of_rows(self, rows, header_row):
+        """
+        Creates sources, given in rows of spreadsheet, which don't exist in domain yet, with a single INSERT.
+        :param list rows: Rows of spreadsheet
+        :param list header_row: An array of headers of candidate's spreadsheet
+        """
+        if SOURCE_HEADER not in header_row:
+            return
+        column_index = header_row.index(SOURCE_HEADER)
+        new_sources = {}
+        for row in rows:
+            description = row[column_index] if column_index < len(row) else None
+            if description and normalize_source(description) not in self.source_ids:
+                new_sources.setdefault(normalize_source(description), description)
+        if not new_sources:
+            return
+
+        db.session.bulk_insert_mappings(CandidateSource, [dict(description=description, domain_id=self.domain_id)
+                                                          for description in new_sources.itervalues()])
+        db.session.commit()
+        for source_id, description in db.session.query(CandidateSource.id, CandidateSource.description).filter(
+                CandidateSource.domain_id == self.domain_id,
+                CandidateSource.description.in_(new_sources.values())).order_by(CandidateSource.id):
+            self.source_ids.setdefault(normalize_source(description), source_id)
+
+    def get_source_id(self, description):
+        """
+        Returns id of source with given description. Sources of rows must be added by add_sources_of_rows() first.
+        :rtype: int | long | None
+        """
+        return self.source_ids.get(normalize_source(description))
+
+    def get_social_network_name(self, profile_url):
+        """
+        Returns name of social network whose name appears in given profile URL
+        :rtype: basestring | None
+        """
+        profile_url = profile_url.lower()
+        return next((name for lower_name, name in self.social_network_names if lower_name in profile_url), None)
+
+    def get_area_of_interest_id(self, name):
+        """
+        Returns id of area of interest, whose name matches given name ignoring case and spaces
+        :rtype: int | long | None
+        """
+        return self.area_of_interest_ids.get(normalize_area_of_interest(name))
@@ -0,0 +1,152 @@
+"""
+Streaming reader of candidates' spreadsheets (CSV, XLS and XLSX).
+
+Rows are read lazily and normalized (stripped, decoded and padded to number of columns of first row), so that
+large spreadsheets are never held in memory as a whole. Encoding of a CSV file is detected once from a sample of
+its beginning.
+
+    for row in iter_spreadsheet_rows(spreadsheet_file, filename):
+        ...
+"""
+import csv
+import datetime
+from itertools import islice
+
+import xlrd
+import chardet
+
+from spreadsheet_import_service.common.error_handling import InvalidUsage
+from spreadsheet_import_service.common.utils.talent_reporting import email_error_to_admins
+
+# Number of bytes read at once from a CSV file, also used as sample to detect its encoding
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+def iter_spreadsheet_rows(spreadsheet_file, filename):
+    """
+    Yields non-empty rows of given spreadsheet
+    :param spreadsheet_file: python file object
+    :param filename: spreadsheet file name
+    :rtype: collections.Iterable[list]
+    """
+    if ".csv" in filename:
+        return iter_csv_rows(spreadsheet_file)
+    return iter_excel_rows(spreadsheet_file)
+
+
+def convert_spreadsheet_to_table(spreadsheet_file, filename, max_rows=None):
+    """
+    Convert a spreadsheet file object to a python table object (array of arrays)
+    :param spreadsheet_file: python file object
+    :param filename: spreadsheet file name
+    :param max_rows: Maximum number of rows to read from beginning of spreadsheet
+    :return: An array containing rows of spreadsheets
+    :rtype: list[list]
+    """
+    return list(islice(iter_spreadsheet_rows(spreadsheet_file, filename), max_rows))
+
+
+def count_spreadsheet_rows(spreadsheet_file, filename):
+    """
+    Counts non-empty rows of spreadsheet without keeping them in memory. File is rewound afterwards.
+    :rtype: int
+    """
+    number_of_rows = sum(1 for _ in iter_spreadsheet_rows(spreadsheet_file, filename))
+    spreadsheet_file.seek(0)
+    return number_of_rows
+
+
+def detect_encoding(csv_file):
+    """
+    Detects encoding of CSV file from its first CSV_CHUNK_SIZE bytes. File is rewound afterwards.
+    :rtype: str
+    """
+    csv_file.seek(0)
+    sample = csv_file.read(CSV_CHUNK_SIZE)
+    csv_file.seek(0)
+    encoding = chardet.detect(sample)['encoding'] or 'cp1252'
+    # Non-ASCII characters may appear after the sample, UTF-8 decodes ASCII text same as ASCII does
+    return 'utf-8' if encoding.lower() == 'ascii' else encoding
+
+
+def iter_lines(csv_file):
+    """
+    Yields lines of file without line breaks, reading it in chunks. Lines may end with '\n', '\r\n' or '\r'.
+    """
+    remainder = ''
+    for chunk in iter(lambda: csv_file.read(CSV_CHUNK_SIZE), ''):
+        lines = (remainder + chunk).splitlines(True)
+        # Last line may be incomplete, or its '\r' may be followed by '\n' in next chunk
+        remainder = lines.pop()
+        for line in lines:
+            yield line.rstrip('\r\n')
+    if remainder:
+        yield remainder.rstrip('\r\n')
+
+
+def iter_csv_rows(csv_file):
+    """
+    Yields non-empty rows of CSV file with their columns stripped & decoded
+    :param csv_file: python file object
+    :rtype: collections.Iterable[list]
+    """
+    try:
+        encoding = detect_encoding(csv_file)
+        # Guess dialect with sniffer and read in CSV
+        dialect = csv.Sniffer().sniff(csv_file.readline())
+        csv_file.seek(0)
+
+        num_columns = None
+        for row in csv.reader(iter_lines(csv_file), dialect=dialect):
+            # Rows are padded to number of columns of first row
+            num_columns = num_columns or len(row)
+            row_array = []
+            is_row_empty = True
+            for column_index in range(max(num_columns, len(row))):
+                column = row[column_index].strip(' ') if len(row) > column_index else ''
+                if column:
+                    is_row_empty = False  # to ignore empty rows
+                try:
+                    row_array.append(column.decode(encoding))
+                except UnicodeDecodeError:
+                    row_array.append(column.decode('latin-1'))
+            if not is_row_empty:
+                yield row_array
+
+    except Exception as e:
+        email_error_to_admins("Error message: %s" % e, "Error importing CSV")
+        raise InvalidUsage(error_message="Error importing csv because %s" % e.message)
+
+
+def iter_excel_rows(spreadsheet_file):
+    """
+    Yields non-empty rows of first sheet of XLS or XLSX file. Workbooks downloaded to disk are opened from their
+    path, so that xlrd memory-maps XLS files instead of reading them into a string.
+    :param spreadsheet_file: python file object
+    :rtype: collections.Iterable[list]
+    """
+    if getattr(spreadsheet_file, 'name', None):
+        book = xlrd.open_workbook(filename=spreadsheet_file.name, on_demand=True)
+    else:
+        spreadsheet_file.seek(0)
+        book = xlrd.open_workbook(filename=None, file_contents=spreadsheet_file.read(), on_demand=True)
+    first_sheet = book.sheet_by_index(0)
+
+    for row_index in xrange(first_sheet.nrows):
+        cell_values = []
+        for cell in first_sheet.row(row_index):  # array of cell objects
+            cell_value = cell.value
+            cell_type = cell.ctype
+
+            if cell_type == xlrd.XL_CELL_NUMBER:  # there should be no float-type data
+                cell_value = str(int(cell_value))
+            elif cell_type == xlrd.XL_CELL_TEXT:
+                cell_value = cell_value.strip()
+            elif cell_type == xlrd.XL_CELL_DATE:
+                cell_value = datetime.datetime(*(xlrd.xldate.xldate_as_tuple(cell_value, book.datemode)))
+                cell_value = cell_value.isoformat()
+
+            cell_values.append(cell_value)
+
+        if cell_values:
+            yield cell_values
@@ -3,12 +3,22 @@
 
         * test_convert_spreadsheet_to_table: It'll test functionality of '/parse_spreadsheet/convert_to_table' endpoint
         * test_import_candidates_from_spreadsheet: It'll test functionality of '/parse_spreadsheet/import_from_table' endpoint
+        * test_get_failed_candidate_indices: It'll test matching of candidates failed in a batch with their rows
+        * test_split_batch_does_not_modify_rows: It'll test existing candidates' ids are set in copies of rows
+        * test_import_reference_data: It'll test resolving sources, social networks & AOIs of rows from preloaded maps
+        * test_iter_csv_rows: It'll test streaming rows of a CSV file with encoding detected once per file
         * test_health_check: It'll test either the service is up
 """
 from time import sleep
 from spreadsheet_import_service.common.tests.conftest import *
 from spreadsheet_import_service.common.utils.test_utils import send_request, response_info
 from spreadsheet_import_service.common.routes import CandidateApiUrl
+from spreadsheet_import_service.app.batch_import import (get_candidate_dict_with_tags, get_failed_candidate_indices,
+                                                         CandidatesBatchImporter)
+from spreadsheet_import_service.app.reference_data import ImportReferenceData
+from spreadsheet_import_service.app.parsing_utilities import get_or_create_areas_of_interest
+from spreadsheet_import_service.app.spreadsheet_reader import iter_csv_rows, count_spreadsheet_rows
+from spreadsheet_import_service.common.models.candidate import CandidateSource, CandidateEmail
 from common_functions import candidate_test_data, import_spreadsheet_candidates, SpreadsheetImportApiUrl
 
 
@@ -65,6 +75,87 @@ def test_import_candidates_from_spreadsheet(access_token_first, user_first, tale
     sleep(10)
 
 
+def test_get_failed_candidate_indices():
+    rows = [(index, [], {'first_name': 'John\t%s' % index, 'emails': [{'address': 'john%s@example.com' % index}],
+                         'talent_pool_ids': {'add': [1]}}, [{'name': ' Python '}], [])
+            for index in xrange(4)]
+    candidates = [get_candidate_dict_with_tags(parsed_row) for parsed_row in rows]
+    assert candidates[0]['first_name'] == 'John 0'
+    assert candidates[0]['tags'] == [{'name': 'python'}]
+    assert '\t' in rows[0][2]['first_name']  # Parsed row is not modified
+
+    # Candidate-service returns failed candidates with their position in request, starting from 1
+    errors = [dict(candidate_data=dict(candidates[index], source_product_id=2), position=index + 1,
+                   error_message='Failed') for index in (3, 1)]
+    assert get_failed_candidate_indices(candidates, errors) == {1, 3}
+    assert get_failed_candidate_indices(candidates, []) == set()
+
+    # Position of failed candidate is not in request
+    try:
+        get_failed_candidate_indices(candidates, [dict(candidate_data={'first_name': 'Jane'}, position=5,
+                                                       error_message='Failed')])
+        assert None, 'It should raise an exception'
+    except Exception as error:
+        assert 'position' in error.message
+
+
+def test_split_batch_does_not_modify_rows(user_first, candidate_first):
+    address = fake.safe_email()
+    db.session.add(CandidateEmail(candidate_id=candidate_first.id, address=address))
+    db.session.commit()
+    rows = [(0, [], {'emails': [{'address': address}]}, [], []),
+            (1, [], {'emails': [{'address': fake.safe_email()}]}, [], [])]
+
+    importer = CandidatesBatchImporter('Bearer %s' % gen_salt(20), user_first.domain_id)
+    new_rows, existing_rows = importer.split_batch(rows, [])
+    assert new_rows == [rows[1]]
+    assert existing_rows[0][2]['id'] == candidate_first.id
+    assert 'id' not in rows[0][2]  # Parsed row is not modified
+
+
+def test_import_reference_data(user_first):
+    domain_id = user_first.domain_id
+    existing_source = CandidateSource(description='Source %s' % fake.uuid4(), domain_id=domain_id)
+    db.session.add(existing_source)
+    db.session.commit()
+    areas_of_interest = get_or_create_areas_of_interest(domain_id, include_child_aois=True)
+    reference_data = ImportReferenceData(domain_id, areas_of_interest)
+
+    new_source = 'New Source %s' % fake.uuid4()
+    header_row = ['candidate.firstName', 'candidate.source']
+    rows = [['John', new_source], ['Jane', new_source.upper()], ['Jim', existing_source.description.lower() + ' '],
+            ['Joe']]
+    reference_data.add_sources_of_rows(rows, header_row)
+    # New source is created once for both of its spellings
+    new_sources = CandidateSource.query.filter_by(domain_id=domain_id, description=new_source).all()
+    assert len(new_sources) == 1
+    assert reference_data.get_source_id(new_source.upper()) == new_sources[0].id
+    assert reference_data.get_source_id(rows[2][1]) == existing_source.id
+    reference_data.add_sources_of_rows(rows, header_row)
+    assert CandidateSource.query.filter_by(domain_id=domain_id, description=new_source).count() == 1
+
+    area_of_interest = areas_of_interest[0]
+    assert reference_data.get_area_of_interest_id(area_of_interest.name.upper().replace(' ', '')) == \
+        area_of_interest.id
+    assert reference_data.get_area_of_interest_id('Unknown AOI %s' % fake.uuid4()) is None
+    assert reference_data.get_social_network_name('https://www.unknown-network.com/johndoe') is None
+
+
+def test_iter_csv_rows():
+    from cStringIO import StringIO
+    # Non-ASCII name comes after a sample of ASCII rows, and line breaks are mixed
+    ascii_rows = ''.join('John %s,Doe,john%s@example.com\r\n' % (index, index) for index in xrange(3000))
+    csv_file = StringIO('first_name,last_name,email\n' + ascii_rows + '\r\nJos\xc3\xa9 , Garc\xc3\xada\rJane,Doe')
+    rows = iter_csv_rows(csv_file)
+    assert next(rows) == [u'first_name', u'last_name', u'email']
+    rows = list(rows)
+    assert len(rows) == 3002  # Empty row is skipped
+    assert rows[0] == [u'John 0', u'Doe', u'john0@example.com']
+    assert rows[-2] == [u'Jos\xe9', u'Garc\xeda', u'']  # Padded to number of columns of first row
+    assert rows[-1] == [u'Jane', u'Doe', u'']
+    assert count_spreadsheet_rows(csv_file, 'candidates.csv') == 3003
+
+
 def test_health_check():
     response = requests.get(SpreadsheetImportApiUrl.HEALTH_CHECK)
     assert response.status_code == 200
@@ -7,6 +7,7 @@ from user_service.common.models.db import db
 from user_service.common.models.user import User
 from user_service.common.models.misc import AreaOfInterest
 from user_service.common.error_handling import InvalidUsage, NotFoundError, ForbiddenError
+from user_service.common.utils.facet_labels_generation import bump_facet_labels_generation
 
 
 def create_or_update_domain_aois(domain_id, aois, aoi_id_from_url=None, is_creating=False, is_updating=False):
@@ -75,6 +76,7 @@ def create_or_update_domain_aois(domain_id, aois, aoi_id_from_url=None, is_creat
             created_or_updated_aoi_ids.append(aoi_id)
 
     db.session.commit()
+    bump_facet_labels_generation(domain_id)
     return created_or_updated_aoi_ids
 
 
@@ -125,6 +127,7 @@ def delete_domain_aoi(domain_id, aoi_id):
 
     db.session.delete(aoi_object)
     db.session.commit()
+    bump_facet_labels_generation(domain_id)
     return
 
 
@@ -141,4 +144,5 @@ def delete_domain_aois(domain_id):
     deleted_aoi_ids = [aoi.id for aoi in domain_aois]
     map(db.session.delete, domain_aois)
     db.session.commit()
+    bump_facet_labels_generation(domain_id)
     return deleted_aoi_ids
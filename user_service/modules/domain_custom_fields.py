@@ -15,6 +15,9 @@ from user_service.common.models.user import User
 # Error handling
 from user_service.common.error_handling import NotFoundError, ForbiddenError, InvalidUsage
 
+# Utilities
+from user_service.common.utils.facet_labels_generation import bump_facet_labels_generation
+
 
 def get_custom_field_if_validated(custom_field_id, user):
     """
@@ -83,6 +86,7 @@ def create_custom_fields(custom_fields, domain_id):
         created_custom_fields.append(dict(id=add_custom_field(domain_id, cf_category_id, cf_name)))
 
     db.session.commit()
+    bump_facet_labels_generation(domain_id)
     return created_custom_fields
 
 
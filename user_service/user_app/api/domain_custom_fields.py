@@ -28,6 +28,7 @@ from user_service.common.error_handling import InvalidUsage, NotFoundError, Forb
 # Helpers
 from user_service.modules.domain_custom_fields import get_custom_field_if_validated, create_custom_fields
 from user_service.common.inter_service_calls.candidate_service_calls import update_candidates_on_cloudsearch
+from user_service.common.utils.facet_labels_generation import bump_facet_labels_generation
 
 
 class DomainCustomFieldsResource(Resource):
@@ -133,6 +134,7 @@ class DomainCustomFieldsResource(Resource):
             custom_field_query = CustomField.query.filter_by(id=custom_field_id)
             custom_field_query.update(dict(name=custom_field_name))
             db.session.commit()
+            bump_facet_labels_generation(request.user.domain_id)
 
             return {'custom_field': {'id': custom_field_id}}
 
@@ -164,6 +166,7 @@ class DomainCustomFieldsResource(Resource):
             updated_custom_field_ids.append(custom_field_id)
 
         db.session.commit()
+        bump_facet_labels_generation(request.user.domain_id)
         return {'custom_fields': [{'id': custom_field_id} for custom_field_id in updated_custom_field_ids]}
 
     @require_all_permissions(Permission.PermissionNames.CAN_DELETE_DOMAIN_CUSTOM_FIELDS)
@@ -201,7 +204,9 @@ class DomainCustomFieldsResource(Resource):
 
             update_candidates_on_cloudsearch(request.oauth_token, custom_field_candidate_ids)
 
+            custom_field_domain_id = custom_field.domain_id
             db.session.delete(custom_field)
             db.session.commit()
+            bump_facet_labels_generation(custom_field_domain_id)
 
             return {'custom_field': {'id': custom_field_id}}
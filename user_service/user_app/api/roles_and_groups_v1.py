@@ -7,6 +7,7 @@ from user_service.common.talent_api import TalentApi
 from user_service.common.utils.validators import is_number
 from user_service.common.models.user import User, Domain, UserGroup, db, Role, Permission, PermissionsOfRole
 from user_service.common.utils.auth_utils import require_oauth, require_any_permission, require_all_permissions
+from user_service.common.utils.token_cache import invalidate_user_tokens
 from user_service.user_app.user_service_utilties import get_users_stats_from_mixpanel
 
 
@@ -188,6 +189,7 @@ class UserRolesApi(Resource):
 
         requested_user.role_id = role_id
         db.session.commit()
+        invalidate_user_tokens(requested_user.id)
 
         return '', 201
 
@@ -26,6 +26,7 @@ from user_service.common.error_handling import (ForbiddenError, InvalidUsage)
 
 # Utilities
 from user_service.common.utils.datetime_utils import DatetimeUtils
+from user_service.common.utils.facet_labels_generation import bump_facet_labels_generation
 
 
 class DomainSourceResource(Resource):
@@ -73,6 +74,7 @@ class DomainSourceResource(Resource):
 
         db.session.add(new_source)
         db.session.commit()
+        bump_facet_labels_generation(domain_id)
 
         return {'source': {'id': new_source.id}}, requests.codes.CREATED
 
@@ -12,6 +12,8 @@ from user_service.common.models.user import User, db, Permission, Token, Domain
 from user_service.common.utils.validators import is_valid_email, is_number
 from user_service.common.utils.auth_utils import gettalent_generate_password_hash
 from user_service.common.utils.auth_utils import require_oauth, require_all_permissions
+from user_service.common.utils.token_cache import invalidate_user_tokens
+from user_service.common.utils.facet_labels_generation import bump_facet_labels_generation
 from user_service.user_app.user_service_utilties import (check_if_user_exists, create_user_for_company,
                                                          get_users_stats_from_mixpanel,
                                                          send_new_account_email, validate_role)
@@ -41,6 +43,7 @@ class UserInviteApi(Resource):
         requested_user.is_disabled = 0
         requested_user.registration_id = 'Invited'
         db.session.commit()
+        invalidate_user_tokens(requested_user.id)
 
         send_new_account_email(requested_user.email, temp_password, requested_user.email)
 
@@ -168,6 +171,8 @@ class UserApi(Resource):
                                               domain_id=int(domain_id), dice_user_id=dice_user_id,
                                               thumbnail_url=thumbnail_url, user_group_id=user_group_id, locale=locale,
                                               role_id=role_id)
+            # New user is an owner option in candidate search facets of domain
+            bump_facet_labels_generation(int(domain_id))
             user_ids.append(user_id)
 
         return {'users': user_ids}
@@ -249,6 +254,10 @@ class UserApi(Resource):
 
         User.query.filter(User.id == requested_user_id).update(update_user_dict)
         db.session.commit()
+        invalidate_user_tokens(requested_user_id)
+        if first_name or last_name:
+            # Name of user is label of its owner facet in candidate search
+            bump_facet_labels_generation(requested_user.domain_id)
 
         if is_disabled:
             # Delete all tokens of deleted user
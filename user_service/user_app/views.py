@@ -14,6 +14,7 @@ from user_service.common.utils.validators import is_valid_email
 from user_service.common.models.user import Token, db
 from werkzeug.security import check_password_hash
 from user_service.common.utils.auth_utils import require_oauth, gettalent_generate_password_hash
+from user_service.common.utils.token_cache import invalidate_user_tokens
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 
 users_utilities_blueprint = Blueprint('users_utilities_api', __name__)
@@ -54,6 +55,7 @@ def update_password():
     request.user.password_reset_time = datetime.utcnow()
 
     db.session.commit()
+    invalidate_user_tokens(request.user.id)
 
     # Delete all existing tokens for logged-in user
     tokens = Token.query.filter_by(user_id=request.user.id).all()
@@ -141,6 +143,7 @@ def reset_password(token):
         user.password_reset_time = datetime.utcnow()
         user.is_disabled = 0
         db.session.commit()
+        invalidate_user_tokens(user.id)
         return '', 204
 
 